@@ -0,0 +1,593 @@
+"""
+Benchmarks de performance do Sistema de Controle de Brindes
+
+Uso:
+    python benchmark_performance.py            # executa todos
+    python benchmark_performance.py pool       # executa apenas um
+"""
+
+import sys
+import os
+import time
+import logging
+import sqlite3
+import tempfile
+import shutil
+
+# Adicionar o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.database.schema import DatabaseSchema
+
+def _temp_schema():
+    """Cria um banco temporário isolado para o benchmark"""
+    temp_dir = tempfile.mkdtemp(prefix="brindez_bench_")
+    schema = DatabaseSchema(os.path.join(temp_dir, "bench.db"))
+    return schema, temp_dir
+
+def _cleanup(schema, temp_dir):
+    """Fecha conexões e remove arquivos temporários"""
+    schema.close()
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+def _seed_brindes(schema, n: int, filiais: tuple = (1,)):
+    """Insere n brindes ativos (distribuídos entre as filiais) em uma transação"""
+    with schema.transaction() as conn:
+        conn.executemany("""
+            INSERT INTO brindes (codigo, descricao, categoria_id, quantidade, valor_unitario,
+                                 unidade_medida_id, filial_id)
+            VALUES (?, ?, 1, ?, ?, 1, ?)
+        """, (
+            (f"S{i:07d}", f"Brinde {i}", i % 250, 1 + (i % 97) / 10, filiais[i % len(filiais)])
+            for i in range(n)
+        ))
+
+def _report(nome: str, total: float, n: int):
+    """Imprime uma linha de resultado"""
+    print(f"  {nome:<40} {total:8.3f}s  {total / n * 1_000_000:9.1f} us/op")
+
+def bench_connection_pool(iterations: int = 2000):
+    """Latência por query: conexão nova a cada query vs pool reutilizável"""
+    print(f"\n=== POOL DE CONEXÕES ({iterations} queries) ===")
+    schema, temp_dir = _temp_schema()
+    query = "SELECT * FROM filiais WHERE id = ?"
+    try:
+        # Antes: abrir, configurar e fechar uma conexão por query
+        start = time.perf_counter()
+        for i in range(iterations):
+            conn = sqlite3.connect(schema.db_path)
+            conn.execute("PRAGMA foreign_keys = ON")
+            conn.row_factory = sqlite3.Row
+            try:
+                conn.execute(query, (i % 3 + 1,)).fetchall()
+            finally:
+                conn.close()
+        antes = time.perf_counter() - start
+        _report("conexão por query (antes)", antes, iterations)
+
+        # Depois: conexão da thread reaproveitada pelo pool
+        start = time.perf_counter()
+        for i in range(iterations):
+            schema.execute_query(query, (i % 3 + 1,))
+        depois = time.perf_counter() - start
+        _report("pool de conexões (depois)", depois, iterations)
+
+        print(f"  Ganho: {antes / depois:.1f}x")
+    finally:
+        _cleanup(schema, temp_dir)
+
+def bench_bulk_movements(n: int = 10000):
+    """Throughput de movimentações: uma transação por item vs lote único"""
+    from src.database.movement_engine import MovementEngine
+
+    print(f"\n=== MOVIMENTAÇÕES EM LOTE ({n} linhas) ===")
+    schema, temp_dir = _temp_schema()
+    try:
+        engine = MovementEngine()
+        engine.db = schema
+        brinde_ids = [
+            schema.execute_insert("""
+                INSERT INTO brindes (codigo, descricao, categoria_id, quantidade, valor_unitario,
+                                     unidade_medida_id, filial_id)
+                VALUES (?, ?, 1, ?, 1.0, 1, 1)
+            """, (f"B{i:03d}", f"Brinde {i}", n * 2))
+            for i in range(50)
+        ]
+        itens = [
+            {'brinde_id': brinde_ids[i % len(brinde_ids)], 'tipo': 'saida' if i % 3 else 'entrada',
+             'quantidade': 1, 'filial_origem_id': 1, 'usuario_id': 1}
+            for i in range(n)
+        ]
+
+        # Antes: uma transação (e um commit) por movimentação
+        start = time.perf_counter()
+        for item in itens:
+            engine.register(item)
+        antes = time.perf_counter() - start
+        _report("register por item (antes)", antes, n)
+
+        # Depois: lote validado e gravado com executemany em uma transação
+        start = time.perf_counter()
+        resultados = engine.register_bulk(itens)
+        depois = time.perf_counter() - start
+        _report("register_bulk (depois)", depois, n)
+
+        assert all(r['sucesso'] for r in resultados)
+        print(f"  Throughput: {n / depois:,.0f} mov/s  Ganho: {antes / depois:.1f}x")
+    finally:
+        _cleanup(schema, temp_dir)
+
+def bench_transfer(n: int = 2000):
+    """Throughput de transferências: quatro chamadas separadas vs transação única"""
+    from src.database.movement_engine import MovementEngine
+
+    print(f"\n=== TRANSFERÊNCIAS ENTRE FILIAIS ({n} transferências) ===")
+    schema, temp_dir = _temp_schema()
+    try:
+        engine = MovementEngine()
+        engine.db = schema
+        origem_id = schema.execute_insert("""
+            INSERT INTO brindes (codigo, descricao, categoria_id, quantidade, valor_unitario,
+                                 unidade_medida_id, filial_id)
+            VALUES ('T001', 'Caneta', 1, ?, 1.0, 1, 1)
+        """, (n * 4,))
+        destino_id = schema.execute_insert("""
+            INSERT INTO brindes (codigo, descricao, categoria_id, quantidade, valor_unitario,
+                                 unidade_medida_id, filial_id)
+            VALUES ('T002', 'Caneta', 1, 0, 1.0, 1, 2)
+        """)
+
+        def movimento(brinde_id, tipo):
+            return {'brinde_id': brinde_id, 'tipo': tipo, 'quantidade': 1,
+                    'filial_origem_id': 1, 'filial_destino_id': 2, 'usuario_id': 1}
+
+        # Antes: baixa, movimentação, busca do destino, entrada e movimentação
+        # em transações separadas (a busca percorria os brindes do destino)
+        start = time.perf_counter()
+        for _ in range(n):
+            schema.execute_update("UPDATE brindes SET quantidade = quantidade - 1 WHERE id = ?", (origem_id,))
+            engine.register(movimento(origem_id, 'transferencia_saida'))
+            schema.execute_query("SELECT * FROM brindes WHERE filial_id = 2 AND ativo = 1")
+            schema.execute_update("UPDATE brindes SET quantidade = quantidade + 1 WHERE id = ?", (destino_id,))
+            engine.register(movimento(destino_id, 'transferencia_entrada'))
+        antes = time.perf_counter() - start
+        _report("quatro chamadas (antes)", antes, n)
+
+        start = time.perf_counter()
+        for _ in range(n):
+            engine.transfer(origem_id, 2, 1, 1)
+        depois = time.perf_counter() - start
+        _report("transfer em uma transação (depois)", depois, n)
+
+        print(f"  Throughput: {n / depois:,.0f} transf/s  Ganho: {antes / depois:.1f}x")
+    finally:
+        _cleanup(schema, temp_dir)
+
+def bench_dashboard_stats(n: int = 100000, repeticoes: int = 5):
+    """Estatísticas do dashboard: listar brindes e somar em Python vs query agregada"""
+    from src.database.models import BrindeModel
+
+    print(f"\n=== ESTATÍSTICAS DO DASHBOARD ({n} brindes) ===")
+    schema, temp_dir = _temp_schema()
+    try:
+        model = BrindeModel()
+        model.db = schema
+        _seed_brindes(schema, n)
+        estoque_minimo = 10
+
+        # Antes: join de todos os brindes, um dict por linha e somas em Python
+        start = time.perf_counter()
+        for _ in range(repeticoes):
+            brindes = model.get_all()
+            antes_stats = (
+                sum(b['quantidade'] for b in brindes),
+                sum(b['quantidade'] * b['valor_unitario'] for b in brindes),
+                len([b for b in brindes if b['quantidade'] <= estoque_minimo])
+            )
+        antes = time.perf_counter() - start
+        _report("get_brindes + somas (antes)", antes, repeticoes)
+
+        # Depois: uma linha agregada pelo SQLite
+        start = time.perf_counter()
+        for _ in range(repeticoes):
+            stats = model.get_estatisticas(estoque_minimo)
+        depois = time.perf_counter() - start
+        _report("query agregada (depois)", depois, repeticoes)
+
+        assert stats['total_itens'] == antes_stats[0]
+        assert stats['itens_estoque_baixo'] == antes_stats[2]
+        print(f"  Ganho: {antes / depois:.1f}x")
+    finally:
+        _cleanup(schema, temp_dir)
+
+def bench_search(n: int = 100000, consultas: int = 100):
+    """Busca de brindes: LIKE '%termo%' em várias colunas vs índice FTS5 (top 20)"""
+    from src.database.models import BrindeModel
+
+    print(f"\n=== BUSCA DE BRINDES ({n} brindes, {consultas} consultas) ===")
+    schema, temp_dir = _temp_schema()
+    try:
+        model = BrindeModel()
+        model.db = schema
+        itens = ['Caneta', 'Camiseta', 'Chaveiro', 'Bloco', 'Caneca', 'Mochila', 'Squeeze', 'Boné']
+        cores = ['Azul', 'Vermelha', 'Preta', 'Branca', 'Verde', 'Amarela', 'Cinza']
+        with schema.transaction() as conn:
+            conn.executemany("""
+                INSERT INTO brindes (codigo, descricao, categoria_id, quantidade, valor_unitario,
+                                     unidade_medida_id, filial_id, observacoes)
+                VALUES (?, ?, 1, 10, 1.0, 1, 1, ?)
+            """, (
+                (f"S{i:07d}", f"{itens[i % len(itens)]} {cores[i // len(itens) % len(cores)]} {i}",
+                 f"Lote {i % 500}")
+                for i in range(n)
+            ))
+        # Termos amplos (primeiras letras), seletivos e sem resultado
+        termos = ['can', 'azul', 'moch', '4999', 'squeeze cinza', 'xyz']
+
+        # Antes: LIKE com curinga no início percorre a tabela a cada tecla
+        query = """
+            SELECT b.*, c.nome as categoria_nome FROM brindes b
+            JOIN categorias c ON b.categoria_id = c.id
+            WHERE b.ativo = 1 AND (b.descricao LIKE ? OR b.codigo LIKE ? OR b.observacoes LIKE ?)
+            ORDER BY b.codigo LIMIT 20
+        """
+        start = time.perf_counter()
+        for i in range(consultas):
+            termo = f"%{termos[i % len(termos)]}%"
+            schema.execute_query(query, (termo, termo, termo))
+        antes = time.perf_counter() - start
+        _report("LIKE '%termo%' (antes)", antes, consultas)
+
+        # Depois: prefixo no FTS5, ordenado por relevância (bm25)
+        start = time.perf_counter()
+        for i in range(consultas):
+            model.search(termos[i % len(termos)], limit=20)
+        depois = time.perf_counter() - start
+        _report("FTS5 top 20 (depois)", depois, consultas)
+
+        assert len(model.search('can', limit=20)) == 20
+        assert model.search('xyz') == []
+        print(f"  Ganho: {antes / depois:.1f}x")
+    finally:
+        _cleanup(schema, temp_dir)
+
+def bench_listing_search(n: int = 50000):
+    """Busca das telas de listagem a cada tecla: varredura de todos os valores vs índice em memória"""
+    from src.utils.text_search import TextSearchIndex
+
+    print(f"\n=== BUSCA NAS LISTAGENS ({n} itens, digitação tecla a tecla) ===")
+    itens = ['Caneta', 'Camiseta', 'Chaveiro', 'Bloco', 'Caneca', 'Mochila', 'Squeeze', 'Boné']
+    cores = ['Azul', 'Vermelha', 'Preta', 'Branca', 'Verde', 'Amarela', 'Metálica']
+    brindes = [{
+        'id': i, 'codigo': f"{i:06d}",
+        'descricao': f"{itens[i % len(itens)]} {cores[i // len(itens) % len(cores)]} {i}",
+        'categoria': 'Outros', 'quantidade': i % 50, 'valor_unitario': 1.5, 'filial': 'Matriz'
+    } for i in range(n)]
+    digitado = "caneta azul 4"
+    teclas = [digitado[:i] for i in range(1, len(digitado) + 1)]
+
+    # Antes: str().lower() de todos os valores de todos os itens a cada tecla
+    start = time.perf_counter()
+    for query in teclas:
+        [item for item in brindes if any(query in str(v).lower() for v in item.values())]
+    antes = time.perf_counter() - start
+    _report("Varredura por tecla (antes)", antes, len(teclas))
+
+    start = time.perf_counter()
+    indice = TextSearchIndex(brindes)
+    print(f"  Montagem do índice (uma vez por carga): {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    # Depois: índice de prefixos, filtrando o resultado da tecla anterior
+    start = time.perf_counter()
+    for query in teclas:
+        indice.search(query)
+    depois = time.perf_counter() - start
+    _report("Índice em memória (depois)", depois, len(teclas))
+
+    assert indice.search('metalica') == indice.search('METÁL')
+    print(f"  Ganho: {antes / depois:.1f}x")
+
+def bench_table_paging(n: int = 5000, linhas: int = 20, trocas: int = 50):
+    """Troca de página nas listagens: recriar frame + labels por linha vs pool da VirtualTable"""
+    print(f"\n=== PAGINAÇÃO DAS TABELAS ({n} itens, {linhas} linhas por página, {trocas} trocas) ===")
+    try:
+        import customtkinter as ctk
+        root = ctk.CTk()
+    except Exception as e:
+        print(f"  Ignorado: interface gráfica indisponível ({e})")
+        return
+    from src.ui.components.virtual_table import VirtualTable, Column
+
+    def contar(widget):
+        return 1 + sum(contar(filho) for filho in widget.winfo_children())
+
+    try:
+        itens = [{'codigo': f"{i:06d}", 'descricao': f"Brinde {i}", 'categoria': 'Outros',
+                  'quantidade': i % 50, 'valor_unitario': 1.5} for i in range(n)]
+        colunas = [Column(chave, chave.title()) for chave in itens[0]]
+        paginas = [itens[p * linhas:(p + 1) * linhas] for p in range(trocas)]
+
+        # Antes: destruir e recriar as linhas a cada página
+        lista = ctk.CTkFrame(root)
+        lista.pack(fill="both", expand=True)
+        start = time.perf_counter()
+        for pagina in paginas:
+            for filho in lista.winfo_children():
+                filho.destroy()
+            for item in pagina:
+                linha = ctk.CTkFrame(lista)
+                linha.pack(fill="x")
+                for col, coluna in enumerate(colunas):
+                    ctk.CTkLabel(linha, text=coluna.text(item)).grid(row=0, column=col)
+            root.update_idletasks()
+        antes = time.perf_counter() - start
+        _report("Recriar linhas (antes)", antes, trocas)
+        widgets_antes = contar(lista)
+        lista.destroy()
+
+        # Depois: pool fixo, só o texto muda
+        tabela = VirtualTable(root, colunas, rows=linhas)
+        tabela.frame.pack(fill="both", expand=True)
+        tabela.set_items(itens)
+        root.update_idletasks()
+        start = time.perf_counter()
+        for pagina in range(1, trocas + 1):
+            tabela.go_to_page(pagina)
+            root.update_idletasks()
+        depois = time.perf_counter() - start
+        _report("VirtualTable (depois)", depois, trocas)
+
+        print(f"  Widgets Tk: {widgets_antes} (antes, por página) vs {tabela.widget_count()} (depois, fixo)")
+        print(f"  Ganho: {antes / depois:.1f}x")
+    finally:
+        root.destroy()
+
+def bench_export(n: int = 1_000_000):
+    """Exportação CSV de movimentações: lista inteira em memória vs cursor em lotes"""
+    import csv
+    import tracemalloc
+    from src.database.models import MovimentacaoModel
+    from src.database.data_manager import DatabaseDataManager
+    from src.data.exporter import ExportJob
+
+    print(f"\n=== EXPORTAÇÃO DE MOVIMENTAÇÕES ({n} linhas) ===")
+    schema, temp_dir = _temp_schema()
+    try:
+        _seed_brindes(schema, 100)
+        with schema.transaction() as conn:
+            conn.executemany("""
+                INSERT INTO movimentacoes (brinde_id, tipo, quantidade, filial_origem_id,
+                                           usuario_id, observacoes, data_hora)
+                VALUES (?, ?, 1, 1, 1, ?, ?)
+            """, ((1 + i % 100, 'entrada' if i % 2 else 'saida', f"Lote {i}",
+                   f"2025-{1 + i % 12:02d}-{1 + i % 28:02d} {i % 24:02d}:{i % 60:02d}:00")
+                  for i in range(n)))
+        model = MovimentacaoModel()
+        model.db = schema
+        formatar = DatabaseDataManager._format_movimentacao
+
+        class Provedor:
+            def count_movimentacoes(self, filters):
+                return model.count(filters)
+
+            def iter_movimentacoes(self, filters):
+                return map(formatar, model.iter_rows(filters))
+
+        # Antes: todas as linhas carregadas em uma lista e depois escritas
+        path = os.path.join(temp_dir, "antes.csv")
+        tracemalloc.start()
+        start = time.perf_counter()
+        rows = [formatar(dict(r)) for r in schema.execute_query(
+            model.SELECT_QUERY + " ORDER BY m.data_hora DESC, m.id DESC")]
+        with open(path, 'w', newline='', encoding='utf-8-sig') as arquivo:
+            writer = csv.writer(arquivo, delimiter=';')
+            for row in rows:
+                writer.writerow(row.values())
+        antes = time.perf_counter() - start
+        pico_antes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        del rows
+        _report("lista em memória (antes)", antes, n)
+
+        # Depois: ExportJob lendo o cursor em lotes
+        job = ExportJob('movimentacoes', os.path.join(temp_dir, "depois.csv"))
+        job.provider = Provedor()
+        tracemalloc.start()
+        start = time.perf_counter()
+        escritas = job.run()
+        depois = time.perf_counter() - start
+        pico_depois = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        _report("ExportJob em fluxo (depois)", depois, n)
+
+        assert escritas == n
+        print(f"  Pico de memória: {pico_antes / 2**20:,.1f} MB (antes) vs {pico_depois / 2**20:,.1f} MB (depois)")
+        print(f"  Arquivo: {os.path.getsize(job.path) / 2**20:,.1f} MB  Throughput: {n / depois:,.0f} linhas/s")
+    finally:
+        _cleanup(schema, temp_dir)
+
+def bench_audit_stats(tamanhos: tuple = (10_000, 100_000, 1_000_000), repeticoes: int = 5):
+    """Estatísticas da auditoria: GROUP BY nos registros vs resumo (logs_auditoria_resumo)"""
+    from src.utils.audit_logger import AuditLogger
+    from src.database.audit_partitions import insert_records
+
+    print(f"\n=== ESTATÍSTICAS DA AUDITORIA ({', '.join(str(n) for n in tamanhos)} registros) ===")
+    schema, temp_dir = _temp_schema()
+    try:
+        logger = AuditLogger()
+        logger.db = schema
+        consultas = (
+            "SELECT acao, COUNT(*) FROM logs_auditoria GROUP BY acao",
+            """SELECT u.nome, COUNT(*) as total FROM logs_auditoria la
+               JOIN usuarios u ON la.usuario_id = u.id GROUP BY u.nome ORDER BY total DESC LIMIT 10""",
+            """SELECT DATE(data_hora) as data, COUNT(*) FROM logs_auditoria
+               WHERE data_hora >= date('now', '-7 days') GROUP BY DATE(data_hora) ORDER BY data DESC"""
+        )
+        inseridos = 0
+        for n in tamanhos:
+            # Registros espalhados pelos últimos 12 meses, 1 a 5 usuários
+            with schema.transaction() as conn:
+                insert_records(conn, (
+                    ('brindes', i, ('INSERT', 'UPDATE', 'DELETE')[i % 3], None, {'quantidade': i % 50},
+                     1 + i % 5, None, None,
+                     time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(time.time() - (i % 365) * 86400)))
+                    for i in range(inseridos, n)
+                ))
+            inseridos = n
+
+            # Antes: três GROUP BY sobre todos os registros
+            start = time.perf_counter()
+            for _ in range(repeticoes):
+                for query in consultas:
+                    schema.execute_query(query)
+            antes = time.perf_counter() - start
+            _report(f"{n:>9} registros: GROUP BY (antes)", antes, repeticoes)
+
+            # Depois: get_system_stats lendo só o resumo
+            start = time.perf_counter()
+            for _ in range(repeticoes):
+                stats = logger.get_system_stats()
+            depois = time.perf_counter() - start
+            _report(f"{n:>9} registros: resumo (depois)", depois, repeticoes)
+
+            assert sum(stats['logs_por_acao'].values()) == n
+            print(f"  Ganho: {antes / depois:.1f}x")
+    finally:
+        _cleanup(schema, temp_dir)
+
+def bench_mock_journal(n: int = 100_000, gravacoes_antes: int = 10, gravacoes: int = 300_000):
+    """Modo mock: reescrita do JSON inteiro a cada alteração vs diário só de acréscimo"""
+    import json
+    from src.data.mock_data import MockDataManager
+    from src.data.journal import op_put
+
+    print(f"\n=== MODO MOCK: GRAVAÇÕES COM {n} BRINDES ===")
+    temp_dir = tempfile.mkdtemp(prefix="brindez_bench_")
+    cwd = os.getcwd()
+    os.chdir(temp_dir)
+    try:
+        mock = MockDataManager()
+        mock.data['brindes'] = [
+            {'id': i + 1, 'codigo': f"S{i:07d}", 'descricao': f"Brinde {i}", 'categoria': 'Outros',
+             'quantidade': i % 250, 'valor_unitario': 1 + (i % 97) / 10, 'unidade_medida': 'UN',
+             'filial': 'Matriz', 'usuario_cadastro': 'admin'}
+            for i in range(n)
+        ]
+        mock.save_data()
+
+        # Antes: json.dump com indentação de todos os dados a cada alteração
+        start = time.perf_counter()
+        for i in range(gravacoes_antes):
+            with open("antes.json", 'w', encoding='utf-8') as f:
+                json.dump(mock.data, f, indent=2, ensure_ascii=False, default=str)
+        antes = time.perf_counter() - start
+        _report("JSON inteiro por alteração (antes)", antes, gravacoes_antes)
+
+        # Depois: uma linha no diário por alteração, compactação amortizada
+        # (só a gravação; a busca do brinde por id fica fora da medição)
+        compactacoes = 0
+        compactar = mock.store.compact
+
+        def contar(data):
+            nonlocal compactacoes
+            compactacoes += 1
+            compactar(data)
+
+        mock.store.compact = contar
+        start = time.perf_counter()
+        for i in range(gravacoes):
+            brinde = mock.data['brindes'][(i * 7919) % n]
+            brinde['quantidade'] = i
+            mock._persist(op_put('brindes', brinde))
+        depois = time.perf_counter() - start
+        _report("diário JSONL (depois)", depois, gravacoes)
+        mock.store.close()
+
+        recarregado = MockDataManager()
+        recarregado.store.close()
+        assert recarregado.data['brindes'] == mock.data['brindes']
+        print(f"  Compactações: {compactacoes}  Diário: {os.path.getsize(mock.store.journal_path) / 2**20:,.1f} MB")
+        print(f"  Ganho por gravação: {antes / gravacoes_antes / (depois / gravacoes):,.0f}x")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def bench_mock_index(n: int = 100_000, consultas: int = 200):
+    """Modo mock: busca sequencial/ordenação a cada chamada vs índices em memória"""
+    from src.data.mock_data import MockDataManager
+    from src.data.journal import JournalStore
+
+    print(f"\n=== MODO MOCK: ÍNDICES ({n} brindes, {n} movimentações) ===")
+    temp_dir = tempfile.mkdtemp(prefix="brindez_bench_")
+    try:
+        mock = MockDataManager.__new__(MockDataManager)
+        mock.store = JournalStore(os.path.join(temp_dir, "mock.json"))
+        mock.data = {
+            'brindes': [{'id': i + 1, 'codigo': f"{i + 1:06d}", 'descricao': f"Brinde {i}",
+                         'filial': ('Matriz', 'Filial 1', 'Filial 2')[i % 3], 'quantidade': i % 250}
+                        for i in range(n)],
+            'movimentacoes': [{'id': i + 1, 'brinde_id': 1 + i % n, 'tipo': 'entrada' if i % 2 else 'saida',
+                               'quantidade': 1, 'data_hora': f"2025-01-01T00:{i // 60 % 60:02d}:{i % 60:02d}.{i:06d}"}
+                              for i in range(n)]
+        }
+        brindes = mock.data['brindes']
+        alvos = [1 + (i * 7919) % n for i in range(consultas)]
+
+        # Antes: as mesmas operações como eram feitas (lista percorrida/ordenada a cada chamada)
+        start = time.perf_counter()
+        for alvo in alvos:
+            next((b for b in brindes if b.get('id') == alvo), None)
+            max(b.get('id', 0) for b in brindes) + 1
+            movimentacoes = sorted(mock.data['movimentacoes'], key=lambda m: m.get('data_hora', ''),
+                                   reverse=True)[:10]
+        antes = time.perf_counter() - start
+        _report("busca sequencial + sort (antes)", antes, consultas)
+
+        # Depois: índices montados uma vez e consultados
+        start = time.perf_counter()
+        mock.get_next_id('brindes')
+        mock.get_next_id('movimentacoes')
+        montagem = time.perf_counter() - start
+        _report("montagem dos índices (uma vez)", montagem, 1)
+
+        start = time.perf_counter()
+        for alvo in alvos:
+            mock.get_brinde_by_id(alvo)
+            mock.get_next_id('brindes')
+            recentes = mock.get_movimentacoes(limit=10)
+        depois = time.perf_counter() - start
+        _report("índices em memória (depois)", depois, consultas)
+
+        assert recentes == movimentacoes
+        print(f"  Ganho: {antes / depois:,.0f}x")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+BENCHMARKS = {
+    'pool': bench_connection_pool,
+    'bulk': bench_bulk_movements,
+    'transfer': bench_transfer,
+    'stats': bench_dashboard_stats,
+    'search': bench_search,
+    'listing': bench_listing_search,
+    'paging': bench_table_paging,
+    'export': bench_export,
+    'audit': bench_audit_stats,
+    'journal': bench_mock_journal,
+    'mockindex': bench_mock_index,
+}
+
+def main():
+    """Executa os benchmarks selecionados"""
+    selecionados = sys.argv[1:] or list(BENCHMARKS)
+    # Logs em arquivo/console ficam fora da medição (custo igual nos dois lados)
+    logging.disable(logging.INFO)
+    for nome in selecionados:
+        if nome not in BENCHMARKS:
+            print(f"Benchmark desconhecido: {nome} (disponíveis: {', '.join(BENCHMARKS)})")
+            return 1
+        BENCHMARKS[nome]()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,6 +9,7 @@ import os
 import getpass
 from .ui.main_window import MainWindow
 from .utils.user_manager import UserManager
+from .utils.background import background_loader
 
 class BrindeApp:
     """Classe principal da aplicação"""
@@ -64,6 +65,9 @@ class BrindeApp:
             # Iniciar loop principal
             self.root.mainloop()
             
+            # Cargas pendentes não têm mais onde ser exibidas
+            background_loader.shutdown()
+            
         except Exception as e:
             messagebox.showerror("Erro Fatal", f"Erro ao executar aplicação: {e}")
     
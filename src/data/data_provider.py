@@ -3,10 +3,33 @@ Provedor de dados que alterna entre mock e banco de dados
 """
 
 import os
-from typing import Dict, List, Any, Optional
+import functools
+from typing import Dict, Iterator, List, Any, Optional
 from .mock_data import mock_data
 from ..database.data_manager import db_data_manager
 from ..utils.performance import performance_monitor, cache_manager
+from ..utils.change_bus import change_bus, ChangeEvent, ALL_TABLES
+
+# Tabelas das quais o dashboard depende (versão do snapshot)
+DASHBOARD_TABLES = ('brindes', 'movimentacoes', 'categorias', 'filiais', 'configuracoes')
+
+def _brindes_tags(provider, filial_filter: Optional[str] = None):
+    """Tag da filial consultada em get_brindes (invalidação por filial)"""
+    if filial_filter and filial_filter != "Todas":
+        return (f"brindes:filial={filial_filter}",)
+    return ("brindes:todas",)
+
+def publishes(*tabelas: str):
+    """Decorator: publica as alterações após a escrita (também se ela falhar no meio)"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                self._publish_changes(*tabelas)
+        return wrapper
+    return decorator
 
 class DataProvider:
     """Provedor de dados que escolhe automaticamente entre mock e database"""
@@ -16,6 +39,12 @@ class DataProvider:
         self._use_database = self._should_use_database()
         self._current_provider = db_data_manager if self._use_database else mock_data
         
+        # Caches invalidados pelas alterações publicadas (escritas e change_log)
+        change_bus.subscribe(self._on_change)
+        
+        # Snapshot do dashboard por filtro de filial: (versão dos dados, snapshot)
+        self._dashboard_snapshots: Dict[Optional[str], tuple] = {}
+        
         print(f"DataProvider inicializado: {'Database' if self._use_database else 'Mock'}")
     
     def _should_use_database(self) -> bool:
@@ -41,6 +70,8 @@ class DataProvider:
         try:
             self._use_database = True
             self._current_provider = db_data_manager
+            cache_manager.clear()  # Resultados do provedor anterior
+            self._dashboard_snapshots.clear()
             print("Alternado para Database")
         except Exception as e:
             print(f"Erro ao alternar para database: {e}")
@@ -51,12 +82,68 @@ class DataProvider:
         """Força uso do mock"""
         self._use_database = False
         self._current_provider = mock_data
+        cache_manager.clear()  # Resultados do provedor anterior
+        self._dashboard_snapshots.clear()
         print("Alternado para Mock")
     
     def is_using_database(self) -> bool:
         """Retorna se está usando banco de dados"""
         return self._use_database
     
+    # Invalidação de cache por alteração
+    def _filial_nome(self, filial_id: int) -> Optional[str]:
+        """Nome da filial pelo ID (None se desconhecida)"""
+        if self._use_database:
+            filial = self._current_provider.dimensions.get_by_id('filiais', filial_id)
+        else:
+            filiais = self._current_provider.data.get('filiais', [])
+            filial = next((f for f in filiais if f.get('id') == filial_id), None)
+        return filial['nome'] if filial else None
+    
+    def _on_change(self, event: ChangeEvent):
+        """Descarta apenas os resultados afetados pela alteração"""
+        tabela = event.tabela
+        if tabela == ALL_TABLES:
+            cache_manager.clear()
+        elif tabela == 'brindes':
+            nomes = [self._filial_nome(f) for f in event.filiais]
+            if nomes and all(nomes):
+                cache_manager.invalidate_tags(
+                    "brindes:todas", "estatisticas", *(f"brindes:filial={nome}" for nome in nomes)
+                )
+            else:
+                cache_manager.invalidate_tags("brindes", "estatisticas")
+        elif tabela == 'movimentacoes':
+            cache_manager.invalidate_tags("movimentacoes", "estatisticas")
+        elif tabela in ('categorias', 'unidades_medida'):
+            # Listas de brindes trazem o nome da categoria/unidade
+            cache_manager.invalidate_tags(tabela, "brindes")
+        elif tabela == 'filiais':
+            cache_manager.invalidate_tags("filiais", "brindes", "usuarios", "estatisticas")
+        else:
+            cache_manager.invalidate_tags(tabela)
+    
+    def _publish_changes(self, *tabelas: str):
+        """Publica as alterações de uma escrita.
+        
+        No banco os triggers registram exatamente o que mudou (change_log);
+        no mock é publicado um evento por tabela alterada.
+        """
+        if self._use_database:
+            self._current_provider.publish_changes()
+        else:
+            for tabela in tabelas:
+                change_bus.publish(tabela)
+    
+    def poll_changes(self) -> int:
+        """Publica alterações feitas fora desta instância (outras estações no mesmo banco)"""
+        if self._use_database:
+            try:
+                return self._current_provider.publish_changes()
+            except Exception as e:
+                print(f"Erro ao verificar alterações: {e}")
+        return 0
+    
     # Métodos delegados - Configurações
     def get_configuracao(self, chave: str, valor_padrao: Any = None) -> Any:
         """Obtém configuração"""
@@ -65,6 +152,7 @@ class DataProvider:
         else:
             return self._current_provider.data.get('configuracoes', {}).get(chave, valor_padrao)
     
+    @publishes('configuracoes')
     def set_configuracao(self, chave: str, valor: Any) -> bool:
         """Define configuração"""
         if self._use_database:
@@ -73,12 +161,12 @@ class DataProvider:
             if 'configuracoes' not in self._current_provider.data:
                 self._current_provider.data['configuracoes'] = {}
             self._current_provider.data['configuracoes'][chave] = valor
-            self._current_provider.save_data()
+            self._current_provider.save_key('configuracoes')
             return True
     
     # Métodos delegados - Brindes
     @performance_monitor.measure_time("get_brindes")
-    @cache_manager.cache_result(60)
+    @cache_manager.cache_result(300, tags=("brindes",), tag_func=_brindes_tags)
     def get_brindes(self, filial_filter: Optional[str] = None) -> List[Dict[str, Any]]:
         """Obtém lista de brindes"""
         try:
@@ -97,37 +185,44 @@ class DataProvider:
             return None
     
     @performance_monitor.measure_time("create_brinde")
+    @publishes('brindes')
     def create_brinde(self, brinde_data: Dict[str, Any]) -> Dict[str, Any]:
         """Cria novo brinde"""
-        # Invalidar cache relacionado
-        cache_manager.invalidate_cache("get_brindes")
-        cache_manager.invalidate_cache("get_estatisticas")
         return self._current_provider.create_brinde(brinde_data)
     
+    @publishes('brindes')
     def update_brinde(self, brinde_id: int, brinde_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Atualiza brinde"""
-        cache_manager.invalidate_cache("get_brindes")
-        cache_manager.invalidate_cache("get_estatisticas")
         return self._current_provider.update_brinde(brinde_id, brinde_data)
     
+    @publishes('brindes')
     def delete_brinde(self, brinde_id: int) -> bool:
         """Exclui brinde"""
-        cache_manager.invalidate_cache("get_brindes")
-        cache_manager.invalidate_cache("get_estatisticas")
         return self._current_provider.delete_brinde(brinde_id)
     
-    def search_brindes(self, query: str, categoria: str = None, filial: str = None) -> List[Dict[str, Any]]:
-        """Busca brindes"""
-        return self._current_provider.search_brindes(query, categoria, filial)
+    @performance_monitor.measure_time("search_brindes")
+    def search_brindes(self, query: str, categoria: str = None, filial: str = None,
+                       limit: int = 50) -> List[Dict[str, Any]]:
+        """Busca brindes: os ``limit`` mais relevantes, por prefixo e sem acentos"""
+        return self._current_provider.search_brindes(query, categoria, filial, limit)
     
     # Métodos delegados - Movimentações
+    @publishes('brindes', 'movimentacoes')
     def create_movimentacao(self, movimentacao_data: Dict[str, Any]) -> Dict[str, Any]:
         """Cria movimentação"""
-        # Movimentações alteram o estoque; invalidar caches de listas de brindes/estatísticas
-        cache_manager.invalidate_cache("get_brindes")
-        cache_manager.invalidate_cache("get_estatisticas")
         return self._current_provider.create_movimentacao(movimentacao_data)
-    
+
+    @performance_monitor.measure_time("create_movimentacoes_bulk")
+    @publishes('brindes', 'movimentacoes')
+    def create_movimentacoes_bulk(self, movimentacoes: List[Dict[str, Any]],
+                                  atomic: bool = True) -> List[Dict[str, Any]]:
+        """Cria um lote de movimentações em uma única transação.
+
+        Retorna um resultado por linha (linha, sucesso, id, brinde_id, erro).
+        Com atomic=True qualquer linha inválida cancela o lote inteiro.
+        """
+        return self._current_provider.create_movimentacoes_bulk(movimentacoes, atomic)
+
     def get_movimentacoes(self, brinde_id: int = None, tipo: str = None, limit: int = None) -> List[Dict[str, Any]]:
         """Obtém movimentações"""
         try:
@@ -136,21 +231,61 @@ class DataProvider:
         except Exception as e:
             print(f"Erro em get_movimentacoes: {e}")
             return []
-    
+
+    @performance_monitor.measure_time("query_movimentacoes")
+    def query_movimentacoes(self, filters: Optional[Dict[str, Any]] = None,
+                            after_cursor: Optional[tuple] = None,
+                            page_size: int = 50) -> Dict[str, Any]:
+        """Página de movimentações filtradas (mais recentes primeiro).
+
+        Filtros: filial (nome), tipo (um ou vários), data_inicio (inclusive),
+        data_fim (exclusive), usuario (username) e brinde_id. Retorna items,
+        total e next_cursor (passar como after_cursor para a próxima página).
+        """
+        try:
+            return self._current_provider.query_movimentacoes(filters, after_cursor, page_size)
+        except Exception as e:
+            print(f"Erro em query_movimentacoes: {e}")
+            return {'items': [], 'total': 0, 'next_cursor': None}
+
+    def count_movimentacoes(self, filters: Optional[Dict[str, Any]] = None) -> int:
+        """Total de movimentações dos filtros de query_movimentacoes"""
+        return self._current_provider.count_movimentacoes(filters)
+
+    # Leitura em fluxo (exportação): erros sobem para quem consome o iterador
+    def iter_brindes(self, filial_filter: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Brindes (formato de get_brindes) lidos em lotes, sem montar a lista"""
+        return self._current_provider.iter_brindes(filial_filter)
+
+    def iter_estoque_resumo(self, grupo: str = 'descricao',
+                            filial_filter: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Resumo do estoque (formato de get_estoque_resumo) lido em lotes"""
+        return self._current_provider.iter_estoque_resumo(grupo, filial_filter)
+
+    def iter_movimentacoes(self, filters: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """Todas as movimentações dos filtros de query_movimentacoes, lidas em lotes"""
+        return self._current_provider.iter_movimentacoes(filters)
+
+    @publishes('brindes')
     def update_estoque_brinde(self, brinde_id: int, quantidade: int, tipo: str) -> bool:
         """Atualiza estoque"""
-        cache_manager.invalidate_cache("get_brindes")
-        cache_manager.invalidate_cache("get_estatisticas")
         return self._current_provider.update_estoque_brinde(brinde_id, quantidade, tipo)
 
+    @publishes('brindes')
     def find_or_create_brinde_for_transfer(self, brinde_origem: Dict[str, Any], filial_destino: str, username: str) -> Dict[str, Any]:
         """
         Encontra um brinde existente no destino ou cria um novo para a transferência.
         """
-        res = self._current_provider.find_or_create_brinde_for_transfer(brinde_origem, filial_destino, username)
-        cache_manager.invalidate_cache("get_brindes")
-        cache_manager.invalidate_cache("get_estatisticas")
-        return res
+        return self._current_provider.find_or_create_brinde_for_transfer(brinde_origem, filial_destino, username)
+
+    @performance_monitor.measure_time("transfer_brinde")
+    @publishes('brindes', 'movimentacoes')
+    def transfer_brinde(self, origem_id: int, filial_destino: str, quantidade: int,
+                        username: str, justificativa: Optional[str] = None) -> Dict[str, Any]:
+        """Transfere estoque entre filiais em uma única transação"""
+        return self._current_provider.transfer_brinde(
+            origem_id, filial_destino, quantidade, username, justificativa
+        )
 
     # Métodos delegados - Auxiliares
     def get_categorias(self) -> List[str]:
@@ -250,32 +385,51 @@ class DataProvider:
             return next((u for u in usuarios if u.get('username') == username), None)
     
     # Métodos para estatísticas
-    def get_estatisticas_dashboard(self) -> Dict[str, Any]:
-        """Obtém estatísticas para dashboard"""
-        if self._use_database:
-            return self._current_provider.get_estatisticas_dashboard()
-        else:
-            # Calcular estatísticas do mock
-            brindes = self.get_brindes()
-            total_itens = sum(b.get('quantidade', 0) for b in brindes)
-            total_categorias = len(self.get_categorias())
-            valor_total = sum(b.get('quantidade', 0) * b.get('valor_unitario', 0) for b in brindes)
-            estoque_minimo = self.get_configuracao('estoque_minimo', 10)
-            itens_baixo = len([b for b in brindes if b.get('quantidade', 0) <= estoque_minimo])
-            
-            return {
-                'total_itens': total_itens,
-                'total_categorias': total_categorias,
-                'valor_total': valor_total,
-                'itens_estoque_baixo': itens_baixo,
-                'estoque_minimo': estoque_minimo
-            }
+    def get_estatisticas_dashboard(self, filial_filter: Optional[str] = None) -> Dict[str, Any]:
+        """Obtém estatísticas para dashboard (agregadas pelo provedor, sem listar brindes)"""
+        return self._current_provider.get_estatisticas_dashboard(filial_filter)
+    
+    @performance_monitor.measure_time("get_dashboard_snapshot")
+    def get_dashboard_snapshot(self, filial_filter: Optional[str] = None) -> Dict[str, Any]:
+        """Dados do dashboard em uma única chamada.
+        
+        Indicadores ('estatisticas'), quantidade por categoria, brindes com
+        estoque baixo e movimentações recentes. ``versao`` soma as versões das
+        tabelas de DASHBOARD_TABLES no change_bus: o snapshot é reaproveitado
+        enquanto ela não muda, e versão igual à anterior significa dados iguais.
+        """
+        # Versão lida antes da consulta: alteração durante ela gera outra versão
+        versao = sum(change_bus.version(tabela) for tabela in DASHBOARD_TABLES)
+        cache = self._dashboard_snapshots.get(filial_filter)
+        if cache is not None and cache[0] == versao:
+            return cache[1]
+        
+        snapshot = self._current_provider.get_dashboard_snapshot(filial_filter)
+        snapshot['versao'] = versao
+        self._dashboard_snapshots[filial_filter] = (versao, snapshot)
+        return snapshot
+    
+    @performance_monitor.measure_time("get_estoque_resumo")
+    def get_estoque_resumo(self, grupo: str = 'descricao',
+                           filial_filter: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Estoque agregado por descrição ('descricao') ou categoria ('categoria') em cada filial.
+        
+        No banco vem da tabela estoque_resumo, mantida por triggers: o custo
+        não depende do número de brindes. Linhas com descricao, categoria,
+        filial, itens, quantidade e valor_total (por descrição, também
+        valor_unitario, unidade_medida e codigo de um brinde do grupo).
+        """
+        try:
+            return self._current_provider.get_estoque_resumo(grupo, filial_filter)
+        except Exception as e:
+            print(f"Erro ao obter resumo do estoque: {e}")
+            return []
     
     # Métodos CRUD - Categorias
     @performance_monitor.measure_time("create_categoria")
+    @publishes('categorias')
     def create_categoria(self, categoria_data: Dict[str, Any]) -> Dict[str, Any]:
         """Cria nova categoria"""
-        cache_manager.invalidate_cache("get_categorias")
         if self._use_database:
             return self._current_provider.create_categoria(categoria_data)
         else:
@@ -290,13 +444,13 @@ class DataProvider:
                 **categoria_data
             }
             self._current_provider.data['categorias'].append(categoria)
-            self._current_provider.save_data()
+            self._current_provider.save_key('categorias')
             return categoria
     
     @performance_monitor.measure_time("update_categoria")
+    @publishes('categorias')
     def update_categoria(self, categoria_id: int, categoria_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Atualiza categoria"""
-        cache_manager.invalidate_cache("get_categorias")
         if self._use_database:
             return self._current_provider.update_categoria(categoria_id, categoria_data)
         else:
@@ -307,14 +461,14 @@ class DataProvider:
             for i, cat in enumerate(self._current_provider.data['categorias']):
                 if cat.get('id') == categoria_id:
                     self._current_provider.data['categorias'][i].update(categoria_data)
-                    self._current_provider.save_data()
+                    self._current_provider.save_key('categorias')
                     return self._current_provider.data['categorias'][i]
             return None
     
     @performance_monitor.measure_time("delete_categoria")
+    @publishes('categorias')
     def delete_categoria(self, categoria_id: int) -> bool:
         """Exclui categoria"""
-        cache_manager.invalidate_cache("get_categorias")
         if self._use_database:
             return self._current_provider.delete_categoria(categoria_id)
         else:
@@ -325,15 +479,15 @@ class DataProvider:
             for i, cat in enumerate(self._current_provider.data['categorias']):
                 if cat.get('id') == categoria_id:
                     del self._current_provider.data['categorias'][i]
-                    self._current_provider.save_data()
+                    self._current_provider.save_key('categorias')
                     return True
             return False
     
     # Métodos CRUD - Unidades de Medida
     @performance_monitor.measure_time("create_unidade_medida")
+    @publishes('unidades_medida')
     def create_unidade_medida(self, unidade_data: Dict[str, Any]) -> Dict[str, Any]:
         """Cria nova unidade de medida"""
-        cache_manager.invalidate_cache("get_unidades_medida")
         if self._use_database:
             return self._current_provider.create_unidade_medida(unidade_data)
         else:
@@ -348,13 +502,13 @@ class DataProvider:
                 **unidade_data
             }
             self._current_provider.data['unidades_medida'].append(unidade)
-            self._current_provider.save_data()
+            self._current_provider.save_key('unidades_medida')
             return unidade
     
     @performance_monitor.measure_time("update_unidade_medida")
+    @publishes('unidades_medida')
     def update_unidade_medida(self, unidade_id: int, unidade_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Atualiza unidade de medida"""
-        cache_manager.invalidate_cache("get_unidades_medida")
         if self._use_database:
             return self._current_provider.update_unidade_medida(unidade_id, unidade_data)
         else:
@@ -365,14 +519,14 @@ class DataProvider:
             for i, un in enumerate(self._current_provider.data['unidades_medida']):
                 if un.get('id') == unidade_id:
                     self._current_provider.data['unidades_medida'][i].update(unidade_data)
-                    self._current_provider.save_data()
+                    self._current_provider.save_key('unidades_medida')
                     return self._current_provider.data['unidades_medida'][i]
             return None
     
     @performance_monitor.measure_time("delete_unidade_medida")
+    @publishes('unidades_medida')
     def delete_unidade_medida(self, unidade_id: int) -> bool:
         """Exclui unidade de medida"""
-        cache_manager.invalidate_cache("get_unidades_medida")
         if self._use_database:
             return self._current_provider.delete_unidade_medida(unidade_id)
         else:
@@ -383,15 +537,15 @@ class DataProvider:
             for i, un in enumerate(self._current_provider.data['unidades_medida']):
                 if un.get('id') == unidade_id:
                     del self._current_provider.data['unidades_medida'][i]
-                    self._current_provider.save_data()
+                    self._current_provider.save_key('unidades_medida')
                     return True
             return False
     
     # Métodos CRUD - Usuários
     @performance_monitor.measure_time("create_usuario")
+    @publishes('usuarios')
     def create_usuario(self, usuario_data: Dict[str, Any]) -> Dict[str, Any]:
         """Cria novo usuário"""
-        cache_manager.invalidate_cache("get_usuarios")
         if self._use_database:
             return self._current_provider.create_usuario(usuario_data)
         else:
@@ -410,13 +564,13 @@ class DataProvider:
                 **usuario_data
             }
             self._current_provider.data['usuarios'].append(usuario)
-            self._current_provider.save_data()
+            self._current_provider.save_key('usuarios')
             return usuario
     
     @performance_monitor.measure_time("update_usuario")
+    @publishes('usuarios')
     def update_usuario(self, usuario_id: int, usuario_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Atualiza usuário"""
-        cache_manager.invalidate_cache("get_usuarios")
         if self._use_database:
             return self._current_provider.update_usuario(usuario_id, usuario_data)
         else:
@@ -427,12 +581,12 @@ class DataProvider:
             for i, user in enumerate(self._current_provider.data['usuarios']):
                 if user.get('id') == usuario_id:
                     self._current_provider.data['usuarios'][i].update(usuario_data)
-                    self._current_provider.save_data()
+                    self._current_provider.save_key('usuarios')
                     return self._current_provider.data['usuarios'][i]
             return None
     
     @performance_monitor.measure_time("get_usuarios")
-    @cache_manager.cache_result(60)
+    @cache_manager.cache_result(300, tags=("usuarios",))
     def get_usuarios(self) -> List[Dict[str, Any]]:
         """Obtém lista de usuários"""
         if self._use_database:
@@ -442,9 +596,9 @@ class DataProvider:
     
     # Métodos CRUD - Filiais
     @performance_monitor.measure_time("create_filial")
+    @publishes('filiais')
     def create_filial(self, filial_data: Dict[str, Any]) -> Dict[str, Any]:
         """Cria nova filial"""
-        cache_manager.invalidate_cache("get_filiais")
         if self._use_database:
             return self._current_provider.create_filial(filial_data)
         else:
@@ -463,13 +617,13 @@ class DataProvider:
                 **filial_data
             }
             self._current_provider.data['filiais'].append(filial)
-            self._current_provider.save_data()
+            self._current_provider.save_key('filiais')
             return filial
     
     @performance_monitor.measure_time("update_filial")
+    @publishes('filiais')
     def update_filial(self, filial_id: int, filial_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Atualiza filial"""
-        cache_manager.invalidate_cache("get_filiais")
         if self._use_database:
             return self._current_provider.update_filial(filial_id, filial_data)
         else:
@@ -480,16 +634,14 @@ class DataProvider:
             for i, fil in enumerate(self._current_provider.data['filiais']):
                 if fil.get('id') == filial_id:
                     self._current_provider.data['filiais'][i].update(filial_data)
-                    self._current_provider.save_data()
+                    self._current_provider.save_key('filiais')
                     return self._current_provider.data['filiais'][i]
             return None
 
     @performance_monitor.measure_time("delete_filial")
+    @publishes('filiais', 'brindes')
     def delete_filial(self, filial_id: int) -> bool:
         """Exclui filial. Invalida caches e deixa a lógica de integridade referencial ao provider (DB/Mock)."""
-        cache_manager.invalidate_cache("get_filiais")
-        cache_manager.invalidate_cache("get_brindes")
-        cache_manager.invalidate_cache("get_estatisticas")
         if self._use_database:
             return getattr(self._current_provider, 'delete_filial', lambda _id: False)(filial_id)
         else:
@@ -528,6 +680,8 @@ class DataProvider:
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 backup_path = f"backup_mock_{timestamp}.json"
             
+            # Compacta o diário no snapshot antes de copiar
+            self._current_provider.save_data()
             shutil.copy2(self._current_provider.data_file, backup_path)
             return backup_path
     
@@ -550,21 +704,36 @@ class DataProvider:
         """Retorna fornecedor por ID"""
         return self._current_provider.get_fornecedor_by_id(fornecedor_id)
     
+    @publishes('fornecedores')
     def create_fornecedor(self, data: Dict[str, Any]) -> bool:
         """Cria novo fornecedor"""
         return self._current_provider.create_fornecedor(data)
     
+    @publishes('fornecedores')
     def update_fornecedor(self, fornecedor_id: int, data: Dict[str, Any]) -> bool:
         """Atualiza fornecedor"""
         return self._current_provider.update_fornecedor(fornecedor_id, data)
     
+    @publishes('fornecedores')
     def delete_fornecedor(self, fornecedor_id: int) -> bool:
         """Remove fornecedor"""
         return self._current_provider.delete_fornecedor(fornecedor_id)
     
-    def search_fornecedores(self, termo: str) -> List[Dict[str, Any]]:
-        """Busca fornecedores por termo"""
-        return self._current_provider.search_fornecedores(termo)
+    @performance_monitor.measure_time("search_fornecedores")
+    def search_fornecedores(self, termo: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Busca fornecedores: os ``limit`` mais relevantes, por prefixo e sem acentos"""
+        return self._current_provider.search_fornecedores(termo, limit)
+
+    def get_dimension_cache_stats(self) -> Dict[str, Any]:
+        """Acertos/faltas do cache de filiais, categorias, unidades e usuários"""
+        if self._use_database:
+            return self._current_provider.dimensions.get_stats()
+        return {}
+    
+    def invalidate_dimension_cache(self, tabela: Optional[str] = None):
+        """Descarta o cache de dimensões (após alterações feitas fora do provedor)"""
+        if self._use_database:
+            self._current_provider.dimensions.invalidate(tabela)
 
     def get_provider_info(self) -> Dict[str, Any]:
         """Retorna informações do provedor atual"""
@@ -0,0 +1,208 @@
+"""
+Exportação em fluxo (CSV/XLSX) de brindes, estoque e movimentações
+"""
+
+import csv
+import os
+import threading
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .data_provider import data_provider
+from ..utils.table_model import Column
+from ..utils.text_search import matcher
+
+try:
+    from openpyxl import Workbook
+except ImportError:  # openpyxl é opcional: sem ele só há CSV
+    Workbook = None
+
+# Linhas entre duas verificações de cancelamento
+CHECK_EVERY = 500
+
+def _valor_total(item: Dict[str, Any]) -> float:
+    return (item.get('quantidade') or 0) * (item.get('valor_unitario') or 0)
+
+# Visão -> (título da planilha, colunas, campos da busca textual)
+EXPORT_VIEWS: Dict[str, Tuple[str, List[Column], Optional[Callable[[Dict[str, Any]], Iterable[Any]]]]] = {
+    'brindes': ("Brindes", [
+        Column('codigo', "Código"),
+        Column('descricao', "Descrição"),
+        Column('categoria', "Categoria"),
+        Column('filial', "Filial"),
+        Column('quantidade', "Quantidade"),
+        Column('unidade_medida', "Unidade"),
+        Column('valor_unitario', "Valor Unitário"),
+        Column(_valor_total, "Valor Total")
+    ], lambda item: (item.get('descricao'), item.get('codigo'))),
+    'estoque': ("Estoque", [
+        Column('descricao', "Descrição"),
+        Column('categoria', "Categoria"),
+        Column('filial', "Filial"),
+        Column('itens', "Itens"),
+        Column('quantidade', "Quantidade"),
+        Column('unidade_medida', "Unidade"),
+        Column('valor_unitario', "Valor Unitário"),
+        Column('valor_total', "Valor Total"),
+        Column('codigo', "Código (exemplo)")
+    ], lambda item: (item.get('descricao'), item.get('categoria'))),
+    'movimentacoes': ("Movimentações", [
+        Column('data_hora', "Data/Hora"),
+        Column('tipo', "Tipo"),
+        Column('brinde_codigo', "Código"),
+        Column('brinde_descricao', "Brinde"),
+        Column('quantidade', "Quantidade"),
+        Column('filial_origem', "Filial Origem"),
+        Column('filial_destino', "Filial Destino"),
+        Column('usuario', "Usuário"),
+        Column('justificativa', "Justificativa"),
+        Column('observacoes', "Observações")
+    ], None)
+}
+
+def cadastrado_no_periodo(item: Dict[str, Any], inicio: Optional[date], fim: Optional[date]) -> bool:
+    """Indica se o brinde foi cadastrado entre ``inicio`` e ``fim`` (inclusive; None = sem limite).
+
+    Mesmo critério do filtro de datas da tela de brindes: sem data de cadastro
+    no formato 'AAAA-MM-DD HH:MM:SS' o brinde fica de fora.
+    """
+    try:
+        cadastro = datetime.strptime(item.get('data_cadastro'), '%Y-%m-%d %H:%M:%S').date()
+    except (ValueError, TypeError):
+        return False
+    return (not inicio or cadastro >= inicio) and (not fim or cadastro <= fim)
+
+def xlsx_available() -> bool:
+    """Indica se a exportação XLSX está disponível (openpyxl instalado)"""
+    return Workbook is not None
+
+class ExportCancelled(Exception):
+    """Exportação cancelada pelo usuário"""
+
+class ExportJob:
+    """Exportação de uma visão para um arquivo, executada fora da thread da interface.
+
+    As linhas vêm de iteradores do provedor (cursor lido em lotes no banco)
+    e vão direto para o arquivo: CSV pelo módulo csv ou XLSX pelo modo
+    write-only do openpyxl, sem montar a lista inteira em memória. O arquivo
+    é escrito com o sufixo ``.parcial`` e só recebe o nome final ao concluir;
+    cancelamento ou erro o removem. ``written``/``total`` podem ser lidos de
+    outra thread para exibir o progresso.
+
+    Filtros: ``filial``, ``categoria`` e ``busca`` (brindes e estoque),
+    ``data_inicio``/``data_fim`` (data de cadastro, só brindes); para
+    movimentações, os mesmos de ``query_movimentacoes``.
+    """
+
+    def __init__(self, view: str, path: str, filtros: Optional[Dict[str, Any]] = None,
+                 formato: Optional[str] = None):
+        """Inicializa a exportação (formato deduzido da extensão, se não informado)"""
+        if view not in EXPORT_VIEWS:
+            raise ValueError(f"Visão de exportação inválida: {view}")
+        formato = (formato or os.path.splitext(path)[1].lstrip('.') or 'csv').lower()
+        if formato not in ('csv', 'xlsx'):
+            raise ValueError(f"Formato de exportação inválido: {formato}")
+        if formato == 'xlsx' and not xlsx_available():
+            raise RuntimeError("Exportação XLSX requer o pacote openpyxl")
+
+        self.view = view
+        self.path = path
+        self.filtros = dict(filtros or {})
+        self.formato = formato
+        self.written = 0
+        self.total: Optional[int] = None
+        self.provider = data_provider
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        """Pede o cancelamento (atendido em até CHECK_EVERY linhas)"""
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """Indica se o cancelamento foi pedido"""
+        return self._cancel.is_set()
+
+    @property
+    def progress(self) -> Optional[float]:
+        """Fração concluída (0..1) ou None quando o total não é conhecido"""
+        if not self.total:
+            return None
+        return min(1.0, self.written / self.total)
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        """Linhas da visão com os filtros aplicados (define ``total`` quando é barato saber)"""
+        filtros = self.filtros
+        if self.view == 'movimentacoes':
+            self.total = self.provider.count_movimentacoes(filtros)
+            return self.provider.iter_movimentacoes(filtros)
+
+        filial = filtros.get('filial')
+        if self.view == 'brindes':
+            linhas = self.provider.iter_brindes(filial)
+        else:
+            linhas = self.provider.iter_estoque_resumo('descricao', filial)
+
+        categoria = filtros.get('categoria')
+        if categoria and categoria != "Todas":
+            linhas = (item for item in linhas if item.get('categoria') == categoria)
+        casa = matcher(filtros.get('busca', ''), EXPORT_VIEWS[self.view][2])
+        if casa:
+            linhas = filter(casa, linhas)
+        inicio, fim = filtros.get('data_inicio'), filtros.get('data_fim')
+        if self.view == 'brindes' and (inicio or fim):
+            linhas = (item for item in linhas if cadastrado_no_periodo(item, inicio, fim))
+        return linhas
+
+    def run(self) -> int:
+        """Escreve o arquivo; retorna o número de linhas (ExportCancelled se cancelada)"""
+        titulo, columns, _ = EXPORT_VIEWS[self.view]
+        parcial = self.path + '.parcial'
+        try:
+            if self.formato == 'xlsx':
+                self._write_xlsx(parcial, titulo, columns)
+            else:
+                self._write_csv(parcial, columns)
+            os.replace(parcial, self.path)
+        except BaseException:
+            if os.path.exists(parcial):
+                os.remove(parcial)
+            raise
+        return self.written
+
+    def _values(self, columns: List[Column]) -> Iterator[List[Any]]:
+        """Valores de cada linha, verificando o cancelamento a cada CHECK_EVERY linhas"""
+        for item in self.rows():
+            if self.written % CHECK_EVERY == 0 and self._cancel.is_set():
+                raise ExportCancelled()
+            yield [column.value(item) for column in columns]
+            self.written += 1
+        if self._cancel.is_set():
+            raise ExportCancelled()
+
+    def _write_csv(self, path: str, columns: List[Column]):
+        """CSV para o Excel em português: ';' como separador, vírgula decimal e BOM"""
+        with open(path, 'w', newline='', encoding='utf-8-sig') as arquivo:
+            writer = csv.writer(arquivo, delimiter=';')
+            writer.writerow([column.title for column in columns])
+            for valores in self._values(columns):
+                writer.writerow([_csv_value(valor) for valor in valores])
+
+    def _write_xlsx(self, path: str, titulo: str, columns: List[Column]):
+        """XLSX no modo write-only do openpyxl (linhas gravadas à medida que chegam)"""
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(titulo)
+        sheet.append([column.title for column in columns])
+        for valores in self._values(columns):
+            sheet.append(valores)
+        workbook.save(path)
+
+def _csv_value(valor: Any) -> Any:
+    """Valor da célula no CSV"""
+    if valor is None:
+        return ''
+    if isinstance(valor, float):
+        return f"{valor:.2f}".replace('.', ',')
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat(' ') if isinstance(valor, datetime) else valor.isoformat()
+    return valor
@@ -0,0 +1,169 @@
+"""
+Armazenamento do modo mock: snapshot JSON + diário de operações (JSONL) só de acréscimo
+"""
+
+import json
+import os
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Compactação só depois de pelo menos tantas operações no diário
+COMPACT_MIN_OPS = 1000
+
+def op_put(tabela: str, registro: Dict[str, Any]) -> Dict[str, Any]:
+    """Grava o registro inteiro (inclui ou substitui pelo id)"""
+    return {'op': 'put', 't': tabela, 'v': registro}
+
+def op_delete(tabela: str, registro_id: Any) -> Dict[str, Any]:
+    """Remove o registro de ``tabela`` com o id informado"""
+    return {'op': 'del', 't': tabela, 'id': registro_id}
+
+def op_set(chave: str, valor: Any) -> Dict[str, Any]:
+    """Substitui uma chave inteira dos dados (tabelas pequenas, configurações)"""
+    return {'op': 'set', 'k': chave, 'v': valor}
+
+def apply_ops(data: Dict[str, Any], ops: Iterable[Dict[str, Any]]):
+    """Aplica as operações em ``data`` (todas idempotentes: podem ser repetidas).
+
+    As tabelas alteradas por put/del viram dicionários id -> registro durante
+    a aplicação (inclusão no fim, substituição na mesma posição) e voltam a
+    ser listas no final.
+    """
+    por_id: Dict[str, Dict[Any, Dict[str, Any]]] = {}
+
+    def tabela(nome: str) -> Dict[Any, Dict[str, Any]]:
+        registros = por_id.get(nome)
+        if registros is None:
+            registros = por_id[nome] = {}
+            for registro in data.get(nome) or []:
+                registros[registro.get('id', object())] = registro
+        return registros
+
+    for op in ops:
+        tipo = op.get('op')
+        if tipo == 'put':
+            registro = op['v']
+            tabela(op['t'])[registro.get('id')] = registro
+        elif tipo == 'del':
+            tabela(op['t']).pop(op['id'], None)
+        elif tipo == 'set':
+            por_id.pop(op['k'], None)
+            data[op['k']] = op['v']
+        else:
+            raise ValueError(f"Operação desconhecida no diário: {tipo}")
+
+    for nome, registros in por_id.items():
+        data[nome] = list(registros.values())
+
+def _tamanho(data: Dict[str, Any]) -> int:
+    """Total de registros (itens das listas) em ``data``"""
+    return sum(len(valor) for valor in data.values() if isinstance(valor, list))
+
+class JournalStore:
+    """Snapshot JSON mais um diário de operações, uma por linha.
+
+    Cada alteração acrescenta linhas ao diário (custo proporcional à
+    alteração, não ao total de dados). Quando o diário passa de
+    ``max(COMPACT_MIN_OPS, registros do snapshot)`` operações, os dados são
+    compactados em um novo snapshot: o arquivo é escrito ao lado, com fsync,
+    e trocado com ``os.replace`` (atômico); só depois o diário é esvaziado.
+    Como a compactação custa O(registros) e acontece no máximo uma vez a
+    cada O(registros) operações, o custo amortizado por gravação é O(1).
+
+    Na carga o snapshot é lido e o diário reaplicado. Uma última linha
+    incompleta (queda durante a gravação) é descartada e cortada do arquivo.
+    """
+
+    def __init__(self, snapshot_path: str, journal_path: Optional[str] = None,
+                 compact_min_ops: int = COMPACT_MIN_OPS, fsync: bool = False):
+        """Inicializa o armazenamento (nada é lido até ``load()``)"""
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path or os.path.splitext(snapshot_path)[0] + ".journal.jsonl"
+        self.compact_min_ops = compact_min_ops
+        self.fsync = fsync
+        # Operações no diário desde o último snapshot e registros do snapshot
+        self.pending_ops = 0
+        self.snapshot_size = 0
+        self._journal = None
+
+    def has_snapshot(self) -> bool:
+        """Indica se o snapshot já existe em disco"""
+        return os.path.exists(self.snapshot_path)
+
+    def load(self, default: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Lê o snapshot (ou ``default()``) e reaplica o diário"""
+        data = None
+        if self.has_snapshot():
+            try:
+                with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception as e:
+                print(f"Erro ao ler snapshot {self.snapshot_path}: {e}")
+        if data is None:
+            data = default()
+        self.snapshot_size = _tamanho(data)
+
+        ops = self._read_journal()
+        apply_ops(data, ops)
+        self.pending_ops = len(ops)
+        return data
+
+    def _read_journal(self) -> List[Dict[str, Any]]:
+        """Operações válidas do diário; corta o arquivo após a última linha íntegra"""
+        if not os.path.exists(self.journal_path):
+            return []
+        ops = []
+        integro = 0
+        with open(self.journal_path, 'rb') as f:
+            for linha in f:
+                if not linha.endswith(b'\n'):
+                    break
+                try:
+                    ops.append(json.loads(linha))
+                except ValueError:
+                    break
+                integro += len(linha)
+            tamanho = f.seek(0, os.SEEK_END)
+        if integro < tamanho:
+            print(f"Diário {self.journal_path}: {tamanho - integro} bytes incompletos descartados")
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(integro)
+        return ops
+
+    def append(self, ops: Iterable[Dict[str, Any]]):
+        """Acrescenta as operações ao diário em uma única escrita"""
+        linhas = ''.join(json.dumps(op, ensure_ascii=False, default=str, separators=(',', ':')) + '\n'
+                         for op in ops)
+        if not linhas:
+            return
+        if self._journal is None:
+            self._journal = open(self.journal_path, 'a', encoding='utf-8', newline='\n')
+        self._journal.write(linhas)
+        self._journal.flush()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+        self.pending_ops += linhas.count('\n')
+
+    def should_compact(self) -> bool:
+        """Indica se o diário já cresceu o suficiente para compactar"""
+        return self.pending_ops >= max(self.compact_min_ops, self.snapshot_size)
+
+    def compact(self, data: Dict[str, Any]):
+        """Grava ``data`` como novo snapshot (troca atômica) e esvazia o diário"""
+        temporario = self.snapshot_path + '.tmp'
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, self.snapshot_path)
+
+        # Queda aqui só faz o diário antigo ser reaplicado sobre o snapshot novo
+        self.close()
+        open(self.journal_path, 'w').close()
+        self.pending_ops = 0
+        self.snapshot_size = _tamanho(data)
+
+    def close(self):
+        """Fecha o arquivo do diário"""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
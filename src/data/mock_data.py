@@ -2,36 +2,54 @@
 Gerenciador de dados mock para desenvolvimento
 """
 
-import json
-import os
-from datetime import datetime
-from typing import Dict, List, Any, Optional
+import heapq
+import re
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Any, Optional, Callable
+from ..utils.text_search import search_words
+from .journal import JournalStore, op_put, op_delete, op_set
+from .mock_index import BrindeIndex, MovimentacaoIndex, normalize_descricao
 
 class MockDataManager:
     """Classe para gerenciar dados mock durante o desenvolvimento"""
     
+    # Índices em memória sobre data['brindes'] e data['movimentacoes'] (ver mock_index),
+    # criados no primeiro uso
+    _brinde_index: Optional[BrindeIndex] = None
+    _movimentacao_index: Optional[MovimentacaoIndex] = None
+    
     def __init__(self):
         """Inicializa o gerenciador de dados mock"""
         self.data_file = "mock_data.json"
+        # Snapshot em data_file + diário de operações ao lado (ver JournalStore)
+        self.store = JournalStore(self.data_file)
         self.data = self.load_data()
         
     def load_data(self) -> Dict[str, Any]:
-        """Carrega dados do arquivo JSON ou cria dados iniciais"""
-        if os.path.exists(self.data_file):
-            try:
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception:
-                pass
-        
-        # Dados iniciais se arquivo não existe
-        return self.create_initial_data()
+        """Carrega o snapshot (ou os dados iniciais) e reaplica o diário de operações"""
+        return self.store.load(self.create_initial_data)
     
     def save_data(self):
-        """Salva dados no arquivo JSON"""
+        """Salva todos os dados em um novo snapshot (esvazia o diário)"""
+        try:
+            self.store.compact(self.data)
+        except Exception as e:
+            print(f"Erro ao salvar dados: {e}")
+    
+    def save_key(self, chave: str):
+        """Salva uma chave inteira dos dados (tabelas pequenas, configurações) no diário"""
+        self._persist(op_set(chave, self.data.get(chave)))
+    
+    def _persist(self, *ops: Dict[str, Any]):
+        """Registra as alterações no diário; compacta quando ele cresce demais"""
         try:
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, ensure_ascii=False, indent=2)
+            if not self.store.has_snapshot():
+                # Primeira gravação: o snapshot já inclui a alteração
+                self.store.compact(self.data)
+                return
+            self.store.append(ops)
+            if self.store.should_compact():
+                self.store.compact(self.data)
         except Exception as e:
             print(f"Erro ao salvar dados: {e}")
     
@@ -133,8 +151,26 @@ class MockDataManager:
             }
         }
     
+    def _brindes(self) -> BrindeIndex:
+        """Índice dos brindes, refeito se a lista mudou por fora"""
+        if self._brinde_index is None:
+            self._brinde_index = BrindeIndex()
+        return self._brinde_index.sync(self.data.get('brindes'))
+    
+    def _movimentacoes(self) -> MovimentacaoIndex:
+        """Índice das movimentações, refeito se a lista mudou por fora"""
+        if self._movimentacao_index is None:
+            self._movimentacao_index = MovimentacaoIndex()
+        return self._movimentacao_index.sync(self.data.get('movimentacoes'))
+    
     def get_next_id(self, table: str) -> int:
         """Obtém o próximo ID para uma tabela"""
+        # Brindes e movimentações: contadores dos índices (não reaproveitam ids excluídos)
+        if table == 'brindes':
+            return self._brindes().proximo_id
+        if table == 'movimentacoes':
+            return self._movimentacoes().proximo_id
+        
         if table not in self.data:
             return 1
         
@@ -146,30 +182,30 @@ class MockDataManager:
     
     def get_next_codigo(self) -> str:
         """Obtém o próximo código para brindes"""
-        brindes = self.data.get('brindes', [])
-        if not brindes:
-            return "001"
-        
-        codigos = [int(brinde.get('codigo', '0')) for brinde in brindes if brinde.get('codigo', '').isdigit()]
-        if not codigos:
-            return "001"
-        
-        return f"{max(codigos) + 1:03d}"
+        return self._brindes().proximo_codigo_formatado()
+    
+    # Descrição normalizada (sem espaços nas pontas, minúscula)
+    normalize_descricao = staticmethod(normalize_descricao)
+    
+    def find_brinde_by_descricao(self, filial: str, descricao: str) -> Optional[Dict[str, Any]]:
+        """Localiza o brinde da filial pela descrição normalizada (consulta no índice)"""
+        return self._brindes().por_descricao(filial, descricao)
     
     # CRUD para Brindes
     def get_brindes(self, filial_filter: Optional[str] = None) -> List[Dict[str, Any]]:
         """Obtém lista de brindes"""
-        brindes = self.data.get('brindes', [])
-        
         if filial_filter and filial_filter != "Todas":
-            brindes = [b for b in brindes if b.get('filial') == filial_filter]
+            return self._brindes().da_filial(filial_filter)
         
-        return brindes
+        return self.data.get('brindes', [])
+    
+    def iter_brindes(self, filial_filter: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Percorre os brindes (mesmo formato de get_brindes)"""
+        return iter(self.get_brindes(filial_filter))
     
     def get_brinde_by_id(self, brinde_id: int) -> Optional[Dict[str, Any]]:
         """Obtém um brinde por ID"""
-        brindes = self.data.get('brindes', [])
-        return next((b for b in brindes if b.get('id') == brinde_id), None)
+        return self._brindes().get(brinde_id)
     
     def create_brinde(self, brinde_data: Dict[str, Any]) -> Dict[str, Any]:
         """Cria um novo brinde"""
@@ -190,47 +226,52 @@ class MockDataManager:
         if 'valor_unitario' in brinde_data:
             brinde_data['valor_unitario'] = float(str(brinde_data['valor_unitario']).replace(',', '.'))
         
+        indice = self._brindes()
         self.data['brindes'].append(brinde_data)
-        self.save_data()
+        indice.adicionado(brinde_data)
+        self._persist(op_put('brindes', brinde_data))
         
         return brinde_data
     
     def update_brinde(self, brinde_id: int, brinde_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Atualiza um brinde"""
-        brindes = self.data.get('brindes', [])
-        
-        for i, brinde in enumerate(brindes):
-            if brinde.get('id') == brinde_id:
-                # Preparar dados para atualização
-                update_payload = brinde_data.copy()
-
-                # Adicionar timestamp de atualização
-                update_payload['data_atualizacao'] = datetime.now().isoformat()
-                
-                # Converter valores numéricos
-                if 'quantidade' in update_payload:
-                    update_payload['quantidade'] = int(update_payload['quantidade'])
-                if 'valor_unitario' in update_payload:
-                    update_payload['valor_unitario'] = float(str(update_payload['valor_unitario']).replace(',', '.'))
-                
-                # Atualizar o dicionário existente em vez de substituí-lo
-                self.data['brindes'][i].update(update_payload)
-                self.save_data()
-                return self.data['brindes'][i]
-        
-        return None
+        indice = self._brindes()
+        brinde = indice.get(brinde_id)
+        if brinde is None:
+            return None
+        
+        # Preparar dados para atualização
+        update_payload = brinde_data.copy()
+
+        # Adicionar timestamp de atualização
+        update_payload['data_atualizacao'] = datetime.now().isoformat()
+        
+        # Converter valores numéricos
+        if 'quantidade' in update_payload:
+            update_payload['quantidade'] = int(update_payload['quantidade'])
+        if 'valor_unitario' in update_payload:
+            update_payload['valor_unitario'] = float(str(update_payload['valor_unitario']).replace(',', '.'))
+        
+        # Atualizar o dicionário existente em vez de substituí-lo
+        antes = indice.estado(brinde)
+        brinde.update(update_payload)
+        indice.alterado(brinde, antes)  # Descrição/filial podem ter mudado
+        self._persist(op_put('brindes', brinde))
+        return brinde
     
     def delete_brinde(self, brinde_id: int) -> bool:
         """Exclui um brinde"""
-        brindes = self.data.get('brindes', [])
-        
-        for i, brinde in enumerate(brindes):
-            if brinde.get('id') == brinde_id:
-                del self.data['brindes'][i]
-                self.save_data()
-                return True
-        
-        return False
+        indice = self._brindes()
+        brinde = indice.get(brinde_id)
+        if brinde is None:
+            return False
+        
+        # Posição por identidade (sem comparar os dicionários)
+        brindes = self.data['brindes']
+        del brindes[next(i for i, b in enumerate(brindes) if b is brinde)]
+        indice.removido(brinde)
+        self._persist(op_delete('brindes', brinde_id))
+        return True
     
     # CRUD para Movimentações
     def create_movimentacao(self, movimentacao_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -254,62 +295,180 @@ class MockDataManager:
         tipo = movimentacao_data.get('tipo', 'entrada')
         
         if brinde_id and self.update_estoque_brinde(brinde_id, quantidade, tipo):
+            indice = self._movimentacoes()
             self.data['movimentacoes'].append(movimentacao_data)
-            self.save_data()
+            indice.adicionado(movimentacao_data)
+            self._persist(op_put('brindes', self.get_brinde_by_id(brinde_id)),
+                          op_put('movimentacoes', movimentacao_data))
             return movimentacao_data
         else:
             raise Exception("Erro ao atualizar estoque do brinde")
-    
+
+    def create_movimentacoes_bulk(self, movimentacoes: List[Dict[str, Any]],
+                                  atomic: bool = True) -> List[Dict[str, Any]]:
+        """Cria um lote de movimentações com uma única gravação do arquivo"""
+        if 'movimentacoes' not in self.data:
+            self.data['movimentacoes'] = []
+
+        brindes = self._brindes().por_id
+        saldos = {}
+        aceitas = []
+        resultados = []
+
+        # Validar o lote inteiro (saldo acumulado na ordem das linhas)
+        for i, movimentacao_data in enumerate(movimentacoes):
+            brinde_id = movimentacao_data.get('brinde_id')
+            resultado = {'linha': i, 'sucesso': False, 'id': None, 'brinde_id': brinde_id, 'erro': None}
+            resultados.append(resultado)
+            try:
+                quantidade = int(movimentacao_data.get('quantidade', 0))
+                tipo = movimentacao_data.get('tipo')
+                if quantidade <= 0:
+                    raise ValueError("Quantidade deve ser maior que zero")
+                if tipo not in ('entrada', 'saida'):
+                    raise ValueError(f"Tipo de movimentação inválido: {tipo}")
+                if brinde_id not in brindes:
+                    raise ValueError(f"Brinde {brinde_id} não encontrado")
+
+                saldo = saldos.get(brinde_id, brindes[brinde_id].get('quantidade', 0))
+                saldo += quantidade if tipo == 'entrada' else -quantidade
+                if saldo < 0:
+                    raise ValueError("Estoque insuficiente")
+                saldos[brinde_id] = saldo
+                aceitas.append((i, {**movimentacao_data, 'quantidade': quantidade}))
+            except (ValueError, TypeError) as e:
+                resultado['erro'] = str(e)
+
+        if not aceitas or (atomic and len(aceitas) < len(movimentacoes)):
+            for resultado in resultados:
+                if not resultado['erro']:
+                    resultado['erro'] = "Lote cancelado: há linhas inválidas"
+            return resultados
+
+        # Aplicar saldos e gravar movimentações
+        for brinde_id, saldo in saldos.items():
+            brindes[brinde_id]['quantidade'] = saldo
+
+        indice = self._movimentacoes()
+        proximo_id = indice.proximo_id
+        data_hora = datetime.now().isoformat()
+        for offset, (i, movimentacao_data) in enumerate(aceitas):
+            movimentacao_data['id'] = proximo_id + offset
+            movimentacao_data['data_hora'] = data_hora
+            self.data['movimentacoes'].append(movimentacao_data)
+            indice.adicionado(movimentacao_data)
+            resultados[i].update({'sucesso': True, 'id': movimentacao_data['id']})
+
+        self._persist(*[op_put('brindes', brindes[brinde_id]) for brinde_id in saldos],
+                      *[op_put('movimentacoes', m) for _, m in aceitas])
+        return resultados
+
     def update_estoque_brinde(self, brinde_id: int, quantidade: int, tipo: str) -> bool:
         """Atualiza o estoque de um brinde"""
-        brindes = self.data.get('brindes', [])
-        
-        for brinde in brindes:
-            if brinde.get('id') == brinde_id:
-                estoque_atual = brinde.get('quantidade', 0)
-                
-                if tipo == 'entrada':
-                    novo_estoque = estoque_atual + quantidade
-                elif tipo == 'saida':
-                    novo_estoque = estoque_atual - quantidade
-                    if novo_estoque < 0:
-                        raise Exception("Estoque insuficiente")
-                else:
-                    return False
-                
-                brinde['quantidade'] = novo_estoque
-                return True
+        brinde = self.get_brinde_by_id(brinde_id)
+        if brinde is None:
+            return False
+        
+        estoque_atual = brinde.get('quantidade', 0)
+        
+        if tipo == 'entrada':
+            novo_estoque = estoque_atual + quantidade
+        elif tipo == 'saida':
+            novo_estoque = estoque_atual - quantidade
+            if novo_estoque < 0:
+                raise Exception("Estoque insuficiente")
+        else:
+            return False
         
-        return False
+        brinde['quantidade'] = novo_estoque
+        return True
     
     def get_movimentacoes(self, brinde_id: int = None, tipo: str = None, limit: int = None) -> List[Dict[str, Any]]:
-        """Obtém lista de movimentações"""
-        movimentacoes = self.data.get('movimentacoes', [])
-        
-        # Filtrar por brinde
-        if brinde_id:
-            movimentacoes = [m for m in movimentacoes if m.get('brinde_id') == brinde_id]
-        
-        # Filtrar por tipo
-        if tipo:
-            movimentacoes = [m for m in movimentacoes if m.get('tipo') == tipo]
-        
-        # Ordenar por data (mais recente primeiro)
-        movimentacoes.sort(key=lambda x: x.get('data_hora', ''), reverse=True)
-        
-        # Limitar resultados
-        if limit:
-            movimentacoes = movimentacoes[:limit]
+        """Obtém lista de movimentações (mais recentes primeiro, já ordenadas no índice)"""
+        movimentacoes = []
+        
+        for m in self._movimentacoes().recentes():
+            # Filtrar por brinde e por tipo
+            if brinde_id and m.get('brinde_id') != brinde_id:
+                continue
+            if tipo and m.get('tipo') != tipo:
+                continue
+            movimentacoes.append(m)
+            
+            # Limitar resultados (para de percorrer ao atingir o limite)
+            if limit and len(movimentacoes) >= limit:
+                break
         
         return movimentacoes
-    
+
+    def query_movimentacoes(self, filters: Optional[Dict[str, Any]] = None,
+                            after_cursor: Optional[tuple] = None,
+                            page_size: int = 50) -> Dict[str, Any]:
+        """Página de movimentações com os mesmos filtros e cursor do banco"""
+        filtradas = self._filtrar_movimentacoes(filters or {})
+
+        inicio = 0
+        if after_cursor:
+            cursor = tuple(after_cursor)
+            inicio = next(
+                (i for i, m in enumerate(filtradas) if (m.get('data_hora', ''), m.get('id', 0)) < cursor),
+                len(filtradas)
+            )
+
+        items = filtradas[inicio:inicio + page_size]
+        next_cursor = None
+        if inicio + page_size < len(filtradas):
+            next_cursor = (items[-1].get('data_hora', ''), items[-1].get('id', 0))
+
+        return {'items': items, 'total': len(filtradas), 'next_cursor': next_cursor}
+
+    def count_movimentacoes(self, filters: Optional[Dict[str, Any]] = None) -> int:
+        """Total de movimentações dos filtros de query_movimentacoes"""
+        return len(self._filtrar_movimentacoes(filters or {}))
+
+    def iter_movimentacoes(self, filters: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """Todas as movimentações dos filtros de query_movimentacoes (mais recentes primeiro)"""
+        return iter(self._filtrar_movimentacoes(filters or {}))
+
+    def _filtrar_movimentacoes(self, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Movimentações que atendem aos filtros, na ordem (data_hora, id) decrescente"""
+        tipo = filters.get('tipo')
+        tipos = {tipo} if isinstance(tipo, str) else set(tipo or ())
+        filial = filters.get('filial')
+        if filial == "Todas":
+            filial = None
+        usuario = filters.get('usuario')
+        if usuario == "Todos":
+            usuario = None
+
+        def timestamp(valor):
+            return valor.isoformat() if isinstance(valor, (date, datetime)) else valor
+
+        data_inicio = timestamp(filters.get('data_inicio'))
+        data_fim = timestamp(filters.get('data_fim'))
+        brinde_id = filters.get('brinde_id')
+
+        def atende(m: Dict[str, Any]) -> bool:
+            data_hora = m.get('data_hora', '')
+            return not (
+                (filial and (m.get('filial_origem') or m.get('filial')) != filial)
+                or (tipos and m.get('tipo') not in tipos)
+                or (data_inicio and data_hora < data_inicio)
+                or (data_fim and data_hora >= data_fim)
+                or (usuario and m.get('usuario') != usuario)
+                or (brinde_id and m.get('brinde_id') != brinde_id)
+            )
+
+        filtradas = [m for m in self.data.get('movimentacoes', []) if atende(m)]
+        filtradas.sort(key=lambda m: (m.get('data_hora', ''), m.get('id', 0)), reverse=True)
+        return filtradas
+
     def find_or_create_brinde_for_transfer(self, brinde_origem: Dict[str, Any], filial_destino: str, username: str) -> Dict[str, Any]:
         """
         Encontra um brinde existente no destino ou cria um novo para a transferência (versão mock).
         """
         # Verificar se já existe um brinde com a mesma descrição na filial de destino
-        brindes_destino = self.get_brindes(filial_filter=filial_destino)
-        brinde_destino_existente = next((b for b in brindes_destino if b['descricao'] == brinde_origem['descricao']), None)
+        brinde_destino_existente = self.find_brinde_by_descricao(filial_destino, brinde_origem['descricao'])
 
         if brinde_destino_existente:
             return brinde_destino_existente
@@ -327,6 +486,79 @@ class MockDataManager:
             }
             return self.create_brinde(novo_brinde_data)
 
+    def transfer_brinde(self, origem_id: int, filial_destino: str, quantidade: int,
+                        username: str, justificativa: Optional[str] = None) -> Dict[str, Any]:
+        """Transfere estoque entre filiais (validação completa antes de alterar, uma gravação)"""
+        if not any(f.get('nome') == filial_destino for f in self.data.get('filiais', [])):
+            raise ValueError(f"Filial '{filial_destino}' não encontrada")
+        quantidade = int(quantidade)
+        if quantidade <= 0:
+            raise ValueError("Quantidade deve ser maior que zero")
+
+        origem = self.get_brinde_by_id(origem_id)
+        if not origem:
+            raise ValueError(f"Brinde {origem_id} não encontrado")
+        if origem.get('filial') == filial_destino:
+            raise ValueError("A filial de destino deve ser diferente da filial de origem")
+        if origem.get('quantidade', 0) < quantidade:
+            raise ValueError("Estoque insuficiente")
+
+        destino = self.find_brinde_by_descricao(filial_destino, origem['descricao'])
+        destino_criado = destino is None
+        if destino_criado:
+            destino = {
+                'id': self.get_next_id('brindes'),
+                'codigo': self.get_next_codigo(),
+                'descricao': origem['descricao'],
+                'categoria': origem.get('categoria'),
+                'quantidade': 0,
+                'valor_unitario': origem.get('valor_unitario'),
+                'unidade_medida': origem.get('unidade_medida'),
+                'filial': filial_destino,
+                'usuario_cadastro': username,
+                'data_cadastro': datetime.now().isoformat()
+            }
+            indice = self._brindes()
+            self.data['brindes'].append(destino)
+            indice.adicionado(destino)
+
+        origem['quantidade'] -= quantidade
+        destino['quantidade'] = destino.get('quantidade', 0) + quantidade
+
+        if 'movimentacoes' not in self.data:
+            self.data['movimentacoes'] = []
+        indice = self._movimentacoes()
+        proximo_id = indice.proximo_id
+        data_hora = datetime.now().isoformat()
+        comum = {
+            'quantidade': quantidade,
+            'usuario': username,
+            'data_hora': data_hora,
+            'filial_origem': origem.get('filial'),
+            'filial_destino': filial_destino
+        }
+        saida = {**comum, 'id': proximo_id, 'brinde_id': origem['id'], 'brinde_codigo': origem.get('codigo'),
+                 'brinde_descricao': origem['descricao'], 'tipo': 'transferencia_saida',
+                 'justificativa': justificativa, 'filial': origem.get('filial')}
+        entrada = {**comum, 'id': proximo_id + 1, 'brinde_id': destino['id'], 'brinde_codigo': destino.get('codigo'),
+                   'brinde_descricao': destino['descricao'], 'tipo': 'transferencia_entrada',
+                   'justificativa': f"Transferência recebida de {origem.get('filial')}", 'filial': filial_destino}
+        self.data['movimentacoes'].extend([saida, entrada])
+        indice.adicionado(saida)
+        indice.adicionado(entrada)
+
+        self._persist(op_put('brindes', origem), op_put('brindes', destino),
+                      op_put('movimentacoes', saida), op_put('movimentacoes', entrada))
+        return {
+            'brinde_origem_id': origem['id'],
+            'brinde_destino_id': destino['id'],
+            'brinde_destino_criado': destino_criado,
+            'quantidade': quantidade,
+            'movimentacao_saida_id': saida['id'],
+            'movimentacao_entrada_id': entrada['id'],
+            'brinde_destino': destino
+        }
+
     # Métodos auxiliares
     def get_categorias(self) -> List[str]:
         """Obtém lista de categorias ativas"""
@@ -343,23 +575,139 @@ class MockDataManager:
         filiais = self.data.get('filiais', [])
         return [fil['nome'] for fil in filiais if fil.get('ativo', True)]
     
-    def search_brindes(self, query: str, categoria: str = None, filial: str = None) -> List[Dict[str, Any]]:
-        """Busca brindes por critérios"""
-        brindes = self.get_brindes(filial)
+    # Palavras minúsculas e sem acentos (mesmas regras do índice FTS5 do banco)
+    search_words = staticmethod(search_words)
+    
+    def _search(self, registros: List[Dict[str, Any]], termo: str,
+                campos: Callable[[Dict[str, Any]], List[Any]], limit: int) -> List[Dict[str, Any]]:
+        """Registros em que cada palavra do termo é prefixo de alguma palavra dos campos.
         
-        if query:
-            query = query.lower()
-            brindes = [
-                b for b in brindes 
-                if query in b.get('descricao', '').lower() or 
-                   query in b.get('codigo', '').lower()
-            ]
+        ``campos`` retorna os textos pesquisáveis do registro; os que casam no
+        primeiro (descrição/nome) vêm primeiro.
+        """
+        palavras = self.search_words(termo)
+        if not palavras:
+            return registros[:limit]
+        
+        principais = []
+        demais = []
+        for registro in registros:
+            textos = [self.search_words(texto) for texto in campos(registro)]
+            todas = [p for texto in textos for p in texto]
+            if not all(any(p.startswith(q) for p in todas) for q in palavras):
+                continue
+            if all(any(p.startswith(q) for p in textos[0]) for q in palavras):
+                principais.append(registro)
+            else:
+                demais.append(registro)
+        return (principais + demais)[:limit]
+    
+    def search_brindes(self, query: str, categoria: str = None, filial: str = None,
+                       limit: int = 50) -> List[Dict[str, Any]]:
+        """Busca brindes por critérios (prefixo das palavras, sem acentos)"""
+        brindes = self.get_brindes(filial)
         
         if categoria and categoria != "Todas":
             brindes = [b for b in brindes if b.get('categoria') == categoria]
         
-        return brindes
-    
+        return self._search(brindes, query, lambda b: [
+            b.get('descricao'), b.get('codigo'), b.get('observacoes'), b.get('categoria')
+        ], limit)
+
+    def get_estatisticas_dashboard(self, filial_filter: Optional[str] = None) -> Dict[str, Any]:
+        """Estatísticas do dashboard em uma única passada, sem copiar a lista"""
+        return self.get_dashboard_snapshot(filial_filter, 0, 0)['estatisticas']
+
+    def get_dashboard_snapshot(self, filial_filter: Optional[str] = None,
+                               limite_alertas: int = 4, limite_movimentacoes: int = 10) -> Dict[str, Any]:
+        """Dados do dashboard (mesmo formato do banco) em uma única passada pelos brindes"""
+        estoque_minimo = self.data.get('configuracoes', {}).get('estoque_minimo', 10)
+        filtrar = bool(filial_filter) and filial_filter != "Todas"
+
+        total_itens = 0
+        valor_total = 0.0
+        itens_baixo = 0
+        por_categoria: Dict[str, int] = {}
+        estoque_baixo = []
+        for b in self.data.get('brindes', []):
+            if filtrar and b.get('filial') != filial_filter:
+                continue
+            quantidade = b.get('quantidade', 0)
+            total_itens += quantidade
+            valor_total += quantidade * b.get('valor_unitario', 0)
+            categoria = b.get('categoria') or 'Outros'
+            por_categoria[categoria] = por_categoria.get(categoria, 0) + quantidade
+            if quantidade <= estoque_minimo:
+                itens_baixo += 1
+                estoque_baixo.append(b)
+
+        # Mesmas ordens das consultas do banco, sem ordenar as listas inteiras
+        estoque_baixo = heapq.nsmallest(
+            limite_alertas, estoque_baixo,
+            key=lambda b: (b.get('quantidade', 0), b.get('descricao', ''))
+        )
+        movimentacoes = self.query_movimentacoes(
+            {'filial': filial_filter}, None, limite_movimentacoes
+        )['items'] if limite_movimentacoes else []
+
+        return {
+            'estatisticas': {
+                'total_itens': total_itens,
+                'total_categorias': len(self.get_categorias()),
+                'valor_total': valor_total,
+                'itens_estoque_baixo': itens_baixo,
+                'estoque_minimo': estoque_minimo
+            },
+            'categorias': [
+                {'categoria': categoria, 'quantidade': quantidade}
+                for categoria, quantidade in sorted(por_categoria.items(), key=lambda c: (-c[1], c[0]))
+            ],
+            'estoque_baixo': [
+                {'id': b.get('id'), 'codigo': b.get('codigo'), 'descricao': b.get('descricao'),
+                 'quantidade': b.get('quantidade', 0)}
+                for b in estoque_baixo
+            ],
+            'movimentacoes': movimentacoes
+        }
+
+    def get_estoque_resumo(self, grupo: str = 'descricao',
+                           filial_filter: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Estoque agregado por descrição ou categoria em cada filial (mesmo formato do banco)"""
+        if grupo not in ('descricao', 'categoria'):
+            raise ValueError(f"Grupo de resumo inválido: {grupo}")
+
+        grupos: Dict[tuple, Dict[str, Any]] = {}
+        for b in self.get_brindes(filial_filter):
+            quantidade = b.get('quantidade', 0)
+            if grupo == 'descricao':
+                chave = (self.normalize_descricao(b.get('descricao', '')), b.get('filial'))
+            else:
+                chave = (b.get('categoria') or '', b.get('filial'))
+            if not chave[0] and grupo == 'descricao':
+                continue
+            linha = grupos.get(chave)
+            if linha is None:
+                linha = grupos[chave] = {'categoria': b.get('categoria'), 'filial': b.get('filial'),
+                                         'itens': 0, 'quantidade': 0, 'valor_total': 0.0}
+                if grupo == 'descricao':
+                    # Dados de exibição do primeiro brinde do grupo
+                    linha.update({
+                        'descricao': b.get('descricao'),
+                        'valor_unitario': float(b.get('valor_unitario', 0)),
+                        'unidade_medida': b.get('unidade_medida'),
+                        'codigo': b.get('codigo')
+                    })
+            linha['itens'] += 1
+            linha['quantidade'] += quantidade
+            linha['valor_total'] += quantidade * b.get('valor_unitario', 0)
+
+        return [grupos[chave] for chave in sorted(grupos, key=lambda c: (c[0], c[1] or ''))]
+
+    def iter_estoque_resumo(self, grupo: str = 'descricao',
+                            filial_filter: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Percorre o resumo do estoque (mesmo formato de get_estoque_resumo)"""
+        return iter(self.get_estoque_resumo(grupo, filial_filter))
+
     # Métodos de Fornecedores (Mock)
     def get_fornecedores(self) -> List[Dict[str, Any]]:
         """Retorna lista de fornecedores"""
@@ -416,7 +764,7 @@ class MockDataManager:
                 }
             ]
             self.data['fornecedores'] = fornecedores_padrao
-            self.save_data()
+            self.save_key('fornecedores')
             return fornecedores_padrao
         
         return fornecedores_existentes
@@ -450,7 +798,7 @@ class MockDataManager:
         data['ativo'] = True
         fornecedores.append(data)
         self.data['fornecedores'] = fornecedores
-        self.save_data()
+        self._persist(op_put('fornecedores', data))
         return True
     
     def update_fornecedor(self, fornecedor_id: int, data: Dict[str, Any]) -> bool:
@@ -459,7 +807,7 @@ class MockDataManager:
         for i, f in enumerate(fornecedores):
             if f['id'] == fornecedor_id:
                 fornecedores[i].update(data)
-                self.save_data()
+                self._persist(op_put('fornecedores', fornecedores[i]))
                 return True
         return False
     
@@ -467,20 +815,13 @@ class MockDataManager:
         """Remove fornecedor (mock - soft delete)"""
         return self.update_fornecedor(fornecedor_id, {'ativo': False})
     
-    def search_fornecedores(self, termo: str) -> List[Dict[str, Any]]:
+    def search_fornecedores(self, termo: str, limit: int = 50) -> List[Dict[str, Any]]:
         """Busca fornecedores por termo (mock)"""
-        fornecedores = self.get_fornecedores()
-        if not termo:
-            return fornecedores
-        
-        termo = termo.lower()
-        return [
-            f for f in fornecedores
-            if termo in f.get('nome', '').lower() or
-               termo in f.get('codigo', '').lower() or
-               termo in f.get('contato_nome', '').lower() or
-               termo in f.get('email', '').lower()
-        ]
+        # CNPJ também só com os dígitos, como no índice do banco
+        return self._search(self.get_fornecedores(), termo, lambda f: [
+            f.get('nome'), f.get('codigo'), f.get('contato_nome'), f.get('email'),
+            f.get('cnpj'), re.sub(r"\D", "", f.get('cnpj') or '')
+        ], limit)
 
 # Instância global do gerenciador
 mock_data = MockDataManager()
@@ -0,0 +1,197 @@
+"""
+Índices em memória do modo mock (brindes por id, filial e descrição; movimentações por data)
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+def normalize_descricao(descricao: str) -> str:
+    """Descrição normalizada (sem espaços nas pontas, minúscula)"""
+    return (descricao or '').strip().lower()
+
+def _numero(valor: Any) -> Optional[int]:
+    """Valor inteiro de um id ou código numérico (None se não for)"""
+    if isinstance(valor, bool):
+        return None
+    if isinstance(valor, int):
+        return valor
+    if isinstance(valor, str) and valor.isdigit():
+        return int(valor)
+    return None
+
+class BrindeIndex:
+    """Índices sobre a lista ``data['brindes']`` do MockDataManager.
+
+    A lista continua sendo a fonte dos dados (ordem de get_brindes, snapshot
+    e diário); aqui ficam id -> brinde, filial -> brindes (na ordem da lista),
+    (filial, descrição normalizada) -> brinde mais antigo e os próximos id e
+    código. As operações do MockDataManager mantêm os índices; se a lista for
+    trocada ou mudar de tamanho por fora, ``sync()`` os refaz. Os contadores
+    só crescem enquanto a lista for a mesma: ids de brindes excluídos não são
+    reaproveitados.
+    """
+
+    def __init__(self):
+        """Inicializa os índices vazios (montados no primeiro ``sync()``)"""
+        self._lista: Optional[List[Dict[str, Any]]] = None
+        self._tamanho = 0
+        self._sujo = True
+        self.por_id: Dict[Any, Dict[str, Any]] = {}
+        self._por_filial: Dict[Any, List[Dict[str, Any]]] = {}
+        self._por_descricao: Dict[Tuple[Any, str], Dict[str, Any]] = {}
+        self.proximo_id = 1
+        self.proximo_codigo = 1
+
+    def sync(self, lista: Optional[List[Dict[str, Any]]]) -> 'BrindeIndex':
+        """Refaz os índices se ``lista`` não for a indexada ou tiver mudado de tamanho"""
+        tamanho = len(lista) if lista is not None else 0
+        if not self._sujo and lista is self._lista and tamanho == self._tamanho:
+            return self
+
+        if lista is not self._lista:
+            self.proximo_id = self.proximo_codigo = 1
+        self._lista = lista
+        self.por_id = {}
+        self._por_filial = {}
+        self._por_descricao = {}
+        for brinde in lista or ():
+            self._incluir(brinde)
+        self._tamanho = tamanho
+        self._sujo = False
+        return self
+
+    @staticmethod
+    def _chave(brinde: Dict[str, Any]) -> Tuple[Any, str]:
+        """(filial, descrição normalizada) do brinde"""
+        return (brinde.get('filial'), normalize_descricao(brinde.get('descricao')))
+
+    def _incluir(self, brinde: Dict[str, Any]):
+        """Inclui um brinde já presente no fim da lista em todos os índices"""
+        self.por_id.setdefault(brinde.get('id'), brinde)
+        self._por_filial.setdefault(brinde.get('filial'), []).append(brinde)
+        self._por_descricao.setdefault(self._chave(brinde), brinde)
+        self._contar(brinde)
+
+    def _contar(self, brinde: Dict[str, Any]):
+        """Avança os contadores de id e código além dos valores do brinde"""
+        registro_id = _numero(brinde.get('id'))
+        if registro_id is not None and registro_id >= self.proximo_id:
+            self.proximo_id = registro_id + 1
+        codigo = brinde.get('codigo')
+        codigo = _numero(codigo) if isinstance(codigo, str) else None
+        if codigo is not None and codigo >= self.proximo_codigo:
+            self.proximo_codigo = codigo + 1
+
+    def get(self, brinde_id: Any) -> Optional[Dict[str, Any]]:
+        """Brinde pelo id (o primeiro da lista, como na busca sequencial)"""
+        return self.por_id.get(brinde_id)
+
+    def da_filial(self, filial: Any) -> List[Dict[str, Any]]:
+        """Cópia dos brindes da filial, na ordem da lista"""
+        return list(self._por_filial.get(filial, ()))
+
+    def por_descricao(self, filial: Any, descricao: str) -> Optional[Dict[str, Any]]:
+        """Brinde mais antigo da filial com a descrição normalizada"""
+        return self._por_descricao.get((filial, normalize_descricao(descricao)))
+
+    def proximo_codigo_formatado(self) -> str:
+        """Próximo código numérico (três dígitos no mínimo)"""
+        return f"{self.proximo_codigo:03d}"
+
+    def adicionado(self, brinde: Dict[str, Any]):
+        """Registra um brinde acrescentado ao fim da lista"""
+        self._incluir(brinde)
+        self._tamanho += 1
+
+    def removido(self, brinde: Dict[str, Any]):
+        """Registra a remoção de um brinde da lista"""
+        self._tamanho -= 1
+        if self.por_id.get(brinde.get('id')) is brinde:
+            del self.por_id[brinde.get('id')]
+
+        filial = self._por_filial.get(brinde.get('filial'), [])
+        for i, b in enumerate(filial):
+            if b is brinde:
+                del filial[i]
+                break
+
+        chave = self._chave(brinde)
+        if self._por_descricao.get(chave) is brinde:
+            del self._por_descricao[chave]
+            substituto = next((b for b in filial if self._chave(b) == chave), None)
+            if substituto is not None:
+                self._por_descricao[chave] = substituto
+
+    def estado(self, brinde: Dict[str, Any]) -> Tuple[Any, Any, str]:
+        """Chaves indexadas do brinde (id, filial, descrição normalizada), para ``alterado()``"""
+        return (brinde.get('id'),) + self._chave(brinde)
+
+    def alterado(self, brinde: Dict[str, Any], antes: Tuple[Any, Any, str]):
+        """Registra a alteração de um brinde; ``antes`` é o ``estado()`` anterior"""
+        if self.estado(brinde) != antes:
+            # Id, filial ou descrição mudaram (raro): índices refeitos na próxima consulta
+            self._sujo = True
+        self._contar(brinde)
+
+class MovimentacaoIndex:
+    """Movimentações de ``data['movimentacoes']`` ordenadas por data_hora.
+
+    Mantém (data_hora, ordem de inclusão) em ordem crescente com ``bisect``;
+    novas movimentações quase sempre entram no fim. ``recentes()`` percorre
+    da mais recente para a mais antiga, com empates na ordem de inclusão
+    (mesma ordem da ordenação estável decrescente por data_hora).
+    """
+
+    def __init__(self):
+        """Inicializa o índice vazio (montado no primeiro ``sync()``)"""
+        self._lista: Optional[List[Dict[str, Any]]] = None
+        self._tamanho = 0
+        self._chaves: List[Tuple[str, int]] = []
+        self._movimentacoes: List[Dict[str, Any]] = []
+        self._sequencia = 0
+        self.proximo_id = 1
+
+    def sync(self, lista: Optional[List[Dict[str, Any]]]) -> 'MovimentacaoIndex':
+        """Refaz o índice se ``lista`` não for a indexada ou tiver mudado de tamanho"""
+        tamanho = len(lista) if lista is not None else 0
+        if lista is self._lista and tamanho == self._tamanho:
+            return self
+
+        if lista is not self._lista:
+            self.proximo_id = 1
+        self._lista = lista
+        registros = list(lista or ())
+        self._chaves = [(m.get('data_hora', ''), i) for i, m in enumerate(registros)]
+        ordem = sorted(range(len(registros)), key=self._chaves.__getitem__)
+        self._chaves = [self._chaves[i] for i in ordem]
+        self._movimentacoes = [registros[i] for i in ordem]
+        self._sequencia = len(registros)
+        for m in registros:
+            self._contar(m)
+        self._tamanho = tamanho
+        return self
+
+    def _contar(self, movimentacao: Dict[str, Any]):
+        """Avança o contador de id além do id da movimentação"""
+        registro_id = _numero(movimentacao.get('id'))
+        if registro_id is not None and registro_id >= self.proximo_id:
+            self.proximo_id = registro_id + 1
+
+    def adicionado(self, movimentacao: Dict[str, Any]):
+        """Registra uma movimentação acrescentada ao fim da lista"""
+        chave = (movimentacao.get('data_hora', ''), self._sequencia)
+        self._sequencia += 1
+        posicao = bisect_right(self._chaves, chave)
+        self._chaves.insert(posicao, chave)
+        self._movimentacoes.insert(posicao, movimentacao)
+        self._contar(movimentacao)
+        self._tamanho += 1
+
+    def recentes(self) -> Iterator[Dict[str, Any]]:
+        """Mais recentes primeiro; mesma data_hora na ordem de inclusão"""
+        fim = len(self._movimentacoes)
+        while fim:
+            data_hora = self._chaves[fim - 1][0]
+            inicio = bisect_left(self._chaves, (data_hora,), 0, fim)
+            yield from self._movimentacoes[inicio:fim]
+            fim = inicio
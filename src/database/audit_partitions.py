@@ -0,0 +1,254 @@
+"""
+Auditoria particionada por mês (logs_auditoria_AAAAMM) com dados compactados
+"""
+
+import json
+import re
+import sqlite3
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from .audit_rollup import add_to_rollup, trim_rollup
+
+PREFIXO = 'logs_auditoria_'
+
+# Padrão GLOB dos nomes de partição (logs_auditoria_AAAAMM)
+PADRAO_PARTICAO = PREFIXO + '[0-9]' * 6
+
+# Dados menores que isto ficam como texto JSON (o zlib não compensaria)
+COMPRIMIR_A_PARTIR = 96
+
+COLUNAS = ("id, tabela, registro_id, acao, dados_anteriores, dados_novos, "
+           "usuario_id, ip_address, user_agent, data_hora")
+
+INSERT_QUERY = """
+    INSERT INTO {particao}
+    (tabela, registro_id, acao, dados_anteriores, dados_novos,
+     usuario_id, ip_address, user_agent, data_hora)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# (tabela, registro_id, acao, dados_anteriores, dados_novos,
+#  usuario_id, ip_address, user_agent, data_hora)
+AuditRecord = Tuple[str, Optional[int], str, Optional[Dict[str, Any]], Optional[Dict[str, Any]],
+                    Optional[int], Optional[str], Optional[str], str]
+
+_MES = re.compile(r'(\d{4})-(\d{2})')
+
+def audit_timestamp() -> str:
+    """Data/hora no formato de CURRENT_TIMESTAMP (UTC), fixada no momento da ação"""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+def partition_for(data_hora: Optional[str]) -> str:
+    """Nome da partição do mês de ``data_hora`` ('AAAA-MM-DD ...')"""
+    mes = _MES.match(data_hora or '') or _MES.match(audit_timestamp())
+    return f"{PREFIXO}{mes.group(1)}{mes.group(2)}"
+
+def list_partitions(conn: sqlite3.Connection) -> List[str]:
+    """Partições existentes, da mais antiga para a mais recente"""
+    rows = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB ? ORDER BY name",
+        (PADRAO_PARTICAO,)
+    )
+    return [row[0] for row in rows]
+
+def partitions_between(conn: sqlite3.Connection, inicio: Optional[str] = None,
+                       fim: Optional[str] = None) -> List[str]:
+    """Partições que podem ter registros entre ``inicio`` e ``fim``, mais recente primeiro"""
+    particoes = list_partitions(conn)
+    if inicio:
+        primeira = partition_for(inicio)
+        particoes = [p for p in particoes if p >= primeira]
+    if fim:
+        ultima = partition_for(fim)
+        particoes = [p for p in particoes if p <= ultima]
+    return particoes[::-1]
+
+def ensure_partition(conn: sqlite3.Connection, particao: str) -> bool:
+    """Cria a partição (e atualiza a visão logs_auditoria) se ainda não existir"""
+    existe = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (particao,)
+    ).fetchone()
+    if existe:
+        return False
+
+    conn.execute(f"""
+        CREATE TABLE {particao} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tabela TEXT NOT NULL,
+            registro_id INTEGER,
+            acao TEXT NOT NULL CHECK (acao IN ('INSERT', 'UPDATE', 'DELETE')),
+            dados_anteriores BLOB,
+            dados_novos BLOB,
+            usuario_id INTEGER,
+            ip_address TEXT,
+            user_agent TEXT,
+            data_hora TIMESTAMP NOT NULL
+        )
+    """)
+    conn.execute(f"CREATE INDEX idx_{particao}_data ON {particao} (data_hora)")
+    conn.execute(f"CREATE INDEX idx_{particao}_tabela ON {particao} (tabela, registro_id)")
+    # IDs começam em AAAAMM * 10^9: continuam únicos entre partições
+    sufixo = int(particao[len(PREFIXO):])
+    conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (particao, sufixo * 10 ** 9))
+    _recreate_view(conn)
+    return True
+
+def _recreate_view(conn: sqlite3.Connection):
+    """Visão logs_auditoria com todas as partições (consultas avulsas e compatibilidade)"""
+    particoes = list_partitions(conn)
+    if particoes:
+        corpo = " UNION ALL ".join(f"SELECT {COLUNAS} FROM {p}" for p in particoes)
+    else:
+        corpo = ("SELECT NULL AS id, NULL AS tabela, NULL AS registro_id, NULL AS acao, "
+                 "NULL AS dados_anteriores, NULL AS dados_novos, NULL AS usuario_id, "
+                 "NULL AS ip_address, NULL AS user_agent, NULL AS data_hora WHERE 0")
+    conn.execute("DROP VIEW IF EXISTS logs_auditoria")
+    conn.execute(f"CREATE VIEW logs_auditoria AS {corpo}")
+
+def diff_payloads(acao: str, anteriores: Optional[Dict[str, Any]],
+                  novos: Optional[Dict[str, Any]]) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """Em um UPDATE com os dois lados, mantém só os campos que mudaram"""
+    if acao != 'UPDATE' or not anteriores or not novos:
+        return anteriores, novos
+    ausente = object()
+    campos = [c for c in {**anteriores, **novos}
+              if anteriores.get(c, ausente) != novos.get(c, ausente)]
+    return ({c: anteriores[c] for c in campos if c in anteriores} or None,
+            {c: novos[c] for c in campos if c in novos} or None)
+
+def encode_payload(dados: Optional[Dict[str, Any]]) -> Union[None, str, bytes]:
+    """JSON do registro: texto se for pequeno, zlib (BLOB) se compensar"""
+    if not dados:
+        return None
+    texto = json.dumps(dados, ensure_ascii=False, default=str, separators=(',', ':'))
+    bruto = texto.encode('utf-8')
+    if len(bruto) >= COMPRIMIR_A_PARTIR:
+        compactado = zlib.compress(bruto)
+        if len(compactado) < len(bruto):
+            return compactado
+    return texto
+
+def decode_payload(valor: Union[None, str, bytes]) -> Optional[str]:
+    """Texto JSON de um valor gravado por ``encode_payload``"""
+    if isinstance(valor, bytes):
+        return zlib.decompress(valor).decode('utf-8')
+    return valor
+
+def insert_records(conn: sqlite3.Connection, registros: Iterable[AuditRecord]) -> int:
+    """Grava os registros nas partições dos seus meses e soma no resumo (na transação de ``conn``)"""
+    por_particao: Dict[str, List[tuple]] = {}
+    for (tabela, registro_id, acao, anteriores, novos,
+         usuario_id, ip_address, user_agent, data_hora) in registros:
+        anteriores, novos = diff_payloads(acao, anteriores, novos)
+        por_particao.setdefault(partition_for(data_hora), []).append((
+            tabela, registro_id, acao, encode_payload(anteriores), encode_payload(novos),
+            usuario_id, ip_address, user_agent, data_hora or audit_timestamp()
+        ))
+
+    total = 0
+    for particao, params in por_particao.items():
+        ensure_partition(conn, particao)
+        conn.executemany(INSERT_QUERY.format(particao=particao), params)
+        add_to_rollup(conn, ((p[8], p[0], p[2], p[5]) for p in params))
+        total += len(params)
+    return total
+
+def drop_partitions_before(conn: sqlite3.Connection, limite: str) -> int:
+    """Remove os registros anteriores a ``limite``: partições inteiras com DROP TABLE
+    e, na partição do mês de ``limite``, só as linhas mais antigas.
+
+    Retorna o número de registros removidos.
+    """
+    particao_limite = partition_for(limite)
+    removidos = 0
+    removidas = False
+    for particao in list_partitions(conn):
+        if particao < particao_limite:
+            removidos += conn.execute(f"SELECT COUNT(*) FROM {particao}").fetchone()[0]
+            conn.execute(f"DROP TABLE {particao}")
+            conn.execute("DELETE FROM sqlite_sequence WHERE name = ?", (particao,))
+            removidas = True
+        elif particao == particao_limite:
+            removidos += conn.execute(f"DELETE FROM {particao} WHERE data_hora < ?", (limite,)).rowcount
+    if removidas:
+        _recreate_view(conn)
+    trim_rollup(conn, limite)
+    return removidos
+
+def query_partitions(conn: sqlite3.Connection, where: str, params: Sequence[Any],
+                     inicio: Optional[str] = None, fim: Optional[str] = None,
+                     limit: Optional[int] = None) -> List[sqlite3.Row]:
+    """Registros (mais recentes primeiro) lidos só das partições do intervalo.
+
+    ``where`` usa o alias ``la`` para a partição; a busca para assim que
+    ``limit`` registros são encontrados.
+    """
+    if inicio:
+        where += " AND la.data_hora >= ?"
+        params = [*params, inicio]
+    if fim:
+        where += " AND la.data_hora <= ?"
+        params = [*params, fim]
+
+    resultado: List[sqlite3.Row] = []
+    for particao in partitions_between(conn, inicio, fim):
+        query = f"""
+            SELECT la.*, u.nome as usuario_nome
+            FROM {particao} la
+            LEFT JOIN usuarios u ON la.usuario_id = u.id
+            WHERE {where}
+            ORDER BY la.data_hora DESC, la.id DESC
+        """
+        restante = None
+        if limit:
+            restante = limit - len(resultado)
+            query += f" LIMIT {restante}"
+        resultado.extend(conn.execute(query, params).fetchall())
+        if restante is not None and len(resultado) >= limit:
+            break
+    return resultado
+
+def create_audit_partitions(conn: sqlite3.Connection):
+    """Migração: move logs_auditoria (tabela única) para as partições mensais.
+
+    Os dados antigos são gravados no formato novo (só os campos alterados,
+    compactados); os IDs são preservados. A tabela vira uma visão.
+    """
+    tipo = conn.execute("SELECT type FROM sqlite_master WHERE name = 'logs_auditoria'").fetchone()
+    if tipo and tipo[0] == 'table':
+        conn.execute("ALTER TABLE logs_auditoria RENAME TO logs_auditoria_v1")
+        # Partições criadas antes da cópia (sem DDL com a leitura em andamento)
+        meses = conn.execute("SELECT DISTINCT substr(data_hora, 1, 7) FROM logs_auditoria_v1").fetchall()
+        for particao in sorted({partition_for(row[0]) for row in meses}):
+            ensure_partition(conn, particao)
+
+        cursor = conn.execute(f"SELECT {COLUNAS} FROM logs_auditoria_v1 ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(1000)
+            if not rows:
+                break
+            por_particao: Dict[str, List[tuple]] = {}
+            for (id_, tabela, registro_id, acao, anteriores, novos,
+                 usuario_id, ip_address, user_agent, data_hora) in rows:
+                data_hora = data_hora or audit_timestamp()
+                anteriores, novos = diff_payloads(acao, _load(anteriores), _load(novos))
+                por_particao.setdefault(partition_for(data_hora), []).append((
+                    id_, tabela, registro_id, acao, encode_payload(anteriores), encode_payload(novos),
+                    usuario_id, ip_address, user_agent, data_hora
+                ))
+            for particao, params in por_particao.items():
+                conn.executemany(f"INSERT INTO {particao} ({COLUNAS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                 params)
+        conn.execute("DROP TABLE logs_auditoria_v1")
+    _recreate_view(conn)
+
+def _load(texto: Optional[str]) -> Optional[Dict[str, Any]]:
+    """JSON antigo (texto) como dicionário; valores que não são objetos ficam como estão"""
+    if not texto:
+        return None
+    try:
+        dados = json.loads(texto)
+    except (TypeError, ValueError):
+        return {'valor': texto}
+    return dados if isinstance(dados, dict) else {'valor': dados}
@@ -0,0 +1,125 @@
+"""
+Resumo da auditoria (logs_auditoria_resumo): contagens por dia, tabela, ação e usuário
+"""
+
+import sqlite3
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Registros sem usuário entram com usuario_id 0 (a chave primária não aceita NULL)
+SEM_USUARIO = 0
+
+UPSERT_QUERY = """
+    INSERT INTO logs_auditoria_resumo (dia, tabela, acao, usuario_id, total)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (dia, tabela, acao, usuario_id) DO UPDATE SET
+        total = total + excluded.total
+"""
+
+# Contagem calculada direto dos registros (visão com todas as partições)
+AGREGADO_QUERY = """
+    SELECT substr(data_hora, 1, 10), tabela, acao, COALESCE(usuario_id, 0), COUNT(*)
+    FROM logs_auditoria
+    GROUP BY substr(data_hora, 1, 10), tabela, acao, COALESCE(usuario_id, 0)
+"""
+
+def create_audit_rollup(conn: sqlite3.Connection):
+    """Cria a tabela do resumo e a preenche com os registros existentes"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS logs_auditoria_resumo (
+            dia TEXT NOT NULL,
+            tabela TEXT NOT NULL,
+            acao TEXT NOT NULL,
+            usuario_id INTEGER NOT NULL DEFAULT 0,
+            total INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (dia, tabela, acao, usuario_id)
+        ) WITHOUT ROWID
+    """)
+    rebuild_audit_rollup(conn)
+
+def add_to_rollup(conn: sqlite3.Connection,
+                  registros: Iterable[Tuple[str, str, str, Optional[int]]]):
+    """Soma (data_hora, tabela, acao, usuario_id) ao resumo, na transação de ``conn``"""
+    contagens: Dict[Tuple[str, str, str, int], int] = {}
+    for data_hora, tabela, acao, usuario_id in registros:
+        chave = (data_hora[:10], tabela, acao, usuario_id or SEM_USUARIO)
+        contagens[chave] = contagens.get(chave, 0) + 1
+    conn.executemany(UPSERT_QUERY, [(*chave, total) for chave, total in contagens.items()])
+
+def trim_rollup(conn: sqlite3.Connection, limite: str):
+    """Remove do resumo os dias anteriores a ``limite`` (retenção da auditoria)"""
+    conn.execute("DELETE FROM logs_auditoria_resumo WHERE dia < ?", (limite[:10],))
+
+def rebuild_audit_rollup(conn: sqlite3.Connection) -> int:
+    """Recalcula o resumo a partir dos registros; retorna o número de linhas.
+
+    Roda na transação corrente (ou em uma própria, se não houver).
+    """
+    propria = not conn.in_transaction
+    if propria:
+        conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute("DELETE FROM logs_auditoria_resumo")
+        conn.execute(f"""
+            INSERT INTO logs_auditoria_resumo (dia, tabela, acao, usuario_id, total)
+            {AGREGADO_QUERY}
+        """)
+        linhas = conn.execute("SELECT COUNT(*) FROM logs_auditoria_resumo").fetchone()[0]
+    except Exception:
+        if propria:
+            conn.rollback()
+        raise
+    if propria:
+        conn.commit()
+    return linhas
+
+def verify_audit_rollup(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+    """Compara o resumo com a contagem dos registros; retorna as divergências"""
+    def carregar(sql: str) -> Dict[Tuple[str, str, str, int], int]:
+        return {(row[0], row[1], row[2], row[3]): row[4] for row in conn.execute(sql)}
+
+    esperado = carregar(AGREGADO_QUERY)
+    atual = carregar("SELECT dia, tabela, acao, usuario_id, total FROM logs_auditoria_resumo")
+    return [
+        {'dia': chave[0], 'tabela': chave[1], 'acao': chave[2], 'usuario_id': chave[3],
+         'esperado': esperado.get(chave, 0), 'atual': atual.get(chave, 0)}
+        for chave in sorted(esperado.keys() | atual.keys())
+        if esperado.get(chave, 0) != atual.get(chave, 0)
+    ]
+
+def main(argv: List[str]) -> int:
+    """Linha de comando: verificar ou reconstruir o resumo da auditoria de um banco"""
+    if not argv or argv[0] not in ('verificar', 'reconstruir'):
+        print("Uso: python -m src.database.audit_rollup verificar|reconstruir [caminho.db]")
+        return 2
+    comando = argv[0]
+    db_path = argv[1] if len(argv) > 1 else "brindez.db"
+
+    conn = sqlite3.connect(db_path)
+    try:
+        existe = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'logs_auditoria_resumo'"
+        ).fetchone()
+        if not existe:
+            print(f"{db_path}: tabela logs_auditoria_resumo não existe (abra o sistema para migrar o banco)")
+            return 1
+
+        if comando == 'reconstruir':
+            linhas = rebuild_audit_rollup(conn)
+            print(f"Resumo da auditoria reconstruído: {linhas} linhas")
+            return 0
+
+        divergencias = verify_audit_rollup(conn)
+        for d in divergencias:
+            print(f"  {d['dia']} {d['tabela']} {d['acao']} usuário {d['usuario_id']}: "
+                  f"esperado {d['esperado']}, atual {d['atual']}")
+        if divergencias:
+            print(f"{len(divergencias)} divergência(s) — use 'reconstruir' para corrigir")
+            return 1
+        print("Resumo da auditoria consistente")
+        return 0
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,142 @@
+"""
+Registro de alterações (change_log) alimentado por triggers e leitor que publica no barramento
+"""
+
+import sqlite3
+import threading
+from typing import Dict, Optional
+from ..utils.change_bus import ChangeBus, ChangeEvent, ALL_TABLES
+
+# Tabela -> expressão da filial afetada (NEW/OLD substituído no trigger)
+LOGGED_TABLES: Dict[str, Optional[str]] = {
+    'brindes': 'filial_id',
+    'categorias': None,
+    'unidades_medida': None,
+    'filiais': 'id',
+    'usuarios': 'filial_id',
+    'fornecedores': None,
+    'configuracoes': None
+}
+
+# Movimentações só recebem INSERT
+MOVIMENTACOES_FILIAL = 'filial_origem_id'
+
+def create_change_log(conn: sqlite3.Connection):
+    """Cria a tabela change_log e os triggers que a alimentam"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS change_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tabela TEXT NOT NULL,
+            registro_id INTEGER,
+            filial_id INTEGER,
+            data_hora TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    for tabela in LOGGED_TABLES:
+        create_table_triggers(conn, tabela)
+
+    # Mudança de filial: a filial anterior também é afetada
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_change_log_brindes_filial
+        AFTER UPDATE OF filial_id ON brindes
+        WHEN OLD.filial_id IS NOT NEW.filial_id
+        BEGIN
+            INSERT INTO change_log (tabela, registro_id, filial_id)
+            VALUES ('brindes', OLD.id, OLD.filial_id);
+        END
+    """)
+
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_change_log_movimentacoes_insert
+        AFTER INSERT ON movimentacoes
+        BEGIN
+            INSERT INTO change_log (tabela, registro_id, filial_id)
+            VALUES ('movimentacoes', NEW.id, NEW.{MOVIMENTACOES_FILIAL});
+        END
+    """)
+
+def create_table_triggers(conn: sqlite3.Connection, tabela: str):
+    """Cria os triggers de INSERT/UPDATE/DELETE de uma tabela de LOGGED_TABLES"""
+    coluna = LOGGED_TABLES[tabela]
+    for evento, ref in (('INSERT', 'NEW'), ('UPDATE', 'NEW'), ('DELETE', 'OLD')):
+        filial = f"{ref}.{coluna}" if coluna else "NULL"
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_change_log_{tabela}_{evento.lower()}
+            AFTER {evento} ON {tabela}
+            BEGIN
+                INSERT INTO change_log (tabela, registro_id, filial_id)
+                VALUES ('{tabela}', {ref}.id, {filial});
+            END
+        """)
+
+def create_configuracoes_triggers(conn: sqlite3.Connection):
+    """Registra no change_log as alterações de configurações (ex.: estoque mínimo do dashboard)"""
+    create_table_triggers(conn, 'configuracoes')
+
+class ChangeLogReader:
+    """Lê as alterações novas do change_log e as publica no barramento.
+
+    Como o log é gravado por triggers, escritas de outros computadores no
+    mesmo banco também são vistas. Cada chamada de ``poll`` publica no
+    máximo um evento por tabela (IDs e filiais agrupados).
+    """
+
+    BATCH_SIZE = 5000
+
+    def __init__(self, db, bus: ChangeBus, retention_minutes: int = 60, prune_every: int = 500):
+        """Inicializa o leitor a partir do fim atual do log"""
+        self.db = db
+        self.bus = bus
+        self.retention_minutes = retention_minutes
+        self.prune_every = prune_every
+        self._lock = threading.Lock()
+        self._polls = 0
+        self.last_id = self._max_id()
+
+    def _max_id(self) -> int:
+        rows = self.db.execute_query("SELECT COALESCE(MAX(id), 0) FROM change_log")
+        return rows[0][0]
+
+    def poll(self) -> int:
+        """Publica as alterações ainda não vistas; retorna o número de eventos"""
+        with self._lock:
+            # Log podado além do último ID lido: não dá para saber o que mudou
+            menor = self.db.execute_query("SELECT MIN(id) FROM change_log")[0][0]
+            if menor is not None and menor > self.last_id + 1 and self.last_id > 0:
+                self.last_id = self._max_id()
+                eventos = {ALL_TABLES: ChangeEvent(ALL_TABLES)}
+            else:
+                eventos = self._read_new()
+
+            self._polls += 1
+            if self._polls % self.prune_every == 0:
+                self.prune()
+
+        for event in eventos.values():
+            self.bus.publish_event(event)
+        return len(eventos)
+
+    def _read_new(self) -> Dict[str, ChangeEvent]:
+        """Agrupa por tabela as linhas novas do log (chamado com o lock)"""
+        agrupado: Dict[str, tuple] = {}
+        while True:
+            rows = self.db.execute_query(
+                "SELECT id, tabela, registro_id, filial_id FROM change_log WHERE id > ? ORDER BY id LIMIT ?",
+                (self.last_id, self.BATCH_SIZE)
+            )
+            for row_id, tabela, registro_id, filial_id in rows:
+                ids, filiais = agrupado.setdefault(tabela, (set(), set()))
+                ids.add(registro_id)
+                filiais.add(filial_id)
+                self.last_id = row_id
+            if len(rows) < self.BATCH_SIZE:
+                break
+        return {tabela: ChangeEvent(tabela, ids, filiais) for tabela, (ids, filiais) in agrupado.items()}
+
+    def prune(self) -> int:
+        """Remove entradas mais antigas que a retenção"""
+        return self.db.execute_update(
+            "DELETE FROM change_log WHERE data_hora < datetime('now', ?)",
+            (f"-{int(self.retention_minutes)} minutes",)
+        )
@@ -0,0 +1,200 @@
+"""
+Pool de conexões SQLite reutilizáveis por thread
+"""
+
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# PRAGMAs aplicados em toda conexão aberta pelo pool
+DEFAULT_PRAGMAS: List[Tuple[str, str]] = [
+    ('foreign_keys', 'ON'),
+    ('busy_timeout', '5000'),
+]
+
+class ConnectionPool:
+    """Mantém uma conexão de longa duração por thread.
+
+    O sqlite3 não permite compartilhar uma conexão entre threads com
+    segurança, então cada thread recebe a sua própria conexão, criada na
+    primeira utilização e reaproveitada nas seguintes. As conexões são
+    verificadas periodicamente (``SELECT 1``) e recriadas se estiverem
+    inválidas.
+    """
+
+    def __init__(self, db_path: str,
+                 pragmas: Optional[List[Tuple[str, str]]] = None,
+                 max_connections: int = 16,
+                 health_check_interval: float = 30.0,
+                 timeout: float = 10.0):
+        """Inicializa o pool"""
+        self.db_path = db_path
+        self.pragmas = list(pragmas) if pragmas is not None else list(DEFAULT_PRAGMAS)
+        self.max_connections = max_connections
+        self.health_check_interval = health_check_interval
+        self.timeout = timeout
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._connections: Dict[int, Tuple[threading.Thread, sqlite3.Connection]] = {}
+        self._on_connect: List[Callable[[sqlite3.Connection], None]] = []
+        self._closed = False
+        self._generation = 0
+
+        self.stats = {
+            'connections_created': 0,
+            'connections_reused': 0,
+            'health_check_failures': 0
+        }
+
+    def set_pragmas(self, pragmas: List[Tuple[str, str]]):
+        """Troca os PRAGMAs; cada thread reabre sua conexão no próximo uso"""
+        with self._lock:
+            self.pragmas = list(pragmas)
+            self._generation += 1
+
+    def add_connect_hook(self, hook: Callable[[sqlite3.Connection], None]):
+        """Registra função executada em cada nova conexão (após os PRAGMAs)"""
+        self._on_connect.append(hook)
+
+    def _create_connection(self, pragmas: List[Tuple[str, str]]) -> sqlite3.Connection:
+        """Abre e configura uma nova conexão"""
+        # check_same_thread=False apenas para permitir o fechamento no
+        # shutdown; o uso continua restrito à thread dona da conexão
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for nome, valor in pragmas:
+            conn.execute(f"PRAGMA {nome} = {valor}")
+        for hook in self._on_connect:
+            hook(conn)
+        return conn
+
+    def _is_healthy(self, conn: sqlite3.Connection) -> bool:
+        """Verifica se a conexão ainda responde"""
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def get_connection(self) -> sqlite3.Connection:
+        """Retorna a conexão da thread atual, criando-a se necessário"""
+        if self._closed:
+            raise sqlite3.ProgrammingError("Pool de conexões encerrado")
+
+        conn = getattr(self._local, 'conn', None)
+        if (conn is not None and self._local.generation != self._generation
+                and not conn.in_transaction):
+            # PRAGMAs alterados: recriar a conexão com a nova configuração
+            self.release()
+            conn = None
+
+        if conn is not None:
+            agora = time.monotonic()
+            if agora - self._local.last_check < self.health_check_interval:
+                with self._lock:
+                    self.stats['connections_reused'] += 1
+                return conn
+
+            self._local.last_check = agora
+            if self._is_healthy(conn):
+                with self._lock:
+                    self.stats['connections_reused'] += 1
+                return conn
+
+            with self._lock:
+                self.stats['health_check_failures'] += 1
+            self.release()
+
+        if not self._slots.acquire(blocking=False):
+            # Conexões de threads já finalizadas liberam suas vagas
+            self._reap_dead_threads()
+            if not self._slots.acquire(timeout=self.timeout):
+                raise sqlite3.OperationalError(
+                    f"Limite de {self.max_connections} conexões simultâneas atingido"
+                )
+
+        with self._lock:
+            pragmas, generation = self.pragmas, self._generation
+
+        try:
+            conn = self._create_connection(pragmas)
+        except Exception:
+            self._slots.release()
+            raise
+
+        self._local.conn = conn
+        self._local.last_check = time.monotonic()
+        self._local.generation = generation
+        with self._lock:
+            self._connections[threading.get_ident()] = (threading.current_thread(), conn)
+            self.stats['connections_created'] += 1
+        return conn
+
+    def release(self):
+        """Fecha a conexão da thread atual (ex.: ao finalizar uma thread de trabalho)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+
+        self._local.conn = None
+        with self._lock:
+            registrada = self._connections.pop(threading.get_ident(), None)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        # Se já foi removida por close_all, a vaga já foi devolvida
+        if registrada is not None:
+            self._slots.release()
+
+    def _reap_dead_threads(self):
+        """Fecha conexões pertencentes a threads que já terminaram"""
+        with self._lock:
+            mortas = [ident for ident, (thread, _) in self._connections.items()
+                      if not thread.is_alive()]
+            conexoes = [self._connections.pop(ident)[1] for ident in mortas]
+
+        for conn in conexoes:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+            self._slots.release()
+
+    def close_all(self):
+        """Fecha todas as conexões do pool (usado no encerramento da aplicação)"""
+        with self._lock:
+            self._closed = True
+            connections = [conn for _, conn in self._connections.values()]
+            self._connections.clear()
+
+        for conn in connections:
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+                conn.close()
+            except sqlite3.Error:
+                pass
+            self._slots.release()
+
+    def reopen(self):
+        """Reativa o pool após um close_all (ex.: troca do arquivo de banco)"""
+        with self._lock:
+            self._closed = False
+        self._local = threading.local()
+
+    @property
+    def is_closed(self) -> bool:
+        """Indica se o pool foi encerrado"""
+        return self._closed
+
+    def get_stats(self) -> Dict[str, int]:
+        """Retorna estatísticas de uso do pool"""
+        with self._lock:
+            return {
+                **self.stats,
+                'open_connections': len(self._connections)
+            }
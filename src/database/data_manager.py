@@ -2,13 +2,19 @@
 Gerenciador de dados que integra SQLite com o sistema existente
 """
 
-from typing import Dict, List, Any, Optional
-from datetime import datetime
+import sqlite3
+from typing import Dict, Iterator, List, Any, Optional
+from datetime import date, datetime
 from .models import (
     filial_model, categoria_model, unidade_medida_model, 
     usuario_model, brinde_model, movimentacao_model, fornecedor_model
 )
 from .schema import db_schema
+from .storage_profile import StorageProfile, CONFIG_PREFIX as STORAGE_CONFIG_PREFIX
+from .movement_engine import movement_engine
+from .dimension_cache import DimensionCache, DIMENSIONS
+from .change_log import ChangeLogReader
+from ..utils.change_bus import change_bus, ChangeEvent, ALL_TABLES
 from ..utils.audit_logger import audit_logger
 
 class DatabaseDataManager:
@@ -25,11 +31,36 @@ class DatabaseDataManager:
             'filiais': None,
             'configuracoes': None
         }
+        
+        # Resolução nome -> ID das tabelas de dimensão sem consultar o banco
+        self.dimensions = DimensionCache(self.db)
+        
+        # Alterações gravadas pelos triggers (inclusive de outros computadores)
+        # são publicadas no barramento; aqui só descartamos o que mudou
+        self.change_feed = ChangeLogReader(self.db, change_bus)
+        change_bus.subscribe(self._on_change)
     
-    def clear_cache(self):
-        """Limpa o cache"""
+    def _on_change(self, event: ChangeEvent):
+        """Descarta os caches da tabela alterada"""
+        if event.tabela == ALL_TABLES:
+            self.clear_cache()
+            self.dimensions.invalidate()
+            return
+        if event.tabela in self._cache:
+            self._cache[event.tabela] = None
+        if event.tabela in DIMENSIONS:
+            self.dimensions.invalidate(event.tabela)
+    
+    def publish_changes(self) -> int:
+        """Publica as alterações pendentes do change_log; retorna o número de eventos"""
+        return self.change_feed.poll()
+    
+    def clear_cache(self, dimensao: Optional[str] = None):
+        """Limpa o cache (e a tabela de dimensão alterada, se informada)"""
         for key in self._cache:
             self._cache[key] = None
+        if dimensao:
+            self.dimensions.invalidate(dimensao)
     
     # Métodos de configuração
     def get_configuracao(self, chave: str, valor_padrao: Any = None) -> Any:
@@ -53,6 +84,10 @@ class DatabaseDataManager:
     
     def set_configuracao(self, chave: str, valor: Any) -> bool:
         """Define valor de configuração"""
+        if chave.startswith(STORAGE_CONFIG_PREFIX):
+            # Valores do perfil viram PRAGMAs: validar antes de gravar
+            valor = StorageProfile.normalize_value(chave[len(STORAGE_CONFIG_PREFIX):], valor)
+        
         query = """
             INSERT OR REPLACE INTO configuracoes (chave, valor, data_atualizacao)
             VALUES (?, ?, CURRENT_TIMESTAMP)
@@ -60,6 +95,9 @@ class DatabaseDataManager:
         affected = self.db.execute_update(query, (chave, str(valor)))
         if affected > 0:
             self._cache['configuracoes'] = None  # Limpar cache
+            if chave.startswith(STORAGE_CONFIG_PREFIX):
+                # Perfil de armazenamento: reaplicar PRAGMAs nas conexões
+                self.db.reload_storage_profile()
         return affected > 0
     
     # Métodos para Filiais
@@ -75,8 +113,7 @@ class DatabaseDataManager:
     
     def get_filial_by_nome(self, nome: str) -> Optional[Dict[str, Any]]:
         """Retorna filial por nome"""
-        filiais = filial_model.get_all(ativo_apenas=False)
-        return next((f for f in filiais if f['nome'] == nome), None)
+        return self.dimensions.get_by_name('filiais', nome)
     
     # Métodos para Categorias
     def get_categorias(self) -> List[str]:
@@ -92,8 +129,7 @@ class DatabaseDataManager:
     
     def get_categoria_by_nome(self, nome: str) -> Optional[Dict[str, Any]]:
         """Retorna categoria por nome"""
-        categorias = categoria_model.get_all(ativo_apenas=False)
-        return next((c for c in categorias if c['nome'] == nome), None)
+        return self.dimensions.get_by_name('categorias', nome)
     
     # Métodos para Unidades de Medida
     def get_unidades_medida(self) -> List[str]:
@@ -107,6 +143,10 @@ class DatabaseDataManager:
         """Retorna dados completos das unidades"""
         return unidade_medida_model.get_all(ativo_apenas=True)
     
+    def get_unidade_by_codigo(self, codigo: str) -> Optional[Dict[str, Any]]:
+        """Retorna unidade de medida ativa por código"""
+        return self.dimensions.get_by_name('unidades_medida', codigo, ativo_apenas=True)
+    
     def get_unidades_medida_completas(self) -> List[Dict[str, Any]]:
         """Retorna dados completos das unidades de medida (alias)"""
         return self.get_unidades_completas()
@@ -114,7 +154,7 @@ class DatabaseDataManager:
     # Métodos para Usuários
     def get_usuario_by_username(self, username: str) -> Optional[Dict[str, Any]]:
         """Retorna usuário por username"""
-        return usuario_model.get_by_username(username)
+        return self.dimensions.get_by_name('usuarios', username, ativo_apenas=True)
     
     def get_usuarios_completos(self) -> List[Dict[str, Any]]:
         """Retorna dados completos dos usuários"""
@@ -133,27 +173,35 @@ class DatabaseDataManager:
             brindes_db = brinde_model.get_all(filial_id=filial_id, ativo_apenas=True)
             
             # Converter para formato compatível com mock_data
-            brindes = []
-            for brinde in brindes_db:
-                brindes.append({
-                    'id': brinde['id'],
-                    'codigo': brinde['codigo'],
-                    'descricao': brinde['descricao'],
-                    'categoria': brinde['categoria_nome'],
-                    'quantidade': brinde['quantidade'],
-                    'valor_unitario': float(brinde['valor_unitario']),
-                    'unidade_medida': brinde['unidade_codigo'],
-                    'filial': brinde['filial_nome'],
-                    'observacoes': brinde.get('observacoes', ''),
-                    'data_cadastro': brinde['data_criacao'],
-                    'data_atualizacao': brinde.get('data_atualizacao')
-                })
+            brindes = [self._format_brinde(brinde) for brinde in brindes_db]
             
             return brindes or []  # Garante que sempre retorne uma lista, mesmo que vazia
             
         except Exception as e:
             print(f"Erro ao buscar brindes: {e}")
             return []  # Retorna lista vazia em caso de erro
+    
+    def iter_brindes(self, filial_filter: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Brindes ativos (formato de get_brindes) lidos do cursor em lotes"""
+        filial_id = self._filial_id_filtro(filial_filter)
+        return map(self._format_brinde, brinde_model.iter_all(filial_id=filial_id))
+    
+    @staticmethod
+    def _format_brinde(brinde: Dict[str, Any]) -> Dict[str, Any]:
+        """Converte a linha do banco para o formato do mock"""
+        return {
+            'id': brinde['id'],
+            'codigo': brinde['codigo'],
+            'descricao': brinde['descricao'],
+            'categoria': brinde['categoria_nome'],
+            'quantidade': brinde['quantidade'],
+            'valor_unitario': float(brinde['valor_unitario']),
+            'unidade_medida': brinde['unidade_codigo'],
+            'filial': brinde['filial_nome'],
+            'observacoes': brinde.get('observacoes', ''),
+            'data_cadastro': brinde['data_criacao'],
+            'data_atualizacao': brinde.get('data_atualizacao')
+        }
             
     def get_brinde_by_id(self, brinde_id: int) -> Optional[Dict[str, Any]]:
         """Retorna um brinde pelo ID"""
@@ -187,8 +235,7 @@ class DatabaseDataManager:
         if not categoria:
             raise ValueError(f"Categoria '{brinde_data['categoria']}' não encontrada")
         
-        unidade = next((u for u in self.get_unidades_completas() 
-                       if u['codigo'] == brinde_data['unidade_medida']), None)
+        unidade = self.get_unidade_by_codigo(brinde_data['unidade_medida'])
         if not unidade:
             raise ValueError(f"Unidade de medida '{brinde_data['unidade_medida']}' não encontrada")
         
@@ -209,10 +256,13 @@ class DatabaseDataManager:
         }
         
         # Inserir no banco
-        brinde_id = brinde_model.create(data_insert)
+        try:
+            brinde_id = brinde_model.create(data_insert)
+        except sqlite3.IntegrityError:
+            raise ValueError(self._descricao_duplicada_msg(brinde_data))
         
-        # Limpar cache
-        self.clear_cache()
+        # Invalidar caches afetados
+        self.publish_changes()
         
         # Retornar brinde criado
         brinde_criado = self.get_brinde_by_id(brinde_id)
@@ -226,8 +276,7 @@ class DatabaseDataManager:
         """Atualiza um brinde"""
         # Converter nomes para IDs
         categoria = self.get_categoria_by_nome(brinde_data['categoria'])
-        unidade = next((u for u in self.get_unidades_completas() 
-                       if u['codigo'] == brinde_data['unidade_medida']), None)
+        unidade = self.get_unidade_by_codigo(brinde_data['unidade_medida'])
         filial = self.get_filial_by_nome(brinde_data['filial'])
         
         if not all([categoria, unidade, filial]):
@@ -248,10 +297,13 @@ class DatabaseDataManager:
         brinde_anterior = self.get_brinde_by_id(brinde_id)
         
         # Atualizar no banco
-        success = brinde_model.update(brinde_id, data_update)
+        try:
+            success = brinde_model.update(brinde_id, data_update)
+        except sqlite3.IntegrityError:
+            raise ValueError(self._descricao_duplicada_msg(brinde_data))
         
         if success:
-            self.clear_cache()
+            self.publish_changes()
             brinde_atualizado = self.get_brinde_by_id(brinde_id)
             
             # Auditoria
@@ -261,6 +313,12 @@ class DatabaseDataManager:
         
         return None
 
+    @staticmethod
+    def _descricao_duplicada_msg(brinde_data: Dict[str, Any]) -> str:
+        """Mensagem para violação do índice único (filial, descrição)"""
+        return (f"Já existe um brinde com a descrição '{brinde_data['descricao']}' "
+                f"na filial '{brinde_data['filial']}'")
+    
     def delete_brinde(self, brinde_id: int) -> bool:
         """Exclui (inativa) um brinde"""
         # Buscar dados do brinde antes de excluir para auditoria
@@ -270,7 +328,7 @@ class DatabaseDataManager:
         
         sucesso = brinde_model.delete(brinde_id)
         if sucesso:
-            self.clear_cache()
+            self.publish_changes()
             # Auditoria
             try:
                 audit_logger.audit_brinde_deleted(brinde_id, brinde_data)
@@ -281,50 +339,72 @@ class DatabaseDataManager:
     
     def update_estoque_brinde(self, brinde_id: int, quantidade: int, tipo: str) -> bool:
         """Atualiza estoque de um brinde"""
-        brinde = brinde_model.get_by_id(brinde_id)
-        if not brinde:
-            return False
-        
-        estoque_atual = brinde['quantidade']
-        
         if tipo == 'entrada':
-            novo_estoque = estoque_atual + quantidade
+            delta = quantidade
         elif tipo == 'saida':
-            novo_estoque = estoque_atual - quantidade
-            if novo_estoque < 0:
-                raise ValueError("Estoque insuficiente")
+            delta = -quantidade
         else:
             return False
         
-        return brinde_model.update_quantidade(brinde_id, novo_estoque)
+        # UPDATE condicional: sem leitura prévia do saldo
+        if brinde_model.adjust_quantidade(brinde_id, delta):
+            self.publish_changes()
+            return True
+        if delta < 0 and brinde_model.exists(brinde_id):
+            raise ValueError("Estoque insuficiente")
+        return False
+    
+    def transfer_brinde(self, origem_id: int, filial_destino: str, quantidade: int,
+                        username: str, justificativa: Optional[str] = None) -> Dict[str, Any]:
+        """Transfere estoque de um brinde para outra filial em uma única transação"""
+        filial = self.get_filial_by_nome(filial_destino)
+        if not filial:
+            raise ValueError(f"Filial '{filial_destino}' não encontrada")
+        
+        resultado = movement_engine.transfer(
+            origem_id, filial['id'], int(quantidade),
+            self._get_usuario_id(username) or 1,  # Fallback para admin
+            justificativa
+        )
+        
+        # Invalidar caches afetados
+        self.publish_changes()
+        
+        resultado['brinde_destino'] = self.get_brinde_by_id(resultado['brinde_destino_id'])
+        return resultado
     
     def find_or_create_brinde_for_transfer(self, brinde_origem: Dict[str, Any], filial_destino_nome: str, username: str) -> Dict[str, Any]:
         """
         Encontra um brinde com a mesma descrição na filial de destino.
         Se não encontrar, cria um novo com estoque zero.
         """
-        # Verificar se já existe um brinde com a mesma descrição na filial de destino
-        brindes_destino = self.get_brindes(filial_filter=filial_destino_nome)
-        brinde_destino_existente = next((b for b in brindes_destino if b['descricao'] == brinde_origem['descricao']), None)
-
-        if brinde_destino_existente:
-            return brinde_destino_existente
-
-        # Se não existir, criar um novo brinde na filial de destino com estoque zero
-        else:
-            novo_brinde_data = {
-                'descricao': brinde_origem['descricao'],
-                'categoria': brinde_origem['categoria'],
-                'quantidade': 0, # Começa com zero, a movimentação irá adicionar o estoque
-                'valor_unitario': brinde_origem['valor_unitario'],
-                'unidade_medida': brinde_origem['unidade_medida'],
-                'filial': filial_destino_nome,
-                'usuario_cadastro': username
-            }
-            return self.create_brinde(novo_brinde_data)
-
-    def search_brindes(self, query: str, categoria: str = None, filial: str = None) -> List[Dict[str, Any]]:
-        """Busca brindes por critérios"""
+        categoria = self.get_categoria_by_nome(brinde_origem['categoria'])
+        unidade = self.get_unidade_by_codigo(brinde_origem['unidade_medida'])
+        filial = self.get_filial_by_nome(filial_destino_nome)
+        if not all([categoria, unidade, filial]):
+            raise ValueError("Categoria, unidade de medida ou filial de destino não encontrada")
+        
+        usuario_id = self._get_usuario_id(username)
+        # Upsert pelo índice (filial_id, descricao_norm) com quantidade zero
+        brinde_id, criado = brinde_model.upsert_for_filial({
+            'descricao': brinde_origem['descricao'],
+            'categoria_id': categoria['id'],
+            'quantidade': 0,  # Começa com zero, a movimentação irá adicionar o estoque
+            'valor_unitario': float(str(brinde_origem['valor_unitario']).replace(',', '.')),
+            'unidade_medida_id': unidade['id'],
+            'filial_id': filial['id'],
+            'usuario_criacao_id': usuario_id
+        })
+        
+        brinde = self.get_brinde_by_id(brinde_id)
+        if criado:
+            self.publish_changes()
+            audit_logger.audit_brinde_created(brinde, usuario_id)
+        return brinde
+    
+    def search_brindes(self, query: str, categoria: str = None, filial: str = None,
+                       limit: int = 50) -> List[Dict[str, Any]]:
+        """Busca brindes por critérios (os ``limit`` mais relevantes, via FTS5)"""
         categoria_id = None
         if categoria and categoria != "Todas":
             cat = self.get_categoria_by_nome(categoria)
@@ -337,7 +417,7 @@ class DatabaseDataManager:
             if fil:
                 filial_id = fil['id']
         
-        brindes_db = brinde_model.search(query, categoria_id, filial_id)
+        brindes_db = brinde_model.search(query, categoria_id, filial_id, limit)
         
         # Converter para formato compatível
         brindes = []
@@ -356,34 +436,29 @@ class DatabaseDataManager:
         return brindes
     
     # Métodos para Movimentações
-    def create_movimentacao(self, movimentacao_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Cria uma nova movimentação"""
-        # Obter IDs necessários
+    def _prepare_movimentacao(self, movimentacao_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Converte os dados da movimentação (nomes) para as colunas da tabela (IDs)"""
+        def filial_id(nome: str) -> Optional[int]:
+            return self.dimensions.get_id('filiais', nome)
+        
         usuario_id = self._get_usuario_id(movimentacao_data.get('usuario'))
         
         filial_origem_id = None
         filial_destino_id = None
         
         if movimentacao_data.get('filial'):
-            filial = self.get_filial_by_nome(movimentacao_data['filial'])
-            if filial:
-                filial_origem_id = filial['id']
+            filial_origem_id = filial_id(movimentacao_data['filial']) or filial_origem_id
         
         if movimentacao_data.get('filial_destino'):
-            filial = self.get_filial_by_nome(movimentacao_data['filial_destino'])
-            if filial:
-                filial_destino_id = filial['id']
+            filial_destino_id = filial_id(movimentacao_data['filial_destino']) or filial_destino_id
         
         if movimentacao_data.get('filial_origem'):
-            filial = self.get_filial_by_nome(movimentacao_data['filial_origem'])
-            if filial:
-                filial_origem_id = filial['id']
+            filial_origem_id = filial_id(movimentacao_data['filial_origem']) or filial_origem_id
         
-        # Preparar dados para inserção
-        data_insert = {
-            'brinde_id': movimentacao_data['brinde_id'],
-            'tipo': movimentacao_data['tipo'],
-            'quantidade': int(movimentacao_data['quantidade']),
+        return {
+            'brinde_id': movimentacao_data.get('brinde_id'),
+            'tipo': movimentacao_data.get('tipo'),
+            'quantidade': movimentacao_data.get('quantidade'),
             'valor_unitario_anterior': movimentacao_data.get('valor_unitario_anterior'),
             'valor_unitario_novo': movimentacao_data.get('valor_unitario_novo'),
             'justificativa': movimentacao_data.get('justificativa'),
@@ -393,31 +468,24 @@ class DatabaseDataManager:
             'filial_destino_id': filial_destino_id,
             'usuario_id': usuario_id or 1  # Fallback para admin
         }
-        
-        # Atualizar estoque do brinde
-        brinde_id = movimentacao_data['brinde_id']
-        quantidade = movimentacao_data['quantidade']
-        tipo = movimentacao_data['tipo']
-        
-        if 'entrada' in tipo:
-            self.update_estoque_brinde(brinde_id, quantidade, 'entrada')
-        elif 'saida' in tipo:
-            self.update_estoque_brinde(brinde_id, quantidade, 'saida')
-        
-        # Inserir movimentação
-        movimentacao_id = movimentacao_model.create(data_insert)
-        
-        # Retornar dados da movimentação
-        movimentacao_criada = {
-            'id': movimentacao_id,
-            'data_hora': datetime.now().isoformat(),
-            **movimentacao_data
-        }
-        
-        # Auditoria
-        audit_logger.audit_movimentacao_created(movimentacao_criada, data_insert.get('usuario_id'))
-        
-        return movimentacao_criada
+    
+    def create_movimentacao(self, movimentacao_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Cria uma nova movimentação"""
+        data_insert = self._prepare_movimentacao(movimentacao_data)
+        data_insert['quantidade'] = int(movimentacao_data['quantidade'])
+        
+        # Estoque, movimentação e auditoria em uma única transação
+        resultado = movement_engine.register(data_insert, movimentacao_data)
+        self.publish_changes()
+        return resultado
+    
+    def create_movimentacoes_bulk(self, movimentacoes: List[Dict[str, Any]],
+                                  atomic: bool = True) -> List[Dict[str, Any]]:
+        """Cria um lote de movimentações em uma única transação (resultado por linha)"""
+        data_inserts = [self._prepare_movimentacao(m) for m in movimentacoes]
+        resultados = movement_engine.register_bulk(data_inserts, atomic=atomic)
+        self.publish_changes()
+        return resultados
     
     def get_movimentacoes(self, brinde_id: int = None, tipo: str = None, limit: int = None) -> List[Dict[str, Any]]:
         """Obtém lista de movimentações"""
@@ -427,34 +495,98 @@ class DatabaseDataManager:
             movs = movimentacao_model.get_recent(limit, tipo)
         
         # Converter para formato compatível
-        movimentacoes = []
-        for mov in movs:
-            movimentacoes.append({
-                'id': mov['id'],
-                'brinde_id': mov['brinde_id'],
-                'brinde_codigo': mov.get('brinde_codigo', ''),
-                'brinde_descricao': mov['brinde_descricao'],
-                'tipo': mov['tipo'],
-                'quantidade': mov['quantidade'],
-                'usuario': mov['usuario_nome'],
-                'justificativa': mov.get('justificativa', ''),
-                'observacoes': mov.get('observacoes', ''),
-                'destino': mov.get('destino', ''),
-                'filial': mov.get('filial_origem_nome', ''),
-                'filial_origem': mov.get('filial_origem_nome', ''),
-                'filial_destino': mov.get('filial_destino_nome', ''),
-                'data_hora': mov['data_hora']
-            })
+        return [self._format_movimentacao(mov) for mov in movs]
+    
+    @staticmethod
+    def _format_movimentacao(mov: Dict[str, Any]) -> Dict[str, Any]:
+        """Converte a linha do banco para o formato do mock"""
+        return {
+            'id': mov['id'],
+            'brinde_id': mov['brinde_id'],
+            'brinde_codigo': mov.get('brinde_codigo', ''),
+            'brinde_descricao': mov['brinde_descricao'],
+            'tipo': mov['tipo'],
+            'quantidade': mov['quantidade'],
+            'usuario': mov['usuario_nome'],
+            'justificativa': mov.get('justificativa', ''),
+            'observacoes': mov.get('observacoes', ''),
+            'destino': mov.get('destino', ''),
+            'filial': mov.get('filial_origem_nome', ''),
+            'filial_origem': mov.get('filial_origem_nome', ''),
+            'filial_destino': mov.get('filial_destino_nome', ''),
+            'data_hora': mov['data_hora']
+        }
+    
+    @staticmethod
+    def _timestamp(valor: Any) -> Any:
+        """Data/hora no formato gravado pelo banco (CURRENT_TIMESTAMP)"""
+        if isinstance(valor, datetime):
+            return valor.strftime('%Y-%m-%d %H:%M:%S')
+        if isinstance(valor, date):
+            return valor.isoformat()
+        return valor
+    
+    def query_movimentacoes(self, filters: Optional[Dict[str, Any]] = None,
+                            after_cursor: Optional[tuple] = None,
+                            page_size: int = 50) -> Dict[str, Any]:
+        """Página de movimentações filtrada no banco (ver MovimentacaoModel.query).
+        
+        Filtros: filial (nome), tipo, data_inicio, data_fim, usuario
+        (username) e brinde_id.
+        """
+        model_filters = self._movimentacao_filters(filters or {})
+        if model_filters is None:
+            return {'items': [], 'total': 0, 'next_cursor': None}
+        
+        page = movimentacao_model.query(model_filters, after_cursor, page_size)
+        page['items'] = [self._format_movimentacao(mov) for mov in page['items']]
+        return page
+    
+    def count_movimentacoes(self, filters: Optional[Dict[str, Any]] = None) -> int:
+        """Total de movimentações dos filtros de query_movimentacoes"""
+        model_filters = self._movimentacao_filters(filters or {})
+        if model_filters is None:
+            return 0
+        return movimentacao_model.count(model_filters)
+    
+    def iter_movimentacoes(self, filters: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """Todas as movimentações dos filtros de query_movimentacoes, lidas do cursor em lotes"""
+        model_filters = self._movimentacao_filters(filters or {})
+        if model_filters is None:
+            return iter(())
+        return map(self._format_movimentacao, movimentacao_model.iter_rows(model_filters))
+    
+    def _movimentacao_filters(self, filters: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Filtros da tela (nomes) convertidos para IDs; None se nenhuma linha pode atender"""
+        model_filters = {
+            'tipo': filters.get('tipo'),
+            'data_inicio': self._timestamp(filters.get('data_inicio')),
+            'data_fim': self._timestamp(filters.get('data_fim')),
+            'brinde_id': filters.get('brinde_id')
+        }
+        
+        filial_nome = filters.get('filial')
+        if filial_nome and filial_nome != "Todas":
+            filial = self.get_filial_by_nome(filial_nome)
+            if not filial:
+                return None
+            model_filters['filial_id'] = filial['id']
         
-        return movimentacoes
+        username = filters.get('usuario')
+        if username and username != "Todos":
+            usuario_id = self._get_usuario_id(username)
+            if not usuario_id:
+                return None
+            model_filters['usuario_id'] = usuario_id
+        
+        return model_filters
     
     def _get_usuario_id(self, username: str) -> Optional[int]:
         """Obtém ID do usuário por username"""
         if not username:
             return None
         
-        usuario = usuario_model.get_by_username(username)
-        return usuario['id'] if usuario else None
+        return self.dimensions.get_id('usuarios', username, ativo_apenas=True)
     
     # Métodos CRUD - Categorias
     def create_categoria(self, categoria_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -466,7 +598,7 @@ class DatabaseDataManager:
         }
         
         categoria_id = categoria_model.create(data_insert)
-        self.clear_cache()
+        self.publish_changes()
         
         categoria_criada = {
             'id': categoria_id,
@@ -492,7 +624,7 @@ class DatabaseDataManager:
         
         sucesso = categoria_model.update(categoria_id, data_update)
         if sucesso:
-            self.clear_cache()
+            self.publish_changes()
             categoria_atualizada = {
                 'id': categoria_id,
                 **data_update
@@ -509,7 +641,7 @@ class DatabaseDataManager:
         """Exclui uma categoria"""
         sucesso = categoria_model.delete(categoria_id)
         if sucesso:
-            self.clear_cache()
+            self.publish_changes()
             
             # Auditoria
             audit_logger.audit_categoria_deleted(categoria_id)
@@ -526,7 +658,7 @@ class DatabaseDataManager:
         }
         
         unidade_id = unidade_medida_model.create(data_insert)
-        self.clear_cache()
+        self.publish_changes()
         
         unidade_criada = {
             'id': unidade_id,
@@ -552,7 +684,7 @@ class DatabaseDataManager:
         
         sucesso = unidade_medida_model.update(unidade_id, data_update)
         if sucesso:
-            self.clear_cache()
+            self.publish_changes()
             unidade_atualizada = {
                 'id': unidade_id,
                 **data_update
@@ -569,7 +701,7 @@ class DatabaseDataManager:
         """Exclui uma unidade de medida"""
         sucesso = unidade_medida_model.delete(unidade_id)
         if sucesso:
-            self.clear_cache()
+            self.publish_changes()
             
             # Auditoria
             audit_logger.audit_unidade_deleted(unidade_id)
@@ -593,7 +725,7 @@ class DatabaseDataManager:
         }
         
         usuario_id = usuario_model.create(data_insert)
-        self.clear_cache()
+        self.publish_changes()
         
         usuario_criado = {
             'id': usuario_id,
@@ -628,7 +760,7 @@ class DatabaseDataManager:
         
         sucesso = usuario_model.update(usuario_id, data_update)
         if sucesso:
-            self.clear_cache()
+            self.publish_changes()
             usuario_atualizado = {
                 'id': usuario_id,
                 **usuario_data
@@ -650,7 +782,7 @@ class DatabaseDataManager:
             # Buscar nome da filial
             filial_nome = ''
             if usuario['filial_id']:
-                filial = filial_model.get_by_id(usuario['filial_id'])
+                filial = self.dimensions.get_by_id('filiais', usuario['filial_id'])
                 filial_nome = filial['nome'] if filial else ''
             
             usuarios.append({
@@ -678,7 +810,7 @@ class DatabaseDataManager:
         }
         
         filial_id = filial_model.create(data_insert)
-        self.clear_cache()
+        self.publish_changes()
         
         filial_criada = {
             'id': filial_id,
@@ -706,7 +838,7 @@ class DatabaseDataManager:
         
         sucesso = filial_model.update(filial_id, data_update)
         if sucesso:
-            self.clear_cache()
+            self.publish_changes()
             filial_atualizada = {
                 'id': filial_id,
                 **data_update
@@ -743,31 +875,73 @@ class DatabaseDataManager:
         )
         
         if affected > 0:
-            self.clear_cache()
+            self.publish_changes()
             audit_logger.audit_filial_deleted(filial_id, filial)
             return True
         
         return False
     
     # Métodos para estatísticas
-    def get_estatisticas_dashboard(self) -> Dict[str, Any]:
-        """Retorna estatísticas para o dashboard"""
-        brindes = self.get_brindes()
-        
-        total_itens = sum(b['quantidade'] for b in brindes)
-        total_categorias = len(self.get_categorias())
-        valor_total = sum(b['quantidade'] * b['valor_unitario'] for b in brindes)
+    def _filial_id_filtro(self, filial_filter: Optional[str]) -> Optional[int]:
+        """ID da filial de um filtro por nome (None: todas)"""
+        if filial_filter and filial_filter != "Todas":
+            filial = self.get_filial_by_nome(filial_filter)
+            if filial:
+                return filial['id']
+        return None
+    
+    def get_estatisticas_dashboard(self, filial_filter: Optional[str] = None) -> Dict[str, Any]:
+        """Retorna estatísticas para o dashboard (geral ou de uma filial)"""
         estoque_minimo = self.get_configuracao('estoque_minimo', 10)
-        itens_baixo = len([b for b in brindes if b['quantidade'] <= estoque_minimo])
+        filial_id = self._filial_id_filtro(filial_filter)
+        
+        # Agregação no banco: uma linha, independente do tamanho do catálogo
+        stats = brinde_model.get_estatisticas(estoque_minimo, filial_id)
         
         return {
-            'total_itens': total_itens,
-            'total_categorias': total_categorias,
-            'valor_total': valor_total,
-            'itens_estoque_baixo': itens_baixo,
+            'total_itens': stats['total_itens'],
+            'total_categorias': stats['total_categorias'],
+            'valor_total': float(stats['valor_total']),
+            'itens_estoque_baixo': stats['itens_estoque_baixo'],
             'estoque_minimo': estoque_minimo
         }
     
+    def get_dashboard_snapshot(self, filial_filter: Optional[str] = None,
+                               limite_alertas: int = 4, limite_movimentacoes: int = 10) -> Dict[str, Any]:
+        """Dados do dashboard em consultas agregadas, sem listar os brindes"""
+        estatisticas = self.get_estatisticas_dashboard(filial_filter)
+        filial_id = self._filial_id_filtro(filial_filter)
+        return {
+            'estatisticas': estatisticas,
+            'categorias': brinde_model.get_quantidade_por_categoria(filial_id),
+            'estoque_baixo': brinde_model.get_estoque_baixo(
+                estatisticas['estoque_minimo'], limite_alertas, filial_id
+            ),
+            'movimentacoes': self.query_movimentacoes(
+                {'filial': filial_filter}, None, limite_movimentacoes
+            )['items']
+        }
+    
+    def get_estoque_resumo(self, grupo: str = 'descricao',
+                           filial_filter: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Estoque agregado por descrição ou categoria em cada filial (tabela estoque_resumo)"""
+        rows = brinde_model.get_estoque_resumo(grupo, self._filial_id_filtro(filial_filter))
+        return [self._format_resumo(row) for row in rows]
+    
+    def iter_estoque_resumo(self, grupo: str = 'descricao',
+                            filial_filter: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Linhas de get_estoque_resumo lidas do cursor em lotes"""
+        filial_id = self._filial_id_filtro(filial_filter)
+        return map(self._format_resumo, brinde_model.iter_estoque_resumo(grupo, filial_id))
+    
+    @staticmethod
+    def _format_resumo(row: Dict[str, Any]) -> Dict[str, Any]:
+        """Valores do resumo como float (DECIMAL do SQLite pode vir inteiro)"""
+        row['valor_total'] = float(row['valor_total'] or 0)
+        if 'valor_unitario' in row:
+            row['valor_unitario'] = float(row['valor_unitario'] or 0)
+        return row
+    
     # Métodos de Fornecedores
     def get_fornecedores(self) -> List[Dict[str, Any]]:
         """Retorna lista de fornecedores"""
@@ -805,7 +979,7 @@ class DatabaseDataManager:
             
             fornecedor_id = fornecedor_model.create(data)
             if fornecedor_id:
-                self.clear_cache()
+                self.publish_changes()
                 return True
             return False
         except Exception as e:
@@ -817,7 +991,7 @@ class DatabaseDataManager:
         try:
             sucesso = fornecedor_model.update(fornecedor_id, data)
             if sucesso:
-                self.clear_cache()
+                self.publish_changes()
             return sucesso
         except Exception as e:
             print(f"Erro ao atualizar fornecedor: {e}")
@@ -828,15 +1002,15 @@ class DatabaseDataManager:
         try:
             sucesso = fornecedor_model.toggle_ativo(fornecedor_id)
             if sucesso:
-                self.clear_cache()
+                self.publish_changes()
             return sucesso
         except Exception as e:
             print(f"Erro ao remover fornecedor: {e}")
             return False
     
-    def search_fornecedores(self, termo: str) -> List[Dict[str, Any]]:
-        """Busca fornecedores por termo"""
-        return fornecedor_model.search(termo)
+    def search_fornecedores(self, termo: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Busca fornecedores por termo (os ``limit`` mais relevantes, via FTS5)"""
+        return fornecedor_model.search(termo, limit)
 
 # Instância global do gerenciador
 db_data_manager = DatabaseDataManager()
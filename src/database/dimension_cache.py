@@ -0,0 +1,98 @@
+"""
+Cache em memória das tabelas de dimensão (filiais, categorias, unidades e usuários)
+"""
+
+import threading
+from typing import Any, Dict, Optional
+
+# Tabela -> (coluna usada como nome, query de carga)
+DIMENSIONS: Dict[str, tuple] = {
+    'filiais': ('nome', "SELECT * FROM filiais"),
+    'categorias': ('nome', "SELECT * FROM categorias"),
+    'unidades_medida': ('codigo', "SELECT * FROM unidades_medida"),
+    'usuarios': ('username', """
+        SELECT u.*, f.nome as filial_nome, f.numero as filial_numero
+        FROM usuarios u
+        LEFT JOIN filiais f ON u.filial_id = f.id
+    """)
+}
+
+class DimensionCache:
+    """Mapas nome -> linha e id -> linha das tabelas de dimensão.
+
+    Cada tabela é carregada por inteiro em uma única query no primeiro
+    acesso; a partir daí as resoluções não consultam o banco até que a
+    tabela seja invalidada (escritas feitas pelo gerenciador de dados).
+    Como o mapa é completo, um nome inexistente também é respondido sem
+    consulta.
+    """
+
+    def __init__(self, db):
+        """Inicializa o cache vazio"""
+        self.db = db
+        self._lock = threading.RLock()
+        self._by_name: Dict[str, Dict[Any, Dict[str, Any]]] = {}
+        self._by_id: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        self.stats = {tabela: {'hits': 0, 'misses': 0, 'invalidations': 0} for tabela in DIMENSIONS}
+
+    def _load(self, tabela: str):
+        """Carrega a tabela (chamado com o lock)"""
+        coluna, query = DIMENSIONS[tabela]
+        rows = [dict(row) for row in self.db.execute_query(query)]
+        self._by_id[tabela] = {row['id']: row for row in rows}
+        self._by_name[tabela] = {row[coluna]: row for row in rows}
+
+    def _maps(self, tabela: str):
+        """Mapas da tabela, carregando-os se necessário"""
+        if tabela not in DIMENSIONS:
+            raise ValueError(f"Tabela de dimensão desconhecida: {tabela}")
+        with self._lock:
+            if tabela in self._by_id:
+                self.stats[tabela]['hits'] += 1
+            else:
+                self.stats[tabela]['misses'] += 1
+                self._load(tabela)
+            return self._by_name[tabela], self._by_id[tabela]
+
+    def get_by_name(self, tabela: str, nome: Any, ativo_apenas: bool = False) -> Optional[Dict[str, Any]]:
+        """Linha pelo nome (username/código nas tabelas correspondentes)"""
+        by_name, _ = self._maps(tabela)
+        row = by_name.get(nome)
+        if row is None or (ativo_apenas and not row.get('ativo')):
+            return None
+        return dict(row)
+
+    def get_by_id(self, tabela: str, registro_id: int) -> Optional[Dict[str, Any]]:
+        """Linha pelo ID"""
+        _, by_id = self._maps(tabela)
+        row = by_id.get(registro_id)
+        return dict(row) if row is not None else None
+
+    def get_id(self, tabela: str, nome: Any, ativo_apenas: bool = False) -> Optional[int]:
+        """ID pelo nome"""
+        row = self.get_by_name(tabela, nome, ativo_apenas)
+        return row['id'] if row else None
+
+    def invalidate(self, tabela: Optional[str] = None):
+        """Descarta uma tabela (ou todas); a próxima consulta recarrega"""
+        with self._lock:
+            for nome in ([tabela] if tabela else list(DIMENSIONS)):
+                if self._by_id.pop(nome, None) is not None:
+                    self.stats[nome]['invalidations'] += 1
+                self._by_name.pop(nome, None)
+            # Usuários trazem o nome da filial
+            if tabela == 'filiais':
+                self._by_id.pop('usuarios', None)
+                self._by_name.pop('usuarios', None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores de acertos/faltas por tabela e totais"""
+        with self._lock:
+            hits = sum(s['hits'] for s in self.stats.values())
+            misses = sum(s['misses'] for s in self.stats.values())
+            return {
+                'tabelas': {tabela: dict(s) for tabela, s in self.stats.items()},
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': hits / (hits + misses) if hits + misses else 0.0
+            }
@@ -0,0 +1,227 @@
+"""
+Migrações versionadas do schema (PRAGMA user_version) e backfills em lotes
+"""
+
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+class Backfill:
+    """Atualização de dados feita em lotes curtos com o banco já em uso.
+
+    ``update_sql`` recebe o intervalo de IDs do lote como parâmetros
+    (ex.: ``UPDATE brindes SET x = ... WHERE id > ? AND id <= ?``). Cada lote
+    roda em sua própria transação, liberando o lock de escrita entre eles.
+    O limite é o maior ID existente quando a migração foi aplicada: linhas
+    novas já devem ser gravadas no formato novo (pelo código ou por trigger).
+    """
+
+    def __init__(self, nome: str, tabela: str, update_sql: str, batch_size: int = 1000):
+        """Inicializa o backfill"""
+        self.nome = nome
+        self.tabela = tabela
+        self.update_sql = update_sql
+        self.batch_size = batch_size
+
+class Migration:
+    """Passo de migração que leva o banco para ``versao``"""
+
+    def __init__(self, versao: int, descricao: str,
+                 aplicar: Callable[[sqlite3.Connection], None],
+                 backfills: Sequence[Backfill] = ()):
+        """Inicializa o passo"""
+        self.versao = versao
+        self.descricao = descricao
+        self.aplicar = aplicar
+        self.backfills = list(backfills)
+
+class MigrationRunner:
+    """Aplica as migrações pendentes de acordo com ``PRAGMA user_version``.
+
+    Todos os passos pendentes rodam em uma única transação: se um falhar,
+    o banco permanece na versão anterior. Com o banco na versão atual nada
+    além da leitura do ``user_version`` é executado.
+    """
+
+    def __init__(self, migrations: Sequence[Migration]):
+        """Inicializa o executor, validando a sequência de versões"""
+        self.migrations = sorted(migrations, key=lambda m: m.versao)
+        versoes = [m.versao for m in self.migrations]
+        if versoes != list(range(1, len(versoes) + 1)):
+            raise ValueError(f"Versões de migração devem ser consecutivas a partir de 1: {versoes}")
+        self.backfills: Dict[str, Backfill] = {
+            backfill.nome: backfill for m in self.migrations for backfill in m.backfills
+        }
+
+    @property
+    def latest_version(self) -> int:
+        """Versão mais recente do schema"""
+        return self.migrations[-1].versao if self.migrations else 0
+
+    @staticmethod
+    def current_version(conn: sqlite3.Connection) -> int:
+        """Versão gravada no banco"""
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def pending(self, conn: sqlite3.Connection) -> List[Migration]:
+        """Migrações ainda não aplicadas"""
+        versao = self.current_version(conn)
+        return [m for m in self.migrations if m.versao > versao]
+
+    def migrate(self, conn: sqlite3.Connection) -> List[int]:
+        """Aplica as migrações pendentes; retorna as versões aplicadas"""
+        versao = self.current_version(conn)
+        if versao > self.latest_version:
+            print(f"Banco na versão {versao}, mais nova que a do sistema ({self.latest_version})")
+            return []
+
+        pendentes = [m for m in self.migrations if m.versao > versao]
+        if not pendentes:
+            return []
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.create_backfill_table(conn)
+            for migration in pendentes:
+                migration.aplicar(conn)
+                for backfill in migration.backfills:
+                    self.schedule_backfill(conn, backfill)
+                # user_version faz parte da transação
+                conn.execute(f"PRAGMA user_version = {migration.versao:d}")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+        return [m.versao for m in pendentes]
+
+    @staticmethod
+    def create_backfill_table(conn: sqlite3.Connection):
+        """Tabela com o progresso dos backfills"""
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS schema_backfills (
+                nome TEXT PRIMARY KEY,
+                ultimo_id INTEGER NOT NULL DEFAULT 0,
+                limite_id INTEGER NOT NULL,
+                concluido_em TIMESTAMP
+            )
+        """)
+
+    @staticmethod
+    def schedule_backfill(conn: sqlite3.Connection, backfill: Backfill):
+        """Registra o backfill até o maior ID atual da tabela.
+
+        Se tudo cabe em um lote (ex.: banco novo), ele é aplicado já na
+        transação da migração.
+        """
+        limite = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {backfill.tabela}").fetchone()[0]
+        imediato = limite <= backfill.batch_size
+        if imediato and limite:
+            conn.execute(backfill.update_sql, (0, limite))
+        conn.execute("""
+            INSERT OR IGNORE INTO schema_backfills (nome, ultimo_id, limite_id, concluido_em)
+            VALUES (?, ?, ?, CASE WHEN ? THEN CURRENT_TIMESTAMP END)
+        """, (backfill.nome, limite if imediato else 0, limite, imediato))
+
+class BackfillWorker:
+    """Executa os backfills pendentes em segundo plano, um lote por transação"""
+
+    def __init__(self, db, runner: MigrationRunner, pause: float = 0.05):
+        """Inicializa o executor (``db`` é o DatabaseSchema)"""
+        self.db = db
+        self.runner = runner
+        self.pause = pause
+
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {
+            'batches': 0,
+            'rows': 0,
+            'completed': 0,
+            'errors': 0
+        }
+
+    def pending(self) -> List[str]:
+        """Nomes dos backfills ainda não concluídos"""
+        rows = self.db.execute_query(
+            "SELECT nome FROM schema_backfills WHERE concluido_em IS NULL ORDER BY rowid"
+        )
+        return [row[0] for row in rows]
+
+    def start(self):
+        """Inicia a thread se houver backfill pendente"""
+        if self._thread and self._thread.is_alive():
+            return
+        if not self.pending():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="Backfill", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Interrompe após o lote atual (o progresso fica salvo)"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def wait(self, timeout: Optional[float] = None):
+        """Aguarda o término da thread"""
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        """Laço principal da thread"""
+        try:
+            self.run_pending()
+        except Exception as e:
+            self.stats['errors'] += 1
+            print(f"Erro no backfill: {e}")
+        finally:
+            self.db.pool.release()
+
+    def run_pending(self, max_batches: Optional[int] = None) -> int:
+        """Executa os backfills pendentes; retorna o número de lotes processados"""
+        lotes = 0
+        for nome in self.pending():
+            backfill = self.runner.backfills.get(nome)
+            if backfill is None:
+                print(f"Backfill desconhecido ignorado: {nome}")
+                continue
+
+            while not self._stop_event.is_set():
+                if max_batches is not None and lotes >= max_batches:
+                    return lotes
+                if not self.run_batch(backfill):
+                    break
+                lotes += 1
+                # Intervalo para as escritas da aplicação
+                if self.pause:
+                    time.sleep(self.pause)
+        return lotes
+
+    def run_batch(self, backfill: Backfill) -> bool:
+        """Processa o próximo lote; retorna False se o backfill já terminou"""
+        with self.db.transaction() as conn:
+            row = conn.execute(
+                "SELECT ultimo_id, limite_id FROM schema_backfills WHERE nome = ? AND concluido_em IS NULL",
+                (backfill.nome,)
+            ).fetchone()
+            if row is None:
+                return False
+
+            inicio, limite = row
+            fim = min(inicio + backfill.batch_size, limite)
+            cursor = conn.execute(backfill.update_sql, (inicio, fim))
+            conn.execute("""
+                UPDATE schema_backfills
+                SET ultimo_id = ?, concluido_em = CASE WHEN ? >= limite_id THEN CURRENT_TIMESTAMP END
+                WHERE nome = ?
+            """, (fim, fim, backfill.nome))
+
+        self.stats['batches'] += 1
+        self.stats['rows'] += max(cursor.rowcount, 0)
+        if fim >= limite:
+            self.stats['completed'] += 1
+        return True
@@ -3,9 +3,10 @@ Modelos de dados para acesso ao banco SQLite
 """
 
 import sqlite3
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 from datetime import datetime
 from .schema import db_schema
+from .search_index import fts_query, ranked_search
 
 class BaseModel:
     """Classe base para todos os modelos"""
@@ -14,8 +15,8 @@ class BaseModel:
         self.db = db_schema
     
     def get_connection(self) -> sqlite3.Connection:
-        """Retorna conexão com o banco"""
-        return self.db.get_connection()
+        """Retorna a conexão reutilizável da thread atual"""
+        return self.db.get_pooled_connection()
     
     def execute_query(self, query: str, params: tuple = None) -> List[sqlite3.Row]:
         """Executa query SELECT"""
@@ -24,6 +25,28 @@ class BaseModel:
     def execute_update(self, query: str, params: tuple = None) -> int:
         """Executa query UPDATE/INSERT/DELETE"""
         return self.db.execute_update(query, params)
+    
+    def execute_insert(self, query: str, params: tuple = None) -> int:
+        """Executa INSERT e retorna o ID criado"""
+        return self.db.execute_insert(query, params)
+    
+    def iter_query(self, query: str, params: tuple = None, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Percorre o resultado de um SELECT em lotes, sem carregar todas as linhas.
+        
+        O cursor fica aberto enquanto o iterador é consumido (a leitura vê
+        um único snapshot do banco) e é fechado ao terminar ou ao descartar
+        o iterador.
+        """
+        cursor = self.get_connection().execute(query, params or ())
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                for row in rows:
+                    yield dict(row)
+        finally:
+            cursor.close()
 
 class FilialModel(BaseModel):
     """Modelo para gerenciar filiais"""
@@ -56,16 +79,10 @@ class FilialModel(BaseModel):
             INSERT INTO filiais (numero, nome, cidade, endereco, telefone, email)
             VALUES (?, ?, ?, ?, ?, ?)
         """
-        conn = self.get_connection()
-        try:
-            cursor = conn.execute(query, (
-                data['numero'], data['nome'], data['cidade'],
-                data.get('endereco'), data.get('telefone'), data.get('email')
-            ))
-            conn.commit()
-            return cursor.lastrowid
-        finally:
-            conn.close()
+        return self.execute_insert(query, (
+            data['numero'], data['nome'], data['cidade'],
+            data.get('endereco'), data.get('telefone'), data.get('email')
+        ))
     
     def update(self, filial_id: int, data: Dict[str, Any]) -> bool:
         """Atualiza filial"""
@@ -114,13 +131,7 @@ class CategoriaModel(BaseModel):
     def create(self, data: Dict[str, Any]) -> int:
         """Cria nova categoria"""
         query = "INSERT INTO categorias (nome, descricao) VALUES (?, ?)"
-        conn = self.get_connection()
-        try:
-            cursor = conn.execute(query, (data['nome'], data.get('descricao')))
-            conn.commit()
-            return cursor.lastrowid
-        finally:
-            conn.close()
+        return self.execute_insert(query, (data['nome'], data.get('descricao')))
     
     def update(self, categoria_id: int, data: Dict[str, Any]) -> bool:
         """Atualiza categoria"""
@@ -166,13 +177,7 @@ class UnidadeMedidaModel(BaseModel):
     def create(self, data: Dict[str, Any]) -> int:
         """Cria nova unidade de medida"""
         query = "INSERT INTO unidades_medida (codigo, descricao) VALUES (?, ?)"
-        conn = self.get_connection()
-        try:
-            cursor = conn.execute(query, (data['codigo'], data['descricao']))
-            conn.commit()
-            return cursor.lastrowid
-        finally:
-            conn.close()
+        return self.execute_insert(query, (data['codigo'], data['descricao']))
 
 class UsuarioModel(BaseModel):
     """Modelo para gerenciar usuários"""
@@ -208,22 +213,29 @@ class UsuarioModel(BaseModel):
             INSERT INTO usuarios (username, nome, email, filial_id, perfil)
             VALUES (?, ?, ?, ?, ?)
         """
-        conn = self.get_connection()
-        try:
-            cursor = conn.execute(query, (
-                data['username'], data['nome'], data.get('email'),
-                data['filial_id'], data['perfil']
-            ))
-            conn.commit()
-            return cursor.lastrowid
-        finally:
-            conn.close()
+        return self.execute_insert(query, (
+            data['username'], data['nome'], data.get('email'),
+            data['filial_id'], data['perfil']
+        ))
 
 class BrindeModel(BaseModel):
     """Modelo para gerenciar brindes"""
     
     def get_all(self, filial_id: int = None, ativo_apenas: bool = True) -> List[Dict[str, Any]]:
         """Retorna todos os brindes com dados relacionados"""
+        query, params = self._all_query(filial_id, ativo_apenas)
+        rows = self.execute_query(query, params or None)
+        return [dict(row) for row in rows]
+    
+    def iter_all(self, filial_id: int = None, ativo_apenas: bool = True,
+                 batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Mesmas linhas de get_all, lidas do cursor em lotes"""
+        query, params = self._all_query(filial_id, ativo_apenas)
+        return self.iter_query(query, params, batch_size)
+    
+    @staticmethod
+    def _all_query(filial_id: int = None, ativo_apenas: bool = True) -> Tuple[str, tuple]:
+        """SELECT dos brindes com dados relacionados, ordenado por código"""
         query = """
             SELECT b.*, c.nome as categoria_nome, u.codigo as unidade_codigo,
                    f.nome as filial_nome, f.numero as filial_numero
@@ -247,8 +259,119 @@ class BrindeModel(BaseModel):
             query += " WHERE " + " AND ".join(conditions)
         
         query += " ORDER BY b.codigo"
+        return query, tuple(params)
+    
+    def get_estatisticas(self, estoque_minimo: int, filial_id: int = None) -> Dict[str, Any]:
+        """Totais do estoque ativo calculados em uma única query agregada"""
+        query = """
+            SELECT COUNT(*) as total_brindes,
+                   COALESCE(SUM(quantidade), 0) as total_itens,
+                   COALESCE(SUM(quantidade * valor_unitario), 0) as valor_total,
+                   COALESCE(SUM(quantidade <= ?), 0) as itens_estoque_baixo,
+                   (SELECT COUNT(*) FROM categorias WHERE ativo = 1) as total_categorias
+            FROM brindes
+            WHERE ativo = 1
+        """
+        params = [estoque_minimo]
         
-        rows = self.execute_query(query, tuple(params) if params else None)
+        if filial_id:
+            query += " AND filial_id = ?"
+            params.append(filial_id)
+        
+        rows = self.execute_query(query, tuple(params))
+        return dict(rows[0])
+    
+    def get_quantidade_por_categoria(self, filial_id: int = None) -> List[Dict[str, Any]]:
+        """Quantidade em estoque por categoria (maior primeiro), lida do resumo do estoque"""
+        query = """
+            SELECT c.nome as categoria, SUM(r.quantidade) as quantidade
+            FROM estoque_resumo r
+            JOIN categorias c ON c.id = CAST(r.chave AS INTEGER)
+            WHERE r.grupo = 'categoria'
+        """
+        params = []
+        
+        if filial_id:
+            query += " AND r.filial_id = ?"
+            params.append(filial_id)
+        
+        query += " GROUP BY c.nome ORDER BY quantidade DESC, c.nome"
+        rows = self.execute_query(query, tuple(params))
+        return [dict(row) for row in rows]
+    
+    def get_estoque_resumo(self, grupo: str = 'descricao', filial_id: int = None) -> List[Dict[str, Any]]:
+        """Estoque agregado por descrição × filial ou categoria × filial (tabela estoque_resumo).
+        
+        Por descrição, os dados de exibição (descrição, categoria, valor
+        unitário, unidade e código) vêm de um brinde ativo do grupo.
+        """
+        query, params = self._estoque_resumo_query(grupo, filial_id)
+        rows = self.execute_query(query, params)
+        return [dict(row) for row in rows]
+    
+    def iter_estoque_resumo(self, grupo: str = 'descricao', filial_id: int = None,
+                            batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Mesmas linhas de get_estoque_resumo, lidas do cursor em lotes"""
+        query, params = self._estoque_resumo_query(grupo, filial_id)
+        return self.iter_query(query, params, batch_size)
+    
+    @staticmethod
+    def _estoque_resumo_query(grupo: str, filial_id: int = None) -> Tuple[str, tuple]:
+        """SELECT do resumo do estoque do grupo (ValueError se o grupo não existe)"""
+        if grupo == 'descricao':
+            query = """
+                SELECT COALESCE(b.descricao, r.chave) as descricao, c.nome as categoria, f.nome as filial,
+                       r.itens as itens, r.quantidade as quantidade, r.valor_total as valor_total,
+                       b.valor_unitario as valor_unitario, u.codigo as unidade_medida,
+                       b.codigo as codigo
+                FROM estoque_resumo r
+                JOIN filiais f ON f.id = r.filial_id
+                LEFT JOIN brindes b ON b.id = (
+                    SELECT MIN(b2.id) FROM brindes b2
+                    WHERE b2.filial_id = r.filial_id AND b2.descricao_norm = r.chave AND b2.ativo = 1
+                )
+                LEFT JOIN categorias c ON c.id = b.categoria_id
+                LEFT JOIN unidades_medida u ON u.id = b.unidade_medida_id
+                WHERE r.grupo = 'descricao' AND r.chave <> ''
+            """
+            ordem = " ORDER BY r.chave, f.nome"
+        elif grupo == 'categoria':
+            query = """
+                SELECT c.nome as categoria, f.nome as filial, r.itens as itens,
+                       r.quantidade as quantidade, r.valor_total as valor_total
+                FROM estoque_resumo r
+                JOIN filiais f ON f.id = r.filial_id
+                LEFT JOIN categorias c ON c.id = CAST(r.chave AS INTEGER)
+                WHERE r.grupo = 'categoria'
+            """
+            ordem = " ORDER BY c.nome, f.nome"
+        else:
+            raise ValueError(f"Grupo de resumo inválido: {grupo}")
+        params = []
+        
+        if filial_id:
+            query += " AND r.filial_id = ?"
+            params.append(filial_id)
+        
+        query += ordem
+        return query, tuple(params)
+    
+    def get_estoque_baixo(self, estoque_minimo: int, limit: int, filial_id: int = None) -> List[Dict[str, Any]]:
+        """Brindes ativos com quantidade até o mínimo, zerados primeiro (só os ``limit`` primeiros)"""
+        query = """
+            SELECT id, codigo, descricao, quantidade
+            FROM brindes
+            WHERE ativo = 1 AND quantidade <= ?
+        """
+        params = [estoque_minimo]
+        
+        if filial_id:
+            query += " AND filial_id = ?"
+            params.append(filial_id)
+        
+        query += " ORDER BY quantidade, descricao LIMIT ?"
+        params.append(limit)
+        rows = self.execute_query(query, tuple(params))
         return [dict(row) for row in rows]
     
     def get_by_id(self, brinde_id: int) -> Optional[Dict[str, Any]]:
@@ -279,10 +402,10 @@ class BrindeModel(BaseModel):
         rows = self.execute_query(query, (codigo,))
         return dict(rows[0]) if rows else None
     
-    def create(self, data: Dict[str, Any]) -> int:
-        """Cria novo brinde"""
+    def create(self, data: Dict[str, Any], conn: Optional[sqlite3.Connection] = None) -> int:
+        """Cria novo brinde (dentro da transação de conn, se informada)"""
         # Gerar próximo código
-        codigo = self.get_next_codigo()
+        codigo = self.get_next_codigo(conn=conn)
         
         query = """
             INSERT INTO brindes (codigo, descricao, categoria_id, quantidade, 
@@ -290,17 +413,14 @@ class BrindeModel(BaseModel):
                                observacoes, usuario_criacao_id)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
-        conn = self.get_connection()
-        try:
-            cursor = conn.execute(query, (
-                codigo, data['descricao'], data['categoria_id'], data['quantidade'],
-                data['valor_unitario'], data['unidade_medida_id'], data['filial_id'],
-                data.get('observacoes'), data.get('usuario_criacao_id')
-            ))
-            conn.commit()
-            return cursor.lastrowid
-        finally:
-            conn.close()
+        params = (
+            codigo, data['descricao'], data['categoria_id'], data['quantidade'],
+            data['valor_unitario'], data['unidade_medida_id'], data['filial_id'],
+            data.get('observacoes'), data.get('usuario_criacao_id')
+        )
+        if conn is not None:
+            return conn.execute(query, params).lastrowid
+        return self.execute_insert(query, params)
     
     def update(self, brinde_id: int, data: Dict[str, Any]) -> bool:
         """Atualiza brinde"""
@@ -328,26 +448,107 @@ class BrindeModel(BaseModel):
         affected = self.execute_update(query, (nova_quantidade, brinde_id))
         return affected > 0
     
-    def get_next_codigo(self) -> str:
+    def adjust_quantidade(self, brinde_id: int, delta: int,
+                          conn: Optional[sqlite3.Connection] = None) -> bool:
+        """Soma delta ao estoque em um único UPDATE (saídas exigem saldo suficiente)"""
+        query = """
+            UPDATE brindes 
+            SET quantidade = quantidade + ?, data_atualizacao = CURRENT_TIMESTAMP
+            WHERE id = ? AND quantidade >= ?
+        """
+        params = (delta, brinde_id, max(-delta, 0))
+        if conn is not None:
+            return conn.execute(query, params).rowcount > 0
+        return self.execute_update(query, params) > 0
+    
+    def exists(self, brinde_id: int, conn: Optional[sqlite3.Connection] = None) -> bool:
+        """Verifica se o brinde existe"""
+        query = "SELECT 1 FROM brindes WHERE id = ?"
+        if conn is not None:
+            return conn.execute(query, (brinde_id,)).fetchone() is not None
+        return bool(self.execute_query(query, (brinde_id,)))
+    
+    def find_by_descricao(self, filial_id: int, descricao: str,
+                          conn: Optional[sqlite3.Connection] = None) -> Optional[Dict[str, Any]]:
+        """Retorna o brinde ativo com a descrição (normalizada) na filial"""
+        query = """
+            SELECT * FROM brindes
+            WHERE filial_id = ? AND descricao_norm = lower(trim(?)) AND ativo = 1
+        """
+        params = (filial_id, descricao)
+        if conn is not None:
+            row = conn.execute(query, params).fetchone()
+        else:
+            rows = self.execute_query(query, params)
+            row = rows[0] if rows else None
+        return dict(row) if row else None
+    
+    def upsert_for_filial(self, data: Dict[str, Any],
+                          conn: Optional[sqlite3.Connection] = None) -> Tuple[int, bool]:
+        """Cria o brinde na filial ou soma a quantidade no existente com a mesma descrição.
+        
+        Usa o índice único (filial_id, descricao_norm): um único comando,
+        sem varrer os brindes da filial. Retorna (id, criado).
+        """
+        if conn is None:
+            # Código gerado dentro da transação (BEGIN IMMEDIATE): outra escrita não pega o mesmo
+            with self.db.transaction() as tx:
+                return self.upsert_for_filial(data, conn=tx)
+        
+        codigo = self.get_next_codigo(conn=conn)
+        query = """
+            INSERT INTO brindes (codigo, descricao, descricao_norm, categoria_id, quantidade,
+                               valor_unitario, unidade_medida_id, filial_id,
+                               observacoes, usuario_criacao_id)
+            VALUES (?, ?, lower(trim(?)), ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (filial_id, descricao_norm) WHERE ativo = 1 DO UPDATE SET
+                quantidade = quantidade + excluded.quantidade,
+                data_atualizacao = CURRENT_TIMESTAMP
+            RETURNING id, codigo
+        """
+        params = (
+            codigo, data['descricao'], data['descricao'], data['categoria_id'], data['quantidade'],
+            data['valor_unitario'], data['unidade_medida_id'], data['filial_id'],
+            data.get('observacoes'), data.get('usuario_criacao_id')
+        )
+        row = conn.execute(query, params).fetchall()[0]
+        # O código é único: se voltou o código gerado, a linha é nova
+        return row[0], row[1] == codigo
+    
+    def get_next_codigo(self, conn: Optional[sqlite3.Connection] = None) -> str:
         """Gera próximo código sequencial"""
         query = "SELECT MAX(CAST(codigo AS INTEGER)) FROM brindes WHERE codigo GLOB '[0-9]*'"
-        rows = self.execute_query(query)
+        rows = conn.execute(query).fetchall() if conn is not None else self.execute_query(query)
         max_codigo = rows[0][0] if rows and rows[0][0] else 0
         return f"{max_codigo + 1:03d}"
     
-    def search(self, termo: str, categoria_id: int = None, filial_id: int = None) -> List[Dict[str, Any]]:
-        """Busca brindes por termo"""
+    def search(self, termo: str, categoria_id: int = None, filial_id: int = None,
+               limit: int = 50) -> List[Dict[str, Any]]:
+        """Busca brindes por termo no índice FTS5 (mais relevantes primeiro).
+        
+        Cada palavra é buscada como prefixo, sem diferenciar acentos, em
+        descrição, código, observações e categoria. Sem termo, retorna os
+        primeiros brindes por código.
+        """
+        match = fts_query(termo)
+        if match is None:
+            brindes = self.get_all(filial_id=filial_id)
+            if categoria_id:
+                brindes = [b for b in brindes if b['categoria_id'] == categoria_id]
+            return brindes[:limit]
+        
         query = """
             SELECT b.*, c.nome as categoria_nome, u.codigo as unidade_codigo,
                    f.nome as filial_nome
-            FROM brindes b
+            FROM brindes_fts
+            JOIN brindes b ON b.id = brindes_fts.rowid
             JOIN categorias c ON b.categoria_id = c.id
             JOIN unidades_medida u ON b.unidade_medida_id = u.id
             JOIN filiais f ON b.filial_id = f.id
-            WHERE b.ativo = 1 AND (b.descricao LIKE ? OR b.codigo LIKE ?)
+            WHERE brindes_fts MATCH ? AND b.ativo = 1
         """
         
-        params = [f"%{termo}%", f"%{termo}%"]
+        params = []
         
         if categoria_id:
             query += " AND b.categoria_id = ?"
@@ -357,9 +558,8 @@ class BrindeModel(BaseModel):
             query += " AND b.filial_id = ?"
             params.append(filial_id)
         
-        query += " ORDER BY b.codigo"
-        
-        rows = self.execute_query(query, tuple(params))
+        # rank = bm25 com os pesos das colunas (search_index.BRINDES_RANK)
+        rows = ranked_search(self.execute_query, 'brindes_fts', 'descricao', match, query, params, limit)
         return [dict(row) for row in rows]
     
     def delete(self, brinde_id: int) -> bool:
@@ -371,27 +571,41 @@ class BrindeModel(BaseModel):
 class MovimentacaoModel(BaseModel):
     """Modelo para gerenciar movimentações"""
     
-    def create(self, data: Dict[str, Any]) -> int:
-        """Cria nova movimentação"""
-        query = """
-            INSERT INTO movimentacoes (brinde_id, tipo, quantidade, valor_unitario_anterior,
-                                     valor_unitario_novo, justificativa, observacoes, destino,
-                                     filial_origem_id, filial_destino_id, usuario_id)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """
-        conn = self.get_connection()
-        try:
-            cursor = conn.execute(query, (
-                data['brinde_id'], data['tipo'], data['quantidade'],
-                data.get('valor_unitario_anterior'), data.get('valor_unitario_novo'),
-                data.get('justificativa'), data.get('observacoes'), data.get('destino'),
-                data.get('filial_origem_id'), data.get('filial_destino_id'),
-                data['usuario_id']
-            ))
-            conn.commit()
-            return cursor.lastrowid
-        finally:
-            conn.close()
+    INSERT_QUERY = """
+        INSERT INTO movimentacoes (brinde_id, tipo, quantidade, valor_unitario_anterior,
+                                 valor_unitario_novo, justificativa, observacoes, destino,
+                                 filial_origem_id, filial_destino_id, usuario_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    
+    SELECT_QUERY = """
+        SELECT m.*, b.descricao as brinde_descricao, b.codigo as brinde_codigo,
+               u.nome as usuario_nome, fo.nome as filial_origem_nome,
+               fd.nome as filial_destino_nome
+        FROM movimentacoes m
+        JOIN brindes b ON m.brinde_id = b.id
+        JOIN usuarios u ON m.usuario_id = u.id
+        LEFT JOIN filiais fo ON m.filial_origem_id = fo.id
+        LEFT JOIN filiais fd ON m.filial_destino_id = fd.id
+    """
+    
+    @staticmethod
+    def insert_params(data: Dict[str, Any]) -> tuple:
+        """Parâmetros do INSERT na ordem das colunas"""
+        return (
+            data['brinde_id'], data['tipo'], data['quantidade'],
+            data.get('valor_unitario_anterior'), data.get('valor_unitario_novo'),
+            data.get('justificativa'), data.get('observacoes'), data.get('destino'),
+            data.get('filial_origem_id'), data.get('filial_destino_id'),
+            data['usuario_id']
+        )
+    
+    def create(self, data: Dict[str, Any], conn: Optional[sqlite3.Connection] = None) -> int:
+        """Cria nova movimentação (dentro da transação de conn, se informada)"""
+        params = self.insert_params(data)
+        if conn is not None:
+            return conn.execute(self.INSERT_QUERY, params).lastrowid
+        return self.execute_insert(self.INSERT_QUERY, params)
     
     def get_by_brinde(self, brinde_id: int, limit: int = None) -> List[Dict[str, Any]]:
         """Retorna movimentações de um brinde"""
@@ -438,6 +652,103 @@ class MovimentacaoModel(BaseModel):
         
         rows = self.execute_query(query, tuple(params) if params else None)
         return [dict(row) for row in rows]
+    
+    @staticmethod
+    def _filter_conditions(filters: Dict[str, Any], ordenado: bool = False) -> Tuple[List[str], List[Any]]:
+        """Condições SQL dos filtros (somente colunas de movimentacoes, sem joins).
+        
+        Com ``ordenado`` (listagem por data_hora), vários tipos usam ``+m.tipo``:
+        o SQLite não usa idx_movimentacoes_tipo_data para o IN e percorre o
+        índice de data já na ordem, sem ordenar todas as linhas encontradas.
+        """
+        conditions = []
+        params = []
+        
+        if filters.get('filial_id'):
+            conditions.append("m.filial_origem_id = ?")
+            params.append(filters['filial_id'])
+        
+        tipo = filters.get('tipo')
+        if tipo:
+            tipos = [tipo] if isinstance(tipo, str) else list(tipo)
+            coluna = "+m.tipo" if ordenado and len(tipos) > 1 else "m.tipo"
+            conditions.append(f"{coluna} IN ({', '.join('?' for _ in tipos)})")
+            params.extend(tipos)
+        
+        if filters.get('data_inicio'):
+            conditions.append("m.data_hora >= ?")
+            params.append(filters['data_inicio'])
+        
+        if filters.get('data_fim'):
+            conditions.append("m.data_hora < ?")
+            params.append(filters['data_fim'])
+        
+        if filters.get('usuario_id'):
+            conditions.append("m.usuario_id = ?")
+            params.append(filters['usuario_id'])
+        
+        if filters.get('brinde_id'):
+            conditions.append("m.brinde_id = ?")
+            params.append(filters['brinde_id'])
+        
+        return conditions, params
+    
+    def count(self, filters: Optional[Dict[str, Any]] = None) -> int:
+        """Total de movimentações que atendem aos filtros"""
+        conditions, params = self._filter_conditions(filters or {})
+        query = "SELECT COUNT(*) FROM movimentacoes m"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        rows = self.execute_query(query, tuple(params) if params else None)
+        return rows[0][0]
+    
+    def query(self, filters: Optional[Dict[str, Any]] = None,
+              after_cursor: Optional[Tuple[str, int]] = None,
+              page_size: int = 50) -> Dict[str, Any]:
+        """Página de movimentações (mais recentes primeiro) com paginação por chave.
+        
+        Filtros: filial_id, tipo (um ou vários), data_inicio (inclusive),
+        data_fim (exclusive), usuario_id e brinde_id. ``after_cursor`` é o
+        ``next_cursor`` da página anterior, ou seja, (data_hora, id) da última
+        linha exibida; o custo de cada página não depende da posição.
+        """
+        filters = filters or {}
+        conditions, params = self._filter_conditions(filters, ordenado=True)
+        total = self.count(filters)
+        
+        if after_cursor:
+            conditions.append("(m.data_hora, m.id) < (?, ?)")
+            params.extend(after_cursor)
+        
+        query = self.SELECT_QUERY
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        
+        # Uma linha a mais indica se existe próxima página
+        query += " ORDER BY m.data_hora DESC, m.id DESC LIMIT ?"
+        params.append(page_size + 1)
+        
+        rows = [dict(row) for row in self.execute_query(query, tuple(params))]
+        items = rows[:page_size]
+        next_cursor = None
+        if len(rows) > page_size:
+            next_cursor = (items[-1]['data_hora'], items[-1]['id'])
+        
+        return {'items': items, 'total': total, 'next_cursor': next_cursor}
+    
+    def iter_rows(self, filters: Optional[Dict[str, Any]] = None,
+                  batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Todas as movimentações dos filtros (mesma ordem de query), lidas do cursor em lotes.
+        
+        Uma única consulta percorrida pelo cursor: o consumo de memória não
+        depende do número de linhas (exportação de históricos inteiros).
+        """
+        conditions, params = self._filter_conditions(filters or {}, ordenado=True)
+        query = self.SELECT_QUERY
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY m.data_hora DESC, m.id DESC"
+        return self.iter_query(query, tuple(params), batch_size)
 
 class FornecedorModel(BaseModel):
     """Modelo para gerenciar fornecedores"""
@@ -471,18 +782,12 @@ class FornecedorModel(BaseModel):
                                     cidade, estado, cep, cnpj, observacoes, usuario_criacao_id)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
-        conn = self.get_connection()
-        try:
-            cursor = conn.execute(query, (
-                data['codigo'], data['nome'], data.get('contato_nome'),
-                data.get('telefone'), data.get('email'), data.get('endereco'),
-                data.get('cidade'), data.get('estado'), data.get('cep'),
-                data.get('cnpj'), data.get('observacoes'), data.get('usuario_criacao_id')
-            ))
-            conn.commit()
-            return cursor.lastrowid
-        finally:
-            conn.close()
+        return self.execute_insert(query, (
+            data['codigo'], data['nome'], data.get('contato_nome'),
+            data.get('telefone'), data.get('email'), data.get('endereco'),
+            data.get('cidade'), data.get('estado'), data.get('cep'),
+            data.get('cnpj'), data.get('observacoes'), data.get('usuario_criacao_id')
+        ))
     
     def update(self, fornecedor_id: int, data: Dict[str, Any]) -> bool:
         """Atualiza fornecedor"""
@@ -515,16 +820,21 @@ class FornecedorModel(BaseModel):
         """Remove fornecedor (soft delete)"""
         return self.toggle_ativo(fornecedor_id)
     
-    def search(self, termo: str) -> List[Dict[str, Any]]:
-        """Busca fornecedores por termo"""
+    def search(self, termo: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Busca fornecedores por termo no índice FTS5 (mais relevantes primeiro).
+        
+        Considera nome, código, contato, email e CNPJ (com ou sem pontuação).
+        """
+        match = fts_query(termo)
+        if match is None:
+            return self.get_all()[:limit]
+        
         query = """
-            SELECT * FROM fornecedores 
-            WHERE (nome LIKE ? OR codigo LIKE ? OR contato_nome LIKE ? OR email LIKE ?) 
-            AND ativo = 1
-            ORDER BY nome
+            SELECT f.* FROM fornecedores_fts
+            JOIN fornecedores f ON f.id = fornecedores_fts.rowid
+            WHERE fornecedores_fts MATCH ? AND f.ativo = 1
         """
-        termo_like = f"%{termo}%"
-        rows = self.execute_query(query, (termo_like, termo_like, termo_like, termo_like))
+        rows = ranked_search(self.execute_query, 'fornecedores_fts', 'nome', match, query, (), limit)
         return [dict(row) for row in rows]
 
 # Instâncias dos modelos
@@ -0,0 +1,269 @@
+"""
+Motor de movimentações de estoque (baixa/entrada, registro e auditoria em uma transação)
+"""
+
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+from .models import brinde_model, movimentacao_model
+from .schema import db_schema
+from ..utils.audit_logger import audit_logger
+from ..utils.validators import Validators, ValidationError
+
+# Limite de parâmetros por comando do SQLite (versões antigas: 999)
+SQL_PARAM_CHUNK = 900
+
+class MovementEngine:
+    """Aplica movimentações de estoque de forma atômica.
+
+    O ajuste do estoque é um UPDATE condicional
+    (``quantidade = quantidade ± ? WHERE quantidade >= ?``), então não há
+    leitura prévia do saldo nem atualização perdida entre usuários
+    concorrentes. Estoque, movimentação e auditoria são gravados na mesma
+    transação: um único commit por movimentação.
+    """
+
+    def __init__(self):
+        """Inicializa o motor"""
+        self.db = db_schema
+
+    @staticmethod
+    def stock_delta(tipo: str, quantidade: int) -> int:
+        """Variação de estoque causada por uma movimentação"""
+        if 'entrada' in tipo:
+            return quantidade
+        if 'saida' in tipo:
+            return -quantidade
+        raise ValueError(f"Tipo de movimentação inválido: {tipo}")
+
+    def apply_stock(self, conn: sqlite3.Connection, brinde_id: int, delta: int):
+        """Ajusta o estoque dentro da transação de conn"""
+        if brinde_model.adjust_quantidade(brinde_id, delta, conn=conn):
+            return
+
+        # Nenhuma linha alterada: brinde inexistente ou saldo insuficiente
+        if not brinde_model.exists(brinde_id, conn=conn):
+            raise ValueError(f"Brinde {brinde_id} não encontrado")
+        raise ValueError("Estoque insuficiente")
+
+    def register(self, data_insert: Dict[str, Any],
+                 movimentacao_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Ajusta o estoque, grava a movimentação e a auditoria em uma transação.
+
+        ``data_insert`` traz as colunas da tabela movimentacoes (IDs já
+        resolvidos); ``movimentacao_data`` são os dados originais, usados no
+        retorno e na auditoria.
+        """
+        quantidade = int(data_insert['quantidade'])
+        if quantidade <= 0:
+            raise ValueError("Quantidade deve ser maior que zero")
+        data_insert = {**data_insert, 'quantidade': quantidade}
+        delta = self.stock_delta(data_insert['tipo'], quantidade)
+
+        with self.db.transaction() as conn:
+            self.apply_stock(conn, data_insert['brinde_id'], delta)
+            movimentacao_id = movimentacao_model.create(data_insert, conn=conn)
+
+            movimentacao_criada = {
+                'id': movimentacao_id,
+                'data_hora': datetime.now().isoformat(),
+                **(movimentacao_data if movimentacao_data is not None else data_insert)
+            }
+            audit_logger.audit_movimentacao_created(
+                movimentacao_criada, data_insert.get('usuario_id'), conn=conn
+            )
+
+        return movimentacao_criada
+
+    def _load_stock(self, conn: sqlite3.Connection, brinde_ids: List[int]) -> Dict[int, int]:
+        """Saldo atual dos brindes informados"""
+        saldos = {}
+        for i in range(0, len(brinde_ids), SQL_PARAM_CHUNK):
+            chunk = brinde_ids[i:i + SQL_PARAM_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT id, quantidade FROM brindes WHERE id IN ({placeholders})", chunk
+            ).fetchall()
+            saldos.update({row[0]: row[1] for row in rows})
+        return saldos
+
+    @staticmethod
+    def _validate_line(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Validação estrutural de uma linha do lote"""
+        Validators.validate_required(data.get('brinde_id'), 'Brinde')
+        Validators.validate_required(data.get('quantidade'), 'Quantidade')
+        quantidade = Validators.validate_positive_integer(data['quantidade'], 'Quantidade')
+        try:
+            MovementEngine.stock_delta(data.get('tipo') or '', quantidade)
+        except ValueError as e:
+            raise ValidationError(str(e))
+        if not data.get('usuario_id'):
+            raise ValidationError("O campo 'Usuário' é obrigatório")
+        return {**data, 'quantidade': quantidade}
+
+    def register_bulk(self, items: List[Dict[str, Any]], atomic: bool = True) -> List[Dict[str, Any]]:
+        """Registra um lote de movimentações em uma única transação.
+
+        Cada item tem o formato de ``data_insert`` de ``register``. O lote é
+        validado por inteiro (incluindo o saldo acumulado de cada brinde, na
+        ordem das linhas) antes de qualquer gravação. Com ``atomic=True``
+        qualquer linha inválida cancela o lote; com ``atomic=False`` apenas
+        as linhas válidas são gravadas.
+
+        Retorna um resultado por linha:
+        ``{'linha', 'sucesso', 'id', 'brinde_id', 'erro'}``.
+        """
+        resultados = [
+            {'linha': i, 'sucesso': False, 'id': None,
+             'brinde_id': item.get('brinde_id'), 'erro': None}
+            for i, item in enumerate(items)
+        ]
+
+        validos = []
+        for i, item in enumerate(items):
+            try:
+                validos.append((i, self._validate_line(item)))
+            except (ValidationError, ValueError, TypeError) as e:
+                resultados[i]['erro'] = str(e)
+
+        if not validos or (atomic and len(validos) < len(items)):
+            return self._cancel_remaining(resultados)
+
+        with self.db.transaction() as conn:
+            # Simular os saldos na ordem das linhas (o lock de escrita da
+            # transação garante que não mudam até o commit)
+            saldos = self._load_stock(conn, sorted({d['brinde_id'] for _, d in validos}))
+            aceitos = []
+            for i, data in validos:
+                brinde_id = data['brinde_id']
+                if brinde_id not in saldos:
+                    resultados[i]['erro'] = f"Brinde {brinde_id} não encontrado"
+                    continue
+                novo_saldo = saldos[brinde_id] + self.stock_delta(data['tipo'], data['quantidade'])
+                if novo_saldo < 0:
+                    resultados[i]['erro'] = "Estoque insuficiente"
+                    continue
+                saldos[brinde_id] = novo_saldo
+                aceitos.append((i, data))
+
+            if not aceitos or (atomic and len(aceitos) < len(items)):
+                return self._cancel_remaining(resultados)
+
+            # Estoque: um UPDATE por brinde com a variação líquida do lote
+            variacoes: Dict[int, int] = {}
+            for _, data in aceitos:
+                delta = self.stock_delta(data['tipo'], data['quantidade'])
+                variacoes[data['brinde_id']] = variacoes.get(data['brinde_id'], 0) + delta
+
+            cursor = conn.executemany("""
+                UPDATE brindes 
+                SET quantidade = quantidade + ?, data_atualizacao = CURRENT_TIMESTAMP
+                WHERE id = ? AND quantidade >= ?
+            """, [(delta, brinde_id, max(-delta, 0)) for brinde_id, delta in variacoes.items()])
+            if cursor.rowcount != len(variacoes):
+                raise sqlite3.IntegrityError("Saldo alterado durante o lote")
+
+            # Movimentações: IDs consecutivos, pois a transação detém o lock de escrita
+            ultimo_id = conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence WHERE name = 'movimentacoes'"
+            ).fetchone()[0]
+            conn.executemany(
+                movimentacao_model.INSERT_QUERY,
+                [movimentacao_model.insert_params(data) for _, data in aceitos]
+            )
+            novo_ultimo_id = conn.execute(
+                "SELECT seq FROM sqlite_sequence WHERE name = 'movimentacoes'"
+            ).fetchone()[0]
+            if novo_ultimo_id != ultimo_id + len(aceitos):
+                raise sqlite3.IntegrityError("IDs de movimentação não sequenciais no lote")
+
+            data_hora = datetime.now().isoformat()
+            criadas = []
+            for offset, (i, data) in enumerate(aceitos, start=1):
+                resultados[i].update({'sucesso': True, 'id': ultimo_id + offset})
+                criadas.append({'id': ultimo_id + offset, 'data_hora': data_hora, **data})
+
+            audit_logger.audit_movimentacoes_bulk(criadas, conn=conn)
+
+        return resultados
+
+    def transfer(self, origem_id: int, filial_destino_id: int, quantidade: int,
+                 usuario_id: int, justificativa: Optional[str] = None) -> Dict[str, Any]:
+        """Transfere estoque de um brinde para outra filial em uma transação.
+
+        Baixa a origem, soma o estoque no brinde com a mesma descrição na
+        filial de destino (criando-o se necessário, via upsert) e grava as
+        movimentações ``transferencia_saida``/``transferencia_entrada`` e a
+        auditoria. Qualquer erro desfaz tudo.
+        """
+        quantidade = int(quantidade)
+        if quantidade <= 0:
+            raise ValueError("Quantidade deve ser maior que zero")
+
+        with self.db.transaction() as conn:
+            origem = conn.execute(
+                "SELECT * FROM brindes WHERE id = ? AND ativo = 1", (origem_id,)
+            ).fetchone()
+            if not origem:
+                raise ValueError(f"Brinde {origem_id} não encontrado")
+            origem = dict(origem)
+            filial_origem_id = origem['filial_id']
+            if filial_origem_id == filial_destino_id:
+                raise ValueError("A filial de destino deve ser diferente da filial de origem")
+
+            self.apply_stock(conn, origem_id, -quantidade)
+
+            # Localiza ou cria o brinde do destino em um único comando
+            # (índice único filial_id + descricao_norm)
+            destino_id, destino_criado = brinde_model.upsert_for_filial({
+                'descricao': origem['descricao'],
+                'categoria_id': origem['categoria_id'],
+                'quantidade': quantidade,
+                'valor_unitario': origem['valor_unitario'],
+                'unidade_medida_id': origem['unidade_medida_id'],
+                'filial_id': filial_destino_id,
+                'observacoes': origem.get('observacoes'),
+                'usuario_criacao_id': usuario_id
+            }, conn=conn)
+            if destino_criado:
+                audit_logger.audit_brinde_created(
+                    dict(conn.execute("SELECT * FROM brindes WHERE id = ?", (destino_id,)).fetchone()),
+                    usuario_id, conn=conn
+                )
+
+            comum = {
+                'quantidade': quantidade,
+                'filial_origem_id': filial_origem_id,
+                'filial_destino_id': filial_destino_id,
+                'usuario_id': usuario_id
+            }
+            saida = {**comum, 'brinde_id': origem_id, 'tipo': 'transferencia_saida',
+                     'justificativa': justificativa}
+            entrada = {**comum, 'brinde_id': destino_id, 'tipo': 'transferencia_entrada',
+                       'justificativa': justificativa or "Transferência recebida"}
+
+            data_hora = datetime.now().isoformat()
+            for movimentacao in (saida, entrada):
+                movimentacao['id'] = movimentacao_model.create(movimentacao, conn=conn)
+                movimentacao['data_hora'] = data_hora
+                audit_logger.audit_movimentacao_created(movimentacao, usuario_id, conn=conn)
+
+        return {
+            'brinde_origem_id': origem_id,
+            'brinde_destino_id': destino_id,
+            'brinde_destino_criado': destino_criado,
+            'quantidade': quantidade,
+            'movimentacao_saida_id': saida['id'],
+            'movimentacao_entrada_id': entrada['id']
+        }
+
+    @staticmethod
+    def _cancel_remaining(resultados: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Marca como canceladas as linhas válidas de um lote não gravado"""
+        for resultado in resultados:
+            if not resultado['erro']:
+                resultado['erro'] = "Lote cancelado: há linhas inválidas"
+        return resultados
+
+# Instância global do motor de movimentações
+movement_engine = MovementEngine()
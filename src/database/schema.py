@@ -4,8 +4,28 @@ Schema do banco de dados SQLite
 
 import sqlite3
 import os
+import atexit
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional
+from typing import Iterator, List, Optional
+from .connection_pool import ConnectionPool
+from .migrations import Migration, MigrationRunner, BackfillWorker
+from .storage_profile import StorageProfile, WalCheckpointScheduler
+from .change_log import create_change_log, create_configuracoes_triggers
+from .search_index import create_search_index, SEARCH_BACKFILLS
+from .stock_summary import create_stock_summary
+from .audit_partitions import create_audit_partitions
+from .audit_rollup import create_audit_rollup
+
+# Índices de versões anteriores removidos na atualização do banco
+OBSOLETE_INDEXES = (
+    'idx_brindes_codigo',
+    'idx_usuarios_username',
+    'idx_fornecedores_codigo',
+    'idx_fornecedores_ativo',
+    'idx_movimentacoes_brinde',
+    'idx_movimentacoes_tipo',
+)
 
 class DatabaseSchema:
     """Classe para gerenciar o schema do banco de dados"""
@@ -13,36 +33,67 @@ class DatabaseSchema:
     def __init__(self, db_path: str = "brindez.db"):
         """Inicializa o schema do banco"""
         self.db_path = db_path
+        self.migrator = MigrationRunner(self.schema_migrations())
         self.ensure_database_exists()
+        
+        # Perfil de armazenamento (WAL, cache, mmap...) salvo em configuracoes
+        self.storage_profile = self.load_storage_profile()
+        
+        # Pool de conexões reutilizadas pelos modelos
+        self.pool = ConnectionPool(self.db_path, pragmas=self.storage_profile.pragmas())
+        
+        # Checkpoint do WAL em segundo plano
+        self.checkpoint_scheduler = WalCheckpointScheduler(
+            self.pool,
+            threshold_pages=self.storage_profile['checkpoint_threshold'],
+            interval=self.storage_profile['checkpoint_interval']
+        )
+        if self.storage_profile.uses_wal:
+            self.checkpoint_scheduler.start()
+        
+        # Backfills das migrações, em lotes, com o banco já em uso
+        self.backfill_worker = BackfillWorker(self, self.migrator)
+        self.backfill_worker.start()
     
     def ensure_database_exists(self):
-        """Garante que o banco de dados existe e está atualizado"""
-        if not os.path.exists(self.db_path):
-            self.create_database()
-        else:
-            self.update_database_if_needed()
-    
-    def create_database(self):
-        """Cria o banco de dados com todas as tabelas"""
+        """Cria o banco ou aplica as migrações pendentes (PRAGMA user_version)"""
+        novo = not os.path.exists(self.db_path)
         conn = sqlite3.connect(self.db_path)
         try:
             # Habilitar foreign keys
             conn.execute("PRAGMA foreign_keys = ON")
-            
-            # Criar todas as tabelas
-            self.create_tables(conn)
-            
-            # Inserir dados iniciais
-            self.insert_initial_data(conn)
-            
-            conn.commit()
-            print(f"Banco de dados criado: {self.db_path}")
-            
+            aplicadas = self.migrator.migrate(conn)
         except Exception as e:
-            conn.rollback()
-            raise Exception(f"Erro ao criar banco de dados: {e}")
+            raise Exception(f"Erro ao migrar banco de dados: {e}")
         finally:
             conn.close()
+        
+        if novo:
+            print(f"Banco de dados criado: {self.db_path}")
+        elif aplicadas:
+            print(f"Banco de dados atualizado para a versão {aplicadas[-1]}")
+    
+    def schema_migrations(self) -> List[Migration]:
+        """Passos de migração do schema, em ordem de versão.
+        
+        Bancos anteriores ao controle de versão (user_version = 0) passam por
+        todos os passos: eles usam IF NOT EXISTS / INSERT OR IGNORE e preservam
+        os dados existentes. Novas alterações entram como novos passos.
+        """
+        def base(conn: sqlite3.Connection):
+            self.create_tables(conn)
+            self.insert_initial_data(conn)
+        
+        return [
+            Migration(1, "Tabelas, índices e dados iniciais", base),
+            Migration(2, "Descrição normalizada dos brindes", self.migrate_brindes_descricao_norm),
+            Migration(3, "Registro de alterações (change_log)", create_change_log),
+            Migration(4, "Índice de busca textual (FTS5)", create_search_index, SEARCH_BACKFILLS),
+            Migration(5, "Resumo do estoque (estoque_resumo)", create_stock_summary),
+            Migration(6, "Auditoria particionada por mês", create_audit_partitions),
+            Migration(7, "Resumo da auditoria (logs_auditoria_resumo)", create_audit_rollup),
+            Migration(8, "Registro de alterações das configurações", create_configuracoes_triggers)
+        ]
     
     def create_tables(self, conn: sqlite3.Connection):
         """Cria todas as tabelas do sistema"""
@@ -162,6 +213,7 @@ class DatabaseSchema:
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 codigo TEXT UNIQUE NOT NULL,
                 descricao TEXT NOT NULL,
+                descricao_norm TEXT,
                 categoria_id INTEGER NOT NULL,
                 quantidade INTEGER NOT NULL DEFAULT 0,
                 valor_unitario DECIMAL(10,2) NOT NULL DEFAULT 0.00,
@@ -221,20 +273,39 @@ class DatabaseSchema:
             )
         """)
         
-        # Índices para melhorar performance
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_fornecedores_codigo ON fornecedores (codigo)")
+        # Índices para melhorar performance. Os compostos seguem as consultas
+        # de models.py (filtro + ORDER BY) para evitar ordenação em B-tree
+        # temporária; os parciais (WHERE ativo = 1) ignoram registros excluídos.
+        # test_query_plans.py verifica o plano de cada consulta.
         conn.execute("CREATE INDEX IF NOT EXISTS idx_fornecedores_nome ON fornecedores (nome)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_fornecedores_ativo ON fornecedores (ativo)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_fornecedores_ativos_nome ON fornecedores (nome) WHERE ativo = 1")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_categorias_ativas_nome ON categorias (nome) WHERE ativo = 1")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_brindes_categoria ON brindes (categoria_id)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_brindes_filial ON brindes (filial_id)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_brindes_fornecedor ON brindes (fornecedor_id)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_brindes_codigo ON brindes (codigo)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_movimentacoes_brinde ON movimentacoes (brinde_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_brindes_ativos_codigo ON brindes (codigo) WHERE ativo = 1")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_brindes_ativos_filial ON brindes (filial_id, codigo) WHERE ativo = 1")
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_brindes_ativos_estoque
+            ON brindes (filial_id, quantidade, valor_unitario, ativo) WHERE ativo = 1
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_brindes_codigo_numerico
+            ON brindes (CAST(codigo AS INTEGER)) WHERE codigo GLOB '[0-9]*'
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_movimentacoes_brinde_data ON movimentacoes (brinde_id, data_hora)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_movimentacoes_data ON movimentacoes (data_hora)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_movimentacoes_tipo ON movimentacoes (tipo)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_usuarios_username ON usuarios (username)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_movimentacoes_tipo_data ON movimentacoes (tipo, data_hora)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_movimentacoes_filial_data ON movimentacoes (filial_origem_id, data_hora)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_movimentacoes_usuario_data ON movimentacoes (usuario_id, data_hora)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_usuarios_nome ON usuarios (nome)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_tabela ON logs_auditoria (tabela, registro_id)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_data ON logs_auditoria (data_hora)")
+        
+        # Índices substituídos pelos compostos acima ou que duplicavam o
+        # índice implícito de uma coluna UNIQUE
+        for indice in OBSOLETE_INDEXES:
+            conn.execute(f"DROP INDEX IF EXISTS {indice}")
     
     def insert_initial_data(self, conn: sqlite3.Connection):
         """Insere dados iniciais no banco"""
@@ -247,6 +318,9 @@ class DatabaseSchema:
             ('intervalo_backup', '24', 'Intervalo de backup em horas')
         ]
         
+        # Perfil de armazenamento padrão (journal WAL, cache, mmap...)
+        configuracoes_iniciais += StorageProfile().to_config_rows()
+        
         for chave, valor, descricao in configuracoes_iniciais:
             conn.execute("""
                 INSERT OR IGNORE INTO configuracoes (chave, valor, descricao)
@@ -322,76 +396,160 @@ class DatabaseSchema:
             VALUES ('admin', 'Administrador', 'admin@empresa.com', 1, 'Admin')
         """)
     
-    def update_database_if_needed(self):
-        """Atualiza o banco de dados se necessário"""
-        conn = sqlite3.connect(self.db_path)
-        try:
-            # Verificar se a tabela fornecedores existe
+    def migrate_brindes_descricao_norm(self, conn: sqlite3.Connection):
+        """Descrição normalizada dos brindes com índice único por filial.
+        
+        ``descricao_norm = lower(trim(descricao))`` é mantida por triggers e
+        indexada junto com filial_id (apenas brindes ativos), permitindo
+        localizar/criar o brinde de uma filial com ``INSERT ... ON CONFLICT``.
+        Observação: lower() do SQLite converte apenas caracteres ASCII.
+        """
+        colunas = {row[1] for row in conn.execute("PRAGMA table_info(brindes)")}
+        if 'descricao_norm' not in colunas:
+            conn.execute("ALTER TABLE brindes ADD COLUMN descricao_norm TEXT")
+        
+        # Backfill das linhas existentes
+        conn.execute("""
+            UPDATE brindes SET descricao_norm = lower(trim(descricao))
+            WHERE descricao_norm IS NULL
+        """)
+        
+        if conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_brindes_filial_descricao'"
+        ).fetchone() is None:
+            # Duplicados ativos já existentes recebem sufixo com o ID: o mais
+            # antigo continua sendo o brinde localizado pela descrição
             cursor = conn.execute("""
-                SELECT name FROM sqlite_master 
-                WHERE type='table' AND name='fornecedores'
+                UPDATE brindes SET descricao_norm = descricao_norm || '#' || id
+                WHERE ativo = 1 AND id NOT IN (
+                    SELECT MIN(id) FROM brindes WHERE ativo = 1
+                    GROUP BY filial_id, descricao_norm
+                )
             """)
+            if cursor.rowcount:
+                print(f"Brindes com descrição duplicada na mesma filial: {cursor.rowcount}")
             
-            if not cursor.fetchone():
-                print("Tabela fornecedores não encontrada. Recriando banco...")
-                conn.close()
-                # Fazer backup do banco atual
-                if os.path.exists(self.db_path):
-                    backup_path = f"{self.db_path}.backup"
-                    os.rename(self.db_path, backup_path)
-                    print(f"Backup criado: {backup_path}")
-                
-                # Recriar banco
-                self.create_database()
-                return
-            
-            # Garantir que todas as tabelas existem
-            self.create_tables(conn)
-            self.insert_initial_data(conn)
-            conn.commit()
-        except Exception as e:
-            print(f"Erro ao atualizar banco: {e}")
-            conn.rollback()
+            conn.execute("""
+                CREATE UNIQUE INDEX idx_brindes_filial_descricao
+                ON brindes (filial_id, descricao_norm) WHERE ativo = 1
+            """)
+        
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_brindes_descricao_norm_insert
+            AFTER INSERT ON brindes
+            WHEN NEW.descricao_norm IS NOT lower(trim(NEW.descricao))
+            BEGIN
+                UPDATE brindes SET descricao_norm = lower(trim(NEW.descricao)) WHERE id = NEW.id;
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_brindes_descricao_norm_update
+            AFTER UPDATE OF descricao ON brindes
+            BEGIN
+                UPDATE brindes SET descricao_norm = lower(trim(NEW.descricao)) WHERE id = NEW.id;
+            END
+        """)
+    
+    def load_storage_profile(self) -> StorageProfile:
+        """Lê o perfil de armazenamento da tabela configuracoes"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            profile = StorageProfile.load(conn)
+            # O modo de journal é persistente no arquivo: definir já na
+            # carga evita disputar o lock na primeira conexão do pool
+            conn.execute(f"PRAGMA journal_mode = {profile['journal_mode']}")
+            return profile
         finally:
-            if not conn.in_transaction:
-                conn.close()
+            conn.close()
     
-    def migrate_to_v1_0(self, conn: sqlite3.Connection):
-        """Migração para versão 1.0"""
-        # Implementar migrações futuras aqui
-        pass
+    def reload_storage_profile(self):
+        """Recarrega o perfil e o aplica às conexões do pool"""
+        self.storage_profile = self.load_storage_profile()
+        self.pool.set_pragmas(self.storage_profile.pragmas())
+        
+        self.checkpoint_scheduler.threshold_pages = self.storage_profile['checkpoint_threshold']
+        self.checkpoint_scheduler.interval = self.storage_profile['checkpoint_interval']
+        if self.storage_profile.uses_wal:
+            self.checkpoint_scheduler.start()
+        else:
+            self.checkpoint_scheduler.stop()
     
     def get_connection(self) -> sqlite3.Connection:
-        """Retorna uma conexão com o banco de dados"""
+        """Retorna uma conexão avulsa com o banco de dados (o chamador deve fechá-la)"""
         conn = sqlite3.connect(self.db_path)
         conn.execute("PRAGMA foreign_keys = ON")
         conn.row_factory = sqlite3.Row  # Para acessar colunas por nome
         return conn
     
+    def get_pooled_connection(self) -> sqlite3.Connection:
+        """Retorna a conexão reutilizável da thread atual (não deve ser fechada)"""
+        return self.pool.get_connection()
+    
     def execute_query(self, query: str, params: tuple = None) -> list:
         """Executa uma query SELECT e retorna os resultados"""
-        conn = self.get_connection()
-        try:
-            if params:
-                cursor = conn.execute(query, params)
-            else:
-                cursor = conn.execute(query)
-            return cursor.fetchall()
-        finally:
-            conn.close()
+        conn = self.pool.get_connection()
+        if params:
+            cursor = conn.execute(query, params)
+        else:
+            cursor = conn.execute(query)
+        return cursor.fetchall()
     
     def execute_update(self, query: str, params: tuple = None) -> int:
         """Executa uma query UPDATE/INSERT/DELETE e retorna o número de linhas afetadas"""
-        conn = self.get_connection()
+        return self._execute_write(query, params).rowcount
+    
+    def execute_insert(self, query: str, params: tuple = None) -> int:
+        """Executa um INSERT e retorna o ID da linha criada"""
+        return self._execute_write(query, params).lastrowid
+    
+    def _execute_write(self, query: str, params: tuple = None) -> sqlite3.Cursor:
+        """Executa um comando de escrita e confirma a transação"""
+        conn = self.pool.get_connection()
         try:
             if params:
                 cursor = conn.execute(query, params)
             else:
                 cursor = conn.execute(query)
             conn.commit()
-            return cursor.rowcount
-        finally:
-            conn.close()
+            return cursor
+        except Exception:
+            # A conexão é reutilizada: não deixar transação pendente
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+    
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Abre uma transação de escrita na conexão da thread atual.
+        
+        Usa BEGIN IMMEDIATE para reservar o lock de escrita já no início,
+        evitando deadlock entre leitura e escrita concorrentes. Se já houver
+        uma transação aberta nesta thread, os comandos participam dela.
+        """
+        conn = self.pool.get_connection()
+        if conn.in_transaction:
+            yield conn
+            return
+        
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+    
+    def close(self):
+        """Para as threads em segundo plano e fecha todas as conexões do pool"""
+        self.backfill_worker.stop()
+        self.checkpoint_scheduler.stop()
+        if self.storage_profile.uses_wal and not self.pool.is_closed:
+            try:
+                # Incorporar o WAL ao banco antes de sair
+                self.checkpoint_scheduler.checkpoint(mode='TRUNCATE')
+            except Exception as e:
+                print(f"Erro no checkpoint final do WAL: {e}")
+        self.pool.close_all()
     
     def backup_database(self, backup_path: Optional[str] = None) -> str:
         """Cria um backup do banco de dados"""
@@ -411,3 +569,4 @@ class DatabaseSchema:
 
 # Instância global do schema
 db_schema = DatabaseSchema()
+atexit.register(db_schema.close)
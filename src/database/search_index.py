@@ -0,0 +1,140 @@
+"""
+Índice de busca textual (FTS5) de brindes e fornecedores mantido por triggers
+"""
+
+import re
+import sqlite3
+from typing import Any, Callable, List, Optional, Sequence
+from .migrations import Backfill
+
+# Sem acentos e sem diferenciar maiúsculas; prefixos de 2 e 3 letras indexados
+TOKENIZE = "unicode61 remove_diacritics 2"
+PREFIX = "2 3"
+
+# Pesos do bm25 por coluna (na ordem das colunas de cada tabela)
+BRINDES_RANK = "bm25(10.0, 5.0, 1.0, 2.0)"
+FORNECEDORES_RANK = "bm25(10.0, 5.0, 3.0, 2.0, 2.0)"
+
+# Acima disso o bm25 (calculado para cada linha encontrada) custa mais que a
+# própria busca: termos amplos, como as primeiras letras digitadas
+RANK_LIMIT = 1000
+
+# Linha do índice a partir de uma linha de brindes ({ref} = NEW ou b)
+_BRINDE_COLUNAS = """
+    {ref}.id, {ref}.descricao, {ref}.codigo, COALESCE({ref}.observacoes, ''),
+    COALESCE((SELECT nome FROM categorias WHERE id = {ref}.categoria_id), '')
+"""
+
+# CNPJ indexado também só com os dígitos (12.345.678/0001-90 -> 12345678000190)
+_FORNECEDOR_COLUNAS = """
+    {ref}.id, {ref}.nome, {ref}.codigo, COALESCE({ref}.contato_nome, ''),
+    COALESCE({ref}.email, ''),
+    COALESCE({ref}.cnpj || ' ' || replace(replace(replace({ref}.cnpj, '.', ''), '/', ''), '-', ''), '')
+"""
+
+_BRINDES_INSERT = "INSERT OR REPLACE INTO brindes_fts (rowid, descricao, codigo, observacoes, categoria)"
+_FORNECEDORES_INSERT = "INSERT OR REPLACE INTO fornecedores_fts (rowid, nome, codigo, contato_nome, email, cnpj)"
+
+# Preenchimento das linhas já existentes, em lotes (ver migrations.Backfill)
+SEARCH_BACKFILLS = [
+    Backfill("brindes_fts", "brindes", f"""
+        {_BRINDES_INSERT}
+        SELECT {_BRINDE_COLUNAS.format(ref='b')} FROM brindes b
+        WHERE b.ativo = 1 AND b.id > ? AND b.id <= ?
+    """, batch_size=2000),
+    Backfill("fornecedores_fts", "fornecedores", f"""
+        {_FORNECEDORES_INSERT}
+        SELECT {_FORNECEDOR_COLUNAS.format(ref='f')} FROM fornecedores f
+        WHERE f.ativo = 1 AND f.id > ? AND f.id <= ?
+    """, batch_size=2000)
+]
+
+def create_search_index(conn: sqlite3.Connection):
+    """Cria as tabelas FTS5 (somente registros ativos) e os triggers que as mantêm"""
+    conn.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS brindes_fts USING fts5(
+            descricao, codigo, observacoes, categoria,
+            tokenize = '{TOKENIZE}', prefix = '{PREFIX}'
+        )
+    """)
+    conn.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS fornecedores_fts USING fts5(
+            nome, codigo, contato_nome, email, cnpj,
+            tokenize = '{TOKENIZE}', prefix = '{PREFIX}'
+        )
+    """)
+    # Função de ordenação padrão (ORDER BY rank) gravada na própria tabela
+    conn.execute(f"INSERT INTO brindes_fts (brindes_fts, rank) VALUES ('rank', '{BRINDES_RANK}')")
+    conn.execute(f"INSERT INTO fornecedores_fts (fornecedores_fts, rank) VALUES ('rank', '{FORNECEDORES_RANK}')")
+
+    for tabela, insert, colunas, campos in (
+        ('brindes', _BRINDES_INSERT, _BRINDE_COLUNAS, 'descricao, codigo, observacoes, categoria_id, ativo'),
+        ('fornecedores', _FORNECEDORES_INSERT, _FORNECEDOR_COLUNAS, 'nome, codigo, contato_nome, email, cnpj, ativo')
+    ):
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{tabela}_fts_insert
+            AFTER INSERT ON {tabela}
+            WHEN NEW.ativo = 1
+            BEGIN
+                {insert} SELECT {colunas.format(ref='NEW')};
+            END
+        """)
+        # Só as colunas indexadas: alterações de estoque não tocam no índice
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{tabela}_fts_update
+            AFTER UPDATE OF {campos} ON {tabela}
+            BEGIN
+                DELETE FROM {tabela}_fts WHERE rowid = OLD.id;
+                {insert} SELECT {colunas.format(ref='NEW')} WHERE NEW.ativo = 1;
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{tabela}_fts_delete
+            AFTER DELETE ON {tabela}
+            BEGIN
+                DELETE FROM {tabela}_fts WHERE rowid = OLD.id;
+            END
+        """)
+
+    # Nome da categoria faz parte do índice dos brindes
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_categorias_fts_nome
+        AFTER UPDATE OF nome ON categorias
+        BEGIN
+            UPDATE brindes_fts SET categoria = NEW.nome
+            WHERE rowid IN (SELECT id FROM brindes WHERE categoria_id = NEW.id AND ativo = 1);
+        END
+    """)
+
+def fts_query(termo: Optional[str]) -> Optional[str]:
+    """Converte o texto digitado em consulta FTS5: todas as palavras, como prefixo.
+
+    "can azul" -> '"can"* "azul"*'. Pontuação separa palavras, como no
+    tokenizador; retorna None se não houver nenhuma palavra.
+    """
+    palavras = re.findall(r"\w+", termo or "")
+    if not palavras:
+        return None
+    return " ".join(f'"{palavra}"*' for palavra in palavras)
+
+def ranked_search(execute_query: Callable[..., List[Any]], tabela: str, coluna_principal: str,
+                  match: str, select_sql: str, params: Sequence[Any], limit: int) -> List[Any]:
+    """Executa ``select_sql`` (cujo primeiro parâmetro é o MATCH) e retorna até ``limit`` linhas.
+
+    Com até RANK_LIMIT linhas encontradas a ordem é a do bm25 (``rank``).
+    Acima disso, vêm primeiro as que casam na coluna principal, na ordem do
+    índice, completadas pelas demais: o custo fica proporcional a ``limit``.
+    """
+    encontradas = execute_query(
+        f"SELECT COUNT(*) FROM (SELECT 1 FROM {tabela} WHERE {tabela} MATCH ? LIMIT ?)",
+        (match, RANK_LIMIT + 1)
+    )[0][0]
+    if encontradas <= RANK_LIMIT:
+        return execute_query(f"{select_sql} ORDER BY {tabela}.rank LIMIT ?", (match, *params, limit))
+
+    linhas = execute_query(f"{select_sql} LIMIT ?", (f"{coluna_principal} : ({match})", *params, limit))
+    if len(linhas) < limit:
+        ids = {linha['id'] for linha in linhas}
+        demais = execute_query(f"{select_sql} LIMIT ?", (match, *params, limit + len(linhas)))
+        linhas += [linha for linha in demais if linha['id'] not in ids][:limit - len(linhas)]
+    return linhas
@@ -0,0 +1,209 @@
+"""
+Resumo do estoque (estoque_resumo) por descrição × filial e categoria × filial mantido por triggers
+"""
+
+import sqlite3
+import sys
+from typing import Any, Dict, List, Tuple
+
+# Grupo -> chave a partir de uma linha de brindes ({ref} = NEW, OLD ou b).
+# A descrição usa a mesma normalização de descricao_norm (lower/trim do SQLite)
+GRUPOS = {
+    'descricao': "lower(trim({ref}.descricao))",
+    'categoria': "CAST({ref}.categoria_id AS TEXT)"
+}
+
+# Colunas de brindes que alteram o resumo
+COLUNAS = ('descricao', 'categoria_id', 'filial_id', 'quantidade', 'valor_unitario', 'ativo')
+
+# Diferença de valor tolerada na verificação (somas de REAL acumulam arredondamento)
+TOLERANCIA_VALOR = 0.005
+
+def _somar(ref: str, sinal: int) -> str:
+    """Comandos que somam (sinal 1) ou subtraem (sinal -1) uma linha de brindes nos dois grupos"""
+    return "".join(f"""
+        INSERT INTO estoque_resumo (grupo, chave, filial_id, itens, quantidade, valor_total)
+        VALUES ('{grupo}', {chave.format(ref=ref)}, {ref}.filial_id, {sinal},
+                {sinal} * {ref}.quantidade, {sinal} * {ref}.quantidade * {ref}.valor_unitario)
+        ON CONFLICT (grupo, chave, filial_id) DO UPDATE SET
+            itens = itens + excluded.itens,
+            quantidade = quantidade + excluded.quantidade,
+            valor_total = valor_total + excluded.valor_total;""" for grupo, chave in GRUPOS.items())
+
+def _remover_vazios(ref: str) -> str:
+    """Remove os grupos da linha que ficaram sem brindes ativos"""
+    return "".join(f"""
+        DELETE FROM estoque_resumo
+        WHERE grupo = '{grupo}' AND chave = {chave.format(ref=ref)}
+          AND filial_id = {ref}.filial_id AND itens <= 0;""" for grupo, chave in GRUPOS.items())
+
+# Linha continua ativa e nos mesmos grupos (caso comum: só quantidade/valor mudam)
+_MESMOS_GRUPOS = " AND ".join(
+    ["OLD.ativo = 1", "NEW.ativo = 1", "OLD.filial_id IS NEW.filial_id"]
+    + [f"{chave.format(ref='OLD')} IS {chave.format(ref='NEW')}" for chave in GRUPOS.values()]
+)
+
+class _transacao:
+    """Usa a transação aberta pelo chamador ou abre uma (commit/rollback ao sair)"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.propria = False
+
+    def __enter__(self):
+        if not self.conn.in_transaction:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.propria = True
+        return self.conn
+
+    def __exit__(self, tipo, valor, traceback):
+        if self.propria:
+            if tipo is None:
+                self.conn.commit()
+            else:
+                self.conn.rollback()
+        return False
+
+def create_stock_summary(conn: sqlite3.Connection):
+    """Cria a tabela estoque_resumo, os triggers que a mantêm e a preenche"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS estoque_resumo (
+            grupo TEXT NOT NULL,
+            chave TEXT NOT NULL,
+            filial_id INTEGER NOT NULL,
+            itens INTEGER NOT NULL DEFAULT 0,
+            quantidade INTEGER NOT NULL DEFAULT 0,
+            valor_total REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (grupo, chave, filial_id)
+        ) WITHOUT ROWID
+    """)
+
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_estoque_resumo_insert
+        AFTER INSERT ON brindes
+        WHEN NEW.ativo = 1
+        BEGIN{_somar('NEW', 1)}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_estoque_resumo_delete
+        AFTER DELETE ON brindes
+        WHEN OLD.ativo = 1
+        BEGIN{_somar('OLD', -1)}{_remover_vazios('OLD')}
+        END
+    """)
+
+    colunas = ", ".join(COLUNAS)
+    # Entradas e saídas de estoque: só a diferença, direto pela chave primária
+    delta = "".join(f"""
+            UPDATE estoque_resumo SET
+                quantidade = quantidade + NEW.quantidade - OLD.quantidade,
+                valor_total = valor_total + NEW.quantidade * NEW.valor_unitario
+                                          - OLD.quantidade * OLD.valor_unitario
+            WHERE grupo = '{grupo}' AND chave = {chave.format(ref='NEW')} AND filial_id = NEW.filial_id;"""
+        for grupo, chave in GRUPOS.items())
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_estoque_resumo_update
+        AFTER UPDATE OF {colunas} ON brindes
+        WHEN {_MESMOS_GRUPOS}
+        BEGIN{delta}
+        END
+    """)
+    # Mudança de grupo, filial ou ativação: sai dos grupos antigos e entra nos novos
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_estoque_resumo_update_old
+        AFTER UPDATE OF {colunas} ON brindes
+        WHEN OLD.ativo = 1 AND NOT ({_MESMOS_GRUPOS})
+        BEGIN{_somar('OLD', -1)}{_remover_vazios('OLD')}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_estoque_resumo_update_new
+        AFTER UPDATE OF {colunas} ON brindes
+        WHEN NEW.ativo = 1 AND NOT ({_MESMOS_GRUPOS})
+        BEGIN{_somar('NEW', 1)}
+        END
+    """)
+
+    rebuild_stock_summary(conn)
+
+def _agregado_sql() -> str:
+    """Resumo calculado direto dos brindes ativos (grupo, chave, filial, itens, quantidade, valor)"""
+    return " UNION ALL ".join(f"""
+        SELECT '{grupo}', {chave.format(ref='b')}, b.filial_id, COUNT(*),
+               COALESCE(SUM(b.quantidade), 0), COALESCE(SUM(b.quantidade * b.valor_unitario), 0)
+        FROM brindes b
+        WHERE b.ativo = 1
+        GROUP BY {chave.format(ref='b')}, b.filial_id""" for grupo, chave in GRUPOS.items())
+
+def rebuild_stock_summary(conn: sqlite3.Connection) -> int:
+    """Recalcula o resumo inteiro a partir dos brindes; retorna o número de grupos.
+
+    Roda na transação corrente (ou em uma própria, se não houver).
+    """
+    with _transacao(conn):
+        conn.execute("DELETE FROM estoque_resumo")
+        conn.execute(f"""
+            INSERT INTO estoque_resumo (grupo, chave, filial_id, itens, quantidade, valor_total)
+            {_agregado_sql()}
+        """)
+        return conn.execute("SELECT COUNT(*) FROM estoque_resumo").fetchone()[0]
+
+def verify_stock_summary(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+    """Compara o resumo com o recálculo a partir dos brindes; retorna as divergências"""
+    def carregar(sql: str) -> Dict[Tuple[str, str, int], Tuple[int, int, float]]:
+        return {(row[0], row[1], row[2]): (row[3], row[4], row[5]) for row in conn.execute(sql)}
+
+    esperado = carregar(_agregado_sql())
+    atual = carregar("""
+        SELECT grupo, chave, filial_id, itens, quantidade, valor_total FROM estoque_resumo
+    """)
+
+    divergencias = []
+    for chave in sorted(esperado.keys() | atual.keys(), key=lambda k: (k[0], k[1], k[2])):
+        valores_esperados = esperado.get(chave, (0, 0, 0.0))
+        valores_atuais = atual.get(chave, (0, 0, 0.0))
+        if (valores_esperados[:2] != valores_atuais[:2]
+                or abs(valores_esperados[2] - valores_atuais[2]) > TOLERANCIA_VALOR):
+            divergencias.append({
+                'grupo': chave[0], 'chave': chave[1], 'filial_id': chave[2],
+                'esperado': valores_esperados, 'atual': valores_atuais
+            })
+    return divergencias
+
+def main(argv: List[str]) -> int:
+    """Linha de comando: verificar ou reconstruir o resumo de um banco"""
+    if not argv or argv[0] not in ('verificar', 'reconstruir'):
+        print("Uso: python -m src.database.stock_summary verificar|reconstruir [caminho.db]")
+        return 2
+    comando = argv[0]
+    db_path = argv[1] if len(argv) > 1 else "brindez.db"
+
+    conn = sqlite3.connect(db_path)
+    try:
+        existe = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'estoque_resumo'"
+        ).fetchone()
+        if not existe:
+            print(f"{db_path}: tabela estoque_resumo não existe (abra o sistema para migrar o banco)")
+            return 1
+
+        if comando == 'reconstruir':
+            grupos = rebuild_stock_summary(conn)
+            print(f"Resumo do estoque reconstruído: {grupos} grupos")
+            return 0
+
+        divergencias = verify_stock_summary(conn)
+        for d in divergencias:
+            print(f"  {d['grupo']} '{d['chave']}' filial {d['filial_id']}: "
+                  f"esperado {d['esperado']}, atual {d['atual']}")
+        if divergencias:
+            print(f"{len(divergencias)} divergência(s) — use 'reconstruir' para corrigir")
+            return 1
+        print("Resumo do estoque consistente")
+        return 0
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
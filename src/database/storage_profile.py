@@ -0,0 +1,198 @@
+"""
+Perfil de armazenamento do SQLite (journal WAL, PRAGMAs e checkpoints)
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+# Valores padrão do perfil, persistidos na tabela configuracoes com o
+# prefixo "storage_" (ex.: storage_journal_mode)
+DEFAULT_PROFILE: Dict[str, Any] = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -16000,          # Negativo = KiB (16 MB)
+    'mmap_size': 268435456,        # 256 MB
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,          # ms
+    'wal_autocheckpoint': 4000,    # Páginas (proteção caso o agendador pare)
+    'checkpoint_threshold': 1000,  # Páginas no WAL para disparar checkpoint
+    'checkpoint_interval': 30      # Segundos entre verificações
+}
+
+PROFILE_DESCRIPTIONS: Dict[str, str] = {
+    'journal_mode': 'Modo de journal do SQLite (WAL permite leituras durante escritas)',
+    'synchronous': 'Nível de sincronização em disco (OFF, NORMAL, FULL, EXTRA)',
+    'cache_size': 'Cache de páginas por conexão (negativo = KiB)',
+    'mmap_size': 'Tamanho máximo de memória mapeada em bytes',
+    'temp_store': 'Local das tabelas temporárias (DEFAULT, FILE, MEMORY)',
+    'busy_timeout': 'Tempo de espera por locks em milissegundos',
+    'wal_autocheckpoint': 'Checkpoint automático do SQLite em páginas (0 desativa)',
+    'checkpoint_threshold': 'Páginas no WAL para o checkpoint em segundo plano',
+    'checkpoint_interval': 'Intervalo em segundos do checkpoint em segundo plano'
+}
+
+CONFIG_PREFIX = 'storage_'
+
+_ALLOWED_VALUES = {
+    'journal_mode': {'WAL', 'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY'},
+    'synchronous': {'OFF', 'NORMAL', 'FULL', 'EXTRA'},
+    'temp_store': {'DEFAULT', 'FILE', 'MEMORY'}
+}
+
+# Ordem importa: journal_mode antes dos demais
+_PRAGMA_KEYS = ['journal_mode', 'synchronous', 'cache_size', 'mmap_size',
+                'temp_store', 'busy_timeout', 'wal_autocheckpoint']
+
+class StorageProfile:
+    """Conjunto de PRAGMAs aplicados em todas as conexões do pool"""
+
+    def __init__(self, values: Optional[Dict[str, Any]] = None):
+        """Inicializa o perfil, validando os valores informados"""
+        self.values = dict(DEFAULT_PROFILE)
+        for chave, valor in (values or {}).items():
+            if chave in DEFAULT_PROFILE:
+                self.values[chave] = self.normalize_value(chave, valor)
+
+    @staticmethod
+    def normalize_value(chave: str, valor: Any) -> Any:
+        """Valida um valor do perfil (os PRAGMAs não aceitam parâmetros)"""
+        if chave in _ALLOWED_VALUES:
+            valor = str(valor).strip().upper()
+            if valor not in _ALLOWED_VALUES[chave]:
+                raise ValueError(f"Valor inválido para {chave}: {valor}")
+            return valor
+
+        try:
+            return int(str(valor).strip())
+        except ValueError:
+            raise ValueError(f"Valor inválido para {chave}: {valor}")
+
+    def __getitem__(self, chave: str) -> Any:
+        return self.values[chave]
+
+    @property
+    def uses_wal(self) -> bool:
+        """Indica se o perfil usa journal WAL"""
+        return self.values['journal_mode'] == 'WAL'
+
+    def pragmas(self) -> List[Tuple[str, str]]:
+        """Lista de PRAGMAs a aplicar em cada conexão"""
+        pragmas = [('foreign_keys', 'ON')]
+        for chave in _PRAGMA_KEYS:
+            if chave == 'wal_autocheckpoint' and not self.uses_wal:
+                continue
+            pragmas.append((chave, str(self.values[chave])))
+        return pragmas
+
+    def to_config_rows(self) -> List[Tuple[str, str, str]]:
+        """Linhas (chave, valor, descrição) para a tabela configuracoes"""
+        return [
+            (f"{CONFIG_PREFIX}{chave}", str(valor), PROFILE_DESCRIPTIONS[chave])
+            for chave, valor in self.values.items()
+        ]
+
+    @classmethod
+    def load(cls, conn: sqlite3.Connection) -> 'StorageProfile':
+        """Carrega o perfil da tabela configuracoes (valores inválidos usam o padrão)"""
+        try:
+            rows = conn.execute(
+                "SELECT chave, valor FROM configuracoes WHERE chave LIKE ?",
+                (f"{CONFIG_PREFIX}%",)
+            ).fetchall()
+        except sqlite3.Error:
+            return cls()
+
+        values = {}
+        for chave, valor in rows:
+            nome = chave[len(CONFIG_PREFIX):]
+            if nome not in DEFAULT_PROFILE:
+                continue
+            try:
+                values[nome] = cls.normalize_value(nome, valor)
+            except ValueError as e:
+                print(f"Configuração de armazenamento ignorada: {e}")
+        return cls(values)
+
+class WalCheckpointScheduler:
+    """Executa checkpoints do WAL em segundo plano quando ele passa do limite.
+
+    Com isso o custo do checkpoint sai do commit das escritas (o
+    ``wal_autocheckpoint`` fica apenas como proteção).
+    """
+
+    def __init__(self, pool, threshold_pages: int, interval: float):
+        """Inicializa o agendador"""
+        self.pool = pool
+        self.threshold_pages = threshold_pages
+        self.interval = interval
+        self.wal_path = f"{pool.db_path}-wal"
+
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {
+            'checks': 0,
+            'checkpoints': 0,
+            'pages_checkpointed': 0,
+            'errors': 0
+        }
+
+    def start(self):
+        """Inicia a thread de checkpoint"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="WalCheckpoint", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Para a thread de checkpoint"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        """Laço principal da thread"""
+        try:
+            while not self._stop_event.wait(self.interval):
+                try:
+                    self.check()
+                except Exception as e:
+                    self.stats['errors'] += 1
+                    print(f"Erro no checkpoint do WAL: {e}")
+        finally:
+            self.pool.release()
+
+    def wal_pages(self, conn: sqlite3.Connection) -> int:
+        """Número aproximado de páginas no arquivo WAL"""
+        try:
+            tamanho = os.path.getsize(self.wal_path)
+        except OSError:
+            return 0
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        return tamanho // page_size if page_size else 0
+
+    def check(self) -> bool:
+        """Executa checkpoint se o WAL passou do limite; retorna se executou"""
+        self.stats['checks'] += 1
+        conn = self.pool.get_connection()
+        if self.wal_pages(conn) < self.threshold_pages:
+            return False
+
+        # PASSIVE copia as páginas sem bloquear; se tudo foi copiado, o
+        # TRUNCATE apenas zera o arquivo (o tamanho do WAL é o critério)
+        if self.checkpoint(conn):
+            self.checkpoint(conn, mode='TRUNCATE')
+        return True
+
+    def checkpoint(self, conn: Optional[sqlite3.Connection] = None, mode: str = 'PASSIVE') -> bool:
+        """Executa o checkpoint; retorna se todo o WAL foi copiado para o banco"""
+        if mode not in ('PASSIVE', 'FULL', 'RESTART', 'TRUNCATE'):
+            raise ValueError(f"Modo de checkpoint inválido: {mode}")
+        conn = conn or self.pool.get_connection()
+        busy, paginas_log, copiadas = conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+        self.stats['checkpoints'] += 1
+        self.stats['pages_checkpointed'] += max(copiadas, 0)
+        return not busy and paginas_log == copiadas
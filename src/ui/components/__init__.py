@@ -1,4 +1,5 @@
 from .form_dialog import FormDialog
 from .form_inline import FormInline
+from .virtual_table import VirtualTable, Column
 
-__all__ = ['FormDialog', 'FormInline']
\ No newline at end of file
+__all__ = ['FormDialog', 'FormInline', 'VirtualTable', 'Column']
\ No newline at end of file
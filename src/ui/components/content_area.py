@@ -41,7 +41,7 @@ class ContentArea:
             'dashboard': lambda: DashboardScreen(self.frame),
             'brindes': lambda: BrindesRefatoradoScreen(self.frame, user_manager),
             'estoque_brindes': lambda: EstoqueBrindesScreen(self.frame, user_manager),
-            'movimentacoes': lambda: MovimentacoesScreen(self.frame),
+            'movimentacoes': lambda: MovimentacoesScreen(self.frame, user_manager),
             'fornecedores': lambda: FornecedoresScreen(self.frame, user_manager),
             'relatorios': lambda: RelatoriosScreen(self.frame),
             'configuracoes': lambda: ConfiguracoesScreen(self.frame),
@@ -0,0 +1,121 @@
+"""
+Diálogo de exportação com progresso e cancelamento
+"""
+
+import customtkinter as ctk
+from datetime import datetime
+from tkinter import filedialog, messagebox
+from ...data.exporter import ExportJob, ExportCancelled, xlsx_available
+from ...utils.background import background_loader
+
+class ExportDialog:
+    """Escolhe o arquivo, executa o ExportJob em segundo plano e mostra o progresso.
+
+    A escrita roda no executor do ``background_loader``; a janela só lê
+    ``job.written``/``job.progress`` em um ``after`` periódico. Fechar a
+    janela ou clicar em Cancelar cancela a exportação.
+    """
+
+    POLL_MS = 150
+
+    def __init__(self, parent, view, filtros=None, nome_sugerido=None):
+        """Inicializa o diálogo (nada é exibido até ``show()``)"""
+        self.parent = parent
+        self.view = view
+        self.filtros = filtros or {}
+        self.nome_sugerido = nome_sugerido or view
+        self.job = None
+        self.dialog = None
+        self._after_id = None
+
+    def show(self):
+        """Pede o arquivo de destino e inicia a exportação"""
+        tipos = [("CSV (separado por ;)", "*.csv")]
+        if xlsx_available():
+            tipos.insert(0, ("Planilha Excel", "*.xlsx"))
+        path = filedialog.asksaveasfilename(
+            title="Exportar",
+            initialfile=f"{self.nome_sugerido}_{datetime.now():%Y%m%d_%H%M}",
+            defaultextension=tipos[0][1][1:],
+            filetypes=tipos + [("Todos os arquivos", "*.*")]
+        )
+        if not path:
+            return
+
+        try:
+            self.job = ExportJob(self.view, path, self.filtros)
+        except (ValueError, RuntimeError) as e:
+            messagebox.showerror("Erro", str(e))
+            return
+
+        self.create_window()
+        background_loader.submit(('exportar', id(self.job)), self.job.run,
+                                 on_done=self.on_done, on_error=self.on_error)
+        self._after_id = self.dialog.after(self.POLL_MS, self.update_progress)
+
+    def create_window(self):
+        """Janela com a barra de progresso e o botão Cancelar"""
+        self.dialog = ctk.CTkToplevel(self.parent)
+        self.dialog.title("Exportando")
+        self.dialog.geometry("420x160")
+        self.dialog.resizable(False, False)
+        self.dialog.transient(self.parent)
+
+        self.status_label = ctk.CTkLabel(self.dialog, text="Preparando exportação...")
+        self.status_label.pack(padx=20, pady=(20, 10))
+
+        self.progress_bar = ctk.CTkProgressBar(self.dialog, mode="indeterminate")
+        self.progress_bar.pack(fill="x", padx=20)
+        self.progress_bar.start()
+
+        self.cancel_button = ctk.CTkButton(self.dialog, text="Cancelar", command=self.cancel)
+        self.cancel_button.pack(pady=15)
+
+        self.dialog.protocol("WM_DELETE_WINDOW", self.cancel)
+
+    def update_progress(self):
+        """Atualiza a barra e o texto com o andamento da exportação"""
+        self._after_id = None
+        if self.job is None or not self.dialog or not self.dialog.winfo_exists():
+            return
+
+        progresso = self.job.progress
+        if progresso is not None:
+            if self.progress_bar.cget("mode") != "determinate":
+                self.progress_bar.stop()
+                self.progress_bar.configure(mode="determinate")
+            self.progress_bar.set(progresso)
+            texto = f"{self.job.written:,} de {self.job.total:,} linhas".replace(',', '.')
+        else:
+            texto = f"{self.job.written:,} linhas".replace(',', '.')
+        self.status_label.configure(text=texto)
+        self._after_id = self.dialog.after(self.POLL_MS, self.update_progress)
+
+    def cancel(self):
+        """Cancela a exportação (o arquivo parcial é removido)"""
+        if self.job is not None:
+            self.job.cancel()
+            self.status_label.configure(text="Cancelando...")
+            self.cancel_button.configure(state="disabled")
+
+    def close(self):
+        """Fecha a janela"""
+        if self._after_id is not None:
+            try:
+                self.dialog.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        if self.dialog is not None and self.dialog.winfo_exists():
+            self.dialog.destroy()
+
+    def on_done(self, linhas):
+        """Exportação concluída (thread da interface)"""
+        self.close()
+        messagebox.showinfo("Exportação concluída", f"{linhas} linhas exportadas para:\n{self.job.path}")
+
+    def on_error(self, error):
+        """Exportação cancelada ou com erro (thread da interface)"""
+        self.close()
+        if not isinstance(error, ExportCancelled):
+            messagebox.showerror("Erro", f"Erro ao exportar: {error}")
@@ -0,0 +1,300 @@
+"""
+Tabela virtualizada: conjunto fixo de linhas reaproveitadas a cada rolagem ou página
+"""
+
+import customtkinter as ctk
+from ...utils.table_model import Column, TableModel
+
+# Cores alternadas das linhas e da linha sob o mouse
+ROW_COLORS = (("gray90", "gray20"), ("white", "gray15"))
+HOVER_COLOR = ("#e3f2fd", "#2c3e50")
+
+# Linhas roladas por movimento da roda do mouse
+WHEEL_ROWS = 3
+
+class _PooledRow:
+    """Linha do pool: widgets criados uma única vez e o item vinculado no momento"""
+
+    __slots__ = ('position', 'frame', 'labels', 'texts', 'colors', 'background', 'item', 'visible')
+
+    def __init__(self, position, frame, labels):
+        self.position = position
+        self.frame = frame
+        self.labels = labels
+        # Último texto/cor aplicados: só chama configure() quando mudam
+        self.texts = [None] * len(labels)
+        self.colors = [None] * len(labels)
+        self.background = None
+        self.item = None
+        self.visible = False
+
+class VirtualTable:
+    """Tabela com um pool fixo de linhas (uma por linha visível).
+
+    Trocar de página, rolar, filtrar ou ordenar só atualiza o texto dos
+    widgets já existentes: nenhum widget é criado ou destruído depois da
+    montagem. Ordenação pelo clique no cabeçalho (``sortable``) e largura
+    das colunas por ``Column.width``/``weight`` ou ``set_column_width``.
+    """
+
+    def __init__(self, parent, columns, rows=15, actions=(), on_row_click=None,
+                 row_color=None, on_tooltip=None, on_tooltip_hide=None,
+                 on_view_change=None, sortable=True, font_size=12,
+                 row_colors=ROW_COLORS, empty_text="Nenhum item encontrado.",
+                 loading_text="⏳ Carregando..."):
+        """Inicializa a tabela.
+
+        ``actions``: lista de (texto, função(item), opções do CTkButton)
+        exibidos em uma coluna extra "Ações". ``row_color(item)`` pode
+        substituir a cor da linha (ex.: estoque baixo). ``on_tooltip(widget,
+        texto)`` é chamado sobre células abreviadas. ``on_view_change()`` é
+        chamado depois de cada mudança de janela (para a paginação).
+        """
+        self.model = TableModel(columns, rows)
+        self.columns = self.model.columns
+        self.actions = list(actions)
+        self.on_row_click = on_row_click
+        self.row_color = row_color
+        self.on_tooltip = on_tooltip
+        self.on_tooltip_hide = on_tooltip_hide
+        self.on_view_change = on_view_change
+        self.sortable = sortable
+        self.row_colors = row_colors
+        self.empty_text = empty_text
+        self.loading_text = loading_text
+        self.loading = False
+        self.font = ctk.CTkFont(size=font_size)
+        self.header_font = ctk.CTkFont(weight="bold")
+
+        self.frame = ctk.CTkFrame(parent)
+        self.frame.grid_columnconfigure(0, weight=1)
+        self.frame.grid_rowconfigure(1, weight=1)
+
+        self._create_header()
+        self._create_body(rows)
+
+    # --- Montagem (uma única vez) ---
+
+    def _configure_columns(self, widget):
+        """Aplica largura mínima e peso das colunas em uma grade"""
+        for i, column in enumerate(self.columns):
+            widget.grid_columnconfigure(i, minsize=column.width, weight=column.weight)
+        if self.actions:
+            widget.grid_columnconfigure(len(self.columns), minsize=40 * len(self.actions), weight=0)
+
+    def _create_header(self):
+        """Cria o cabeçalho (clicável para ordenar)"""
+        self.header_frame = ctk.CTkFrame(self.frame, fg_color=("gray80", "gray30"))
+        self.header_frame.grid(row=0, column=0, columnspan=2, sticky="ew")
+        self._configure_columns(self.header_frame)
+
+        self.header_labels = []
+        for i, column in enumerate(self.columns):
+            label = ctk.CTkLabel(self.header_frame, text=column.title, font=self.header_font,
+                                 anchor=column.anchor)
+            label.grid(row=0, column=i, padx=5, pady=10, sticky="ew")
+            if self.sortable and column.sortable:
+                label.bind("<Button-1>", lambda e, i=i: self.sort_by(i))
+            self.header_labels.append(label)
+
+        if self.actions:
+            label = ctk.CTkLabel(self.header_frame, text="Ações", font=self.header_font)
+            label.grid(row=0, column=len(self.columns), padx=5, pady=10, sticky="ew")
+
+    def _create_body(self, rows):
+        """Cria o pool de linhas, a barra de rolagem e o aviso de lista vazia"""
+        self.body = ctk.CTkFrame(self.frame, fg_color="transparent")
+        self.body.grid(row=1, column=0, sticky="nsew")
+        self.body.grid_columnconfigure(0, weight=1)
+
+        self.scrollbar = ctk.CTkScrollbar(self.frame, command=self._on_scrollbar)
+        self.scrollbar.grid(row=1, column=1, sticky="ns")
+
+        self.empty_label = ctk.CTkLabel(self.body, text=self.empty_text)
+
+        self.pool = [self._create_row(i) for i in range(rows)]
+        self._bind_wheel(self.body)
+
+    def _create_row(self, index):
+        """Cria os widgets de uma linha do pool"""
+        frame = ctk.CTkFrame(self.body, corner_radius=4)
+        self._configure_columns(frame)
+
+        labels = []
+        for col, column in enumerate(self.columns):
+            label = ctk.CTkLabel(frame, text="", anchor=column.anchor, font=self.font)
+            label.grid(row=0, column=col, padx=(10, 5) if col == 0 else 5, pady=4, sticky="ew")
+            labels.append(label)
+
+        row = _PooledRow(index, frame, labels)
+
+        if self.actions:
+            actions_frame = ctk.CTkFrame(frame, fg_color="transparent")
+            actions_frame.grid(row=0, column=len(self.columns), sticky="e", padx=5)
+            for text, callback, options in self.actions:
+                ctk.CTkButton(actions_frame, text=text, width=30,
+                              command=lambda r=row, c=callback: r.item is not None and c(r.item),
+                              **options).pack(side="left", padx=2)
+
+        # Eventos ligados uma vez; o item é lido da linha no momento do evento
+        for col, label in enumerate(labels):
+            if self.on_row_click:
+                label.bind("<Button-1>", lambda e, r=row: r.item is not None and self.on_row_click(r.item))
+            if self.on_tooltip:
+                label.bind("<Enter>", lambda e, r=row, c=col, w=label: self._show_tooltip(r, c, w), add="+")
+                label.bind("<Leave>", lambda e: self.on_tooltip_hide and self.on_tooltip_hide(), add="+")
+            self._bind_wheel(label)
+        frame.bind("<Enter>", lambda e, r=row: r.frame.configure(fg_color=HOVER_COLOR), add="+")
+        frame.bind("<Leave>", lambda e, r=row: r.frame.configure(fg_color=r.background), add="+")
+        self._bind_wheel(frame)
+        return row
+
+    def _bind_wheel(self, widget):
+        """Roda do mouse rola a tabela (e não a tela)"""
+        widget.bind("<MouseWheel>", lambda e: self._on_wheel(-1 if e.delta > 0 else 1))
+        widget.bind("<Button-4>", lambda e: self._on_wheel(-1))
+        widget.bind("<Button-5>", lambda e: self._on_wheel(1))
+
+    # --- Vinculação dos dados ---
+
+    def set_items(self, items, keep_position=False):
+        """Exibe novos itens (filtro/carga), mantendo a ordenação escolhida"""
+        if self.loading:
+            self.loading = False
+            self.empty_label.configure(text=self.empty_text)
+        self.model.set_items(items, keep_position)
+        self.refresh()
+
+    def set_loading(self):
+        """Indica carga em andamento até o próximo ``set_items``.
+
+        Se já há linhas exibidas elas continuam visíveis (sem piscar a
+        tabela); com a tabela vazia, o aviso de lista vazia vira o aviso de
+        carregamento.
+        """
+        self.loading = True
+        self.empty_label.configure(text=self.loading_text)
+        if not self.model.total:
+            self.empty_label.grid(row=0, column=0, pady=20)
+
+    def refresh(self):
+        """Vincula os itens da janela atual às linhas do pool"""
+        visible = self.model.visible()
+        offset = self.model.offset
+        for i, row in enumerate(self.pool):
+            if i < len(visible):
+                self._bind_row(row, visible[i], offset + i)
+            elif row.visible:
+                row.frame.grid_remove()
+                row.visible = False
+                row.item = None
+
+        if visible:
+            self.empty_label.grid_forget()
+        else:
+            self.empty_label.grid(row=0, column=0, pady=20)
+        self._update_scrollbar()
+        if self.on_view_change:
+            self.on_view_change()
+
+    def _bind_row(self, row, item, index):
+        """Atualiza os widgets de uma linha com o item"""
+        row.item = item
+        for col, column in enumerate(self.columns):
+            text = column.text(item)
+            if text != row.texts[col]:
+                row.labels[col].configure(text=text)
+                row.texts[col] = text
+            color = column.color(item) if column.color else None
+            if color != row.colors[col]:
+                row.labels[col].configure(text_color=color or ctk.ThemeManager.theme["CTkLabel"]["text_color"])
+                row.colors[col] = color
+
+        background = (self.row_color(item) if self.row_color else None) or self.row_colors[index % 2]
+        if background != row.background:
+            row.frame.configure(fg_color=background)
+            row.background = background
+        if not row.visible:
+            row.frame.grid(row=row.position, column=0, sticky="ew", padx=2, pady=1)
+            row.visible = True
+
+    def _show_tooltip(self, row, col, widget):
+        """Dica com o texto completo de células abreviadas"""
+        if row.item is None:
+            return
+        column = self.columns[col]
+        texto = column.full_text(row.item)
+        if texto != row.texts[col]:
+            self.on_tooltip(widget, texto)
+
+    # --- Navegação ---
+
+    def _update_scrollbar(self):
+        """Posiciona a barra de rolagem conforme a janela"""
+        total = self.model.total
+        if total <= self.model.page_size:
+            self.scrollbar.set(0.0, 1.0)
+            return
+        inicio = self.model.offset / total
+        self.scrollbar.set(inicio, min(1.0, inicio + self.model.page_size / total))
+
+    def _on_scrollbar(self, *args):
+        """Comandos da barra de rolagem (moveto/scroll)"""
+        if args[0] == "moveto":
+            mudou = self.model.scroll_to(round(float(args[1]) * self.model.total))
+        elif args[0] == "scroll":
+            passo = self.model.page_size if args[2] == "pages" else WHEEL_ROWS
+            mudou = self.model.scroll(passo if float(args[1]) > 0 else -passo)
+        else:
+            mudou = False
+        if mudou:
+            self.refresh()
+
+    def _on_wheel(self, direcao):
+        """Rolagem pela roda do mouse"""
+        if self.model.scroll(direcao * WHEEL_ROWS):
+            self.refresh()
+        return "break"
+
+    def go_to_page(self, page):
+        """Vai para a página"""
+        if self.model.go_to_page(page):
+            self.refresh()
+
+    @property
+    def page(self):
+        """Página atual"""
+        return self.model.page
+
+    @property
+    def pages(self):
+        """Total de páginas"""
+        return self.model.pages
+
+    def sort_by(self, column_index, descending=None):
+        """Ordena pela coluna; a seta no cabeçalho indica o sentido"""
+        self.model.sort_by(column_index, descending)
+        for i, (label, column) in enumerate(zip(self.header_labels, self.columns)):
+            seta = ""
+            if i == self.model.sort_column:
+                seta = " ▼" if self.model.sort_descending else " ▲"
+            label.configure(text=column.title + seta)
+        self.refresh()
+
+    # --- Colunas ---
+
+    def set_column_width(self, column_index, width):
+        """Altera a largura mínima de uma coluna no cabeçalho e em todas as linhas"""
+        self.columns[column_index].width = width
+        for widget in [self.header_frame] + [row.frame for row in self.pool]:
+            widget.grid_columnconfigure(column_index, minsize=width)
+
+    def widget_count(self):
+        """Total de widgets Tk da tabela (para medir o custo do pool)"""
+        pendentes = [self.frame]
+        total = 0
+        while pendentes:
+            widget = pendentes.pop()
+            total += 1
+            pendentes.extend(widget.winfo_children())
+        return total
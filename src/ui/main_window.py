@@ -7,6 +7,8 @@ import tkinter as tk
 from .components.sidebar import Sidebar
 from .components.content_area import ContentArea
 from .components.header import Header
+from ..data.data_provider import data_provider
+from ..utils.background import background_loader
 
 class MainWindow:
     """Classe da janela principal"""
@@ -20,8 +22,15 @@ class MainWindow:
         self.root.grid_columnconfigure(1, weight=1)
         self.root.grid_rowconfigure(1, weight=1)
         
+        # Resultados das cargas em segundo plano entregues na thread do Tk
+        background_loader.attach(self.root)
+        
         # Criar componentes principais
         self.setup_ui()
+        
+        # Alterações feitas por outras estações no mesmo banco
+        self.change_poll_ms = 2000
+        self.root.after(self.change_poll_ms, self.poll_changes)
     
     def setup_ui(self):
         """Configura a interface principal"""
@@ -40,6 +49,18 @@ class MainWindow:
         # Mostrar dashboard inicial
         self.content_area.show_dashboard()
     
+    def poll_changes(self):
+        """Publica alterações externas e atualiza a tela visível se ela ficou desatualizada"""
+        try:
+            data_provider.poll_changes()
+            screen = self.content_area.current_screen
+            if screen is not None:
+                screen.refresh_if_stale()
+        except Exception as e:
+            print(f"Erro ao verificar alterações: {e}")
+        finally:
+            self.root.after(self.change_poll_ms, self.poll_changes)
+    
     def on_menu_select(self, menu_item):
         """Callback para seleção de menu"""
         print(f"Menu selecionado: {menu_item}")
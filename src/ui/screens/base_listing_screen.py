@@ -5,6 +5,8 @@ Classe base para telas de listagem com pesquisa e paginação.
 import customtkinter as ctk
 from tkinter import messagebox
 from .base_screen import BaseScreen
+from ..components.virtual_table import VirtualTable
+from ...utils.text_search import TextSearchIndex
 
 class BaseListingScreen(BaseScreen):
     """Classe base para telas de listagem genéricas."""
@@ -16,12 +18,14 @@ class BaseListingScreen(BaseScreen):
         self.current_page = 1
         self.items_per_page = 15
         self.total_pages = 1
+        self.search_index = None
 
     def setup_ui(self):
         """Configura a interface padrão da tela de listagem."""
         self.create_title(f"📊 {self.title}", f"Gerencie os {self.title.lower()} do sistema")
         self._create_controls_section()
         self._create_listing_section()
+        self.mark_loaded()
         self._load_data()
 
     # --- Métodos de UI (privados) ---
@@ -46,54 +50,29 @@ class BaseListingScreen(BaseScreen):
         self.search_entry.bind("<KeyRelease>", self._on_search_change)
 
     def _create_listing_section(self):
-        """Cria a seção de listagem com cabeçalho e área de conteúdo."""
+        """Cria a seção de listagem (tabela virtualizada) e a paginação."""
         listing_frame = ctk.CTkFrame(self.frame)
         listing_frame.pack(fill="both", expand=True, padx=10, pady=10)
         listing_frame.grid_columnconfigure(0, weight=1)
-        listing_frame.grid_rowconfigure(1, weight=1)
+        listing_frame.grid_rowconfigure(0, weight=1)
 
-        # Cabeçalho da Tabela
-        self._create_table_header(listing_frame)
-
-        # Conteúdo da Lista (Scrollable)
-        self.list_frame = ctk.CTkScrollableFrame(listing_frame)
-        self.list_frame.grid(row=1, column=0, sticky="nsew")
-        self.list_frame.grid_columnconfigure(0, weight=1)
+        # Linhas criadas uma vez; páginas, rolagem e filtros só trocam os dados
+        self.table = VirtualTable(
+            listing_frame, self._get_columns(), rows=self.items_per_page,
+            actions=self._get_row_actions(), on_view_change=self._update_pagination
+        )
+        self.table.frame.grid(row=0, column=0, sticky="nsew")
 
         # Controles de Paginação
         self.pagination_frame = ctk.CTkFrame(listing_frame, fg_color="transparent")
-        self.pagination_frame.grid(row=2, column=0, sticky="ew", pady=(5, 0))
-
-    def _create_table_header(self, parent_frame):
-        """Cria o cabeçalho da tabela de listagem."""
-        headers = self._get_headers()
-        header_frame = ctk.CTkFrame(parent_frame)
-        header_frame.grid(row=0, column=0, sticky="ew")
-
-        for i, header in enumerate(headers):
-            header_frame.grid_columnconfigure(i, weight=1)
-            label = ctk.CTkLabel(header_frame, text=header, font=ctk.CTkFont(weight="bold"))
-            label.grid(row=0, column=i, padx=10, pady=10, sticky="w")
+        self.pagination_frame.grid(row=1, column=0, sticky="ew", pady=(5, 0))
+        self._create_pagination_controls()
 
     # --- Métodos de Paginação ---
-    def _update_pagination(self):
-        """Calcula o número total de páginas."""
-        total_items = len(self.filtered_items)
-        self.total_pages = max(1, (total_items + self.items_per_page - 1) // self.items_per_page)
-        if self.current_page > self.total_pages:
-            self.current_page = 1
-        self._update_pagination_controls()
-
-    def _update_pagination_controls(self):
-        """Desenha os botões e labels de paginação."""
-        for widget in self.pagination_frame.winfo_children():
-            widget.destroy()
-
-        if self.total_pages <= 1:
-            return
-
-        info_label = ctk.CTkLabel(self.pagination_frame, text=f"Página {self.current_page} de {self.total_pages}")
-        info_label.pack(side="left", padx=10)
+    def _create_pagination_controls(self):
+        """Cria os botões e o label de paginação (atualizados a cada página)."""
+        self.page_info_label = ctk.CTkLabel(self.pagination_frame, text="")
+        self.page_info_label.pack(side="left", padx=10)
 
         nav_frame = ctk.CTkFrame(self.pagination_frame, fg_color="transparent")
         nav_frame.pack(side="right")
@@ -105,81 +84,116 @@ class BaseListingScreen(BaseScreen):
             "⏭️": lambda: self._go_to_page(self.total_pages)
         }
 
+        self.page_buttons = {}
         for text, command in buttons.items():
-            is_disabled = (("◀️" in text and self.current_page == 1) or
-                           ("▶️" in text and self.current_page == self.total_pages))
-            btn = ctk.CTkButton(nav_frame, text=text, command=command, width=30, state="disabled" if is_disabled else "normal")
+            btn = ctk.CTkButton(nav_frame, text=text, command=command, width=30)
             btn.pack(side="left", padx=2)
+            self.page_buttons[text] = btn
+
+    def _update_pagination(self):
+        """Atualiza página atual, label e estado dos botões."""
+        self.current_page = self.table.page
+        self.total_pages = self.table.pages
+
+        self.page_info_label.configure(
+            text=f"Página {self.current_page} de {self.total_pages}" if self.total_pages > 1 else ""
+        )
+        for text, btn in self.page_buttons.items():
+            is_disabled = (self.total_pages <= 1 or
+                           ("◀️" in text or "⏮️" in text) and self.current_page == 1 or
+                           ("▶️" in text or "⏭️" in text) and self.current_page == self.total_pages)
+            btn.configure(state="disabled" if is_disabled else "normal")
 
     def _go_to_page(self, page_number):
         """Navega para uma página específica."""
         if 1 <= page_number <= self.total_pages:
             self.current_page = page_number
-            self._display_items()
+            self.table.go_to_page(page_number)
 
     # --- Métodos de Dados e Display ---
     def _display_items(self):
-        """Limpa e exibe os itens da página atual."""
-        for widget in self.list_frame.winfo_children():
-            widget.destroy()
-
-        start_index = (self.current_page - 1) * self.items_per_page
-        end_index = start_index + self.items_per_page
-        page_items = self.filtered_items[start_index:end_index]
-
-        if not page_items:
-            no_data_label = ctk.CTkLabel(self.list_frame, text="Nenhum item encontrado.")
-            no_data_label.grid(row=0, column=0, pady=20)
-            return
-
-        for i, item in enumerate(page_items):
-            self._create_item_row(self.list_frame, i, item)
-
-        self._update_pagination()
+        """Exibe os itens filtrados a partir da página atual."""
+        page = self.current_page
+        self.table.set_items(self.filtered_items)
+        if page > 1:
+            self.table.go_to_page(page)
 
     def _on_search_change(self, event=None):
         """Aplica o filtro de busca quando o texto muda."""
-        query = self.search_entry.get().lower()
-        if not query:
-            self.filtered_items = self.items[:]
-        else:
-            self.filtered_items = self._perform_search(self.items, query)
+        query = self.search_entry.get()
+        self.filtered_items = self._perform_search(self.items, query)
         
         self.current_page = 1
         self._display_items()
 
     def refresh_data(self):
         """Força o recarregamento dos dados e a atualização da tela."""
+        self.mark_loaded()
         self._load_data()
 
+    def _load_items_async(self, fetch, error_message):
+        """Busca os itens em segundo plano; a tabela mostra o aviso de carregamento."""
+        def carregar():
+            items = fetch()
+            return items, self._build_search_index(items)
+
+        self.table.set_loading()
+        self.load_async(
+            'items', carregar,
+            lambda resultado: self._on_items_loaded(*resultado),
+            lambda e: self._on_items_failed(e, error_message)
+        )
+
+    def _build_search_index(self, items):
+        """Índice de busca montado junto com a carga (roda fora da thread da interface)."""
+        return TextSearchIndex(items, self._search_fields)
+
+    def _on_items_loaded(self, items, search_index):
+        """Exibe os itens carregados, reaplicando a busca atual."""
+        self.items = items
+        self.search_index = search_index
+        self._on_search_change()
+
+    def _on_items_failed(self, error, error_message):
+        """Falha na carga: lista vazia e aviso ao usuário."""
+        self.items = []
+        messagebox.showerror("Erro", f"{error_message}: {error}")
+        self._on_search_change()
+
     # --- Métodos Abstratos (a serem implementados pelas subclasses) ---
-    def _get_headers(self):
-        """Deve retornar uma lista de strings para o cabeçalho."""
+    def _get_columns(self):
+        """Deve retornar a lista de Column da tabela."""
         raise NotImplementedError
 
-    def _create_item_row(self, parent, index, item):
-        """Deve criar os widgets para uma linha da lista."""
-        raise NotImplementedError
+    def _get_row_actions(self):
+        """Botões de cada linha: lista de (texto, função(item), opções do botão)."""
+        return []
 
     def _load_data(self):
-        """Deve carregar os dados em self.items e self.filtered_items."""
+        """Deve carregar os dados em self.items (ex.: via _load_items_async)."""
         raise NotImplementedError
 
     def _create_action_buttons(self):
         """Deve criar os botões de ação específicos da tela."""
         pass  # Opcional
 
+    def _search_fields(self, item):
+        """Textos pesquisáveis de um item (padrão: todos os valores)."""
+        return item.values()
+
+    def _get_search_index(self, items):
+        """Índice de busca de ``items``, montado uma vez por carga de dados."""
+        if self.search_index is None:
+            self.search_index = TextSearchIndex(items, self._search_fields)
+        elif self.search_index.items is not items:
+            self.search_index.build(items)
+        return self.search_index
+
     def _perform_search(self, items, query):
-        """Deve implementar a lógica de busca específica."""
-        # Implementação padrão (busca em todos os valores do dicionário)
-        results = []
-        for item in items:
-            for value in item.values():
-                if query in str(value).lower():
-                    results.append(item)
-                    break
-        return results
+        """Itens em que cada palavra da busca é início de alguma palavra (sem acentos)."""
+        return self._get_search_index(items).search(query)
 
     def on_show(self):
-        """Callback quando a tela é mostrada."""
-        self.refresh_data()
+        """Callback quando a tela é mostrada (recarrega só se os dados mudaram)."""
+        if self.is_stale():
+            self.refresh_data()
@@ -3,16 +3,22 @@ Classe base para todas as telas da aplicação
 """
 
 import customtkinter as ctk
+from ...utils.change_bus import change_bus
+from ...utils.background import background_loader
 
 class BaseScreen:
     """Classe base para telas da aplicação"""
     
+    # Tabelas cujas alterações desatualizam a tela (vazio: sempre recarregar)
+    watched_tables = ()
+    
     def __init__(self, parent, user_manager=None, title="Tela"):
         """Inicializa a tela base"""
         self.parent = parent
         self.user_manager = user_manager
         self.title = title
         self.is_visible = False
+        self._loaded_version = None
         
         # Criar frame principal da tela
         self.frame = ctk.CTkScrollableFrame(parent)
@@ -58,6 +64,61 @@ class BaseScreen:
         """Callback chamado quando a tela é ocultada"""
         pass
     
+    def data_version(self) -> int:
+        """Versão atual dos dados observados pela tela"""
+        return sum(change_bus.version(tabela) for tabela in self.watched_tables)
+    
+    def mark_loaded(self):
+        """Registra que a tela reflete a versão atual dos dados (chamar antes de carregar)"""
+        self._loaded_version = self.data_version()
+    
+    def is_stale(self) -> bool:
+        """Indica se os dados mudaram desde a última carga"""
+        if not self.watched_tables:
+            return True
+        return self._loaded_version != self.data_version()
+    
+    def refresh_on_change(self):
+        """Recarrega a tela após alteração nos dados observados"""
+        refresh = getattr(self, 'refresh_data', None)
+        if refresh:
+            refresh()
+    
+    def refresh_if_stale(self) -> bool:
+        """Recarrega a tela visível se os dados observados mudaram"""
+        if not (self.is_visible and self.watched_tables and self.is_stale()):
+            return False
+        self.mark_loaded()
+        self.refresh_on_change()
+        return True
+    
+    def load_async(self, name, func, on_done, on_error=None, args=()):
+        """Executa ``func(*args)`` em segundo plano e entrega o resultado em ``on_done``.
+
+        Uma nova carga com o mesmo ``name`` substitui a anterior ainda
+        pendente. O resultado é descartado se a tela já foi destruída.
+        """
+        def entregar(callback):
+            def wrapper(valor):
+                if self.frame.winfo_exists():
+                    callback(valor)
+            return wrapper
+        
+        if on_error is None:
+            on_error = lambda e: print(f"Erro ao carregar dados ({self.title}): {e}")
+        return background_loader.submit(
+            (id(self), name), func, *args, on_done=entregar(on_done), on_error=entregar(on_error)
+        )
+    
+    def create_loading_label(self, parent, text="⏳ Carregando..."):
+        """Cria o aviso exibido enquanto os dados de uma seção são carregados"""
+        return ctk.CTkLabel(
+            parent,
+            text=text,
+            font=ctk.CTkFont(size=12),
+            text_color=("gray50", "gray50")
+        )
+    
     def create_title(self, title_text, subtitle_text=None):
         """Cria um título para a tela"""
         title_frame = ctk.CTkFrame(self.frame, fg_color="transparent")
@@ -107,9 +168,9 @@ class BaseScreen:
         except Exception:
             pass
     
-    def create_section(self, title, content_frame_class=None):
-        """Cria uma seção com título"""
-        section_frame = ctk.CTkFrame(self.frame)
+    def create_section(self, title, content_frame_class=None, parent=None):
+        """Cria uma seção com título (em ``parent``; padrão: frame da tela)"""
+        section_frame = ctk.CTkFrame(parent or self.frame)
         section_frame.pack(fill="x", pady=(0, 15))
         section_frame.grid_columnconfigure(0, weight=1)
         
@@ -7,6 +7,8 @@ from tkinter import messagebox
 import tkinter as tk
 from .base_screen import BaseScreen
 from ..components.form_dialog import FormDialog
+from ..components.virtual_table import Column
+from ..components.export_dialog import ExportDialog
 from .cadastro_brindes import CadastroBrindesScreen
 from ...data.data_provider import data_provider
 from ...utils.validators import BrindeValidator, MovimentacaoValidator, ValidationError, BusinessRuleError
@@ -20,26 +22,45 @@ class BrindesScreen(BaseListingScreen):
     def __init__(self, parent, user_manager):
         super().__init__(parent, user_manager, "Brindes")
         self._aggregated_code_map = {}
+        self._consolidated = []
+        self._consolidated_key = None
         self.items_per_page = 20 # Brindes podem ter mais itens
         self.setup_ui()
 
     # --- Implementação dos Métodos Abstratos ---
 
-    def _get_headers(self):
-        """Retorna os cabeçalhos da tabela de brindes."""
-        return ["Código", "Descrição", "Categoria", "Quantidade", "Valor Unit.", "Valor Total", "Ações"]
+    def _get_columns(self):
+        """Retorna as colunas da tabela de brindes."""
+        return [
+            Column('codigo', "Código", width=80),
+            Column('descricao', "Descrição", width=200, weight=3),
+            Column('categoria', "Categoria", width=120),
+            Column('quantidade', "Quantidade", width=80),
+            Column('valor_unitario', "Valor Unit.", width=100,
+                   formatter=lambda v: f"R$ {float(v or 0):,.2f}"),
+            Column('valor_total', "Valor Total", width=100,
+                   formatter=lambda v: f"R$ {float(v or 0):,.2f}")
+        ]
+
+    def _get_row_actions(self):
+        """Botões de edição e exclusão de cada linha."""
+        return [
+            ("✏️", self._edit_item, {}),
+            ("🗑️", self._delete_item, {'fg_color': "#cc3333"})
+        ]
 
     def _load_data(self):
-        """Carrega e pré-processa os dados dos brindes."""
-        try:
-            self.items = data_provider.get_brindes()
-            # A filtragem e consolidação ocorrerão no _perform_search
-            self._on_search_change() # Força a aplicação inicial dos filtros
-        except Exception as e:
-            self.items = []
-            self.filtered_items = []
-            messagebox.showerror("Erro", f"Erro ao carregar brindes: {e}")
-            self._display_items()
+        """Carrega os brindes em segundo plano (a consolidação ocorre no _perform_search)."""
+        self._load_items_async(data_provider.get_brindes, "Erro ao carregar brindes")
+
+    def _build_search_index(self, items):
+        """A busca é feita sobre as linhas consolidadas, indexadas a cada consolidação."""
+        return None
+
+    def _on_items_loaded(self, items, search_index):
+        """Descarta a consolidação anterior antes de reaplicar os filtros."""
+        self._consolidated_key = None
+        super()._on_items_loaded(items, search_index)
         
     # --- Sobrescrita dos Métodos de UI ---
 
@@ -90,28 +111,35 @@ class BrindesScreen(BaseListingScreen):
     # --- Lógica de Busca e Filtragem (Sobrescrita) ---
 
     def _perform_search(self, items, query):
-        """Aplica filtros de busca, categoria, filial e consolida os resultados."""
-        # 1. Filtros básicos
-        search_text = query.lower()
+        """Aplica os filtros de categoria e filial, consolida e busca nas linhas consolidadas."""
         category = self.category_combo.get()
         filial = self.filial_combo.get()
-
+        
+        # Consolidação refeita só quando os dados ou os filtros mudam, não a cada tecla
+        key = (category, filial)
+        if self._consolidated_key != key:
+            self._consolidated = self._consolidate(items, category, filial)
+            self._consolidated_key = key
+        return super()._perform_search(self._consolidated, query)
+
+    def _consolidate(self, items, category, filial):
+        """Consolida os brindes por descrição (uma linha por descrição)."""
+        # 1. Filtros de categoria e filial
         filtered = items
-        if search_text:
-            filtered = [i for i in filtered if search_text in str(i.get('codigo', '')).lower() or search_text in str(i.get('descricao', '')).lower()]
         if category != "Todas":
             filtered = [i for i in filtered if i.get('categoria') == category]
         if filial != "Todas":
             filtered = [i for i in filtered if i.get('filial') == filial]
 
         # 2. Consolidação por descrição
-        totals_by_desc = defaultdict(lambda: {'quantidade': 0, 'valor_total': 0, 'rep': None})
+        totals_by_desc = defaultdict(lambda: {'quantidade': 0, 'valor_total': 0, 'rep': None, 'codigos': []})
         for item in filtered:
             desc_key = str(item.get('descricao', '')).strip().lower()
             if not desc_key: continue
             
             totals_by_desc[desc_key]['quantidade'] += int(item.get('quantidade', 0) or 0)
             totals_by_desc[desc_key]['valor_total'] += float(item.get('valor_total', 0) or 0)
+            totals_by_desc[desc_key]['codigos'].append(item.get('codigo'))
             if not totals_by_desc[desc_key]['rep']:
                 totals_by_desc[desc_key]['rep'] = item
 
@@ -127,40 +155,18 @@ class BrindesScreen(BaseListingScreen):
                 'categoria': rep.get('categoria'),
                 'valor_unitario': rep.get('valor_unitario', 0),
                 'quantidade': data['quantidade'],
-                'valor_total': data['valor_total']
+                'valor_total': data['valor_total'],
+                'codigos': data['codigos']
             })
             self._aggregated_code_map[desc_key] = rep.get('codigo')
         
         return display_list
 
-    # --- Lógica de Renderização e Ações ---
+    def _search_fields(self, item):
+        """Busca pela descrição ou pelo código de qualquer brinde consolidado na linha."""
+        return [item.get('descricao'), *item.get('codigos', ())]
 
-    def _create_item_row(self, parent, index, item):
-        """Cria a representação visual de uma linha de brinde consolidado."""
-        row_frame = ctk.CTkFrame(parent, fg_color=("gray90", "gray20") if index % 2 == 0 else ("white", "gray15"))
-        row_frame.pack(fill="x", expand=True, pady=1, padx=5)
-
-        columns = self._get_headers()
-        for i in range(len(columns)):
-            row_frame.grid_columnconfigure(i, weight=1)
-
-        # Formatação de valores
-        valor_unit = float(item.get('valor_unitario', 0))
-        valor_total = float(item.get('valor_total', 0))
-
-        # Dados da linha
-        ctk.CTkLabel(row_frame, text=item.get('codigo', 'N/A')).grid(row=0, column=0, sticky="w", padx=10)
-        ctk.CTkLabel(row_frame, text=item.get('descricao', 'N/A')).grid(row=0, column=1, sticky="w", padx=10)
-        ctk.CTkLabel(row_frame, text=item.get('categoria', 'N/A')).grid(row=0, column=2, sticky="w", padx=10)
-        ctk.CTkLabel(row_frame, text=item.get('quantidade', 0)).grid(row=0, column=3, sticky="w", padx=10)
-        ctk.CTkLabel(row_frame, text=f"R$ {valor_unit:,.2f}").grid(row=0, column=4, sticky="w", padx=10)
-        ctk.CTkLabel(row_frame, text=f"R$ {valor_total:,.2f}").grid(row=0, column=5, sticky="w", padx=10)
-
-        # Botões de Ação
-        actions_frame = ctk.CTkFrame(row_frame, fg_color="transparent")
-        actions_frame.grid(row=0, column=6, sticky="e", padx=5)
-        ctk.CTkButton(actions_frame, text="✏️", width=30, command=lambda i=item: self._edit_item(i)).pack(side="left")
-        ctk.CTkButton(actions_frame, text="🗑️", width=30, fg_color="#cc3333", command=lambda i=item: self._delete_item(i)).pack(side="left", padx=2)
+    # --- Lógica de Renderização e Ações ---
 
     def _new_item(self):
         self._open_cadastro_screen()
@@ -211,7 +217,13 @@ class BrindesScreen(BaseListingScreen):
         messagebox.showinfo("Info", "Funcionalidade de importar brindes a ser implementada.")
 
     def _export_items(self):
-        messagebox.showinfo("Info", "Funcionalidade de exportar brindes a ser implementada.")
+        """Exporta os brindes com os filtros atuais da tela (CSV/XLSX em segundo plano)."""
+        filtros = {
+            'categoria': self.category_combo.get(),
+            'filial': self.filial_combo.get(),
+            'busca': self.search_entry.get()
+        }
+        ExportDialog(self.frame, 'brindes', filtros, nome_sugerido="brindes").show()
     
     
     
@@ -526,45 +538,19 @@ class BrindesScreen(BaseListingScreen):
             user = self.user_manager.get_current_user()
             username = user.get('username', 'admin') if user else 'admin'
 
-            # 1. Atualizar estoque na origem (diminuir)
-            data_provider.update_estoque_brinde(brinde_origem['id'], quantidade_transfer, 'saida')
-
-            # 2. Registrar movimentação de saída
-            data_provider.create_movimentacao({
-                'brinde_id': brinde_origem['id'],
-                'brinde_codigo': brinde_origem['codigo'],
-                'brinde_descricao': brinde_origem['descricao'],
-                'tipo': 'transferencia_saida',
-                'quantidade': quantidade_transfer,
-                'usuario': username,
-                'justificativa': validated_data['justificativa'],
-                'filial': filial_origem_nome,
-                'filial_destino': filial_destino_nome
-            })
-
-            # 3. Encontrar ou criar brinde no destino e atualizar estoque
-            brinde_destino = data_provider.find_or_create_brinde_for_transfer(
-                brinde_origem, filial_destino_nome, username
+            # Baixa na origem, entrada no destino e movimentações em uma transação
+            data_provider.transfer_brinde(
+                brinde_origem['id'],
+                filial_destino_nome,
+                quantidade_transfer,
+                username,
+                validated_data['justificativa']
             )
-            data_provider.update_estoque_brinde(brinde_destino['id'], quantidade_transfer, 'entrada')
-
-            # 4. Registrar movimentação de entrada
-            data_provider.create_movimentacao({
-                'brinde_id': brinde_destino['id'],
-                'brinde_codigo': brinde_destino['codigo'],
-                'brinde_descricao': brinde_destino['descricao'],
-                'tipo': 'transferencia_entrada',
-                'quantidade': quantidade_transfer,
-                'usuario': username,
-                'justificativa': f"Transferência recebida de {filial_origem_nome}",
-                'filial': filial_destino_nome,
-                'filial_origem': filial_origem_nome
-            })
 
             # Atualização imediata após transferência
             self.refresh_brindes_list()
             
-            messagebox.showinfo("Sucesso", f"Transferência realizada: {quantidade_transfer} {descricao_brinde} de {filial_origem_nome} para {filial_destino_nome}")
+            messagebox.showinfo("Sucesso", f"Transferência realizada: {quantidade_transfer} {brinde_origem['descricao']} de {filial_origem_nome} para {filial_destino_nome}")
 
         except (ValidationError, BusinessRuleError) as e:
             messagebox.showerror("Erro de Validação", str(e))
@@ -866,7 +852,7 @@ class BrindesScreen(BaseListingScreen):
     
     def export_brindes(self):
         """Exporta brindes"""
-        messagebox.showinfo("Em Desenvolvimento", "Funcionalidade de exportação será implementada em versão futura")
+        self._export_items()
     
     def generate_report(self):
         """Gera relatório"""
@@ -4,21 +4,28 @@ Tela de Gestão de Brindes (Refatorada)
 
 import customtkinter as ctk
 from tkinter import messagebox
-from datetime import datetime
+import tkinter as tk
 from .base_listing_screen import BaseListingScreen
 from .cadastro_brindes import CadastroBrindesScreen
+from ..components.virtual_table import Column
+from ..components.export_dialog import ExportDialog
 from ...data.data_provider import data_provider
+from ...data.exporter import cadastrado_no_periodo
 from tkcalendar import DateEntry
 
 class BrindesRefatoradoScreen(BaseListingScreen):
     """Tela de gestão de brindes, herdando de BaseListingScreen."""
 
+    watched_tables = ('brindes', 'categorias', 'unidades_medida', 'filiais')
+
     def __init__(self, parent, user_manager):
         super().__init__(parent, user_manager, "Brindes")
         self.start_date_entry = None
         self.end_date_entry = None
         self.sort_combo = None
         self.cadastro_window = None
+        self._sorted_items = []
+        self._sorted_key = None
         self.setup_ui()
 
     # --- Métodos de UI ---
@@ -54,84 +61,82 @@ class BrindesRefatoradoScreen(BaseListingScreen):
 
     # --- Implementação dos Métodos Abstratos ---
 
-    def _get_headers(self):
-        return ["Código", "Descrição", "Categoria", "Qtde", "Valor Unit.", "Valor Total", "Ações"]
+    def _get_columns(self):
+        valor_unit = lambda i: float(i.get('valor_unitario', 0) or 0)
+        quantidade = lambda i: int(i.get('quantidade', 0) or 0)
+        return [
+            Column('codigo', "Código", width=80, weight=0),
+            Column('descricao', "Descrição", width=200, weight=3),
+            Column('categoria', "Categoria", width=120),
+            Column(quantidade, "Qtde", width=60, weight=0),
+            Column(valor_unit, "Valor Unit.", width=100, formatter=lambda v: f"R$ {v:,.2f}"),
+            Column(lambda i: valor_unit(i) * quantidade(i), "Valor Total", width=100,
+                   formatter=lambda v: f"R$ {v:,.2f}")
+        ]
+
+    def _get_row_actions(self):
+        return [
+            ("✏️", self._edit_item, {}),
+            ("🗑️", self._delete_item, {'fg_color': "#cc3333"})
+        ]
 
     def _load_data(self):
-        try:
-            self.items = data_provider.get_brindes()
-        except Exception as e:
-            self.items = []
-            messagebox.showerror("Erro", f"Erro ao carregar brindes: {e}")
-        finally:
-            self._on_search_change()
+        self._load_items_async(data_provider.get_brindes, "Erro ao carregar brindes")
+
+    def _on_items_loaded(self, items, search_index):
+        self._sorted_key = None
+        super()._on_items_loaded(items, search_index)
 
     def _create_action_buttons(self):
         ctk.CTkButton(self.actions_frame, text="➕ Adicionar Brinde", command=self._add_item).pack(side="left", padx=5)
         ctk.CTkButton(self.actions_frame, text="🔄 Atualizar", command=self.refresh_data).pack(side="left", padx=5)
+        ctk.CTkButton(self.actions_frame, text="📤 Exportar", command=self._export_items).pack(side="left", padx=5)
 
-    def _create_item_row(self, parent, index, item):
-        row_frame = ctk.CTkFrame(parent, fg_color=("gray90", "gray20") if index % 2 == 0 else ("white", "gray15"))
-        row_frame.pack(fill="x", expand=True, pady=1, padx=5)
+    def _export_items(self):
+        """Exporta os brindes que atendem à busca atual (CSV/XLSX em segundo plano)"""
+        filtros = {'busca': self.search_entry.get()}
+        start_date, end_date = self._get_date_range()
+        if not (start_date and end_date and start_date > end_date):
+            filtros.update({'data_inicio': start_date, 'data_fim': end_date})
+        ExportDialog(self.frame, 'brindes', filtros, nome_sugerido="brindes").show()
 
-        weights = [0, 3, 1, 0, 1, 1, 1]
-        for i, weight in enumerate(weights):
-            row_frame.grid_columnconfigure(i, weight=weight)
+    def _perform_search(self, items, query):
+        # Ordenação feita uma vez por carga/critério; a busca preserva a ordem
+        sort_key = self.sort_combo.get()
+        if self._sorted_key != sort_key:
+            self._sorted_items = self._sort_items(items, sort_key)
+            self._sorted_key = sort_key
+        filtered = super()._perform_search(self._sorted_items, query)
 
-        valor_unit = float(item.get('valor_unitario', 0) or 0)
-        quantidade = int(item.get('quantidade', 0) or 0)
-        valor_total = valor_unit * quantidade
+        start_date, end_date = self._get_date_range()
 
-        ctk.CTkLabel(row_frame, text=item.get('codigo', 'N/A')).grid(row=0, column=0, sticky="w", padx=10)
-        ctk.CTkLabel(row_frame, text=item.get('descricao', 'N/A')).grid(row=0, column=1, sticky="w", padx=10)
-        ctk.CTkLabel(row_frame, text=item.get('categoria', 'N/A')).grid(row=0, column=2, sticky="w", padx=10)
-        ctk.CTkLabel(row_frame, text=quantidade).grid(row=0, column=3, sticky="w", padx=10)
-        ctk.CTkLabel(row_frame, text=f"R$ {valor_unit:,.2f}").grid(row=0, column=4, sticky="w", padx=10)
-        ctk.CTkLabel(row_frame, text=f"R$ {valor_total:,.2f}").grid(row=0, column=5, sticky="w", padx=10)
+        if not start_date and not end_date:
+            return filtered
 
-        actions_frame = ctk.CTkFrame(row_frame, fg_color="transparent")
-        actions_frame.grid(row=0, column=6, sticky="e", padx=5)
-        ctk.CTkButton(actions_frame, text="✏️", width=30, command=lambda i=item: self._edit_item(i)).pack(side="left")
-        ctk.CTkButton(actions_frame, text="🗑️", width=30, fg_color="#cc3333", command=lambda i=item: self._delete_item(i)).pack(side="left", padx=2)
+        if start_date and end_date and start_date > end_date:
+            messagebox.showwarning("Aviso", "A data de início não pode ser posterior à data de fim.")
+            return filtered
 
-    def _perform_search(self, items, query):
-        filtered = super()._perform_search(items, query)
+        return [item for item in filtered if cadastrado_no_periodo(item, start_date, end_date)]
 
+    def _get_date_range(self):
+        """Datas de início e fim selecionadas (None quando vazias)"""
         try:
-            start_date = self.start_date_entry.get_date()
-            end_date = self.end_date_entry.get_date()
+            return self.start_date_entry.get_date(), self.end_date_entry.get_date()
         except (tk.TclError, ValueError):
-            start_date, end_date = None, None
-
-        if start_date and end_date and start_date > end_date:
-            messagebox.showwarning("Aviso", "A data de início não pode ser posterior à data de fim.")
-            return filtered
+            return None, None
 
-        date_filtered = []
-        for item in filtered:
-            item_date_str = item.get('data_cadastro')
-            if not item_date_str: continue
-            try:
-                item_date = datetime.strptime(item_date_str, '%Y-%m-%d %H:%M:%S').date()
-                if (not start_date or item_date >= start_date) and (not end_date or item_date <= end_date):
-                    date_filtered.append(item)
-            except (ValueError, TypeError):
-                continue
-        filtered = date_filtered
-        
-        sort_key = self.sort_combo.get()
+    def _sort_items(self, items, sort_key):
         reverse = "+" in sort_key
         
         if "Quantidade" in sort_key:
-            filtered.sort(key=lambda i: int(i.get('quantidade', 0) or 0), reverse=reverse)
+            return sorted(items, key=lambda i: int(i.get('quantidade', 0) or 0), reverse=reverse)
         elif "Valor Unit." in sort_key:
-            filtered.sort(key=lambda i: float(i.get('valor_unitario', 0) or 0), reverse=reverse)
+            return sorted(items, key=lambda i: float(i.get('valor_unitario', 0) or 0), reverse=reverse)
         elif "Valor Total" in sort_key:
-            filtered.sort(key=lambda i: float(i.get('valor_unitario', 0) or 0) * int(i.get('quantidade', 0) or 0), reverse=reverse)
+            return sorted(items, key=lambda i: float(i.get('valor_unitario', 0) or 0) * int(i.get('quantidade', 0) or 0), reverse=reverse)
         else: # Descrição
-            filtered.sort(key=lambda i: i.get('descricao', '').lower())
-
-        return filtered
+            return sorted(items, key=lambda i: i.get('descricao', '').lower())
 
     # --- Métodos de Ação ---
     def _apply_filters_and_sort(self, event=None):
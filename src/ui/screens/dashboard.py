@@ -4,25 +4,73 @@ Tela do Dashboard - Indicadores principais
 
 import customtkinter as ctk
 from .base_screen import BaseScreen
-from ...data.data_provider import data_provider
+from ...data.data_provider import data_provider, DASHBOARD_TABLES
 from ...utils.formatters import format_currency, format_relative_time
 from datetime import datetime
 
+class _BoundList:
+    """Lista do dashboard com linhas reaproveitadas: a cada carga só textos e cores mudam"""
+
+    def __init__(self, parent, create_row, update_row, **pack_options):
+        """``create_row(frame)`` cria os widgets de uma linha; ``update_row(linha, valor)`` os atualiza"""
+        self.frame = ctk.CTkFrame(parent, fg_color="transparent")
+        self.create_row = create_row
+        self.update_row = update_row
+        self.pack_options = pack_options
+        self.rows = []
+        self.shown = 0
+
+    def update(self, valores):
+        """Exibe uma linha por valor, criando linhas só quando a lista cresce"""
+        for i, valor in enumerate(valores):
+            if i == len(self.rows):
+                self.rows.append(self.create_row(self.frame))
+            row = self.rows[i]
+            self.update_row(row, valor)
+            if i >= self.shown:
+                row['frame'].pack(**self.pack_options)
+        for row in self.rows[len(valores):self.shown]:
+            row['frame'].pack_forget()
+        self.shown = len(valores)
+
 class DashboardScreen(BaseScreen):
     """Tela do Dashboard"""
     
+    watched_tables = DASHBOARD_TABLES
+    
+    # Cards de indicadores: chave, título e descrição
+    INDICADORES = (
+        ('total_itens', "🎁 Total de Itens", "itens em estoque"),
+        ('total_categorias', "📂 Categorias", "categorias ativas"),
+        ('valor_total', "💰 Valor Total", "valor do estoque"),
+        ('itens_estoque_baixo', "⚠️ Estoque Baixo", "itens precisam reposição")
+    )
+    CARD_COLOR = ("gray90", "gray20")
+    CARD_ALERT_COLOR = ("red", "darkred")
+    
     def __init__(self, parent):
         """Inicializa a tela do dashboard"""
         super().__init__(parent, "Dashboard")
         self.auto_refresh_ms = 10000  # 10s
+        self._auto_refresh_id = None
+        # Versão dos dados exibidos e últimas opções aplicadas a cada widget
+        self._painted_version = None
+        self._widget_state = {}
+        self.render_stats = {'repaints': 0, 'skipped': 0}
+        self.mark_loaded()
         self.setup_ui()
+        self.load_data()
         self.schedule_auto_refresh()
     
     def setup_ui(self):
-        """Configura a interface do dashboard"""
+        """Monta os widgets uma única vez; as cargas só atualizam seus textos"""
         # Título da tela
         self.create_title("📊 Dashboard", "Visão geral do sistema de brindes")
         
+        # Aviso de carregamento até a primeira carga terminar
+        self.loading_label = self.create_loading_label(self.frame, "⏳ Carregando indicadores...")
+        self.loading_label.pack(pady=(0, 10))
+        
         # Cards de indicadores
         self.create_indicators_section()
         
@@ -41,55 +89,16 @@ class DashboardScreen(BaseScreen):
         cards_frame.pack(fill="x")
         cards_frame.grid_columnconfigure((0, 1, 2, 3), weight=1)
         
-        # Obter estatísticas do data provider
-        stats = data_provider.get_estatisticas_dashboard()
-        
-        total_itens = stats['total_itens']
-        categorias = stats['total_categorias']
-        valor_total = stats['valor_total']
-        itens_baixo = stats['itens_estoque_baixo']
-        
-        # Card 1: Total de Itens
-        self.create_indicator_card(
-            cards_frame, 
-            "🎁 Total de Itens", 
-            f"{total_itens:,}".replace(',', '.'), 
-            "itens em estoque",
-            row=0, column=0
-        )
-        
-        # Card 2: Categorias
-        self.create_indicator_card(
-            cards_frame, 
-            "📂 Categorias", 
-            str(categorias), 
-            "categorias ativas",
-            row=0, column=1
-        )
-        
-        # Card 3: Valor Total
-        self.create_indicator_card(
-            cards_frame, 
-            "💰 Valor Total", 
-            f"R$ {valor_total:,.2f}".replace(',', '.').replace('.', ',', 1), 
-            "valor do estoque",
-            row=0, column=2
-        )
-        
-        # Card 4: Estoque Baixo
-        self.create_indicator_card(
-            cards_frame, 
-            "⚠️ Estoque Baixo", 
-            str(itens_baixo), 
-            "itens precisam reposição",
-            row=0, column=3,
-            alert=itens_baixo > 0
-        )
+        self.cards = {}
+        for column, (chave, title, description) in enumerate(self.INDICADORES):
+            self.cards[chave] = self.create_indicator_card(
+                cards_frame, title, "—", description, row=0, column=column
+            )
     
     def create_indicator_card(self, parent, title, value, description, row, column, alert=False):
-        """Cria um card de indicador"""
+        """Cria um card de indicador; retorna o frame e o rótulo do valor"""
         # Cor do card baseada no alerta
-        fg_color = ("red", "darkred") if alert else ("gray90", "gray20")
+        fg_color = self.CARD_ALERT_COLOR if alert else self.CARD_COLOR
         
         card = ctk.CTkFrame(parent, fg_color=fg_color)
         card.grid(row=row, column=column, padx=10, pady=10, sticky="ew")
@@ -118,6 +127,8 @@ class DashboardScreen(BaseScreen):
             text_color=("gray50", "gray50")
         )
         desc_label.pack(pady=(0, 15))
+        
+        return card, value_label
     
     def create_charts_section(self):
         """Cria a seção de gráficos"""
@@ -128,7 +139,7 @@ class DashboardScreen(BaseScreen):
         charts_frame.pack(fill="x")
         charts_frame.grid_columnconfigure((0, 1), weight=1)
         
-        # Gráfico 1: Estoque por Categoria (mock)
+        # Gráfico 1: Estoque por Categoria
         chart1_frame = ctk.CTkFrame(charts_frame)
         chart1_frame.grid(row=0, column=0, padx=(0, 10), pady=10, sticky="ew")
         
@@ -139,34 +150,15 @@ class DashboardScreen(BaseScreen):
         )
         chart1_title.pack(pady=(15, 10))
         
-        # Dados reais de categoria
-        brindes = data_provider.get_brindes()
-        total_itens = sum(b.get('quantidade', 0) for b in brindes)
-        
-        # Agrupar por categoria
-        categorias_count = {}
-        for brinde in brindes:
-            categoria = brinde.get('categoria', 'Outros')
-            categorias_count[categoria] = categorias_count.get(categoria, 0) + brinde.get('quantidade', 0)
-        
-        # Calcular percentuais e ordenar
-        categories_data = []
-        for categoria, quantidade in sorted(categorias_count.items(), key=lambda x: x[1], reverse=True):
-            if total_itens > 0:
-                percentual = (quantidade / total_itens) * 100
-                categories_data.append((categoria, f"{percentual:.1f}%", quantidade))
-        
-        for cat, percent, qty in categories_data:
-            cat_frame = ctk.CTkFrame(chart1_frame, fg_color="transparent")
-            cat_frame.pack(fill="x", padx=15, pady=2)
-            
-            cat_label = ctk.CTkLabel(cat_frame, text=f"{cat}: {qty} itens ({percent})", anchor="w")
-            cat_label.pack(side="left")
+        self.categories_list = _BoundList(
+            chart1_frame, self._create_text_row, self._update_category_row, fill="x", padx=15, pady=2
+        )
+        self.categories_list.frame.pack(fill="x")
         
         # Espaçamento
         ctk.CTkLabel(chart1_frame, text="").pack(pady=10)
         
-        # Gráfico 2: Movimentações Recentes (mock)
+        # Gráfico 2: Movimentações Recentes
         chart2_frame = ctk.CTkFrame(charts_frame)
         chart2_frame.grid(row=0, column=1, padx=(10, 0), pady=10, sticky="ew")
         
@@ -177,8 +169,162 @@ class DashboardScreen(BaseScreen):
         )
         chart2_title.pack(pady=(15, 10))
         
-        # Movimentações reais recentes (texto amigável)
-        movimentacoes = data_provider.get_movimentacoes(limit=5)
+        self.movements_list = _BoundList(
+            chart2_frame, lambda parent: self._create_text_row(parent, size=11),
+            self._update_movement_row, fill="x", padx=15, pady=2
+        )
+        self.movements_list.frame.pack(fill="x")
+        
+        # Espaçamento
+        ctk.CTkLabel(chart2_frame, text="").pack(pady=10)
+    
+    def create_alerts_section(self):
+        """Cria a seção de alertas"""
+        section_frame, content_frame = self.create_section("🚨 Alertas e Notificações")
+        
+        self.alerts_list = _BoundList(content_frame, self._create_alert_row, self._update_alert_row,
+                                      fill="x", pady=5)
+        self.alerts_list.frame.pack(fill="x")
+    
+    # --- Linhas reaproveitadas ---
+    
+    @staticmethod
+    def _create_text_row(parent, size=None):
+        """Linha com um único texto"""
+        frame = ctk.CTkFrame(parent, fg_color="transparent")
+        label = ctk.CTkLabel(frame, text="", anchor="w", font=ctk.CTkFont(size=size) if size else None)
+        label.pack(side="left")
+        return {'frame': frame, 'label': label}
+    
+    def _update_category_row(self, row, categoria):
+        """Categoria: quantidade e percentual"""
+        cat, percent, qty = categoria
+        self._set(row['label'], text=f"{cat}: {qty} itens ({percent})")
+    
+    def _update_movement_row(self, row, movimento):
+        """Movimentação: texto e tempo relativo, com a cor do tipo"""
+        mov_type, texto, when = movimento
+        # Cor baseada no tipo
+        color = "green" if "Entrada" in mov_type else "red" if "Saída" in mov_type else "blue"
+        self._set(row['label'], text=f"{texto} — {when}", text_color=color)
+    
+    @staticmethod
+    def _create_alert_row(parent):
+        """Linha de alerta: ícone, título e mensagem"""
+        alert_frame = ctk.CTkFrame(parent)
+        alert_frame.grid_columnconfigure(1, weight=1)
+        
+        # Ícone
+        icon_label = ctk.CTkLabel(alert_frame, text="", font=ctk.CTkFont(size=16))
+        icon_label.grid(row=0, column=0, padx=15, pady=10, sticky="w")
+        
+        # Conteúdo do alerta
+        content_alert_frame = ctk.CTkFrame(alert_frame, fg_color="transparent")
+        content_alert_frame.grid(row=0, column=1, sticky="ew", padx=(0, 15), pady=10)
+        
+        # Título do alerta
+        alert_title = ctk.CTkLabel(
+            content_alert_frame,
+            text="",
+            font=ctk.CTkFont(size=12, weight="bold"),
+            anchor="w"
+        )
+        alert_title.pack(anchor="w")
+        
+        # Mensagem do alerta
+        alert_msg = ctk.CTkLabel(
+            content_alert_frame,
+            text="",
+            font=ctk.CTkFont(size=11),
+            text_color=("gray50", "gray50"),
+            anchor="w"
+        )
+        alert_msg.pack(anchor="w")
+        
+        return {'frame': alert_frame, 'icon': icon_label, 'title': alert_title, 'message': alert_msg}
+    
+    def _update_alert_row(self, row, alerta):
+        """Alerta: ícone, título e mensagem"""
+        icon, title, message, alert_type = alerta
+        self._set(row['icon'], text=icon)
+        self._set(row['title'], text=title)
+        self._set(row['message'], text=message)
+    
+    def _set(self, widget, **opcoes):
+        """Configura o widget só se as opções mudaram desde a última vez"""
+        if self._widget_state.get(widget) != opcoes:
+            widget.configure(**opcoes)
+            self._widget_state[widget] = opcoes
+    
+    # --- Dados ---
+    
+    def load_data(self):
+        """Consulta o snapshot do dashboard em segundo plano"""
+        self.load_async('dados', self.collect_data, self.show_data, self.on_load_error)
+    
+    def collect_data(self):
+        """Snapshot único do provedor convertido nos textos das seções (fora da thread da interface)"""
+        snapshot = data_provider.get_dashboard_snapshot()
+        return {
+            'versao': snapshot['versao'],
+            'indicadores': self.collect_indicators(snapshot['estatisticas']),
+            'categorias': self.collect_categories(snapshot['categorias']),
+            'movimentacoes': self.collect_movements(snapshot['movimentacoes'][:5]),
+            'alertas': self.collect_alerts(snapshot['estoque_baixo'], snapshot['movimentacoes'])
+        }
+    
+    def show_data(self, data):
+        """Atualiza os widgets existentes; nada é redesenhado se a versão dos dados não mudou"""
+        if data['versao'] == self._painted_version:
+            self.render_stats['skipped'] += 1
+            return
+        
+        if self.loading_label is not None:
+            self.loading_label.destroy()
+            self.loading_label = None
+        
+        for chave, (valor, alerta) in data['indicadores'].items():
+            card, value_label = self.cards[chave]
+            self._set(value_label, text=valor)
+            self._set(card, fg_color=self.CARD_ALERT_COLOR if alerta else self.CARD_COLOR)
+        self.categories_list.update(data['categorias'])
+        self.movements_list.update(data['movimentacoes'])
+        self.alerts_list.update(data['alertas'])
+        
+        self._painted_version = data['versao']
+        self.render_stats['repaints'] += 1
+    
+    def on_load_error(self, error):
+        """Falha na carga: mantém o conteúdo anterior (ou avisa, se ainda não há)"""
+        print(f"Erro ao carregar dashboard: {error}")
+        if self.loading_label is not None:
+            self.loading_label.configure(text="Erro ao carregar indicadores")
+    
+    @staticmethod
+    def collect_indicators(stats):
+        """Texto de cada card e se ele fica em destaque"""
+        itens_baixo = stats['itens_estoque_baixo']
+        return {
+            'total_itens': (f"{stats['total_itens']:,}".replace(',', '.'), False),
+            'total_categorias': (str(stats['total_categorias']), False),
+            'valor_total': (f"R$ {stats['valor_total']:,.2f}".replace(',', '.').replace('.', ',', 1), False),
+            'itens_estoque_baixo': (str(itens_baixo), itens_baixo > 0)
+        }
+    
+    @staticmethod
+    def collect_categories(categorias):
+        """Quantidade e percentual por categoria, da maior para a menor"""
+        total_itens = sum(c['quantidade'] for c in categorias)
+        if total_itens <= 0:
+            return []
+        return [
+            (c['categoria'], f"{c['quantidade'] / total_itens * 100:.1f}%", c['quantidade'])
+            for c in categorias
+        ]
+    
+    @staticmethod
+    def collect_movements(movimentacoes):
+        """Texto amigável e tempo relativo das movimentações recentes"""
         movements_data = []
         
         for mov in movimentacoes:
@@ -223,54 +369,30 @@ class DashboardScreen(BaseScreen):
             
             movements_data.append((mov_type, texto, when))
         
-        for mov_type, texto, when in movements_data:
-            mov_frame = ctk.CTkFrame(chart2_frame, fg_color="transparent")
-            mov_frame.pack(fill="x", padx=15, pady=2)
-            
-            # Cor baseada no tipo
-            color = "green" if "Entrada" in mov_type else "red" if "Saída" in mov_type else "blue"
-            
-            mov_label = ctk.CTkLabel(
-                mov_frame, 
-                text=f"{texto} — {when}", 
-                anchor="w",
-                text_color=color,
-                font=ctk.CTkFont(size=11)
-            )
-            mov_label.pack(side="left")
-        
-        # Espaçamento
-        ctk.CTkLabel(chart2_frame, text="").pack(pady=10)
+        return movements_data
     
-    def create_alerts_section(self):
-        """Cria a seção de alertas"""
-        section_frame, content_frame = self.create_section("🚨 Alertas e Notificações")
-        
-        # Alertas reais
+    @staticmethod
+    def collect_alerts(estoque_baixo, movimentacoes_recentes):
+        """Alertas de estoque (zerados primeiro) e de movimentações das últimas 24h (até 4)"""
         alerts_data = []
         
         # Alertas de estoque baixo
-        brindes = data_provider.get_brindes()
-        estoque_minimo = data_provider.get_configuracao('estoque_minimo', 10)
-        
-        for brinde in brindes:
+        for brinde in estoque_baixo:
             quantidade = brinde.get('quantidade', 0)
-            if quantidade <= estoque_minimo:
-                if quantidade == 0:
-                    alerts_data.append((
-                        "🚨", "Estoque Zerado", 
-                        f"{brinde.get('descricao', 'Item')}: sem estoque disponível", 
-                        "critical"
-                    ))
-                else:
-                    alerts_data.append((
-                        "⚠️", "Estoque Baixo", 
-                        f"{brinde.get('descricao', 'Item')}: apenas {quantidade} unidades restantes", 
-                        "high"
-                    ))
+            if quantidade == 0:
+                alerts_data.append((
+                    "🚨", "Estoque Zerado",
+                    f"{brinde.get('descricao', 'Item')}: sem estoque disponível",
+                    "critical"
+                ))
+            else:
+                alerts_data.append((
+                    "⚠️", "Estoque Baixo",
+                    f"{brinde.get('descricao', 'Item')}: apenas {quantidade} unidades restantes",
+                    "high"
+                ))
         
         # Alertas de movimentações recentes (últimas 24h)
-        movimentacoes_recentes = data_provider.get_movimentacoes(limit=10)
         for mov in movimentacoes_recentes:
             data_hora = mov.get('data_hora', '')
             if data_hora:
@@ -283,14 +405,14 @@ class DashboardScreen(BaseScreen):
                         tipo = mov.get('tipo', '')
                         if 'transferencia' in tipo:
                             alerts_data.append((
-                                "🔄", "Transferência", 
-                                f"Transferência de {mov.get('brinde_descricao', 'item')} concluída", 
+                                "🔄", "Transferência",
+                                f"Transferência de {mov.get('brinde_descricao', 'item')} concluída",
                                 "info"
                             ))
                         elif 'entrada' in tipo:
                             alerts_data.append((
-                                "📥", "Entrada", 
-                                f"Entrada de {mov.get('quantidade', 0)} {mov.get('brinde_descricao', 'itens')}", 
+                                "📥", "Entrada",
+                                f"Entrada de {mov.get('quantidade', 0)} {mov.get('brinde_descricao', 'itens')}",
                                 "success"
                             ))
                 except:
@@ -305,61 +427,42 @@ class DashboardScreen(BaseScreen):
                 ("✅", "Sistema OK", "Todos os indicadores estão normais", "success")
             ]
         
-        for icon, title, message, alert_type in alerts_data:
-            alert_frame = ctk.CTkFrame(content_frame)
-            alert_frame.pack(fill="x", pady=5)
-            alert_frame.grid_columnconfigure(1, weight=1)
-            
-            # Ícone
-            icon_label = ctk.CTkLabel(alert_frame, text=icon, font=ctk.CTkFont(size=16))
-            icon_label.grid(row=0, column=0, padx=15, pady=10, sticky="w")
-            
-            # Conteúdo do alerta
-            content_alert_frame = ctk.CTkFrame(alert_frame, fg_color="transparent")
-            content_alert_frame.grid(row=0, column=1, sticky="ew", padx=(0, 15), pady=10)
-            
-            # Título do alerta
-            alert_title = ctk.CTkLabel(
-                content_alert_frame,
-                text=title,
-                font=ctk.CTkFont(size=12, weight="bold"),
-                anchor="w"
-            )
-            alert_title.pack(anchor="w")
-            
-            # Mensagem do alerta
-            alert_msg = ctk.CTkLabel(
-                content_alert_frame,
-                text=message,
-                font=ctk.CTkFont(size=11),
-                text_color=("gray50", "gray50"),
-                anchor="w"
-            )
-            alert_msg.pack(anchor="w")
+        return alerts_data
+    
+    # --- Atualização ---
     
     def on_show(self):
         """Callback quando a tela é mostrada"""
-        # Atualizar dados e manter atualização periódica
-        self.refresh_all()
+        # Atualizar dados (se mudaram) e manter atualização periódica
+        if self.is_stale():
+            self.refresh_all()
         self.schedule_auto_refresh()
     
     def refresh_all(self):
-        """Reconstrói o conteúdo do dashboard para refletir dados atuais"""
+        """Recarrega o snapshot; os widgets atuais ficam visíveis até ele chegar"""
         try:
-            # Limpar conteúdo atual do frame principal e recriar UI
-            for child in self.frame.winfo_children():
-                try:
-                    child.destroy()
-                except Exception:
-                    pass
-            self.setup_ui()
+            self.mark_loaded()
+            self.load_data()
         except Exception:
             # Em caso de erro, evitar quebra de tela
             pass
-
+    
+    # Recarga pelo change_bus (refresh_if_stale) usa o mesmo caminho
+    refresh_data = refresh_all
+    
     def schedule_auto_refresh(self):
-        """Agenda auto-refresh periódico do dashboard"""
+        """Agenda auto-refresh periódico do dashboard (um único agendamento por vez)"""
+        if self._auto_refresh_id is not None:
+            return
         try:
-            self.frame.after(self.auto_refresh_ms, self.refresh_all)
+            self._auto_refresh_id = self.frame.after(self.auto_refresh_ms, self._auto_refresh)
         except Exception:
             pass
+    
+    def _auto_refresh(self):
+        """Recarrega se os dados mudaram e reagenda enquanto a tela estiver visível"""
+        self._auto_refresh_id = None
+        if not self.is_visible:
+            return  # on_show reagenda
+        self.refresh_if_stale()
+        self.schedule_auto_refresh()
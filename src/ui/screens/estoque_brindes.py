@@ -6,23 +6,31 @@ import customtkinter as ctk
 from tkinter import messagebox
 from .base_screen import BaseScreen
 from ...data.data_provider import data_provider
+from ..components.virtual_table import VirtualTable, Column
+from ..components.export_dialog import ExportDialog
+from ...utils.text_search import TextSearchIndex
 from collections import defaultdict
 
 class EstoqueBrindesScreen(BaseScreen):
     """Tela de estoque consolidado de brindes"""
     
+    watched_tables = ('brindes', 'filiais')
+    
     def __init__(self, parent, user_manager):
         """Inicializa a tela de estoque de brindes"""
         super().__init__(parent, user_manager)
         self.current_estoque = []
         self.filtered_estoque = []
+        self.search_index = TextSearchIndex(
+            fields=lambda item: (item.get('descricao'), item.get('categoria'))
+        )
         self.current_page = 1
         self.items_per_page = 15
         self.total_pages = 1
         self.tooltip = None
-        # Carregar dados iniciais
-        self._load_initial_data()
         self.setup_ui()
+        # Dados carregados em segundo plano; a tabela mostra o aviso de carregamento
+        self.refresh_data()
         
     def show_tooltip(self, widget, text):
         """Exibe uma dica de ferramenta próximo ao widget"""
@@ -57,20 +65,14 @@ class EstoqueBrindesScreen(BaseScreen):
             self.tooltip.destroy()
             self.tooltip = None
         
-    def _load_initial_data(self):
-        """Carrega dados iniciais consolidados"""
-        try:
-            self._consolidate_estoque()
-            print(f"Estoque consolidado carregado: {len(self.current_estoque)} itens únicos")
-        except Exception as e:
-            print(f"Erro ao carregar estoque consolidado: {e}")
-            self.current_estoque = []
-            self.filtered_estoque = []
-    
     def _consolidate_estoque(self):
-        """Consolida o estoque por item e filial (uma linha por filial)"""
+        """Consolida o estoque por item e filial (uma linha por filial).
+        
+        Roda fora da thread da interface: só consulta e calcula, sem tocar
+        nos widgets nem no estado da tela. Retorna as linhas e o índice de busca.
+        """
         try:
-            # Obter todos os brindes (respeitando restrição de filial para não-admin e não-global)
+            # Filtro de filial (respeitando restrição de filial para não-admin e não-global)
             filial_filter = None
             try:
                 user = self.user_manager.get_current_user() if hasattr(self, 'user_manager') else None
@@ -91,44 +93,32 @@ class EstoqueBrindesScreen(BaseScreen):
             except Exception:
                 filial_filter = None
 
-            all_brindes = data_provider.get_brindes(filial_filter=filial_filter)
-            
-            # Agrupar por (descricao, filial)
-            per_filial = {}
-            for brinde in all_brindes:
-                if not brinde or not isinstance(brinde, dict):
-                    continue
-                descricao = brinde.get('descricao', '')
-                filial = brinde.get('filial', 'N/A')
-                if not descricao:
-                    continue
-                key = (descricao.strip().lower(), str(filial))
-                if key not in per_filial:
-                    per_filial[key] = {
-                        'descricao': descricao,
-                        'categoria': brinde.get('categoria', ''),
-                        'filial': filial,
-                        'valor_unitario': brinde.get('valor_unitario', 0),
-                        'unidade_medida': brinde.get('unidade_medida', ''),
-                        'quantidade_filial': 0,
-                        'valor_total_filial': 0,
-                        'codigo_exemplo': brinde.get('codigo', ''),
-                    }
-                per_filial[key]['quantidade_filial'] += int(brinde.get('quantidade', 0) or 0)
-            
-            # Calcular valor total por filial e preparar lista
+            # Agregado por (descricao, filial) já mantido no banco (estoque_resumo)
             result = []
-            for item in per_filial.values():
-                item['valor_total_filial'] = item['quantidade_filial'] * (item.get('valor_unitario') or 0)
-                result.append(item)
-            
-            self.current_estoque = result
-            self.filtered_estoque = self.current_estoque.copy()
+            for linha in data_provider.get_estoque_resumo('descricao', filial_filter):
+                result.append({
+                    'descricao': linha.get('descricao', ''),
+                    'categoria': linha.get('categoria') or '',
+                    'filial': linha.get('filial', 'N/A'),
+                    'valor_unitario': linha.get('valor_unitario') or 0,
+                    'unidade_medida': linha.get('unidade_medida') or '',
+                    'quantidade_filial': int(linha.get('quantidade') or 0),
+                    'valor_total_filial': linha.get('valor_total') or 0,
+                    'codigo_exemplo': linha.get('codigo') or '',
+                })
+            
+            # Índice da busca textual, montado uma vez por consolidação
+            return result, TextSearchIndex(result, self.search_index.fields)
             
         except Exception as e:
             print(f"Erro ao consolidar estoque: {e}")
-            self.current_estoque = []
-            self.filtered_estoque = []
+            return [], TextSearchIndex(fields=self.search_index.fields)
+    
+    def _on_estoque_loaded(self, resultado):
+        """Recebe o estoque consolidado (thread da interface) e reaplica os filtros"""
+        self.current_estoque, self.search_index = resultado
+        print(f"Estoque consolidado carregado: {len(self.current_estoque)} itens únicos")
+        self.apply_filters()
     
     def setup_ui(self):
         """Configura a interface de estoque de brindes"""
@@ -215,6 +205,19 @@ class EstoqueBrindesScreen(BaseScreen):
                         self.filial_combo.set("Todas")
         except Exception as e:
             print(f"Aviso ao aplicar restrição de filial: {e}")
+        
+        # Exportação do estoque com os filtros atuais
+        export_button = ctk.CTkButton(filters_frame, text="📤 Exportar", command=self.export_estoque)
+        export_button.grid(row=2, column=2, padx=10, pady=(0, 10), sticky="e")
+    
+    def export_estoque(self):
+        """Exporta o estoque consolidado com os filtros da tela (CSV/XLSX em segundo plano)"""
+        filtros = {
+            'busca': self.search_entry.get(),
+            'categoria': self.category_combo.get(),
+            'filial': self.filial_combo.get()
+        }
+        ExportDialog(self.frame, 'estoque', filtros, nome_sugerido="estoque").show()
     
     def on_search_change(self, event=None):
         """Callback para mudanças no campo de busca"""
@@ -230,9 +233,6 @@ class EstoqueBrindesScreen(BaseScreen):
     def apply_filters(self):
         """Aplica todos os filtros"""
         try:
-            # Começar com todos os itens
-            self.filtered_estoque = self.current_estoque.copy()
-            
             # Obter valores dos filtros
             search_text = ""
             categoria = "Todas"
@@ -247,13 +247,10 @@ class EstoqueBrindesScreen(BaseScreen):
             if hasattr(self, 'filial_combo') and self.filial_combo.winfo_exists():
                 filial_filter = self.filial_combo.get()
             
-            # Aplicar filtro de busca
-            if search_text:
-                self.filtered_estoque = [
-                    item for item in self.filtered_estoque 
-                    if search_text in item.get('descricao', '').lower() or 
-                       search_text in item.get('categoria', '').lower()
-                ]
+            # Aplicar filtro de busca (prefixo das palavras, sem acentos)
+            if self.search_index.items is not self.current_estoque:
+                self.search_index.build(self.current_estoque)
+            self.filtered_estoque = self.search_index.search(search_text)
             
             # Aplicar filtro de categoria
             if categoria and categoria != "Todas":
@@ -287,160 +284,48 @@ class EstoqueBrindesScreen(BaseScreen):
     
     def create_estoque_table(self, parent):
         """Cria a tabela de estoque consolidado"""
-        if hasattr(self, 'table_frame') and self.table_frame.winfo_exists():
-            for widget in self.table_frame.winfo_children():
-                widget.destroy()
-        else:
-            self.table_frame = ctk.CTkFrame(parent)
-            self.table_frame.pack(fill="both", expand=True, padx=10, pady=10)
-        
-        # Calcular paginação
-        self.calculate_pagination()
-        
-        # Cabeçalho da tabela
-        header_frame = ctk.CTkFrame(self.table_frame, fg_color=("gray80", "gray30"))
-        header_frame.pack(fill="x", pady=(0, 2))
-        
-        # Configurar colunas
-        columns = 6
-        for i in range(columns):
-            header_frame.columnconfigure(i, weight=1, uniform="col")
-        
-        # Cabeçalhos
-        headers = [
-            "Descrição", 
-            "Categoria", 
-            "Filial",
-            "Quantidade", 
-            "Valor Unit.", 
-            "Valor Total"
-        ]
-        
-        for col, header in enumerate(headers):
-            label = ctk.CTkLabel(
-                header_frame, 
-                text=header, 
-                font=ctk.CTkFont(weight="bold"),
-                anchor="center"
-            )
-            label.grid(row=0, column=col, padx=5, pady=10, sticky="ew")
-        
-        # Frame para conteúdo da tabela
-        if hasattr(self, 'content_frame'):
-            self.content_frame.destroy()
-            
-        self.content_frame = ctk.CTkScrollableFrame(
-            self.table_frame, 
-            height=400,
-            fg_color=("gray95", "gray16")
+        self.table_frame = ctk.CTkFrame(parent)
+        self.table_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        
+        # Tabela virtualizada: linhas criadas uma vez e reaproveitadas a cada página
+        self.table = VirtualTable(
+            self.table_frame,
+            [
+                Column('descricao', "Descrição", max_chars=50,
+                       formatter=lambda v: str(v or 'Sem descrição')),
+                Column('categoria', "Categoria", max_chars=20,
+                       formatter=lambda v: str(v or 'Sem categoria')),
+                Column('filial', "Filial", formatter=lambda v: str(v or 'N/A')),
+                Column('quantidade_filial', "Quantidade", anchor="e",
+                       formatter=lambda v: f"{int(v or 0):,}".replace(",", ".")),
+                Column('valor_unitario', "Valor Unit.", anchor="e", formatter=self._format_currency),
+                Column('valor_total_filial', "Valor Total", anchor="e", formatter=self._format_currency)
+            ],
+            rows=self.items_per_page,
+            on_row_click=self.show_item_details,
+            row_color=self._row_color,
+            row_colors=(("#f9f9f9", "#1e1e1e"), ("#ffffff", "#2b2b2b")),
+            on_tooltip=self.show_tooltip,
+            on_tooltip_hide=self.hide_tooltip,
+            on_view_change=self.update_pagination_controls
         )
-        self.content_frame.pack(fill="both", expand=True, pady=(0, 10))
-        
-        # Configurar colunas no conteúdo
-        for i in range(columns):
-            self.content_frame.columnconfigure(i, weight=1, uniform="col")
-        
-        # Renderizar página atual
-        self.render_current_page()
+        self.table.frame.pack(fill="both", expand=True, pady=(0, 10))
         
         # Controles de paginação
         self.create_pagination_controls()
+        self.refresh_table()
     
-    def calculate_pagination(self):
-        """Calcula informações de paginação"""
-        total_items = len(self.filtered_estoque)
-        self.total_pages = max(1, (total_items + self.items_per_page - 1) // self.items_per_page)
-        
-        if self.current_page > self.total_pages:
-            self.current_page = self.total_pages
+    @staticmethod
+    def _format_currency(valor):
+        """Formata valor monetário no padrão brasileiro"""
+        return f"R$ {float(valor or 0):,.2f}".replace('.', '|').replace(',', '.').replace('|', ',')
     
-    def render_current_page(self):
-        """Renderiza os itens da página atual"""
-        # Limpar conteúdo anterior
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
-        
-        # Calcular índices da página atual
-        start_idx = (self.current_page - 1) * self.items_per_page
-        end_idx = min(start_idx + self.items_per_page, len(self.filtered_estoque))
-        
-        # Renderizar itens da página atual
-        for i in range(start_idx, end_idx):
-            item = self.filtered_estoque[i]
-            self.create_item_row(item, i - start_idx)
-    
-    def create_item_row(self, item, row_index):
-        """Cria uma linha da tabela para um item"""
-        try:
-            # Coagir possíveis None para strings seguras (evita len(None))
-            descricao = str(item.get('descricao') or 'Sem descrição')
-            categoria = str(item.get('categoria') or 'Sem categoria')
-            filial = str(item.get('filial') or 'N/A')
-            quantidade = int(item.get('quantidade_filial', 0))
-            valor_unitario = float(item.get('valor_unitario', 0))
-            valor_total = float(item.get('valor_total_filial', 0))
-            
-            # Formatar valores monetários
-            valor_unit_fmt = f"R$ {valor_unitario:,.2f}".replace('.', '|').replace(',', '.').replace('|', ',')
-            valor_total_fmt = f"R$ {valor_total:,.2f}".replace('.', '|').replace(',', '.').replace('|', ',')
-            
-            # Criar frame da linha com cor de fundo alternada para melhor legibilidade
-            bg_color = ("#f9f9f9", "#1e1e1e") if row_index % 2 == 0 else ("#ffffff", "#2b2b2b")
-            row_frame = ctk.CTkFrame(
-                self.content_frame, 
-                fg_color=bg_color,
-                corner_radius=4
-            )
-            row_frame.pack(fill="x", pady=1, padx=2)
-            
-            # Configurar colunas
-            for i in range(6):
-                row_frame.columnconfigure(i, weight=1, uniform="col")
-            
-            # Dados da linha
-            cells = [
-                descricao[:50] + ('...' if len(descricao) > 50 else ''),  # Limitar tamanho da descrição
-                categoria[:20] + ('...' if len(categoria) > 20 else ''),   # Limitar tamanho da categoria
-                filial,
-                f"{quantidade:,}".replace(",", "."),  # Formatar número com separador de milhar
-                valor_unit_fmt,
-                valor_total_fmt
-            ]
-            
-            # Adicionar células
-            for col, text in enumerate(cells):
-                anchor = "w" if col < 3 else "e"
-                padx = (10, 5) if col == 0 else (5, 5)
-                
-                label = ctk.CTkLabel(
-                    row_frame,
-                    text=text,
-                    anchor=anchor,
-                    font=ctk.CTkFont(size=12),
-                    text_color=("#000000", "#ffffff"),
-                    justify="left" if col < 3 else "right"
-                )
-                label.grid(row=0, column=col, padx=padx, pady=5, sticky="nsew")
-                
-                # Adicionar dica de ferramenta com texto completo para campos grandes
-                if col in [0, 1] and len(str(text)) > 20:
-                    tooltip_text = descricao if col == 0 else categoria
-                    label.bind("<Enter>", lambda e, t=tooltip_text, w=label: self.show_tooltip(w, t))
-                    label.bind("<Leave>", lambda e: self.hide_tooltip())
-                
-                # Adicionar evento de clique para mostrar detalhes
-                label.bind("<Button-1>", lambda e, i=item: self.show_item_details(i))
-            
-            # Destacar linhas com estoque baixo
-            if quantidade <= 10:
-                row_frame.configure(fg_color=("#ffebee", "#3a1f1f"))  # Vermelho mais suave
-                
-            # Adicionar hover effect
-            row_frame.bind("<Enter>", lambda e, f=row_frame: f.configure(fg_color=("#e3f2fd", "#2c3e50")))
-            row_frame.bind("<Leave>", lambda e, f=row_frame, b=bg_color: f.configure(fg_color=b))
-                
-        except Exception as e:
-            print(f"Erro ao criar linha {row_index}: {e}")
+    @staticmethod
+    def _row_color(item):
+        """Destaca linhas com estoque baixo"""
+        if int(item.get('quantidade_filial', 0) or 0) <= 10:
+            return ("#ffebee", "#3a1f1f")  # Vermelho mais suave
+        return None
     
     def show_item_details(self, item):
         """Mostra detalhes do item por filial"""
@@ -517,110 +402,117 @@ Valor Total: R$ {item.get('valor_total', 0):,.2f}"""
             messagebox.showerror("Erro", "Não foi possível exibir os detalhes do item")
     
     def create_pagination_controls(self):
-        """Cria os controles de paginação"""
-        if hasattr(self, 'pagination_frame') and self.pagination_frame.winfo_exists():
-            self.pagination_frame.destroy()
-            
+        """Cria os controles de paginação (atualizados a cada mudança de página)"""
         self.pagination_frame = ctk.CTkFrame(self.table_frame)
         self.pagination_frame.pack(fill="x", padx=10, pady=(0, 10))
         
         # Informações da paginação
-        info_label = ctk.CTkLabel(
-            self.pagination_frame, 
-            text=f"Página {self.current_page} de {self.total_pages} | "
-                 f"Mostrando {len(self.filtered_estoque)} linhas | "
-                 f"{self.items_per_page} por página"
-        )
-        info_label.pack(side="left", padx=10, pady=10)
+        self.page_info_label = ctk.CTkLabel(self.pagination_frame, text="")
+        self.page_info_label.pack(side="left", padx=10, pady=10)
         
         # Botões de navegação
         nav_frame = ctk.CTkFrame(self.pagination_frame, fg_color="transparent")
         nav_frame.pack(side="right", padx=10, pady=10)
         
         # Primeira página
-        first_btn = ctk.CTkButton(nav_frame, text="⏮️", width=40, height=30,
-                                 command=self.go_to_first_page,
-                                 state="disabled" if self.current_page == 1 else "normal")
-        first_btn.pack(side="left", padx=2)
+        self.first_btn = ctk.CTkButton(nav_frame, text="⏮️", width=40, height=30,
+                                       command=self.go_to_first_page)
+        self.first_btn.pack(side="left", padx=2)
         
         # Página anterior
-        prev_btn = ctk.CTkButton(nav_frame, text="◀️", width=40, height=30,
-                                command=self.go_to_previous_page,
-                                state="disabled" if self.current_page == 1 else "normal")
-        prev_btn.pack(side="left", padx=2)
+        self.prev_btn = ctk.CTkButton(nav_frame, text="◀️", width=40, height=30,
+                                      command=self.go_to_previous_page)
+        self.prev_btn.pack(side="left", padx=2)
+        
+        # Páginas numeradas (até 5 botões, renumerados a cada página)
+        self.page_buttons = []
+        for _ in range(5):
+            page_btn = ctk.CTkButton(nav_frame, text="", width=40, height=30)
+            self.page_buttons.append(page_btn)
+        
+        # Próxima página
+        self.next_btn = ctk.CTkButton(nav_frame, text="▶️", width=40, height=30,
+                                      command=self.go_to_next_page)
         
-        # Páginas numeradas
+        # Última página
+        self.last_btn = ctk.CTkButton(nav_frame, text="⏭️", width=40, height=30,
+                                      command=self.go_to_last_page)
+        self._default_page_color = self.first_btn.cget("fg_color")
+    
+    def update_pagination_controls(self):
+        """Atualiza label, botões numerados e estados da paginação"""
+        if not hasattr(self, 'page_info_label'):
+            return
+        self.current_page = self.table.page
+        self.total_pages = self.table.pages
+        
+        self.page_info_label.configure(
+            text=f"Página {self.current_page} de {self.total_pages} | "
+                 f"Mostrando {len(self.filtered_estoque)} linhas | "
+                 f"{self.items_per_page} por página"
+        )
+        
+        primeira = self.current_page == 1
+        ultima = self.current_page == self.total_pages
+        self.first_btn.configure(state="disabled" if primeira else "normal")
+        self.prev_btn.configure(state="disabled" if primeira else "normal")
+        
+        # Reempacotar na ordem: numerados e depois próxima/última
         start_page = max(1, self.current_page - 2)
         end_page = min(self.total_pages, start_page + 4)
-        
-        for page in range(start_page, end_page + 1):
-            page_btn = ctk.CTkButton(
-                nav_frame, 
-                text=str(page), 
-                width=40, 
-                height=30,
+        for btn in self.page_buttons + [self.next_btn, self.last_btn]:
+            btn.pack_forget()
+        for btn, page in zip(self.page_buttons, range(start_page, end_page + 1)):
+            btn.configure(
+                text=str(page),
                 command=lambda p=page: self.go_to_page(p),
-                fg_color="blue" if page == self.current_page else None
+                fg_color="blue" if page == self.current_page else self._default_page_color
             )
-            page_btn.pack(side="left", padx=2)
+            btn.pack(side="left", padx=2)
         
-        # Próxima página
-        next_btn = ctk.CTkButton(nav_frame, text="▶️", width=40, height=30,
-                                command=self.go_to_next_page,
-                                state="disabled" if self.current_page == self.total_pages else "normal")
-        next_btn.pack(side="left", padx=2)
-        
-        # Última página
-        last_btn = ctk.CTkButton(nav_frame, text="⏭️", width=40, height=30,
-                                command=self.go_to_last_page,
-                                state="disabled" if self.current_page == self.total_pages else "normal")
-        last_btn.pack(side="left", padx=2)
+        self.next_btn.configure(state="disabled" if ultima else "normal")
+        self.next_btn.pack(side="left", padx=2)
+        self.last_btn.configure(state="disabled" if ultima else "normal")
+        self.last_btn.pack(side="left", padx=2)
     
     def go_to_first_page(self):
         """Vai para a primeira página"""
-        self.current_page = 1
-        self.refresh_table()
+        self.table.go_to_page(1)
     
     def go_to_previous_page(self):
         """Vai para a página anterior"""
-        if self.current_page > 1:
-            self.current_page -= 1
-            self.refresh_table()
+        self.table.go_to_page(self.table.page - 1)
     
     def go_to_next_page(self):
         """Vai para a próxima página"""
-        if self.current_page < self.total_pages:
-            self.current_page += 1
-            self.refresh_table()
+        self.table.go_to_page(self.table.page + 1)
     
     def go_to_last_page(self):
         """Vai para a última página"""
-        self.current_page = self.total_pages
-        self.refresh_table()
+        self.table.go_to_page(self.table.pages)
     
     def go_to_page(self, page):
         """Vai para uma página específica"""
         if 1 <= page <= self.total_pages:
-            self.current_page = page
-            self.refresh_table()
+            self.table.go_to_page(page)
     
     def refresh_table(self):
-        """Atualiza a tabela"""
+        """Atualiza a tabela com os itens filtrados (a partir de current_page)"""
         try:
-            self.calculate_pagination()
-            self.render_current_page()
-            self.create_pagination_controls()
+            page = self.current_page
+            self.table.set_items(self.filtered_estoque)
+            if page > 1:
+                self.table.go_to_page(page)
         except Exception as e:
             print(f"Erro ao atualizar tabela: {e}")
     
     def refresh_data(self):
-        """Recarrega os dados"""
-        try:
-            self._consolidate_estoque()
-            self.apply_filters()
-        except Exception as e:
-            print(f"Erro ao recarregar dados: {e}")
+        """Recarrega os dados em segundo plano (uma nova carga substitui a pendente)"""
+        self.mark_loaded()
+        self.table.set_loading()
+        self.load_async('estoque', self._consolidate_estoque, self._on_estoque_loaded)
     
     def on_show(self):
-        """Callback quando a tela é mostrada"""
-        self.refresh_data()
+        """Callback quando a tela é mostrada (recarrega só se os dados mudaram)"""
+        if self.is_stale():
+            self.refresh_data()
@@ -6,32 +6,39 @@ import customtkinter as ctk
 from tkinter import messagebox
 from .base_listing_screen import BaseListingScreen
 from .cadastro_fornecedor import CadastroFornecedorScreen
+from ..components.virtual_table import Column
 from ...data.data_provider import data_provider
 
 class FornecedoresScreen(BaseListingScreen):
     """Tela de gestão de fornecedores, herdando de BaseListingScreen."""
 
+    watched_tables = ('fornecedores',)
+
     def __init__(self, parent, user_manager):
         super().__init__(parent, user_manager, "Fornecedores")
         self.setup_ui()
 
     # --- Implementação dos Métodos Abstratos ---
 
-    def _get_headers(self):
-        """Retorna os cabeçalhos da tabela de fornecedores."""
-        return ["Código", "Nome", "Contato", "Telefone", "Ações"]
+    def _get_columns(self):
+        """Retorna as colunas da tabela de fornecedores."""
+        return [
+            Column('codigo', "Código", width=80),
+            Column('nome', "Nome", width=200, weight=2),
+            Column('contato_nome', "Contato", width=150),
+            Column('telefone', "Telefone", width=120)
+        ]
+
+    def _get_row_actions(self):
+        """Botões de edição e exclusão de cada linha."""
+        return [
+            ("✏️", self._edit_item, {}),
+            ("🗑️", self._delete_item, {'fg_color': "#cc3333"})
+        ]
 
     def _load_data(self):
-        """Carrega os dados dos fornecedores."""
-        try:
-            self.items = data_provider.get_fornecedores()
-            self.filtered_items = self.items[:]
-            self._display_items()
-        except Exception as e:
-            self.items = []
-            self.filtered_items = []
-            messagebox.showerror("Erro", f"Erro ao carregar fornecedores: {e}")
-            self._display_items() # Exibe a mensagem de 'nenhum item'
+        """Carrega os dados dos fornecedores em segundo plano."""
+        self._load_items_async(data_provider.get_fornecedores, "Erro ao carregar fornecedores")
 
     def _create_action_buttons(self):
         """Cria os botões de 'Novo' e 'Atualizar'."""
@@ -41,31 +48,6 @@ class FornecedoresScreen(BaseListingScreen):
         refresh_button = ctk.CTkButton(self.actions_frame, text="🔄 Atualizar", command=self.refresh_data)
         refresh_button.pack(side="left", padx=5)
 
-    def _create_item_row(self, parent, index, item):
-        """Cria a representação visual de uma linha de fornecedor."""
-        row_frame = ctk.CTkFrame(parent, fg_color=("gray90", "gray20") if index % 2 == 0 else ("white", "gray15"))
-        row_frame.pack(fill="x", expand=True, pady=1, padx=5)
-
-        columns = self._get_headers()
-        for i in range(len(columns)):
-            row_frame.grid_columnconfigure(i, weight=1)
-
-        # Dados da linha
-        ctk.CTkLabel(row_frame, text=item.get('codigo', 'N/A')).grid(row=0, column=0, sticky="w", padx=10)
-        ctk.CTkLabel(row_frame, text=item.get('nome', 'N/A')).grid(row=0, column=1, sticky="w", padx=10)
-        ctk.CTkLabel(row_frame, text=item.get('contato_nome', 'N/A')).grid(row=0, column=2, sticky="w", padx=10)
-        ctk.CTkLabel(row_frame, text=item.get('telefone', 'N/A')).grid(row=0, column=3, sticky="w", padx=10)
-
-        # Botões de Ação na Linha
-        actions_frame = ctk.CTkFrame(row_frame, fg_color="transparent")
-        actions_frame.grid(row=0, column=4, sticky="e", padx=5)
-
-        edit_button = ctk.CTkButton(actions_frame, text="✏️", width=30, command=lambda i=item: self._edit_item(i))
-        edit_button.pack(side="left", padx=2)
-
-        delete_button = ctk.CTkButton(actions_frame, text="🗑️", width=30, fg_color="#cc3333", command=lambda i=item: self._delete_item(i))
-        delete_button.pack(side="left", padx=2)
-
     # --- Lógica Específica de Fornecedores ---
 
     def _new_item(self):
@@ -4,15 +4,31 @@ Tela de Movimentações de Estoque
 
 import customtkinter as ctk
 from .base_screen import BaseScreen
+from ..components.virtual_table import VirtualTable, Column
+from ..components.export_dialog import ExportDialog
 from ...data.data_provider import data_provider
-from datetime import datetime
+from datetime import date, datetime, timedelta
 
 class MovimentacoesScreen(BaseScreen):
     """Tela de movimentações de estoque"""
     
-    def __init__(self, parent):
+    watched_tables = ('movimentacoes',)
+    
+    # Opção do filtro de tipo -> tipos gravados
+    TIPOS = {
+        "Entrada": 'entrada',
+        "Saída": 'saida',
+        "Transferência": ('transferencia_saida', 'transferencia_entrada')
+    }
+    
+    def __init__(self, parent, user_manager=None):
         """Inicializa a tela de movimentações"""
-        super().__init__(parent, "Movimentações")
+        super().__init__(parent, user_manager, "Movimentações")
+        self.page_size = 50
+        self.filters = {}
+        self.cursors = [None]
+        self.page = 0
+        self.next_cursor = None
         self.setup_ui()
     
     def setup_ui(self):
@@ -51,7 +67,7 @@ class MovimentacoesScreen(BaseScreen):
         
         self.period_combo = ctk.CTkComboBox(
             filters_frame,
-            values=["Hoje", "Esta Semana", "Este Mês", "Últimos 3 Meses", "Personalizado"]
+            values=["Todo o Período", "Hoje", "Esta Semana", "Este Mês", "Últimos 3 Meses"]
         )
         self.period_combo.grid(row=1, column=1, padx=10, pady=(0, 10), sticky="ew")
         
@@ -59,9 +75,14 @@ class MovimentacoesScreen(BaseScreen):
         user_label = ctk.CTkLabel(filters_frame, text="👤 Usuário:")
         user_label.grid(row=0, column=2, padx=10, pady=10, sticky="w")
         
+        try:
+            usuarios = data_provider.get_usuarios() or []
+        except Exception:
+            usuarios = []
+        self.usuarios_por_nome = {u.get('nome') or u.get('username'): u.get('username') for u in usuarios}
         self.user_combo = ctk.CTkComboBox(
             filters_frame,
-            values=["Todos", "Admin", "João Silva", "Maria Santos", "Pedro Costa"]
+            values=["Todos"] + list(self.usuarios_por_nome)
         )
         self.user_combo.grid(row=1, column=2, padx=10, pady=(0, 10), sticky="ew")
 
@@ -82,7 +103,7 @@ class MovimentacoesScreen(BaseScreen):
 
         # Restringir seleção de filial para usuários não-Admin e não-globais ('00')
         try:
-            user = self.user_manager.get_current_user() if hasattr(self, 'user_manager') else None
+            user = self.user_manager.get_current_user() if self.user_manager else None
             if user and getattr(self.user_manager, 'is_admin', lambda: False)() is False:
                 user_filial = user.get('filial')
                 # Verificar se a filial do usuário é global (numero '00')
@@ -112,6 +133,19 @@ class MovimentacoesScreen(BaseScreen):
             height=40
         )
         filter_button.grid(row=1, column=3, padx=10, pady=(0, 10), sticky="ew")
+        
+        # Exportação do histórico inteiro com os filtros da tela
+        export_button = ctk.CTkButton(
+            filters_frame,
+            text="📤 Exportar",
+            command=self.export_movimentacoes
+        )
+        export_button.grid(row=2, column=3, padx=10, pady=(0, 10), sticky="ew")
+    
+    def export_movimentacoes(self):
+        """Exporta todas as movimentações dos filtros (não só a página) em segundo plano"""
+        ExportDialog(self.frame, 'movimentacoes', self.get_filters(),
+                     nome_sugerido="movimentacoes").show()
     
     def create_history_section(self):
         """Cria a seção de histórico"""
@@ -121,25 +155,140 @@ class MovimentacoesScreen(BaseScreen):
         table_frame = ctk.CTkFrame(content_frame)
         table_frame.pack(fill="both", expand=True)
         
-        # Cabeçalho da tabela
-        header_frame = ctk.CTkFrame(table_frame, fg_color=("gray80", "gray30"))
-        header_frame.pack(fill="x", padx=10, pady=(10, 0))
-        header_frame.grid_columnconfigure((0, 1, 2, 3, 4, 5, 6, 7), weight=1)
+        # Tabela virtualizada com uma linha por registro da página (reaproveitadas
+        # a cada navegação); a ordem é a da consulta paginada por cursor
+        self.table = VirtualTable(
+            table_frame,
+            [
+                Column('data_hora', "Data/Hora", formatter=self.format_data_hora),
+                Column(self.format_tipo, "Tipo", color=self.tipo_color),
+                Column(lambda mov: mov.get('brinde_descricao', 'N/A'), "Item"),
+                Column(self.format_quantidade, "Quantidade", color=self.tipo_color),
+                Column(self.format_filiais, "Filiais"),
+                Column(lambda mov: mov.get('usuario', 'N/A'), "Usuário"),
+                Column(self.format_justificativa, "Justificativa", max_chars=50),
+                Column(self.format_detalhes, "Detalhes", max_chars=50)
+            ],
+            rows=self.page_size,
+            sortable=False,
+            font_size=10,
+            row_colors=("transparent", "transparent"),
+            empty_text="Nenhuma movimentação encontrada"
+        )
+        self.table.frame.pack(fill="x", padx=10, pady=(10, 0))
         
-        headers = ["Data/Hora", "Tipo", "Item", "Quantidade", "Filiais", "Usuário", "Justificativa", "Detalhes"]
-        for i, header in enumerate(headers):
-            label = ctk.CTkLabel(header_frame, text=header, font=ctk.CTkFont(weight="bold"))
-            label.grid(row=0, column=i, padx=5, pady=10, sticky="ew")
+        # Paginação
+        pagination_frame = ctk.CTkFrame(table_frame, fg_color="transparent")
+        pagination_frame.pack(fill="x", padx=10, pady=10)
         
-        # Obter movimentações reais e aplicar filtro de filial
-        movimentacoes = data_provider.get_movimentacoes(limit=50) or []
+        # Informações da página
+        self.page_info = ctk.CTkLabel(
+            pagination_frame,
+            text="",
+            font=ctk.CTkFont(size=11)
+        )
+        self.page_info.pack(side="left")
+        
+        # Botões de navegação
+        nav_frame = ctk.CTkFrame(pagination_frame, fg_color="transparent")
+        nav_frame.pack(side="right")
+        
+        self.prev_btn = ctk.CTkButton(nav_frame, text="◀ Anterior", width=80, height=30, command=self.prev_page)
+        self.prev_btn.pack(side="left", padx=5)
+        
+        self.next_btn = ctk.CTkButton(nav_frame, text="Próxima ▶", width=80, height=30, command=self.next_page)
+        self.next_btn.pack(side="left", padx=5)
+        
+        self.apply_filters()
+    
+    @staticmethod
+    def format_data_hora(data_hora):
+        """Data/hora da movimentação no formato dd/mm/aaaa hh:mm"""
+        if not data_hora:
+            return "N/A"
         try:
-            selected_filial = self.filial_combo.get() if hasattr(self, 'filial_combo') else "Todas"
-        except Exception:
-            selected_filial = "Todas"
-        # Forçar restrição por perfil (considerando filial global '00')
+            return datetime.fromisoformat(data_hora).strftime("%d/%m/%Y %H:%M")
+        except:
+            return data_hora
+    
+    @staticmethod
+    def format_tipo(mov):
+        """Tipo legível (transferencia_saida -> Transferencia Saida)"""
+        return mov.get('tipo', '').replace('_', ' ').title()
+    
+    @staticmethod
+    def format_quantidade(mov):
+        """Quantidade com sinal de entrada/saída"""
+        tipo_raw = mov.get('tipo', '')
+        quantidade = mov.get('quantidade', 0)
+        if 'entrada' in tipo_raw:
+            return f"+{quantidade}"
+        elif 'saida' in tipo_raw:
+            return f"-{quantidade}"
+        return str(quantidade)
+    
+    @classmethod
+    def tipo_color(cls, mov):
+        """Cor do tipo e da quantidade"""
+        tipo = cls.format_tipo(mov)
+        if "Entrada" in tipo:
+            return "green"
+        elif "Saída" in tipo:
+            return "red"
+        else:  # Transferência
+            return "blue"
+    
+    @staticmethod
+    def format_filiais(mov):
+        """Filial da movimentação (origem -> destino nas transferências)"""
+        filial_origem = mov.get('filial_origem') or mov.get('filial') or ''
+        filial_destino = mov.get('filial_destino') or ''
+        if 'transferencia' in mov.get('tipo', ''):
+            return f"{filial_origem} -> {filial_destino}"
+        return filial_origem or '-'
+    
+    @staticmethod
+    def format_justificativa(mov):
+        """Justificativa ou, na falta, as observações"""
+        # Coagir campos potencialmente None para strings seguras
+        justificativa_raw = mov.get('justificativa')
+        observacoes_raw = mov.get('observacoes')
+        return str(justificativa_raw if justificativa_raw not in (None, '') else (observacoes_raw if observacoes_raw not in (None, '') else 'N/A'))
+    
+    @staticmethod
+    def format_detalhes(mov):
+        """Destino ou, na falta, as observações"""
+        destino_raw = mov.get('destino')
+        observacoes_raw = mov.get('observacoes')
+        return str(destino_raw if destino_raw not in (None, '') else (observacoes_raw if observacoes_raw not in (None, '') else 'N/A'))
+    
+    def get_filters(self):
+        """Monta os filtros da consulta a partir dos campos da tela"""
+        filters = {}
+        
+        tipo = self.type_combo.get()
+        if tipo in self.TIPOS:
+            filters['tipo'] = self.TIPOS[tipo]
+        
+        hoje = date.today()
+        periodo = self.period_combo.get()
+        if periodo == "Hoje":
+            filters['data_inicio'] = hoje
+        elif periodo == "Esta Semana":
+            filters['data_inicio'] = hoje - timedelta(days=hoje.weekday())
+        elif periodo == "Este Mês":
+            filters['data_inicio'] = hoje.replace(day=1)
+        elif periodo == "Últimos 3 Meses":
+            filters['data_inicio'] = hoje - timedelta(days=90)
+        
+        usuario = self.user_combo.get()
+        if usuario in self.usuarios_por_nome:
+            filters['usuario'] = self.usuarios_por_nome[usuario]
+        
+        # Filial: não-admin (e não global) fica restrito à própria filial
+        selected_filial = self.filial_combo.get()
         try:
-            user = self.user_manager.get_current_user() if hasattr(self, 'user_manager') else None
+            user = self.user_manager.get_current_user() if self.user_manager else None
             if user and getattr(self.user_manager, 'is_admin', lambda: False)() is False:
                 user_filial = user.get('filial')
                 is_global = False
@@ -154,105 +303,86 @@ class MovimentacoesScreen(BaseScreen):
                     selected_filial = user_filial
         except Exception:
             pass
-
         if selected_filial and selected_filial != "Todas":
-            movimentacoes = [m for m in movimentacoes if m.get('filial') == selected_filial]
+            filters['filial'] = selected_filial
         
-        # Linhas da tabela
-        for i, mov in enumerate(movimentacoes):
-            # Formatar data
-            data_hora = mov.get('data_hora', '')
-            if data_hora:
-                try:
-                    dt = datetime.fromisoformat(data_hora)
-                    data_formatada = dt.strftime("%d/%m/%Y %H:%M")
-                except:
-                    data_formatada = data_hora
-            else:
-                data_formatada = "N/A"
-            
-            # Dados da movimentação
-            tipo_raw = mov.get('tipo', '')
-            tipo = tipo_raw.replace('_', ' ').title()
-            item = mov.get('brinde_descricao', 'N/A')
-            quantidade = mov.get('quantidade', 0)
-            if 'entrada' in tipo_raw:
-                qty_str = f"+{quantidade}"
-            elif 'saida' in tipo_raw:
-                qty_str = f"-{quantidade}"
-            else:
-                qty_str = str(quantidade)
-            user = mov.get('usuario', 'N/A')
-            # Coagir campos potencialmente None para strings seguras
-            justificativa_raw = mov.get('justificativa')
-            observacoes_raw = mov.get('observacoes')
-            destino_raw = mov.get('destino')
-
-            justificativa = str(justificativa_raw if justificativa_raw not in (None, '') else (observacoes_raw if observacoes_raw not in (None, '') else 'N/A'))
-            detalhes = str(destino_raw if destino_raw not in (None, '') else (observacoes_raw if observacoes_raw not in (None, '') else 'N/A'))
-            
-            data = data_formatada
-            just = justificativa[:50] + "..." if len(justificativa) > 50 else justificativa
-            det = detalhes[:50] + "..." if len(detalhes) > 50 else detalhes
-            row_frame = ctk.CTkFrame(table_frame, fg_color="transparent")
-            row_frame.pack(fill="x", padx=10, pady=2)
-            row_frame.grid_columnconfigure((0, 1, 2, 3, 4, 5, 6, 7), weight=1)
-            
-            # Cor baseada no tipo
-            if "Entrada" in tipo:
-                color = "green"
-            elif "Saída" in tipo:
-                color = "red"
-            else:  # Transferência
-                color = "blue"
-            
-            # Filiais
-            filial_origem = mov.get('filial_origem') or mov.get('filial') or ''
-            filial_destino = mov.get('filial_destino') or ''
-            filiais_txt = f"{filial_origem} -> {filial_destino}" if 'transferencia' in tipo_raw else (filial_origem or '-')
-
-            # Células
-            cells = [data, tipo, item, qty_str, filiais_txt, user, just, det]
-            for j, cell in enumerate(cells):
-                text_color = color if j in (1, 3) else None  # Tipo e Quantidade coloridos
-                label = ctk.CTkLabel(
-                    row_frame, 
-                    text=cell, 
-                    text_color=text_color,
-                    font=ctk.CTkFont(size=10)
-                )
-                label.grid(row=0, column=j, padx=5, pady=5, sticky="ew")
-        
-        # Paginação
-        pagination_frame = ctk.CTkFrame(table_frame, fg_color="transparent")
-        pagination_frame.pack(fill="x", padx=10, pady=10)
+        return filters
+    
+    def load_page(self):
+        """Consulta a página atual em segundo plano (paginação por cursor).
         
-        # Informações da página
-        page_info = ctk.CTkLabel(
-            pagination_frame,
-            text="Mostrando 6 de 156 registros - Página 1 de 26",
-            font=ctk.CTkFont(size=11)
+        Uma nova consulta (outro filtro ou página) substitui a pendente: só
+        o resultado da mais recente é exibido.
+        """
+        self.mark_loaded()
+        page = self.page
+        self.table.set_loading()
+        self.page_info.configure(text="⏳ Carregando...")
+        self.prev_btn.configure(state="disabled")
+        self.next_btn.configure(state="disabled")
+        self.load_async(
+            'page',
+            data_provider.query_movimentacoes,
+            lambda resultado: self.show_page(page, resultado),
+            self.on_load_error,
+            args=(self.filters, self.cursors[page], self.page_size)
         )
-        page_info.pack(side="left")
-        
-        # Botões de navegação
-        nav_frame = ctk.CTkFrame(pagination_frame, fg_color="transparent")
-        nav_frame.pack(side="right")
+    
+    def show_page(self, page, resultado):
+        """Exibe a página consultada"""
+        self.next_cursor = resultado['next_cursor']
+        items = resultado['items']
+        total = resultado['total']
         
-        prev_btn = ctk.CTkButton(nav_frame, text="◀ Anterior", width=80, height=30, command=self.prev_page)
-        prev_btn.pack(side="left", padx=5)
+        self.table.set_items(items)
         
-        next_btn = ctk.CTkButton(nav_frame, text="Próxima ▶", width=80, height=30, command=self.next_page)
-        next_btn.pack(side="left", padx=5)
+        # Informações da página
+        total_pages = max(1, -(-total // self.page_size))
+        inicio = page * self.page_size
+        if items:
+            texto = (f"Mostrando {inicio + 1}-{inicio + len(items)} de {total} registros - "
+                     f"Página {page + 1} de {total_pages}")
+        else:
+            texto = "Nenhuma movimentação encontrada"
+        self.page_info.configure(text=texto)
+        self.prev_btn.configure(state="normal" if page > 0 else "disabled")
+        self.next_btn.configure(state="normal" if self.next_cursor else "disabled")
+    
+    def on_load_error(self, error):
+        """Falha na consulta: tabela vazia e aviso na paginação"""
+        print(f"Erro ao carregar movimentações: {error}")
+        self.next_cursor = None
+        self.table.set_items([])
+        self.page_info.configure(text="Erro ao carregar movimentações")
+        self.prev_btn.configure(state="normal" if self.page > 0 else "disabled")
     
     def apply_filters(self):
-        """Aplica os filtros selecionados"""
-        print("Aplicar filtros - TODO: Implementar")
+        """Aplica os filtros selecionados (volta para a primeira página)"""
+        self.filters = self.get_filters()
+        self.cursors = [None]
+        self.page = 0
+        self.load_page()
+    
+    def refresh_data(self):
+        """Recarrega a página atual"""
+        self.load_page()
+    
+    def on_show(self):
+        """Callback quando a tela é mostrada (recarrega só se os dados mudaram)"""
+        if self.is_stale():
+            self.refresh_data()
     
     def prev_page(self):
         """Página anterior"""
-        print("Página anterior - TODO: Implementar")
+        if self.page > 0:
+            self.page -= 1
+            self.load_page()
     
     def next_page(self):
         """Próxima página"""
-        print("Próxima página - TODO: Implementar")
+        if self.next_cursor:
+            # Cursor de início de cada página visitada, para voltar
+            del self.cursors[self.page + 1:]
+            self.cursors.append(self.next_cursor)
+            self.page += 1
+            self.load_page()
@@ -2,12 +2,18 @@
 Sistema de logs e auditoria
 """
 
+import atexit
 import json
 import logging
 import os
-from datetime import datetime
+import sqlite3
+from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, Optional
 from ..database.schema import db_schema
+from ..database.audit_partitions import (
+    audit_timestamp, insert_records, decode_payload, query_partitions, drop_partitions_before
+)
+from .audit_writer import AuditWriter
 
 class AuditLogger:
     """Sistema de auditoria e logs"""
@@ -16,6 +22,8 @@ class AuditLogger:
         """Inicializa o sistema de auditoria"""
         self.setup_logging()
         self.db = db_schema
+        # Gravação em lotes fora da operação do usuário (ver AuditWriter)
+        self.writer = AuditWriter(self.db)
     
     def setup_logging(self):
         """Configura o sistema de logging"""
@@ -72,8 +80,9 @@ class AuditLogger:
                     dados_novos: Optional[Dict[str, Any]] = None,
                     usuario_id: Optional[int] = None,
                     ip_address: Optional[str] = None,
-                    user_agent: Optional[str] = None):
-        """Registra ação de auditoria"""
+                    user_agent: Optional[str] = None,
+                    conn: Optional[sqlite3.Connection] = None):
+        """Registra ação de auditoria (na transação de conn, se informada)"""
         
         # Log em arquivo
         audit_message = f"AUDIT: {acao} em {tabela}"
@@ -84,34 +93,32 @@ class AuditLogger:
         
         self.audit_logger.info(audit_message)
         
-        # Registrar no banco de dados
+        # Sem conn: enfileira para o gravador em lotes (não bloqueia a operação)
+        if conn is None:
+            if not self.writer.put(tabela, acao, registro_id, dados_anteriores, dados_novos,
+                                   usuario_id, ip_address, user_agent):
+                self.log_warning(f"Fila de auditoria cheia: registro descartado ({acao} em {tabela})")
+            return
+        
+        # Com conn: grava na mesma transação da operação
         try:
-            query = """
-                INSERT INTO logs_auditoria 
-                (tabela, registro_id, acao, dados_anteriores, dados_novos, 
-                 usuario_id, ip_address, user_agent)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """
-            
-            dados_anteriores_json = json.dumps(dados_anteriores, ensure_ascii=False) if dados_anteriores else None
-            dados_novos_json = json.dumps(dados_novos, ensure_ascii=False) if dados_novos else None
-            
-            self.db.execute_update(query, (
-                tabela, registro_id, acao, dados_anteriores_json, dados_novos_json,
-                usuario_id, ip_address, user_agent
-            ))
-            
+            insert_records(conn, [(
+                tabela, registro_id, acao, dados_anteriores, dados_novos,
+                usuario_id, ip_address, user_agent, audit_timestamp()
+            )])
         except Exception as e:
             self.log_error(f"Erro ao registrar auditoria no banco", e)
     
-    def audit_brinde_created(self, brinde_data: Dict[str, Any], usuario_id: int = None):
+    def audit_brinde_created(self, brinde_data: Dict[str, Any], usuario_id: int = None,
+                             conn: Optional[sqlite3.Connection] = None):
         """Auditoria de criação de brinde"""
         self.audit_action(
             tabela='brindes',
             acao='INSERT',
             registro_id=brinde_data.get('id'),
             dados_novos=brinde_data,
-            usuario_id=usuario_id
+            usuario_id=usuario_id,
+            conn=conn
         )
         
         self.log_info(f"Brinde criado: {brinde_data.get('descricao')} (ID: {brinde_data.get('id')})")
@@ -142,14 +149,16 @@ class AuditLogger:
         
         self.log_info(f"Brinde excluído: {brinde_data.get('descricao')} (ID: {brinde_id})")
     
-    def audit_movimentacao_created(self, movimentacao_data: Dict[str, Any], usuario_id: int = None):
+    def audit_movimentacao_created(self, movimentacao_data: Dict[str, Any], usuario_id: int = None,
+                                   conn: Optional[sqlite3.Connection] = None):
         """Auditoria de criação de movimentação"""
         self.audit_action(
             tabela='movimentacoes',
             acao='INSERT',
             registro_id=movimentacao_data.get('id'),
             dados_novos=movimentacao_data,
-            usuario_id=usuario_id
+            usuario_id=usuario_id,
+            conn=conn
         )
         
         tipo = movimentacao_data.get('tipo', '')
@@ -158,6 +167,34 @@ class AuditLogger:
         
         self.log_info(f"Movimentação registrada: {tipo} de {quantidade} {brinde_desc}")
     
+    def audit_movimentacoes_bulk(self, movimentacoes: list, conn: Optional[sqlite3.Connection] = None):
+        """Auditoria de um lote de movimentações (um INSERT por lote)"""
+        if not movimentacoes:
+            return
+        
+        self.audit_logger.info(f"AUDIT: INSERT em movimentacoes (lote de {len(movimentacoes)})")
+        
+        if conn is None:
+            descartados = sum(
+                not self.writer.put('movimentacoes', 'INSERT', mov.get('id'), dados_novos=mov,
+                                    usuario_id=mov.get('usuario_id'))
+                for mov in movimentacoes
+            )
+            if descartados:
+                self.log_warning(f"Fila de auditoria cheia: {descartados} registros do lote descartados")
+        else:
+            data_hora = audit_timestamp()
+            registros = [
+                ('movimentacoes', mov.get('id'), 'INSERT', None, mov, mov.get('usuario_id'), None, None, data_hora)
+                for mov in movimentacoes
+            ]
+            try:
+                insert_records(conn, registros)
+            except Exception as e:
+                self.log_error("Erro ao registrar auditoria do lote no banco", e)
+        
+        self.log_info(f"Lote de movimentações registrado: {len(movimentacoes)} itens")
+    
     def audit_user_login(self, username: str, success: bool, ip_address: str = None):
         """Auditoria de login de usuário"""
         status = "SUCCESS" if success else "FAILED"
@@ -197,6 +234,19 @@ class AuditLogger:
         
         self.log_info(f"Backup criado: {backup_path}")
     
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Espera a gravação dos registros de auditoria enfileirados"""
+        return self.writer.flush(timeout)
+    
+    def close(self):
+        """Grava os registros pendentes e encerra o gravador (saída do sistema)"""
+        self.writer.close()
+        stats = self.writer.stats
+        if stats['dropped'] or stats['errors']:
+            self.log_warning("Auditoria com registros perdidos", {
+                'descartados': stats['dropped'], 'erros': stats['errors']
+            })
+    
     def get_audit_logs(self, 
                       tabela: str = None, 
                       acao: str = None, 
@@ -205,63 +255,61 @@ class AuditLogger:
                       data_fim: datetime = None,
                       limit: int = 100) -> list:
         """Obtém logs de auditoria"""
+        self.flush()
         
-        query = """
-            SELECT la.*, u.nome as usuario_nome
-            FROM logs_auditoria la
-            LEFT JOIN usuarios u ON la.usuario_id = u.id
-            WHERE 1=1
-        """
-        
+        where = "1=1"
         params = []
         
         if tabela:
-            query += " AND la.tabela = ?"
+            where += " AND la.tabela = ?"
             params.append(tabela)
         
         if acao:
-            query += " AND la.acao = ?"
+            where += " AND la.acao = ?"
             params.append(acao)
         
         if usuario_id:
-            query += " AND la.usuario_id = ?"
+            where += " AND la.usuario_id = ?"
             params.append(usuario_id)
         
-        if data_inicio:
-            query += " AND la.data_hora >= ?"
-            params.append(data_inicio.isoformat())
-        
-        if data_fim:
-            query += " AND la.data_hora <= ?"
-            params.append(data_fim.isoformat())
-        
-        query += " ORDER BY la.data_hora DESC"
-        
-        if limit:
-            query += f" LIMIT {limit}"
+        # Mesmo formato de data_hora gravado (UTC, 'AAAA-MM-DD HH:MM:SS')
+        inicio = data_inicio.strftime('%Y-%m-%d %H:%M:%S') if data_inicio else None
+        fim = data_fim.strftime('%Y-%m-%d %H:%M:%S') if data_fim else None
         
         try:
-            rows = self.db.execute_query(query, tuple(params) if params else None)
-            return [dict(row) for row in rows]
+            # Só as partições (meses) do intervalo; para ao atingir o limite
+            rows = query_partitions(self.db.get_pooled_connection(), where, params,
+                                    inicio, fim, limit)
+            logs = []
+            for row in rows:
+                log = dict(row)
+                log['dados_anteriores'] = decode_payload(log['dados_anteriores'])
+                log['dados_novos'] = decode_payload(log['dados_novos'])
+                logs.append(log)
+            return logs
         except Exception as e:
             self.log_error("Erro ao buscar logs de auditoria", e)
             return []
     
     def get_system_stats(self) -> Dict[str, Any]:
         """Obtém estatísticas do sistema"""
+        self.flush()
         try:
             stats = {}
             
+            # Tudo sai de logs_auditoria_resumo (contagens por dia, tabela, ação
+            # e usuário): o custo não depende do tamanho da auditoria
+            
             # Total de logs por tipo
-            query = "SELECT acao, COUNT(*) as total FROM logs_auditoria GROUP BY acao"
+            query = "SELECT acao, SUM(total) as total FROM logs_auditoria_resumo GROUP BY acao"
             rows = self.db.execute_query(query)
             stats['logs_por_acao'] = {row[0]: row[1] for row in rows}
             
             # Logs por usuário
             query = """
-                SELECT u.nome, COUNT(*) as total 
-                FROM logs_auditoria la
-                JOIN usuarios u ON la.usuario_id = u.id
+                SELECT u.nome, SUM(r.total) as total 
+                FROM logs_auditoria_resumo r
+                JOIN usuarios u ON r.usuario_id = u.id
                 GROUP BY u.nome
                 ORDER BY total DESC
                 LIMIT 10
@@ -271,10 +319,10 @@ class AuditLogger:
             
             # Logs por data (últimos 7 dias)
             query = """
-                SELECT DATE(data_hora) as data, COUNT(*) as total
-                FROM logs_auditoria
-                WHERE data_hora >= date('now', '-7 days')
-                GROUP BY DATE(data_hora)
+                SELECT dia as data, SUM(total) as total
+                FROM logs_auditoria_resumo
+                WHERE dia >= date('now', '-7 days')
+                GROUP BY dia
                 ORDER BY data DESC
             """
             rows = self.db.execute_query(query)
@@ -287,10 +335,12 @@ class AuditLogger:
             return {}
     
     def cleanup_old_logs(self, days_to_keep: int = 90):
-        """Remove logs antigos"""
+        """Remove logs antigos (partições de meses inteiros saem com DROP TABLE)"""
+        self.flush()
         try:
-            query = "DELETE FROM logs_auditoria WHERE data_hora < date('now', '-{} days')".format(days_to_keep)
-            affected = self.db.execute_update(query)
+            limite = (datetime.now(timezone.utc) - timedelta(days=days_to_keep)).strftime('%Y-%m-%d')
+            with self.db.transaction() as conn:
+                affected = drop_partitions_before(conn, limite)
             
             self.log_info(f"Limpeza de logs concluída: {affected} registros removidos")
             return affected
@@ -425,3 +475,6 @@ class AuditLogger:
 
 # Instância global do logger de auditoria
 audit_logger = AuditLogger()
+
+# Registrado depois de db_schema.close: na saída, roda antes dele (ordem inversa)
+atexit.register(audit_logger.close)
@@ -0,0 +1,183 @@
+"""
+Gravação assíncrona da auditoria em lotes (fila limitada + thread de escrita)
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from ..database.audit_partitions import audit_timestamp, insert_records
+
+# Espera máxima da thread entre verificações de flush/encerramento
+POLL_INTERVAL = 0.02
+
+class AuditWriter:
+    """Fila limitada de registros de auditoria gravados por uma thread própria.
+
+    ``put()`` só enfileira: a serialização/compactação dos dados e o INSERT
+    saem da operação do usuário. A thread junta até ``batch_size`` registros (ou o que chegar
+    em ``flush_interval`` segundos) e grava com ``executemany`` em uma única
+    transação. Com a fila cheia, ``put()`` espera até ``block_timeout``
+    segundos (contrapressão) e depois descarta o registro, contando em
+    ``stats['dropped']``.
+    """
+
+    def __init__(self, db, max_queue: int = 10000, batch_size: int = 500,
+                 flush_interval: float = 0.5, block_timeout: float = 0.05):
+        """Inicializa o gravador (a thread é criada no primeiro registro)"""
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.block_timeout = block_timeout
+
+        self._queue: "queue.Queue[Tuple]" = queue.Queue(max_queue)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Quantos flush() estão esperando (a thread grava o lote sem esperar completar)
+        self._flushing = 0
+        self.stats = {
+            'queued': 0,
+            'written': 0,
+            'batches': 0,
+            'blocked': 0,
+            'dropped': 0,
+            'errors': 0
+        }
+
+    def put(self, tabela: str, acao: str, registro_id: Optional[int] = None,
+            dados_anteriores: Optional[Dict[str, Any]] = None,
+            dados_novos: Optional[Dict[str, Any]] = None,
+            usuario_id: Optional[int] = None, ip_address: Optional[str] = None,
+            user_agent: Optional[str] = None) -> bool:
+        """Enfileira um registro; retorna False se ele foi descartado (fila cheia)"""
+        # Cópia rasa: o chamador pode alterar o dicionário depois da chamada
+        registro = (
+            tabela, registro_id, acao,
+            dict(dados_anteriores) if dados_anteriores else None,
+            dict(dados_novos) if dados_novos else None,
+            usuario_id, ip_address, user_agent, audit_timestamp()
+        )
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(registro)
+        except queue.Full:
+            with self._lock:
+                self.stats['blocked'] += 1
+            try:
+                self._queue.put(registro, timeout=self.block_timeout)
+            except queue.Full:
+                with self._lock:
+                    self.stats['dropped'] += 1
+                return False
+        with self._lock:
+            self.stats['queued'] += 1
+        return True
+
+    def pending(self) -> int:
+        """Registros enfileirados ou em gravação"""
+        return self._queue.unfinished_tasks
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """Espera a gravação do que já foi enfileirado; retorna False se o prazo acabar"""
+        limite = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            self._flushing += 1
+        try:
+            while self._queue.unfinished_tasks:
+                if self._thread is None or not self._thread.is_alive():
+                    self._write_pending()
+                    continue
+                if limite is not None and time.monotonic() >= limite:
+                    return False
+                time.sleep(0.005)
+            return True
+        finally:
+            with self._lock:
+                self._flushing -= 1
+
+    def close(self, timeout: float = 5.0):
+        """Grava o que está na fila e encerra a thread"""
+        self.flush(timeout)
+        self._stop.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            try:
+                # Acorda a thread parada na espera da fila vazia
+                self._queue.put(None, timeout=self.block_timeout)
+            except queue.Full:
+                pass
+            thread.join(timeout)
+        # Registros que chegaram durante o encerramento
+        self._write_pending()
+        self._stop.clear()
+
+    def _ensure_thread(self):
+        """Inicia a thread de escrita, se necessário"""
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="AuditWriter", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        """Laço da thread: junta um lote por tamanho ou tempo e grava (None encerra)"""
+        while True:
+            try:
+                primeiro = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return
+                continue
+            lote = [primeiro]
+            limite = time.monotonic() + self.flush_interval
+            while lote[-1] is not None and len(lote) < self.batch_size:
+                # Com flush pedido ou prazo esgotado, só pega o que já está na fila
+                esperar = min(limite - time.monotonic(), POLL_INTERVAL)
+                if self._flushing or self._stop.is_set():
+                    esperar = 0
+                try:
+                    if esperar > 0:
+                        lote.append(self._queue.get(timeout=esperar))
+                    else:
+                        lote.append(self._queue.get_nowait())
+                except queue.Empty:
+                    if esperar <= 0:
+                        break
+            self._write(lote)
+            if lote[-1] is None:
+                return
+
+    def _write_pending(self):
+        """Grava na thread atual tudo o que estiver na fila"""
+        while True:
+            lote = []
+            while len(lote) < self.batch_size:
+                try:
+                    lote.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not lote:
+                return
+            self._write(lote)
+
+    def _write(self, lote: List[Optional[Tuple]]):
+        """Grava um lote em uma transação (os registros saem da fila mesmo com erro)"""
+        registros = [registro for registro in lote if registro is not None]
+        try:
+            if not registros:
+                return
+            with self.db.transaction() as conn:
+                insert_records(conn, registros)
+            with self._lock:
+                self.stats['written'] += len(registros)
+                self.stats['batches'] += 1
+        except Exception as e:
+            with self._lock:
+                self.stats['errors'] += len(registros)
+            print(f"Erro ao gravar lote de auditoria ({len(registros)} registros): {e}")
+        finally:
+            for _ in lote:
+                self._queue.task_done()
@@ -0,0 +1,191 @@
+"""
+Carga de dados em segundo plano com entrega dos resultados na thread do Tk
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional
+
+class BackgroundTask:
+    """Requisição enviada ao executor.
+
+    ``cancel()`` impede a execução se ela ainda não começou e, em qualquer
+    caso, descarta o resultado (os callbacks não são chamados).
+    """
+
+    __slots__ = ('key', 'func', 'args', 'kwargs', 'on_done', 'on_error', 'future', '_cancelled')
+
+    def __init__(self, key: Optional[Hashable], func: Callable, args: tuple, kwargs: dict,
+                 on_done: Optional[Callable[[Any], None]],
+                 on_error: Optional[Callable[[Exception], None]]):
+        self.key = key
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.on_done = on_done
+        self.on_error = on_error
+        self.future = None
+        self._cancelled = False
+
+    def cancel(self):
+        """Cancela a requisição"""
+        self._cancelled = True
+        if self.future is not None:
+            self.future.cancel()
+
+    @property
+    def cancelled(self) -> bool:
+        """Indica se a requisição foi cancelada (ou substituída)"""
+        return self._cancelled
+
+class BackgroundLoader:
+    """Executa consultas em threads de trabalho e entrega os resultados na thread do Tk.
+
+    Os widgets do Tk só podem ser usados pela thread da interface, então as
+    funções rodam no executor e os resultados entram em uma fila, esvaziada
+    por ``dispatch()`` — chamado periodicamente via ``root.after`` depois de
+    ``attach(root)``. Requisições com a mesma ``key`` substituem as
+    anteriores: só o resultado da mais recente chega à tela (ex.: um novo
+    filtro enquanto a consulta do filtro anterior ainda roda).
+    """
+
+    def __init__(self, max_workers: int = 3, poll_ms: int = 30):
+        """Inicializa o carregador (o executor é criado no primeiro uso)"""
+        self.max_workers = max_workers
+        self.poll_ms = poll_ms
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._results: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._latest: Dict[Hashable, BackgroundTask] = {}
+        self._lock = threading.Lock()
+        self._root = None
+        self._after_id = None
+        self.stats = {
+            'submitted': 0,
+            'completed': 0,
+            'errors': 0,
+            'superseded': 0,
+            'discarded': 0
+        }
+
+    def submit(self, key: Optional[Hashable], func: Callable, *args,
+               on_done: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[Exception], None]] = None,
+               **kwargs) -> BackgroundTask:
+        """Agenda ``func(*args, **kwargs)`` em segundo plano.
+
+        ``on_done(resultado)`` ou ``on_error(exceção)`` são chamados na
+        thread que executa ``dispatch()``. Com ``key``, a requisição
+        pendente anterior de mesma chave é cancelada.
+        """
+        task = BackgroundTask(key, func, args, kwargs, on_done, on_error)
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="Carga")
+            if key is not None:
+                anterior = self._latest.get(key)
+                if anterior is not None:
+                    anterior.cancel()
+                    self.stats['superseded'] += 1
+                self._latest[key] = task
+            self.stats['submitted'] += 1
+            task.future = self._executor.submit(self._run, task)
+        return task
+
+    def cancel(self, key: Hashable) -> bool:
+        """Cancela a requisição pendente da chave; retorna True se havia uma"""
+        with self._lock:
+            task = self._latest.pop(key, None)
+        if task is None:
+            return False
+        task.cancel()
+        return True
+
+    def pending(self) -> int:
+        """Requisições com chave ainda sem resultado entregue"""
+        with self._lock:
+            return len(self._latest)
+
+    def _run(self, task: BackgroundTask):
+        """Executa a requisição (thread de trabalho)"""
+        if task.cancelled:
+            return
+        try:
+            resultado = task.func(*task.args, **task.kwargs)
+        except Exception as e:
+            self._results.put((task, None, e))
+        else:
+            self._results.put((task, resultado, None))
+
+    def dispatch(self) -> int:
+        """Entrega os resultados prontos; retorna quantos callbacks foram chamados"""
+        entregues = 0
+        while True:
+            try:
+                task, resultado, erro = self._results.get_nowait()
+            except queue.Empty:
+                return entregues
+
+            with self._lock:
+                if task.key is not None and self._latest.get(task.key) is task:
+                    del self._latest[task.key]
+            if task.cancelled:
+                self.stats['discarded'] += 1
+                continue
+
+            try:
+                if erro is None:
+                    self.stats['completed'] += 1
+                    if task.on_done:
+                        task.on_done(resultado)
+                else:
+                    self.stats['errors'] += 1
+                    if task.on_error:
+                        task.on_error(erro)
+                    else:
+                        print(f"Erro na carga em segundo plano: {erro}")
+            except Exception as e:
+                print(f"Erro ao aplicar resultado da carga: {e}")
+            entregues += 1
+
+    def attach(self, root, poll_ms: Optional[int] = None):
+        """Passa a entregar os resultados pelo laço de eventos de ``root``"""
+        if poll_ms is not None:
+            self.poll_ms = poll_ms
+        self.detach()
+        self._root = root
+        self._after_id = root.after(self.poll_ms, self._poll)
+
+    def detach(self):
+        """Para a entrega periódica"""
+        if self._root is not None and self._after_id is not None:
+            try:
+                self._root.after_cancel(self._after_id)
+            except Exception:
+                pass
+        self._root = None
+        self._after_id = None
+
+    def _poll(self):
+        """Entrega periódica (thread do Tk)"""
+        try:
+            self.dispatch()
+        finally:
+            if self._root is not None:
+                self._after_id = self._root.after(self.poll_ms, self._poll)
+
+    def shutdown(self, wait: bool = False):
+        """Cancela as requisições pendentes e encerra as threads de trabalho"""
+        self.detach()
+        with self._lock:
+            tasks = list(self._latest.values())
+            self._latest.clear()
+            executor, self._executor = self._executor, None
+        for task in tasks:
+            task.cancel()
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+# Instância global
+background_loader = BackgroundLoader()
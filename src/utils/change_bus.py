@@ -0,0 +1,91 @@
+"""
+Barramento de eventos de alteração de dados (invalidação precisa de caches e telas)
+"""
+
+import threading
+from typing import Callable, Dict, FrozenSet, Iterable, Optional
+
+# Tabela especial: alteração desconhecida, invalidar tudo
+ALL_TABLES = '*'
+
+class ChangeEvent:
+    """Alteração em uma tabela: IDs alterados e filiais afetadas.
+
+    Conjuntos vazios significam "não informado" (tratar como qualquer um).
+    """
+
+    __slots__ = ('tabela', 'ids', 'filiais')
+
+    def __init__(self, tabela: str, ids: Optional[Iterable[int]] = None,
+                 filiais: Optional[Iterable[int]] = None):
+        self.tabela = tabela
+        self.ids: FrozenSet[int] = frozenset(i for i in (ids or ()) if i is not None)
+        self.filiais: FrozenSet[int] = frozenset(f for f in (filiais or ()) if f is not None)
+
+    def affects(self, tabela: str) -> bool:
+        """Indica se o evento diz respeito à tabela"""
+        return self.tabela in (tabela, ALL_TABLES)
+
+    def __repr__(self):
+        return f"ChangeEvent({self.tabela!r}, ids={sorted(self.ids)}, filiais={sorted(self.filiais)})"
+
+class ChangeBus:
+    """Publica eventos de alteração para os assinantes interessados.
+
+    Os assinantes são chamados de forma síncrona, na thread que publicou.
+    Cada tabela tem um contador de versão incrementado a cada evento.
+    """
+
+    def __init__(self):
+        """Inicializa o barramento"""
+        self._lock = threading.Lock()
+        self._subscribers: Dict[int, tuple] = {}
+        self._next_token = 1
+        self.versions: Dict[str, int] = {}
+        self.stats = {'published': 0, 'delivered': 0, 'errors': 0}
+
+    def subscribe(self, callback: Callable[[ChangeEvent], None],
+                  tables: Optional[Iterable[str]] = None) -> int:
+        """Registra um assinante (todas as tabelas se tables for None); retorna o token"""
+        with self._lock:
+            token = self._next_token
+            self._next_token += 1
+            self._subscribers[token] = (callback, frozenset(tables) if tables else None)
+            return token
+
+    def unsubscribe(self, token: int):
+        """Remove um assinante"""
+        with self._lock:
+            self._subscribers.pop(token, None)
+
+    def publish(self, tabela: str, ids: Optional[Iterable[int]] = None,
+                filiais: Optional[Iterable[int]] = None) -> ChangeEvent:
+        """Publica uma alteração"""
+        event = ChangeEvent(tabela, ids, filiais)
+        self.publish_event(event)
+        return event
+
+    def publish_event(self, event: ChangeEvent):
+        """Entrega um evento já montado aos assinantes"""
+        with self._lock:
+            self.versions[event.tabela] = self.versions.get(event.tabela, 0) + 1
+            self.stats['published'] += 1
+            assinantes = list(self._subscribers.values())
+
+        for callback, tables in assinantes:
+            if tables is not None and event.tabela != ALL_TABLES and event.tabela not in tables:
+                continue
+            try:
+                callback(event)
+                self.stats['delivered'] += 1
+            except Exception as e:
+                self.stats['errors'] += 1
+                print(f"Erro ao processar evento {event}: {e}")
+
+    def version(self, tabela: str) -> int:
+        """Versão atual dos dados de uma tabela"""
+        with self._lock:
+            return self.versions.get(tabela, 0) + self.versions.get(ALL_TABLES, 0)
+
+# Instância global do barramento
+change_bus = ChangeBus()
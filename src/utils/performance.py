@@ -2,11 +2,15 @@
 Sistema de otimização de performance
 """
 
+import sys
 import time
+import hashlib
+import inspect
 import threading
 import functools
-from typing import Dict, Any, Callable, Optional
-from datetime import datetime, timedelta
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Iterable, Optional
+from datetime import datetime
 
 class PerformanceMonitor:
     """Monitor de performance da aplicação"""
@@ -86,80 +90,241 @@ class PerformanceMonitor:
         with self.lock:
             self.metrics.clear()
 
+_MISSING = object()
+
+def _estimate_size(value: Any) -> int:
+    """Tamanho aproximado em bytes (objeto e um nível de conteúdo)"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += sys.getsizeof(item)
+            if isinstance(item, dict):
+                size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in item.items())
+    return size
+
+class _CacheEntry:
+    """Valor armazenado com validade, tags e tamanho"""
+    __slots__ = ('value', 'expires_at', 'tags', 'size')
+    
+    def __init__(self, value: Any, expires_at: float, tags: frozenset, size: int):
+        self.value = value
+        self.expires_at = expires_at
+        self.tags = tags
+        self.size = size
+
+class _CacheShard:
+    """Partição do cache com lock, ordem LRU e índice de tags próprios"""
+    
+    def __init__(self, max_entries: int, max_bytes: Optional[int]):
+        self.lock = threading.Lock()
+        self.entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self.tag_index: Dict[str, set] = {}
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+    
+    def remove(self, key: str) -> Optional[_CacheEntry]:
+        """Remove a entrada e suas referências nas tags (chamado com o lock)"""
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry.size
+            for tag in entry.tags:
+                keys = self.tag_index.get(tag)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self.tag_index[tag]
+        return entry
+    
+    def evict(self):
+        """Remove as entradas menos usadas até respeitar os limites (chamado com o lock)"""
+        while self.entries and (
+            len(self.entries) > self.max_entries
+            or (self.max_bytes is not None and self.bytes > self.max_bytes)
+        ):
+            key = next(iter(self.entries))
+            self.remove(key)
+            self.stats['evictions'] += 1
+
 class CacheManager:
-    """Gerenciador de cache para otimização"""
+    """Cache LRU com TTL por entrada, limite de tamanho e invalidação por tags.
+    
+    As entradas são distribuídas em partições pelo hash da chave, cada uma
+    com seu próprio lock: leituras de chaves diferentes não disputam um lock
+    global. Resultados vazios ou None também são armazenados (cache
+    negativo, com TTL próprio opcional).
+    """
     
-    def __init__(self, default_ttl: int = 300):  # 5 minutos padrão
+    def __init__(self, default_ttl: int = 300, max_entries: int = 1024,  # 5 minutos padrão
+                 max_bytes: Optional[int] = None, negative_ttl: Optional[int] = None,
+                 shards: int = 8):
         """Inicializa o gerenciador de cache"""
-        self.cache = {}
-        self.cache_ttl = {}
         self.default_ttl = default_ttl
-        self.lock = threading.Lock()
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._shards = [
+            _CacheShard(max(1, max_entries // shards),
+                        max_bytes // shards if max_bytes is not None else None)
+            for _ in range(shards)
+        ]
+    
+    def _shard(self, key: str) -> _CacheShard:
+        return self._shards[hash(key) % len(self._shards)]
+    
+    @staticmethod
+    def make_key(namespace: str, args: tuple = (), kwargs: Optional[Dict[str, Any]] = None) -> str:
+        """Chave estável: namespace + hash dos argumentos"""
+        payload = repr((args, sorted((kwargs or {}).items())))
+        digest = hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+        return f"{namespace}:{digest}"
     
-    def cache_result(self, ttl: Optional[int] = None):
-        """Decorator para cache de resultados"""
+    def cache_result(self, ttl: Optional[int] = None, tags: Iterable[str] = (),
+                     tag_func: Optional[Callable[..., Iterable[str]]] = None):
+        """Decorator para cache de resultados.
+        
+        Em métodos, a instância (self) fica fora da chave. O nome da função
+        também é uma tag, então invalidate_cache("get_brindes") continua
+        funcionando. ``tag_func`` recebe os mesmos argumentos da função e
+        devolve tags adicionais da entrada (ex.: a filial consultada).
+        """
         def decorator(func: Callable) -> Callable:
+            parametros = list(inspect.signature(func).parameters)
+            is_method = bool(parametros) and parametros[0] == 'self'
+            namespace = func.__qualname__
+            entry_tags = frozenset(tags) | {func.__name__}
+            
             @functools.wraps(func)
             def wrapper(*args, **kwargs):
-                # Criar chave do cache
-                cache_key = f"{func.__name__}:{str(args)}:{str(sorted(kwargs.items()))}"
+                cache_key = self.make_key(namespace, args[1:] if is_method else args, kwargs)
                 
-                # Verificar se existe no cache e não expirou
-                if self.get_from_cache(cache_key) is not None:
-                    return self.get_from_cache(cache_key)
+                result = self.get(cache_key, _MISSING)
+                if result is not _MISSING:
+                    return result
                 
-                # Executar função e cachear resultado
                 result = func(*args, **kwargs)
-                self.set_cache(cache_key, result, ttl or self.default_ttl)
-                
+                if tag_func is not None:
+                    self.set(cache_key, result, ttl, entry_tags | frozenset(tag_func(*args, **kwargs)))
+                else:
+                    self.set(cache_key, result, ttl, entry_tags)
                 return result
+            
             return wrapper
         return decorator
     
+    def get(self, key: str, default: Any = None) -> Any:
+        """Obtém valor do cache (uma única consulta; default se ausente ou expirado)"""
+        shard = self._shard(key)
+        with shard.lock:
+            entry = shard.entries.get(key)
+            if entry is None:
+                shard.stats['misses'] += 1
+                return default
+            if entry.expires_at <= time.monotonic():
+                shard.remove(key)
+                shard.stats['expirations'] += 1
+                shard.stats['misses'] += 1
+                return default
+            shard.entries.move_to_end(key)
+            shard.stats['hits'] += 1
+            return entry.value
+    
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, tags: Iterable[str] = ()):
+        """Armazena valor no cache"""
+        if ttl is None:
+            vazio = value is None or (hasattr(value, '__len__') and len(value) == 0)
+            ttl = self.negative_ttl if vazio and self.negative_ttl is not None else self.default_ttl
+        
+        size = _estimate_size(value) if self.max_bytes is not None else 0
+        entry = _CacheEntry(value, time.monotonic() + ttl, frozenset(tags), size)
+        
+        shard = self._shard(key)
+        with shard.lock:
+            shard.remove(key)
+            shard.entries[key] = entry
+            shard.bytes += size
+            for tag in entry.tags:
+                shard.tag_index.setdefault(tag, set()).add(key)
+            shard.evict()
+    
     def set_cache(self, key: str, value: Any, ttl: int):
-        """Define valor no cache"""
-        with self.lock:
-            self.cache[key] = value
-            self.cache_ttl[key] = datetime.now() + timedelta(seconds=ttl)
+        """Define valor no cache (compatibilidade)"""
+        self.set(key, value, ttl)
     
     def get_from_cache(self, key: str) -> Any:
-        """Obtém valor do cache"""
-        with self.lock:
-            if key not in self.cache:
-                return None
-            
-            # Verificar se expirou
-            if datetime.now() > self.cache_ttl.get(key, datetime.min):
-                del self.cache[key]
-                del self.cache_ttl[key]
-                return None
-            
-            return self.cache[key]
+        """Obtém valor do cache (compatibilidade; None se ausente)"""
+        return self.get(key)
+    
+    def delete(self, key: str) -> bool:
+        """Remove uma chave"""
+        shard = self._shard(key)
+        with shard.lock:
+            return shard.remove(key) is not None
+    
+    def invalidate_tags(self, *tags: str) -> int:
+        """Remove todas as entradas marcadas com alguma das tags"""
+        removidas = 0
+        for shard in self._shards:
+            with shard.lock:
+                for tag in tags:
+                    for key in list(shard.tag_index.get(tag, ())):
+                        shard.remove(key)
+                        shard.stats['invalidations'] += 1
+                        removidas += 1
+        return removidas
     
     def invalidate_cache(self, pattern: str = None):
-        """Invalida cache por padrão"""
-        with self.lock:
-            if pattern is None:
-                self.cache.clear()
-                self.cache_ttl.clear()
-            else:
-                keys_to_remove = [key for key in self.cache.keys() if pattern in key]
-                for key in keys_to_remove:
-                    del self.cache[key]
-                    del self.cache_ttl[key]
+        """Invalida o cache inteiro ou as entradas de uma tag/nome de função"""
+        if pattern is None:
+            self.clear()
+        else:
+            self.invalidate_tags(pattern)
+    
+    def clear(self):
+        """Remove todas as entradas"""
+        for shard in self._shards:
+            with shard.lock:
+                shard.stats['invalidations'] += len(shard.entries)
+                shard.entries.clear()
+                shard.tag_index.clear()
+                shard.bytes = 0
+    
+    def purge_expired(self) -> int:
+        """Remove as entradas expiradas; retorna quantas foram removidas"""
+        agora = time.monotonic()
+        removidas = 0
+        for shard in self._shards:
+            with shard.lock:
+                for key in [k for k, e in shard.entries.items() if e.expires_at <= agora]:
+                    shard.remove(key)
+                    shard.stats['expirations'] += 1
+                    removidas += 1
+        return removidas
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Obtém estatísticas do cache"""
-        with self.lock:
-            total_items = len(self.cache)
-            expired_items = sum(1 for ttl in self.cache_ttl.values() if datetime.now() > ttl)
-            
-            return {
-                'total_items': total_items,
-                'active_items': total_items - expired_items,
-                'expired_items': expired_items,
-                'cache_keys': list(self.cache.keys())
-            }
+        totais = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+        entradas = 0
+        tamanho = 0
+        for shard in self._shards:
+            with shard.lock:
+                for chave, valor in shard.stats.items():
+                    totais[chave] += valor
+                entradas += len(shard.entries)
+                tamanho += shard.bytes
+        
+        consultas = totais['hits'] + totais['misses']
+        return {
+            **totais,
+            'total_items': entradas,
+            'bytes': tamanho if self.max_bytes is not None else None,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'hit_rate': round(totais['hits'] / consultas, 4) if consultas else 0.0
+        }
 
 class DatabaseOptimizer:
     """Otimizador de consultas ao banco"""
@@ -280,7 +445,7 @@ class PerformanceOptimizer:
             
             try:
                 # Limpeza de cache expirado
-                self.cache.invalidate_cache()
+                self.cache.purge_expired()
                 
                 # Limpeza de memória se necessário
                 if self.memory_manager.should_cleanup():
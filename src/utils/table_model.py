@@ -0,0 +1,153 @@
+"""
+Modelo das tabelas virtualizadas: colunas, ordenação e janela de linhas visíveis
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+class Column:
+    """Coluna de tabela: de onde vem o valor, como exibir e como ordenar"""
+
+    def __init__(self, key: Union[str, Callable[[Dict[str, Any]], Any]], title: str,
+                 width: int = 100, weight: int = 1, anchor: str = "w",
+                 formatter: Optional[Callable[[Any], str]] = None,
+                 sort_key: Optional[Callable[[Dict[str, Any]], Any]] = None,
+                 color: Optional[Callable[[Dict[str, Any]], Any]] = None,
+                 max_chars: Optional[int] = None, sortable: bool = True):
+        """Inicializa a coluna.
+
+        ``key`` é a chave do item ou uma função item -> valor; ``formatter``
+        converte o valor em texto; ``sort_key`` substitui o valor na
+        ordenação; ``color`` retorna a cor do texto para o item (ou None);
+        textos maiores que ``max_chars`` são abreviados com "...".
+        """
+        self.key = key
+        self.title = title
+        self.width = width
+        self.weight = weight
+        self.anchor = anchor
+        self.formatter = formatter
+        self.sort_key = sort_key
+        self.color = color
+        self.max_chars = max_chars
+        self.sortable = sortable
+
+    def value(self, item: Dict[str, Any]) -> Any:
+        """Valor bruto da coluna para o item"""
+        if callable(self.key):
+            return self.key(item)
+        return item.get(self.key)
+
+    def full_text(self, item: Dict[str, Any]) -> str:
+        """Texto completo da célula"""
+        valor = self.value(item)
+        if self.formatter:
+            return self.formatter(valor)
+        return '' if valor is None else str(valor)
+
+    def text(self, item: Dict[str, Any]) -> str:
+        """Texto exibido na célula (abreviado se passar de ``max_chars``)"""
+        texto = self.full_text(item)
+        if self.max_chars and len(texto) > self.max_chars:
+            return texto[:self.max_chars] + '...'
+        return texto
+
+    def sort_value(self, item: Dict[str, Any]) -> Any:
+        """Chave de ordenação: vazios por último (crescente), textos sem diferenciar maiúsculas"""
+        valor = self.sort_key(item) if self.sort_key else self.value(item)
+        if valor is None or valor == '':
+            return (True,)
+        if isinstance(valor, str):
+            valor = valor.lower()
+        return (False, valor)
+
+class TableModel:
+    """Itens de uma tabela com ordenação e janela de ``page_size`` linhas.
+
+    A janela começa em ``offset`` e anda linha a linha (rolagem) ou de
+    página em página, até o início da última página; só os itens dentro
+    dela são vinculados a widgets.
+    """
+
+    def __init__(self, columns: Sequence[Column], page_size: int = 15):
+        """Inicializa o modelo"""
+        self.columns = list(columns)
+        self.page_size = max(1, page_size)
+        self.items: Sequence[Dict[str, Any]] = []
+        self.rows: List[Dict[str, Any]] = []
+        self.offset = 0
+        self.sort_column: Optional[int] = None
+        self.sort_descending = False
+
+    def set_items(self, items: Sequence[Dict[str, Any]], keep_position: bool = False):
+        """Define os itens (na ordem recebida, ou na da coluna ordenada)"""
+        self.items = items
+        self._apply_sort()
+        self.scroll_to(self.offset if keep_position else 0)
+
+    def _apply_sort(self):
+        """Reordena as linhas conforme a coluna de ordenação"""
+        if self.sort_column is None:
+            self.rows = list(self.items)
+            return
+        column = self.columns[self.sort_column]
+        try:
+            self.rows = sorted(self.items, key=column.sort_value, reverse=self.sort_descending)
+        except TypeError:
+            # Tipos misturados na coluna: ordenar pelo texto
+            self.rows = sorted(self.items, key=lambda item: column.full_text(item).lower(),
+                               reverse=self.sort_descending)
+
+    def sort_by(self, column_index: Optional[int], descending: Optional[bool] = None):
+        """Ordena pela coluna (mesma coluna de novo inverte o sentido); None volta à ordem original"""
+        if column_index is not None and not self.columns[column_index].sortable:
+            return
+        if descending is None:
+            descending = column_index == self.sort_column and not self.sort_descending
+        self.sort_column = column_index
+        self.sort_descending = descending
+        self._apply_sort()
+        self.scroll_to(0)
+
+    @property
+    def total(self) -> int:
+        """Quantidade de linhas"""
+        return len(self.rows)
+
+    @property
+    def max_offset(self) -> int:
+        """Maior início de janela (início da última página)"""
+        return (self.pages - 1) * self.page_size
+
+    def scroll_to(self, offset: int) -> bool:
+        """Posiciona a janela; retorna True se ela mudou"""
+        offset = min(max(0, offset), self.max_offset)
+        mudou = offset != self.offset
+        self.offset = offset
+        return mudou
+
+    def scroll(self, linhas: int) -> bool:
+        """Rola a janela ``linhas`` para baixo (negativo: para cima)"""
+        return self.scroll_to(self.offset + linhas)
+
+    @property
+    def pages(self) -> int:
+        """Total de páginas"""
+        return max(1, -(-self.total // self.page_size))
+
+    @property
+    def page(self) -> int:
+        """Página atual (1..pages); com a janela entre duas páginas, a de cima"""
+        return self.offset // self.page_size + 1
+
+    def go_to_page(self, page: int) -> bool:
+        """Vai para a página (limitada ao intervalo válido)"""
+        page = min(max(1, page), self.pages)
+        return self.scroll_to((page - 1) * self.page_size)
+
+    def visible(self) -> List[Dict[str, Any]]:
+        """Itens dentro da janela"""
+        return self.rows[self.offset:self.offset + self.page_size]
+
+    def cells(self, item: Dict[str, Any]) -> List[str]:
+        """Textos das células do item"""
+        return [column.text(item) for column in self.columns]
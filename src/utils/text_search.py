@@ -0,0 +1,152 @@
+"""
+Índice de busca em memória para as telas de listagem (prefixo, sem acentos)
+"""
+
+import re
+import unicodedata
+from bisect import bisect_left
+from functools import lru_cache
+from itertools import zip_longest
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set
+
+# Prefixos curtos (primeiras letras digitadas) já ficam prontos na montagem
+PREFIX_LENGTHS = (1, 2)
+
+_WORD = re.compile(r"\w+")
+
+@lru_cache(maxsize=4096)
+def _fold(palavra: str) -> str:
+    """Remove os acentos de uma palavra"""
+    palavra = unicodedata.normalize('NFKD', palavra)
+    return ''.join(c for c in palavra if not unicodedata.combining(c))
+
+def search_words(texto: Any) -> List[str]:
+    """Palavras minúsculas e sem acentos (mesmas regras do índice FTS5 do banco)"""
+    texto = str(texto or '').lower()
+    if texto.isascii():
+        return _WORD.findall(texto)
+    palavras = _WORD.findall(unicodedata.normalize('NFC', texto))
+    return [p if p.isascii() else _fold(p) for p in palavras]
+
+def _all_values(item: Dict[str, Any]) -> Iterable[Any]:
+    """Campos pesquisáveis padrão: todos os valores do registro"""
+    return item.values()
+
+def matcher(query: str, fields: Callable[[Dict[str, Any]], Iterable[Any]] = _all_values
+            ) -> Optional[Callable[[Dict[str, Any]], bool]]:
+    """Teste item a item com as regras do índice (para fluxos que não cabem em memória).
+
+    Retorna None para busca vazia (todos os itens casam).
+    """
+    palavras = search_words(query)
+    if not palavras:
+        return None
+
+    def casa(item: Dict[str, Any]) -> bool:
+        texto = ' '.join(str(valor) for valor in fields(item) if valor is not None)
+        termos = search_words(texto)
+        return all(any(t.startswith(p) for t in termos) for p in palavras)
+
+    return casa
+
+class TextSearchIndex:
+    """Índice invertido palavra -> posições dos itens, montado uma vez por carga.
+
+    Um item casa se cada palavra da busca é prefixo de alguma palavra dos
+    seus campos ("can az" encontra "Caneta Azul"). As palavras do índice
+    ficam ordenadas, então as que começam por um prefixo formam um intervalo
+    (busca binária). Quando a busca estende a anterior (mais uma letra ou
+    mais uma palavra) só o resultado anterior é filtrado.
+    """
+
+    def __init__(self, items: Sequence[Dict[str, Any]] = (),
+                 fields: Callable[[Dict[str, Any]], Iterable[Any]] = _all_values):
+        """Monta o índice para ``items``; ``fields`` retorna os textos de um item"""
+        self.fields = fields
+        self.build(items)
+
+    def build(self, items: Sequence[Dict[str, Any]]):
+        """(Re)monta o índice; os resultados seguem a ordem de ``items``"""
+        self.items = items
+        postings: Dict[str, List[int]] = {}
+        for posicao, item in enumerate(items):
+            texto = ' '.join(str(valor) for valor in self.fields(item) if valor is not None)
+            for palavra in set(search_words(texto)):
+                postings.setdefault(palavra, []).append(posicao)
+
+        self._postings = postings
+        self._words = sorted(postings)
+        # Prefixo -> posições; cache válido até a próxima montagem
+        self._prefixes: Dict[str, Set[int]] = {}
+        self._sorted: Dict[str, List[int]] = {}
+        for tamanho in PREFIX_LENGTHS:
+            for prefixo in {palavra[:tamanho] for palavra in self._words if len(palavra) >= tamanho}:
+                self._prefix_sorted(prefixo)
+
+        self._all = list(range(len(items)))
+        self._last_words: List[str] = []
+        self._last_result = self._all
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def _prefix(self, prefixo: str) -> Set[int]:
+        """Posições dos itens com alguma palavra começando por ``prefixo``"""
+        conjunto = self._prefixes.get(prefixo)
+        if conjunto is None:
+            inicio = bisect_left(self._words, prefixo)
+            fim = bisect_left(self._words, prefixo + '\uffff', inicio)
+            conjunto = set()
+            for palavra in self._words[inicio:fim]:
+                conjunto.update(self._postings[palavra])
+            self._prefixes[prefixo] = conjunto
+        return conjunto
+
+    def _prefix_sorted(self, prefixo: str) -> List[int]:
+        """Mesmo que ``_prefix``, em ordem (só quando não há resultado anterior)"""
+        posicoes = self._sorted.get(prefixo)
+        if posicoes is None:
+            posicoes = self._sorted[prefixo] = sorted(self._prefix(prefixo))
+        return posicoes
+
+    def search_positions(self, query: str) -> List[int]:
+        """Posições (em ordem) dos itens que casam com a busca"""
+        return list(self._search(query))
+
+    def search(self, query: str) -> List[Dict[str, Any]]:
+        """Itens que casam com a busca, na ordem original"""
+        posicoes = self._search(query)
+        if len(posicoes) == len(self.items):
+            return list(self.items)
+        return list(map(self.items.__getitem__, posicoes))
+
+    def _search(self, query: str) -> List[int]:
+        """Resultado da busca (lista interna: não deve ser alterada)"""
+        palavras = search_words(query)
+        anteriores = self._last_words
+        if not palavras:
+            resultado = self._all
+        elif (len(palavras) >= len(anteriores)
+              and all(p.startswith(a) for p, a in zip(palavras, anteriores))):
+            # Busca estende a anterior: filtra só o resultado anterior
+            resultado = self._last_result
+            for palavra, anterior in zip_longest(palavras, anteriores):
+                if palavra != anterior:
+                    resultado = self._narrow(resultado, palavra)
+        else:
+            resultado = self._all
+            for palavra in sorted(palavras, key=lambda p: len(self._prefix(p))):
+                resultado = self._narrow(resultado, palavra)
+
+        self._last_words = palavras
+        self._last_result = resultado
+        return resultado
+
+    def _narrow(self, candidatos: List[int], palavra: str) -> List[int]:
+        """Restringe ``candidatos`` aos itens que casam com ``palavra``"""
+        conjunto = self._prefix(palavra)
+        if len(conjunto) == len(self.items):
+            return candidatos
+        if len(candidatos) == len(self.items):
+            return self._prefix_sorted(palavra)
+        return list(filter(conjunto.__contains__, candidatos))
@@ -0,0 +1,215 @@
+"""
+Testes da auditoria particionada por mês (dados só alterados e compactados)
+"""
+
+import unittest
+import json
+import os
+import sys
+import sqlite3
+import tempfile
+import shutil
+from datetime import datetime, timedelta, timezone
+
+# Adicionar src ao path para importar módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.database.schema import DatabaseSchema
+from src.database.audit_partitions import (
+    insert_records, list_partitions, diff_payloads, encode_payload, decode_payload,
+    drop_partitions_before
+)
+from src.utils.audit_logger import AuditLogger
+from src.utils.audit_writer import AuditWriter
+
+def _registro(data_hora, registro_id=1, acao='INSERT', anteriores=None, novos=None, tabela='brindes'):
+    return (tabela, registro_id, acao, anteriores, novos, 1, None, None, data_hora)
+
+class TestPayloads(unittest.TestCase):
+    """Diferença entre os lados de um UPDATE e compactação"""
+
+    def test_diff_only_changed_fields(self):
+        anteriores, novos = diff_payloads(
+            'UPDATE',
+            {'id': 1, 'descricao': 'Caneta', 'quantidade': 10, 'obs': 'x'},
+            {'id': 1, 'descricao': 'Caneta', 'quantidade': 7, 'filial': 'Matriz'}
+        )
+        self.assertEqual(anteriores, {'quantidade': 10, 'obs': 'x'})
+        self.assertEqual(novos, {'quantidade': 7, 'filial': 'Matriz'})
+
+    def test_insert_and_delete_keep_full_payload(self):
+        dados = {'id': 1, 'descricao': 'Caneta'}
+        self.assertEqual(diff_payloads('INSERT', None, dados), (None, dados))
+        self.assertEqual(diff_payloads('DELETE', dados, None), (dados, None))
+
+    def test_encode_round_trip(self):
+        pequeno = {'quantidade': 1}
+        grande = {'descricao': 'Caneta esferográfica azul ' * 20, 'quantidade': 10}
+        self.assertIsInstance(encode_payload(pequeno), str)
+        compactado = encode_payload(grande)
+        self.assertIsInstance(compactado, bytes)
+        self.assertLess(len(compactado), len(json.dumps(grande)))
+        self.assertEqual(json.loads(decode_payload(compactado)), grande)
+        self.assertIsNone(encode_payload(None))
+
+class TestAuditPartitions(unittest.TestCase):
+    """Partições mensais, consultas por intervalo e retenção"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.schema = DatabaseSchema(os.path.join(self.temp_dir, 'teste.db'))
+        self.logger = AuditLogger()
+        self.logger.db = self.schema
+        self.logger.writer = AuditWriter(self.schema)
+
+    def tearDown(self):
+        self.logger.writer.close()
+        self.schema.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _inserir(self, registros):
+        with self.schema.transaction() as conn:
+            insert_records(conn, registros)
+
+    def _rastrear(self, funcao, *args, **kwargs):
+        """Executa ``funcao`` registrando o SQL da conexão da thread; retorna (resultado, SQL)"""
+        conn = self.schema.get_pooled_connection()
+        executadas = []
+        conn.set_trace_callback(executadas.append)
+        try:
+            return funcao(*args, **kwargs), executadas
+        finally:
+            conn.set_trace_callback(None)
+
+    def test_records_go_to_month_partitions(self):
+        """Um registro por mês: uma partição cada, IDs únicos, visão com todos"""
+        self._inserir([_registro('2025-01-15 10:00:00', 1), _registro('2025-02-01 00:00:00', 2),
+                       _registro('2025-01-31 23:59:59', 3)])
+        conn = self.schema.get_pooled_connection()
+        self.assertEqual(list_partitions(conn), ['logs_auditoria_202501', 'logs_auditoria_202502'])
+        ids = [row[0] for row in conn.execute("SELECT id FROM logs_auditoria")]
+        self.assertEqual(len(set(ids)), 3)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM logs_auditoria_202501").fetchone()[0], 2)
+
+    def test_get_audit_logs_prunes_by_range(self):
+        """Só as partições do intervalo são lidas"""
+        self._inserir([_registro(f"2025-{mes:02d}-10 12:00:00", mes) for mes in range(1, 7)])
+        logs, executadas = self._rastrear(self.logger.get_audit_logs, data_inicio=datetime(2025, 3, 1),
+                                          data_fim=datetime(2025, 4, 30))
+
+        self.assertEqual([log['registro_id'] for log in logs], [4, 3])
+        particoes = list_partitions(self.schema.get_pooled_connection())
+        lidas = {p for sql in executadas for p in particoes if f"FROM {p} " in sql}
+        self.assertEqual(lidas, {'logs_auditoria_202503', 'logs_auditoria_202504'})
+
+    def test_get_audit_logs_stops_at_limit(self):
+        """Mais recentes primeiro; partições antigas não são lidas se o limite já foi atingido"""
+        self._inserir([_registro(f"2025-{mes:02d}-{dia:02d} 12:00:00", mes * 100 + dia)
+                       for mes in (1, 2, 3) for dia in (1, 2)])
+        logs, executadas = self._rastrear(self.logger.get_audit_logs, limit=3)
+
+        self.assertEqual([log['registro_id'] for log in logs], [302, 301, 202])
+        self.assertFalse(any("FROM logs_auditoria_202501 " in sql for sql in executadas))
+
+    def test_get_audit_logs_decodes_diff(self):
+        """Dados devolvidos como texto JSON, só com os campos alterados"""
+        descricao = 'Caneta esferográfica azul com logotipo ' * 5
+        self._inserir([_registro('2025-05-05 08:00:00', 9, 'UPDATE',
+                                 {'descricao': descricao, 'quantidade': 10},
+                                 {'descricao': descricao, 'quantidade': 4, 'obs': descricao})])
+        log = self.logger.get_audit_logs(tabela='brindes', acao='UPDATE')[0]
+        self.assertEqual(json.loads(log['dados_anteriores']), {'quantidade': 10})
+        self.assertEqual(json.loads(log['dados_novos']), {'quantidade': 4, 'obs': descricao})
+
+    def test_retention_drops_whole_partitions(self):
+        """Meses inteiros antigos saem com DROP; no mês do limite, só as linhas antigas"""
+        agora = datetime.now(timezone.utc)
+        limite = agora - timedelta(days=90)
+        antigos = [(limite - timedelta(days=dias)).strftime('%Y-%m-%d %H:%M:%S') for dias in (40, 70, 100)]
+        recentes = [(agora - timedelta(days=dias)).strftime('%Y-%m-%d %H:%M:%S') for dias in (0, 10)]
+        no_limite = [(limite - timedelta(days=1)).strftime('%Y-%m-%d %H:%M:%S')]
+        self._inserir([_registro(d, i) for i, d in enumerate(antigos + no_limite + recentes)])
+
+        removidos, executadas = self._rastrear(self.logger.cleanup_old_logs, 90)
+
+        self.assertEqual(removidos, 4)
+        conn = self.schema.get_pooled_connection()
+        self.assertTrue(all(p >= f"logs_auditoria_{limite:%Y%m}" for p in list_partitions(conn)))
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM logs_auditoria").fetchone()[0], 2)
+        self.assertTrue(any(sql.startswith("DROP TABLE logs_auditoria_") for sql in executadas))
+
+    def test_retention_without_partitions(self):
+        """Sem registros a limpeza não falha e a visão continua consultável"""
+        with self.schema.transaction() as conn:
+            self.assertEqual(drop_partitions_before(conn, '2030-01-01'), 0)
+        self.assertEqual(self.schema.execute_query("SELECT COUNT(*) FROM logs_auditoria")[0][0], 0)
+
+class TestAuditPartitionMigration(unittest.TestCase):
+    """Banco com a tabela única logs_auditoria migrado para partições"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'teste.db')
+        DatabaseSchema(self.db_path).close()
+
+        # Volta o banco para a versão 5 (tabela única, dados em texto JSON)
+        conn = sqlite3.connect(self.db_path)
+        for particao in list_partitions(conn):
+            conn.execute(f"DROP TABLE {particao}")
+        conn.executescript("""
+            DROP VIEW logs_auditoria;
+            CREATE TABLE logs_auditoria (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                tabela TEXT NOT NULL,
+                registro_id INTEGER,
+                acao TEXT NOT NULL CHECK (acao IN ('INSERT', 'UPDATE', 'DELETE')),
+                dados_anteriores TEXT,
+                dados_novos TEXT,
+                usuario_id INTEGER,
+                ip_address TEXT,
+                user_agent TEXT,
+                data_hora TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            CREATE INDEX idx_logs_data ON logs_auditoria (data_hora);
+            PRAGMA user_version = 5;
+        """)
+        conn.executemany("""
+            INSERT INTO logs_auditoria (id, tabela, registro_id, acao, dados_anteriores, dados_novos, data_hora)
+            VALUES (?, 'brindes', ?, ?, ?, ?, ?)
+        """, [
+            (10, 1, 'INSERT', None, '{"descricao": "Caneta", "quantidade": 5}', '2024-11-03 09:00:00'),
+            (11, 1, 'UPDATE', '{"descricao": "Caneta", "quantidade": 5}',
+             '{"descricao": "Caneta", "quantidade": 8}', '2024-12-24 18:30:00'),
+            (12, 1, 'DELETE', '{"descricao": "Caneta"}', None, '2024-12-31 23:00:00')
+        ])
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_migration_moves_rows(self):
+        """Linhas movidas para as partições com ID preservado e só os campos alterados"""
+        schema = DatabaseSchema(self.db_path)
+        try:
+            conn = schema.get_pooled_connection()
+            self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], schema.migrator.latest_version)
+            self.assertEqual(list_partitions(conn), ['logs_auditoria_202411', 'logs_auditoria_202412'])
+            tipo = conn.execute("SELECT type FROM sqlite_master WHERE name = 'logs_auditoria'").fetchone()[0]
+            self.assertEqual(tipo, 'view')
+
+            rows = conn.execute("SELECT id, dados_anteriores, dados_novos FROM logs_auditoria ORDER BY id").fetchall()
+            self.assertEqual([row[0] for row in rows], [10, 11, 12])
+            self.assertEqual(json.loads(decode_payload(rows[1][1])), {'quantidade': 5})
+            self.assertEqual(json.loads(decode_payload(rows[1][2])), {'quantidade': 8})
+
+            # Novos registros do mesmo mês seguem com IDs maiores
+            with schema.transaction() as tx:
+                insert_records(tx, [_registro('2024-12-31 23:59:00', 2)])
+            novo = conn.execute("SELECT MAX(id) FROM logs_auditoria_202412").fetchone()[0]
+            self.assertGreater(novo, 12)
+        finally:
+            schema.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+"""
+Testes do resumo da auditoria (logs_auditoria_resumo) usado por get_system_stats
+"""
+
+import unittest
+import io
+import os
+import sys
+import tempfile
+import shutil
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta, timezone
+
+# Adicionar src ao path para importar módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.database.schema import DatabaseSchema
+from src.database.audit_partitions import insert_records, list_partitions
+from src.database.audit_rollup import rebuild_audit_rollup, verify_audit_rollup, main
+from src.utils.audit_logger import AuditLogger
+from src.utils.audit_writer import AuditWriter
+
+def _data(dias_atras=0):
+    return (datetime.now(timezone.utc) - timedelta(days=dias_atras)).strftime('%Y-%m-%d %H:%M:%S')
+
+class TestAuditRollup(unittest.TestCase):
+    """Resumo atualizado na gravação, retenção e reconstrução"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'teste.db')
+        self.schema = DatabaseSchema(self.db_path)
+        self.logger = AuditLogger()
+        self.logger.db = self.schema
+        self.logger.writer = AuditWriter(self.schema)
+
+    def tearDown(self):
+        self.logger.writer.close()
+        self.schema.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _inserir(self, registros):
+        with self.schema.transaction() as conn:
+            insert_records(conn, registros)
+
+    def _conn(self):
+        return self.schema.get_pooled_connection()
+
+    def test_incremental_matches_recount(self):
+        """Writer, caminho com conn e vários dias: resumo igual à contagem dos registros"""
+        for i in range(5):
+            self.logger.audit_brinde_updated(i, {'quantidade': 1}, {'quantidade': 2}, usuario_id=1)
+        self.logger.audit_user_login('admin', True)
+        with self.schema.transaction() as conn:
+            self.logger.audit_movimentacoes_bulk([{'id': 1, 'usuario_id': 1}, {'id': 2}], conn)
+        self._inserir([('brindes', 9, 'DELETE', {'id': 9}, None, 1, None, None, _data(dias))
+                       for dias in (1, 2, 40)])
+        self.logger.flush()
+
+        self.assertEqual(verify_audit_rollup(self._conn()), [])
+        total = self._conn().execute("SELECT SUM(total) FROM logs_auditoria_resumo").fetchone()[0]
+        self.assertEqual(total, 11)
+
+    def test_rollback_discards_counts(self):
+        """Resumo e registro entram e saem na mesma transação"""
+        with self.assertRaises(RuntimeError):
+            with self.schema.transaction() as conn:
+                self.logger.audit_action('brindes', 'INSERT', 1, conn=conn)
+                raise RuntimeError("falha")
+        self.assertEqual(self._conn().execute("SELECT COUNT(*) FROM logs_auditoria_resumo").fetchone()[0], 0)
+
+    def test_system_stats_reads_only_rollup(self):
+        """get_system_stats não lê as partições da auditoria"""
+        self._inserir([('brindes', i, 'INSERT' if i % 3 else 'UPDATE', None, {'id': i},
+                        1 if i % 2 else None, None, None, _data(i % 10)) for i in range(30)])
+
+        executadas = []
+        self._conn().set_trace_callback(executadas.append)
+        try:
+            stats = self.logger.get_system_stats()
+        finally:
+            self._conn().set_trace_callback(None)
+
+        self.assertEqual(stats['logs_por_acao'], {'INSERT': 20, 'UPDATE': 10})
+        self.assertEqual(sum(stats['logs_por_usuario'].values()), 15)
+        self.assertEqual(sum(stats['logs_por_data'].values()),
+                         sum(1 for i in range(30) if i % 10 <= 7))
+        self.assertTrue(executadas)
+        self.assertFalse(any("logs_auditoria_2" in sql or "FROM logs_auditoria " in sql for sql in executadas))
+
+    def test_retention_trims_rollup(self):
+        """Dias removidos pela limpeza saem também do resumo"""
+        self._inserir([('brindes', i, 'INSERT', None, None, 1, None, None, _data(dias))
+                       for i, dias in enumerate((0, 5, 95, 200))])
+        self.assertEqual(self.logger.cleanup_old_logs(90), 2)
+        self.assertEqual(verify_audit_rollup(self._conn()), [])
+        self.assertEqual(sum(self.logger.get_system_stats()['logs_por_acao'].values()), 2)
+
+    def test_rebuild_and_cli(self):
+        """Divergência detectada por 'verificar' e corrigida por 'reconstruir'"""
+        self._inserir([('brindes', i, 'INSERT', None, None, 1, None, None, _data()) for i in range(4)])
+        with self.schema.transaction() as conn:
+            conn.execute("UPDATE logs_auditoria_resumo SET total = total + 5")
+        self.assertEqual(len(verify_audit_rollup(self._conn())), 1)
+
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(main(['verificar', self.db_path]), 1)
+            self.assertEqual(main(['reconstruir', self.db_path]), 0)
+            self.assertEqual(main(['verificar', self.db_path]), 0)
+            self.assertEqual(main(['contar']), 2)
+        self.assertEqual(self.logger.get_system_stats()['logs_por_acao'], {'INSERT': 4})
+
+    def test_rebuild_empty(self):
+        """Reconstrução sem registros deixa o resumo vazio"""
+        self.assertEqual(list_partitions(self._conn()), [])
+        self.assertEqual(rebuild_audit_rollup(self._conn()), 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+"""
+Testes do gravador assíncrono da auditoria (fila limitada + lotes)
+"""
+
+import unittest
+import json
+import os
+import sys
+import tempfile
+import shutil
+import threading
+import time
+
+# Adicionar src ao path para importar módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.database.schema import DatabaseSchema
+from src.utils.audit_writer import AuditWriter
+from src.utils.audit_logger import AuditLogger
+
+class _BancoTravado:
+    """Encaminha para o banco real, mas a transação espera ``liberar``"""
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.liberar = threading.Event()
+
+    def transaction(self):
+        self.liberar.wait(5)
+        return self.schema.transaction()
+
+class TestAuditWriter(unittest.TestCase):
+    """Lotes por tamanho e por tempo, flush, encerramento e contrapressão"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.schema = DatabaseSchema(os.path.join(self.temp_dir, 'teste.db'))
+
+    def tearDown(self):
+        self.schema.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _total(self):
+        return self.schema.execute_query("SELECT COUNT(*) FROM logs_auditoria")[0][0]
+
+    def test_batches_by_size(self):
+        """Registros agrupados em poucos lotes, uma transação cada"""
+        writer = AuditWriter(self.schema, batch_size=100, flush_interval=1)
+        for i in range(1000):
+            writer.put('brindes', 'UPDATE', i, {'quantidade': i}, {'quantidade': i + 1}, usuario_id=1)
+        self.assertTrue(writer.flush())
+        writer.close()
+
+        self.assertEqual(self._total(), 1000)
+        self.assertEqual(writer.stats['written'], 1000)
+        self.assertLessEqual(writer.stats['batches'], 15)
+        self.assertEqual(writer.stats['dropped'], 0)
+        row = self.schema.execute_query(
+            "SELECT dados_novos, data_hora FROM logs_auditoria WHERE registro_id = 7")[0]
+        self.assertEqual(json.loads(row[0]), {'quantidade': 8})
+        self.assertRegex(row[1], r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$')
+
+    def test_flush_by_time(self):
+        """Lote incompleto é gravado ao fim do intervalo, sem flush explícito"""
+        writer = AuditWriter(self.schema, batch_size=500, flush_interval=0.05)
+        writer.put('categorias', 'INSERT', 1, dados_novos={'nome': 'Escrita'})
+        limite = time.monotonic() + 3
+        while self._total() == 0 and time.monotonic() < limite:
+            time.sleep(0.01)
+        self.assertEqual(self._total(), 1)
+        writer.close()
+
+    def test_snapshot_at_put(self):
+        """Alterações no dicionário depois do put não afetam o registro"""
+        writer = AuditWriter(self.schema)
+        dados = {'quantidade': 1}
+        writer.put('brindes', 'UPDATE', 1, dados_novos=dados)
+        dados['quantidade'] = 99
+        writer.close()
+        valor = self.schema.execute_query("SELECT dados_novos FROM logs_auditoria")[0][0]
+        self.assertEqual(json.loads(valor), {'quantidade': 1})
+
+    def test_close_drains_queue(self):
+        """close() grava tudo o que estava na fila"""
+        writer = AuditWriter(self.schema, batch_size=50, flush_interval=10)
+        for i in range(120):
+            writer.put('brindes', 'INSERT', i)
+        writer.close()
+        self.assertEqual(self._total(), 120)
+        self.assertEqual(writer.pending(), 0)
+
+    def test_backpressure_and_dropped_metric(self):
+        """Fila cheia: espera curta e descarte contabilizado"""
+        banco = _BancoTravado(self.schema)
+        writer = AuditWriter(banco, max_queue=5, batch_size=1, flush_interval=0.01, block_timeout=0.01)
+        aceitos = sum(writer.put('brindes', 'INSERT', i) for i in range(50))
+
+        self.assertGreater(writer.stats['dropped'], 0)
+        self.assertEqual(aceitos + writer.stats['dropped'], 50)
+        self.assertGreater(writer.stats['blocked'], 0)
+
+        banco.liberar.set()
+        writer.close()
+        self.assertEqual(self._total(), aceitos)
+
+    def test_concurrent_producers_metrics(self):
+        """Várias threads enfileirando: aceitos e descartados somam exatamente o total"""
+        banco = _BancoTravado(self.schema)
+        writer = AuditWriter(banco, max_queue=20, batch_size=1, flush_interval=0.01, block_timeout=0.001)
+        aceitos = []
+
+        def produtor():
+            aceitos.append(sum(writer.put('brindes', 'INSERT', i) for i in range(200)))
+
+        threads = [threading.Thread(target=produtor) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(writer.stats['queued'], sum(aceitos))
+        self.assertEqual(writer.stats['queued'] + writer.stats['dropped'], 8 * 200)
+        banco.liberar.set()
+        writer.close()
+        self.assertEqual(self._total(), sum(aceitos))
+
+    def test_write_error_does_not_block_flush(self):
+        """Erro na gravação é contado e o flush não fica esperando para sempre"""
+        writer = AuditWriter(self.schema, flush_interval=0.01)
+        writer.put('brindes', 'ALTERAR', 1)  # viola o CHECK de acao
+        self.assertTrue(writer.flush(3))
+        self.assertEqual(writer.stats['errors'], 1)
+        writer.close()
+
+class TestAuditLoggerAsync(unittest.TestCase):
+    """audit_action sem conn enfileira; com conn grava na transação"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.schema = DatabaseSchema(os.path.join(self.temp_dir, 'teste.db'))
+        self.logger = AuditLogger()
+        self.logger.db = self.schema
+        self.logger.writer = AuditWriter(self.schema, flush_interval=10)
+
+    def tearDown(self):
+        self.logger.writer.close()
+        self.schema.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_queued_then_visible_to_queries(self):
+        """Consultas de auditoria fazem flush antes de ler"""
+        for i in range(3):
+            self.logger.audit_brinde_updated(i, {'quantidade': 1}, {'quantidade': 2}, usuario_id=1)
+        self.logger.audit_movimentacoes_bulk([{'id': 10, 'usuario_id': 1}, {'id': 11, 'usuario_id': 1}])
+        self.assertEqual(len(self.logger.get_audit_logs()), 5)
+        self.assertEqual(self.logger.get_system_stats()['logs_por_acao'], {'INSERT': 2, 'UPDATE': 3})
+
+    def test_conn_path_is_synchronous(self):
+        """Com conn, o registro entra e sai com a transação do chamador"""
+        with self.schema.transaction() as conn:
+            self.logger.audit_action('brindes', 'INSERT', 1, dados_novos={'x': 1}, conn=conn)
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM logs_auditoria").fetchone()[0], 1)
+        self.assertEqual(self.logger.writer.stats['queued'], 0)
+
+        with self.assertRaises(RuntimeError):
+            with self.schema.transaction() as conn:
+                self.logger.audit_action('brindes', 'INSERT', 2, conn=conn)
+                raise RuntimeError("falha")
+        self.assertEqual(len(self.logger.get_audit_logs()), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,181 @@
+"""
+Testes da carga de dados em segundo plano (executor + entrega na thread da interface)
+"""
+
+import unittest
+import os
+import sys
+import threading
+import time
+
+# Adicionar src ao path para importar módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.utils.background import BackgroundLoader
+
+def _aguardar(loader, condicao, timeout=5.0):
+    """Chama dispatch() (como o laço do Tk faria) até a condição ser verdadeira"""
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        loader.dispatch()
+        if condicao():
+            return True
+        time.sleep(0.005)
+    return False
+
+class _RootFalso:
+    """Imita o agendamento do Tk: guarda os callbacks de after()"""
+
+    def __init__(self):
+        self.agendados = {}
+        self.proximo = 0
+
+    def after(self, ms, func):
+        self.proximo += 1
+        self.agendados[self.proximo] = func
+        return self.proximo
+
+    def after_cancel(self, after_id):
+        self.agendados.pop(after_id, None)
+
+    def tick(self):
+        agendados, self.agendados = self.agendados, {}
+        for func in agendados.values():
+            func()
+
+class TestBackgroundLoader(unittest.TestCase):
+    """Execução fora da thread chamadora, substituição e entrega dos resultados"""
+
+    def setUp(self):
+        self.loader = BackgroundLoader(max_workers=2)
+
+    def tearDown(self):
+        self.loader.shutdown(wait=True)
+
+    def test_runs_off_thread_and_delivers_on_dispatch_thread(self):
+        """A função roda em outra thread; o callback, na thread que chama dispatch()"""
+        resultados = []
+        self.loader.submit('a', threading.get_ident,
+                           on_done=lambda ident: resultados.append((ident, threading.get_ident())))
+        self.assertTrue(_aguardar(self.loader, lambda: resultados))
+        worker, entrega = resultados[0]
+        self.assertNotEqual(worker, threading.get_ident())
+        self.assertEqual(entrega, threading.get_ident())
+        self.assertEqual(self.loader.pending(), 0)
+
+    def test_nothing_delivered_without_dispatch(self):
+        """Sem dispatch() nenhum callback é chamado (nada toca a interface fora da vez)"""
+        resultados = []
+        task = self.loader.submit('a', lambda: 1, on_done=resultados.append)
+        task.future.result(timeout=5)
+        time.sleep(0.01)
+        self.assertEqual(resultados, [])
+        self.assertEqual(self.loader.dispatch(), 1)
+        self.assertEqual(resultados, [1])
+
+    def test_superseded_request_is_discarded(self):
+        """Nova requisição com a mesma chave: só o resultado da mais recente chega"""
+        liberar = threading.Event()
+        resultados = []
+
+        def lenta(valor):
+            liberar.wait(5)
+            return valor
+
+        self.loader.submit('filtro', lenta, 'antigo', on_done=resultados.append)
+        self.loader.submit('filtro', lenta, 'novo', on_done=resultados.append)
+        liberar.set()
+        self.assertTrue(_aguardar(self.loader, lambda: resultados))
+        time.sleep(0.05)
+        self.loader.dispatch()
+        self.assertEqual(resultados, ['novo'])
+        self.assertEqual(self.loader.stats['superseded'], 1)
+
+    def test_cancelled_before_start_does_not_run(self):
+        """Requisição substituída antes de começar nem chega a executar"""
+        liberar = threading.Event()
+        executadas = []
+        # Ocupa as duas threads de trabalho
+        for i in range(2):
+            self.loader.submit(f"ocupada{i}", liberar.wait, 5)
+        self.loader.submit('x', executadas.append, 'primeira')
+        self.loader.submit('x', executadas.append, 'segunda')
+        liberar.set()
+        self.assertTrue(_aguardar(self.loader, lambda: executadas and self.loader.pending() == 0))
+        self.assertEqual(executadas, ['segunda'])
+
+    def test_independent_keys_all_delivered(self):
+        """Chaves diferentes não se substituem"""
+        resultados = []
+        for i in range(5):
+            self.loader.submit(('tela', i), lambda i=i: i, on_done=resultados.append)
+        self.assertTrue(_aguardar(self.loader, lambda: len(resultados) == 5))
+        self.assertEqual(sorted(resultados), list(range(5)))
+
+    def test_error_routed_to_on_error(self):
+        """Exceções da função chegam em on_error; on_done não é chamado"""
+        erros, resultados = [], []
+
+        def falha():
+            raise ValueError("banco indisponível")
+
+        self.loader.submit('a', falha, on_done=resultados.append, on_error=erros.append)
+        self.assertTrue(_aguardar(self.loader, lambda: erros))
+        self.assertIsInstance(erros[0], ValueError)
+        self.assertEqual(resultados, [])
+        self.assertEqual(self.loader.stats['errors'], 1)
+
+    def test_callback_error_does_not_stop_dispatch(self):
+        """Erro em um callback não impede a entrega dos demais"""
+        resultados = []
+
+        def quebra(_):
+            raise RuntimeError("widget destruído")
+
+        self.loader.submit('a', lambda: 1, on_done=quebra).future.result(timeout=5)
+        self.loader.submit('b', lambda: 2, on_done=resultados.append).future.result(timeout=5)
+        self.assertTrue(_aguardar(self.loader, lambda: resultados))
+        self.assertEqual(resultados, [2])
+
+    def test_cancel_by_key(self):
+        """cancel(key) descarta o resultado pendente"""
+        liberar = threading.Event()
+        resultados = []
+        task = self.loader.submit('a', lambda: liberar.wait(5), on_done=resultados.append)
+        self.assertTrue(self.loader.cancel('a'))
+        self.assertFalse(self.loader.cancel('a'))
+        liberar.set()
+        time.sleep(0.05)
+        self.loader.dispatch()
+        self.assertTrue(task.cancelled)
+        self.assertEqual(resultados, [])
+
+    def test_attach_polls_with_after(self):
+        """attach() entrega os resultados pelo after() do root e reagenda"""
+        root = _RootFalso()
+        resultados = []
+        self.loader.attach(root)
+        self.loader.submit('a', lambda: 'ok', on_done=resultados.append).future.result(timeout=5)
+        root.tick()
+        self.assertEqual(resultados, ['ok'])
+        self.assertEqual(len(root.agendados), 1)
+        self.loader.detach()
+        self.assertEqual(root.agendados, {})
+
+    def test_shutdown_discards_pending_and_allows_reuse(self):
+        """shutdown() cancela o que está pendente; um novo submit recria o executor"""
+        liberar = threading.Event()
+        resultados = []
+        self.loader.submit('a', lambda: liberar.wait(5), on_done=resultados.append)
+        self.loader.shutdown()
+        liberar.set()
+        time.sleep(0.05)
+        self.loader.dispatch()
+        self.assertEqual(resultados, [])
+
+        self.loader.submit('a', lambda: 'de novo', on_done=resultados.append)
+        self.assertTrue(_aguardar(self.loader, lambda: resultados))
+        self.assertEqual(resultados, ['de novo'])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+"""
+Testes do cache LRU com TTL e tags
+"""
+
+import unittest
+import os
+import sys
+import time
+import threading
+
+# Adicionar src ao path para importar módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.utils.performance import CacheManager
+
+class TestCacheManager(unittest.TestCase):
+    """Testes do CacheManager"""
+
+    def setUp(self):
+        """Cache pequeno com uma partição (ordem LRU determinística)"""
+        self.cache = CacheManager(default_ttl=60, max_entries=3, shards=1)
+
+    def test_single_lookup_hit_and_miss(self):
+        """Acertos e faltas são contados uma vez por consulta"""
+        self.cache.set('a', 1)
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertIsNone(self.cache.get('b'))
+
+        stats = self.cache.get_cache_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_lru_eviction(self):
+        """Ao passar do limite sai a entrada menos usada"""
+        for chave in 'abc':
+            self.cache.set(chave, chave)
+        self.cache.get('a')  # 'b' passa a ser a menos usada
+        self.cache.set('d', 'd')
+
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual(self.cache.get('a'), 'a')
+        self.assertEqual(self.cache.get_cache_stats()['evictions'], 1)
+
+    def test_byte_limit(self):
+        """O limite em bytes também remove entradas antigas"""
+        cache = CacheManager(max_entries=100, max_bytes=2000, shards=1)
+        for i in range(10):
+            cache.set(f"k{i}", 'x' * 500)
+        stats = cache.get_cache_stats()
+        self.assertLessEqual(stats['bytes'], 2000)
+        self.assertGreater(stats['evictions'], 0)
+        self.assertEqual(cache.get('k9'), 'x' * 500)
+
+    def test_ttl_expiration(self):
+        """Entradas expiradas não são retornadas"""
+        self.cache.set('a', 1, ttl=0.05)
+        time.sleep(0.1)
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(self.cache.get_cache_stats()['expirations'], 1)
+
+    def test_negative_caching(self):
+        """None e listas vazias também ficam em cache"""
+        chamadas = []
+
+        @self.cache.cache_result()
+        def busca(termo):
+            chamadas.append(termo)
+            return None if termo == 'nada' else []
+
+        busca('nada')
+        busca('nada')
+        busca('vazio')
+        busca('vazio')
+        self.assertEqual(chamadas, ['nada', 'vazio'])
+
+    def test_method_key_ignores_instance(self):
+        """A chave de métodos não depende do repr da instância"""
+        cache = self.cache
+
+        class Provedor:
+            def __init__(self):
+                self.chamadas = 0
+
+            @cache.cache_result(tags=('brindes',))
+            def get_brindes(self, filial=None):
+                self.chamadas += 1
+                return [filial]
+
+        p1, p2 = Provedor(), Provedor()
+        p1.get_brindes('Matriz')
+        p2.get_brindes('Matriz')
+        self.assertEqual(p1.chamadas + p2.chamadas, 1)
+        self.assertEqual(CacheManager.make_key('x', ('Matriz',)), CacheManager.make_key('x', ('Matriz',)))
+
+    def test_tag_invalidation(self):
+        """Invalidar uma tag remove apenas as entradas marcadas"""
+        self.cache.set('brindes:1', 1, tags=('brindes',))
+        self.cache.set('brindes:2', 2, tags=('brindes', 'estatisticas'))
+        self.cache.set('usuarios:1', 3, tags=('usuarios',))
+
+        self.assertEqual(self.cache.invalidate_tags('brindes'), 2)
+        self.assertIsNone(self.cache.get('brindes:2'))
+        self.assertEqual(self.cache.get('usuarios:1'), 3)
+
+    def test_function_name_is_a_tag(self):
+        """invalidate_cache(nome_da_funcao) continua funcionando"""
+        chamadas = []
+
+        @self.cache.cache_result()
+        def get_filiais():
+            chamadas.append(1)
+            return ['Matriz']
+
+        get_filiais()
+        self.cache.invalidate_cache('get_filiais')
+        get_filiais()
+        self.assertEqual(len(chamadas), 2)
+
+    def test_concurrent_access(self):
+        """Acessos concorrentes mantêm os limites e os contadores consistentes"""
+        cache = CacheManager(max_entries=64, shards=8)
+        erros = []
+
+        def worker(n):
+            try:
+                for i in range(500):
+                    chave = f"k{(n * 7 + i) % 100}"
+                    if cache.get(chave) is None:
+                        cache.set(chave, i, tags=('t',))
+                    if i % 100 == 0:
+                        cache.invalidate_tags('t')
+            except Exception as e:
+                erros.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        stats = cache.get_cache_stats()
+        self.assertEqual(erros, [])
+        self.assertLessEqual(stats['total_items'], 64)
+        self.assertEqual(stats['hits'] + stats['misses'], 8 * 500)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,223 @@
+"""
+Testes do barramento de alterações e do change_log (invalidação precisa de caches)
+"""
+
+import unittest
+import os
+import sys
+import sqlite3
+import tempfile
+import shutil
+
+# Adicionar src ao path para importar módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.utils.change_bus import ChangeBus, ChangeEvent, ALL_TABLES
+from src.utils.performance import cache_manager
+from src.database.schema import DatabaseSchema
+from src.database.change_log import ChangeLogReader
+from src.database.dimension_cache import DimensionCache
+from src.database.data_manager import DatabaseDataManager
+from src.data.data_provider import data_provider
+
+class TestChangeBus(unittest.TestCase):
+    """Testes do barramento"""
+
+    def setUp(self):
+        self.bus = ChangeBus()
+        self.recebidos = []
+
+    def test_delivery_filtered_by_table(self):
+        """Assinantes recebem só as tabelas pedidas (e eventos '*')"""
+        self.bus.subscribe(self.recebidos.append, tables=('brindes',))
+        self.bus.publish('brindes', ids=[1], filiais=[2])
+        self.bus.publish('fornecedores', ids=[3])
+        self.bus.publish(ALL_TABLES)
+        self.assertEqual([e.tabela for e in self.recebidos], ['brindes', ALL_TABLES])
+        self.assertEqual(self.recebidos[0].ids, {1})
+        self.assertEqual(self.recebidos[0].filiais, {2})
+
+    def test_versions(self):
+        """Cada evento incrementa a versão da tabela; '*' incrementa todas"""
+        self.assertEqual(self.bus.version('brindes'), 0)
+        self.bus.publish('brindes')
+        self.bus.publish('brindes')
+        self.assertEqual(self.bus.version('brindes'), 2)
+        self.bus.publish(ALL_TABLES)
+        self.assertEqual(self.bus.version('brindes'), 3)
+        self.assertEqual(self.bus.version('filiais'), 1)
+
+    def test_subscriber_errors_are_isolated(self):
+        """Erro em um assinante não impede a entrega aos demais"""
+        def falha(event):
+            raise RuntimeError("falha")
+
+        self.bus.subscribe(falha)
+        token = self.bus.subscribe(self.recebidos.append)
+        self.bus.publish('brindes')
+        self.assertEqual(len(self.recebidos), 1)
+        self.assertEqual(self.bus.stats['errors'], 1)
+
+        self.bus.unsubscribe(token)
+        self.bus.publish('brindes')
+        self.assertEqual(len(self.recebidos), 1)
+
+class TestChangeLog(unittest.TestCase):
+    """Testes dos triggers do change_log e do leitor"""
+
+    def setUp(self):
+        """Cria um banco temporário com um leitor ligado a um barramento próprio"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'teste.db')
+        self.schema = DatabaseSchema(self.db_path)
+        self.bus = ChangeBus()
+        self.recebidos = []
+        self.bus.subscribe(self.recebidos.append)
+        self.reader = ChangeLogReader(self.schema, self.bus)
+        self.filial2 = self.schema.execute_insert(
+            "INSERT INTO filiais (numero, nome, cidade) VALUES ('902', 'Filial 2', 'Campinas')"
+        )
+        self.reader.poll()
+        self.recebidos.clear()
+
+    def tearDown(self):
+        """Remove o banco temporário"""
+        self.schema.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _create_brinde(self, descricao: str, filial_id: int = 1) -> int:
+        return self.schema.execute_insert("""
+            INSERT INTO brindes (codigo, descricao, categoria_id, quantidade, valor_unitario,
+                                 unidade_medida_id, filial_id)
+            VALUES (?, ?, 1, 10, 2.5, 1, ?)
+        """, (descricao[:10], descricao, filial_id))
+
+    def _eventos(self) -> dict:
+        return {e.tabela: e for e in self.recebidos}
+
+    def test_no_changes_publishes_nothing(self):
+        """Sem linhas novas no log nada é publicado"""
+        self.assertEqual(self.reader.poll(), 0)
+        self.assertEqual(self.recebidos, [])
+
+    def test_changes_grouped_per_table(self):
+        """Várias alterações viram um evento por tabela com IDs e filiais"""
+        a = self._create_brinde('Caneta')
+        b = self._create_brinde('Caderno', self.filial2)
+        self.schema.execute_update("UPDATE brindes SET quantidade = 5 WHERE id = ?", (a,))
+        self.schema.execute_insert("""
+            INSERT INTO movimentacoes (brinde_id, tipo, quantidade, filial_origem_id, usuario_id)
+            VALUES (?, 'entrada', 1, 1, 1)
+        """, (a,))
+
+        self.assertEqual(self.reader.poll(), 2)
+        eventos = self._eventos()
+        self.assertEqual(eventos['brindes'].ids, {a, b})
+        self.assertEqual(eventos['brindes'].filiais, {1, self.filial2})
+        self.assertEqual(eventos['movimentacoes'].filiais, {1})
+
+        # Já lidas: não são publicadas de novo
+        self.assertEqual(self.reader.poll(), 0)
+
+    def test_filial_change_affects_both_filiais(self):
+        """Mudar a filial de um brinde afeta a filial antiga e a nova"""
+        a = self._create_brinde('Caneta')
+        self.reader.poll()
+        self.recebidos.clear()
+
+        self.schema.execute_update("UPDATE brindes SET filial_id = ? WHERE id = ?", (self.filial2, a))
+        self.reader.poll()
+        self.assertEqual(self._eventos()['brindes'].filiais, {1, self.filial2})
+
+    def test_external_connection_changes_are_seen(self):
+        """Escritas de outra conexão (outra estação) também são publicadas"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("INSERT INTO fornecedores (codigo, nome) VALUES ('F9', 'Externo')")
+        conn.commit()
+        conn.close()
+
+        self.reader.poll()
+        self.assertIn('fornecedores', self._eventos())
+
+    def test_configuracoes_changes_are_logged(self):
+        """Alteração de configuração (ex.: estoque mínimo) é publicada"""
+        self.schema.execute_update("UPDATE configuracoes SET valor = '3' WHERE chave = 'estoque_minimo'")
+        self.reader.poll()
+        self.assertIn('configuracoes', self._eventos())
+
+    def test_pruned_gap_invalidates_everything(self):
+        """Se o log foi podado além do último ID lido, publica '*'"""
+        self._create_brinde('Caneta')
+        self._create_brinde('Caderno')
+        self.schema.execute_update("DELETE FROM change_log")
+        self._create_brinde('Lápis')
+
+        self.reader.poll()
+        self.assertEqual([e.tabela for e in self.recebidos], [ALL_TABLES])
+
+    def test_data_manager_reloads_only_changed_dimension(self):
+        """Alteração externa em filiais recarrega filiais, mas não categorias"""
+        manager = DatabaseDataManager()
+        manager.db = self.schema
+        manager.dimensions = DimensionCache(self.schema)
+        manager.change_feed = self.reader
+        self.bus.subscribe(manager._on_change)
+
+        manager.get_categoria_by_nome('Canetas')
+        self.assertIsNone(manager.get_filial_by_nome('Filial 3'))
+        self.schema.execute_insert(
+            "INSERT INTO filiais (numero, nome, cidade) VALUES ('903', 'Filial 3', 'Santos')"
+        )
+        self.assertIsNone(manager.get_filial_by_nome('Filial 3'))
+
+        manager.publish_changes()
+        self.assertIsNotNone(manager.get_filial_by_nome('Filial 3'))
+        stats = manager.dimensions.get_stats()['tabelas']
+        self.assertEqual(stats['filiais']['invalidations'], 1)
+        self.assertEqual(stats['categorias']['invalidations'], 0)
+
+class TestProviderInvalidation(unittest.TestCase):
+    """Invalidação dos resultados do DataProvider por filial"""
+
+    FILIAIS = {1: 'Matriz', 2: 'Filial 2'}
+
+    def setUp(self):
+        cache_manager.clear()
+        data_provider._filial_nome = self.FILIAIS.get
+        cache_manager.set('matriz', 'm', tags=('brindes', 'brindes:filial=Matriz'))
+        cache_manager.set('filial2', 'f', tags=('brindes', 'brindes:filial=Filial 2'))
+        cache_manager.set('todas', 't', tags=('brindes', 'brindes:todas'))
+        cache_manager.set('fornecedores', 'x', tags=('fornecedores',))
+
+    def tearDown(self):
+        del data_provider._filial_nome
+        cache_manager.clear()
+
+    def test_brinde_change_keeps_other_filiais(self):
+        """Só a filial alterada e a lista completa são descartadas"""
+        data_provider._on_change(ChangeEvent('brindes', ids=[7], filiais=[2]))
+        self.assertEqual(cache_manager.get('matriz'), 'm')
+        self.assertIsNone(cache_manager.get('filial2'))
+        self.assertIsNone(cache_manager.get('todas'))
+        self.assertEqual(cache_manager.get('fornecedores'), 'x')
+
+    def test_unknown_filial_invalidates_all_brindes(self):
+        """Sem filial conhecida, todas as listas de brindes são descartadas"""
+        data_provider._on_change(ChangeEvent('brindes', ids=[7]))
+        self.assertIsNone(cache_manager.get('matriz'))
+        self.assertIsNone(cache_manager.get('filial2'))
+        self.assertEqual(cache_manager.get('fornecedores'), 'x')
+
+    def test_category_change_invalidates_brindes(self):
+        """Listas de brindes trazem o nome da categoria"""
+        data_provider._on_change(ChangeEvent('categorias', ids=[1]))
+        self.assertIsNone(cache_manager.get('matriz'))
+        self.assertEqual(cache_manager.get('fornecedores'), 'x')
+
+    def test_all_tables_clears_cache(self):
+        """Evento '*' limpa todo o cache"""
+        data_provider._on_change(ChangeEvent(ALL_TABLES))
+        self.assertIsNone(cache_manager.get('fornecedores'))
+
+if __name__ == "__main__":
+    unittest.main()
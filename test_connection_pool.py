@@ -0,0 +1,132 @@
+"""
+Testes do pool de conexões SQLite
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+import threading
+
+# Adicionar src ao path para importar módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.database.schema import DatabaseSchema
+from src.database.connection_pool import ConnectionPool
+
+class TestConnectionPool(unittest.TestCase):
+    """Testes do pool de conexões"""
+
+    def setUp(self):
+        """Cria um banco temporário"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'teste.db')
+        self.schema = DatabaseSchema(self.db_path)
+
+    def tearDown(self):
+        """Remove o banco temporário"""
+        self.schema.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_reuses_connection_in_same_thread(self):
+        """A mesma thread deve receber sempre a mesma conexão"""
+        conn1 = self.schema.get_pooled_connection()
+        conn2 = self.schema.get_pooled_connection()
+        self.assertIs(conn1, conn2)
+
+        for _ in range(10):
+            self.schema.execute_query("SELECT COUNT(*) FROM filiais")
+
+        self.assertEqual(self.schema.pool.get_stats()['connections_created'], 1)
+
+    def test_pragmas_applied(self):
+        """As conexões do pool devem ter foreign keys habilitadas"""
+        rows = self.schema.execute_query("PRAGMA foreign_keys")
+        self.assertEqual(rows[0][0], 1)
+
+    def test_one_connection_per_thread(self):
+        """Cada thread deve receber a sua própria conexão"""
+        conexoes = []
+
+        def worker():
+            conexoes.append(self.schema.get_pooled_connection())
+            self.schema.execute_query("SELECT 1")
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(set(id(c) for c in conexoes)), 4)
+
+    def test_stats_exact_under_concurrency(self):
+        """Contadores não perdem incrementos com várias threads usando o pool"""
+        pool = ConnectionPool(self.db_path)
+        chamadas = 2000
+        intervalo = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [threading.Thread(target=lambda: [pool.get_connection() for _ in range(chamadas)])
+                       for _ in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        finally:
+            sys.setswitchinterval(intervalo)
+            pool.close_all()
+
+        stats = pool.get_stats()
+        self.assertEqual(stats['connections_created'] + stats['connections_reused'], 8 * chamadas)
+
+    def test_insert_and_rollback_on_error(self):
+        """Erros de escrita não devem deixar transação aberta na conexão reutilizada"""
+        novo_id = self.schema.execute_insert(
+            "INSERT INTO categorias (nome, descricao) VALUES (?, ?)", ('Teste Pool', '')
+        )
+        self.assertGreater(novo_id, 0)
+
+        with self.assertRaises(Exception):
+            self.schema.execute_insert(
+                "INSERT INTO categorias (nome, descricao) VALUES (?, ?)", ('Teste Pool', '')
+            )
+
+        self.assertFalse(self.schema.get_pooled_connection().in_transaction)
+
+    def test_health_check_recreates_broken_connection(self):
+        """Conexões inválidas devem ser recriadas na verificação de saúde"""
+        pool = ConnectionPool(self.db_path, health_check_interval=0)
+        conn = pool.get_connection()
+        conn.close()
+
+        novo = pool.get_connection()
+        self.assertIsNot(conn, novo)
+        self.assertEqual(novo.execute("SELECT 1").fetchone()[0], 1)
+        self.assertEqual(pool.get_stats()['health_check_failures'], 1)
+        pool.close_all()
+
+    def test_dead_thread_slots_are_reclaimed(self):
+        """Vagas de threads finalizadas devem ser reaproveitadas"""
+        pool = ConnectionPool(self.db_path, max_connections=2, timeout=1)
+
+        for _ in range(5):
+            t = threading.Thread(target=pool.get_connection)
+            t.start()
+            t.join()
+
+        self.assertIsNotNone(pool.get_connection())
+        pool.close_all()
+
+    def test_close_all(self):
+        """Após o encerramento o pool não deve fornecer conexões"""
+        self.schema.execute_query("SELECT 1")
+        self.schema.close()
+
+        self.assertEqual(self.schema.pool.get_stats()['open_connections'], 0)
+        with self.assertRaises(Exception):
+            self.schema.execute_query("SELECT 1")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+Testes do cache de dimensões (resolução nome -> ID)
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+
+# Adicionar src ao path para importar módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.database.schema import DatabaseSchema
+from src.database.dimension_cache import DimensionCache
+from src.database.data_manager import DatabaseDataManager
+
+class TestDimensionCache(unittest.TestCase):
+    """Testes do cache de dimensões"""
+
+    def setUp(self):
+        """Cria um banco temporário e conta as queries executadas"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.schema = DatabaseSchema(os.path.join(self.temp_dir, 'teste.db'))
+        self.queries = 0
+
+        execute_query = self.schema.execute_query
+
+        def counting_query(query, params=None):
+            self.queries += 1
+            return execute_query(query, params)
+
+        self.schema.execute_query = counting_query
+        self.cache = DimensionCache(self.schema)
+
+    def tearDown(self):
+        """Remove o banco temporário"""
+        self.schema.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_repeated_lookups_use_single_query(self):
+        """Após a carga, resoluções (inclusive de nomes inexistentes) não consultam o banco"""
+        matriz = self.cache.get_by_name('filiais', 'Matriz')
+        self.assertIsNotNone(matriz)
+        for _ in range(100):
+            self.assertEqual(self.cache.get_id('filiais', 'Matriz'), matriz['id'])
+            self.assertIsNone(self.cache.get_by_name('filiais', 'Inexistente'))
+            self.assertEqual(self.cache.get_by_id('filiais', matriz['id'])['nome'], 'Matriz')
+
+        self.assertEqual(self.queries, 1)
+        stats = self.cache.get_stats()['tabelas']['filiais']
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 300)
+
+    def test_all_dimension_tables(self):
+        """Filiais, categorias, unidades e usuários são resolvidos pelo nome"""
+        self.assertIsNotNone(self.cache.get_by_name('categorias', 'Canetas'))
+        self.assertIsNotNone(self.cache.get_by_name('unidades_medida', 'UN'))
+        admin = self.cache.get_by_name('usuarios', 'admin', ativo_apenas=True)
+        self.assertEqual(admin['filial_nome'], 'Matriz')
+        with self.assertRaises(ValueError):
+            self.cache.get_by_name('brindes', 'x')
+
+    def test_inactive_rows(self):
+        """Registros inativos só são retornados sem o filtro ativo_apenas"""
+        self.schema.execute_update("UPDATE categorias SET ativo = 0 WHERE nome = 'Outros'")
+        self.assertIsNotNone(self.cache.get_by_name('categorias', 'Outros'))
+        self.assertIsNone(self.cache.get_by_name('categorias', 'Outros', ativo_apenas=True))
+
+    def test_returned_rows_are_copies(self):
+        """Alterar o dicionário retornado não altera o cache"""
+        self.cache.get_by_name('filiais', 'Matriz')['nome'] = 'Alterada'
+        self.assertEqual(self.cache.get_by_name('filiais', 'Matriz')['nome'], 'Matriz')
+
+    def test_data_manager_invalidates_written_table(self):
+        """clear_cache com a dimensão alterada recarrega apenas aquela tabela"""
+        manager = DatabaseDataManager()
+        manager.db = self.schema
+        manager.dimensions = self.cache
+
+        self.assertIsNone(manager.get_filial_by_nome('Filial Nova'))
+        manager.get_categoria_by_nome('Canetas')
+        self.schema.execute_insert(
+            "INSERT INTO filiais (numero, nome, cidade) VALUES ('099', 'Filial Nova', 'Campinas')"
+        )
+        manager.clear_cache('filiais')
+        antes = self.queries
+
+        self.assertIsNotNone(manager.get_filial_by_nome('Filial Nova'))
+        manager.get_categoria_by_nome('Canetas')
+        self.assertEqual(self.queries, antes + 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,222 @@
+"""
+Testes das estatísticas do dashboard (agregação no banco e no mock)
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+
+# Adicionar src ao path para importar módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.database.schema import DatabaseSchema
+from src.database.models import BrindeModel
+from src.data.mock_data import MockDataManager
+from src.data.data_provider import data_provider
+from src.data.journal import JournalStore
+from src.utils.change_bus import change_bus
+
+class TestEstatisticasBanco(unittest.TestCase):
+    """Query agregada comparada ao cálculo sobre a lista de brindes"""
+
+    ESTOQUE_MINIMO = 10
+
+    def setUp(self):
+        """Cria um banco temporário com brindes em duas filiais"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.schema = DatabaseSchema(os.path.join(self.temp_dir, 'teste.db'))
+        self.model = BrindeModel()
+        self.model.db = self.schema
+        self.filial2 = self.schema.execute_insert(
+            "INSERT INTO filiais (numero, nome, cidade) VALUES ('902', 'Filial 2', 'Campinas')"
+        )
+        for i, (quantidade, valor, filial) in enumerate([
+            (5, 2.5, 1), (10, 1.0, 1), (50, 3.75, 1), (0, 9.9, self.filial2), (200, 0.5, self.filial2)
+        ]):
+            self.schema.execute_insert("""
+                INSERT INTO brindes (codigo, descricao, categoria_id, quantidade, valor_unitario,
+                                     unidade_medida_id, filial_id)
+                VALUES (?, ?, 1, ?, ?, 1, ?)
+            """, (f"E{i}", f"Brinde {i}", quantidade, valor, filial))
+        # Inativos não contam
+        self.schema.execute_insert("""
+            INSERT INTO brindes (codigo, descricao, categoria_id, quantidade, valor_unitario,
+                                 unidade_medida_id, filial_id, ativo)
+            VALUES ('X1', 'Inativo', 1, 1000, 100, 1, 1, 0)
+        """)
+
+    def tearDown(self):
+        """Remove o banco temporário"""
+        self.schema.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _esperado(self, filial_id=None):
+        brindes = self.model.get_all(filial_id=filial_id)
+        return {
+            'total_brindes': len(brindes),
+            'total_itens': sum(b['quantidade'] for b in brindes),
+            'valor_total': sum(b['quantidade'] * b['valor_unitario'] for b in brindes),
+            'itens_estoque_baixo': len([b for b in brindes if b['quantidade'] <= self.ESTOQUE_MINIMO])
+        }
+
+    def _assert_stats(self, filial_id=None):
+        stats = self.model.get_estatisticas(self.ESTOQUE_MINIMO, filial_id)
+        esperado = self._esperado(filial_id)
+        self.assertEqual(stats['total_brindes'], esperado['total_brindes'])
+        self.assertEqual(stats['total_itens'], esperado['total_itens'])
+        self.assertAlmostEqual(stats['valor_total'], esperado['valor_total'])
+        self.assertEqual(stats['itens_estoque_baixo'], esperado['itens_estoque_baixo'])
+        return stats
+
+    def test_totals_match_listing(self):
+        """Totais gerais iguais aos calculados sobre a listagem"""
+        stats = self._assert_stats()
+        categorias = self.schema.execute_query("SELECT COUNT(*) FROM categorias WHERE ativo = 1")[0][0]
+        self.assertEqual(stats['total_categorias'], categorias)
+
+    def test_per_filial(self):
+        """Variante por filial"""
+        self._assert_stats(1)
+        stats = self._assert_stats(self.filial2)
+        self.assertEqual(stats['total_itens'], 200)
+
+    def test_snapshot_queries(self):
+        """Quantidade por categoria e estoque baixo (zerados primeiro, limitado)"""
+        categorias = self.model.get_quantidade_por_categoria()
+        self.assertEqual(len(categorias), 1)
+        self.assertEqual(categorias[0]['quantidade'], self._esperado()['total_itens'])
+        self.assertEqual(self.model.get_quantidade_por_categoria(self.filial2)[0]['quantidade'], 200)
+
+        baixo = self.model.get_estoque_baixo(self.ESTOQUE_MINIMO, 10)
+        self.assertEqual([b['quantidade'] for b in baixo], [0, 5, 10])
+        self.assertEqual(len(self.model.get_estoque_baixo(self.ESTOQUE_MINIMO, 2)), 2)
+        self.assertEqual([b['codigo'] for b in self.model.get_estoque_baixo(self.ESTOQUE_MINIMO, 10, 1)],
+                         ['E0', 'E1'])
+
+    def test_empty_catalog(self):
+        """Sem brindes os totais são zero (não None)"""
+        self.schema.execute_update("UPDATE brindes SET ativo = 0")
+        stats = self.model.get_estatisticas(self.ESTOQUE_MINIMO)
+        self.assertEqual(stats['total_itens'], 0)
+        self.assertEqual(stats['valor_total'], 0)
+        self.assertEqual(stats['itens_estoque_baixo'], 0)
+
+class TestEstatisticasMock(unittest.TestCase):
+    """Estatísticas do MockDataManager"""
+
+    def setUp(self):
+        self.mock = MockDataManager()
+        self.mock.data = {
+            'configuracoes': {'estoque_minimo': 10},
+            'categorias': [{'nome': 'Canetas'}, {'nome': 'Outros', 'ativo': False}],
+            'brindes': [
+                {'quantidade': 5, 'valor_unitario': 2.0, 'filial': 'Matriz'},
+                {'quantidade': 20, 'valor_unitario': 1.5, 'filial': 'Matriz'},
+                {'quantidade': 3, 'valor_unitario': 10.0, 'filial': 'Filial 2'}
+            ]
+        }
+
+    def test_totals(self):
+        """Totais gerais e por filial"""
+        stats = self.mock.get_estatisticas_dashboard()
+        self.assertEqual(stats['total_itens'], 28)
+        self.assertAlmostEqual(stats['valor_total'], 70.0)
+        self.assertEqual(stats['itens_estoque_baixo'], 2)
+        self.assertEqual(stats['total_categorias'], 1)
+
+        stats = self.mock.get_estatisticas_dashboard('Matriz')
+        self.assertEqual(stats['total_itens'], 25)
+        self.assertEqual(stats['itens_estoque_baixo'], 1)
+        self.assertEqual(self.mock.get_estatisticas_dashboard('Todas')['total_itens'], 28)
+
+    def test_dashboard_snapshot(self):
+        """Snapshot do dashboard em uma passada: categorias, estoque baixo e movimentações recentes"""
+        self.mock.data['brindes'][0].update({'descricao': 'Caneta', 'categoria': 'Canetas'})
+        self.mock.data['brindes'][1].update({'descricao': 'Bloco', 'categoria': 'Papelaria'})
+        self.mock.data['brindes'][2].update({'descricao': 'Chaveiro', 'categoria': 'Canetas'})
+        self.mock.data['movimentacoes'] = [
+            {'id': i, 'data_hora': f"2024-01-0{i}T10:00:00"} for i in range(1, 8)
+        ]
+
+        snapshot = self.mock.get_dashboard_snapshot(limite_alertas=1, limite_movimentacoes=3)
+        self.assertEqual(snapshot['estatisticas'], self.mock.get_estatisticas_dashboard())
+        self.assertEqual(snapshot['categorias'], [
+            {'categoria': 'Papelaria', 'quantidade': 20}, {'categoria': 'Canetas', 'quantidade': 8}
+        ])
+        self.assertEqual([b['descricao'] for b in snapshot['estoque_baixo']], ['Chaveiro'])
+        self.assertEqual([m['id'] for m in snapshot['movimentacoes']], [7, 6, 5])
+        # A lista original não é reordenada
+        self.assertEqual(self.mock.data['movimentacoes'][0]['id'], 1)
+
+    def test_dashboard_snapshot_per_filial(self):
+        """Movimentações recentes do snapshot seguem o filtro de filial"""
+        self.mock.data['movimentacoes'] = [
+            {'id': 1, 'filial': 'Matriz', 'data_hora': '2024-01-01T10:00:00'},
+            {'id': 2, 'filial': 'Filial 2', 'data_hora': '2024-01-02T10:00:00'},
+            {'id': 3, 'filial': 'Matriz', 'data_hora': '2024-01-03T10:00:00'}
+        ]
+        snapshot = self.mock.get_dashboard_snapshot('Matriz')
+        self.assertEqual([m['id'] for m in snapshot['movimentacoes']], [3, 1])
+        snapshot = self.mock.get_dashboard_snapshot('Todas')
+        self.assertEqual([m['id'] for m in snapshot['movimentacoes']], [3, 2, 1])
+
+class TestDashboardSnapshotProvider(unittest.TestCase):
+    """Snapshot reaproveitado enquanto a versão dos dados não muda"""
+
+    def setUp(self):
+        self.mock = MockDataManager()
+        self.mock.data = {'configuracoes': {}, 'categorias': [], 'movimentacoes': [],
+                          'brindes': [{'quantidade': 1, 'valor_unitario': 1.0, 'categoria': 'A'}]}
+        self.chamadas = 0
+        original = self.mock.get_dashboard_snapshot
+
+        def contar(*args, **kwargs):
+            self.chamadas += 1
+            return original(*args, **kwargs)
+
+        self.mock.get_dashboard_snapshot = contar
+        self.temp_dir = tempfile.mkdtemp()
+        self.mock.store = JournalStore(os.path.join(self.temp_dir, 'dados.json'))
+        self.anterior = (data_provider._current_provider, data_provider._use_database)
+        data_provider._current_provider = self.mock
+        data_provider._use_database = False
+        data_provider._dashboard_snapshots.clear()
+
+    def tearDown(self):
+        data_provider._current_provider, data_provider._use_database = self.anterior
+        data_provider._dashboard_snapshots.clear()
+        self.mock.store.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_version_reuse_and_invalidation(self):
+        """Mesma versão: mesmo snapshot, sem nova consulta; alteração publicada gera outra versão"""
+        primeiro = data_provider.get_dashboard_snapshot()
+        self.assertIs(data_provider.get_dashboard_snapshot(), primeiro)
+        self.assertEqual(self.chamadas, 1)
+
+        self.mock.data['brindes'][0]['quantidade'] = 50
+        change_bus.publish('brindes')
+        segundo = data_provider.get_dashboard_snapshot()
+        self.assertEqual(self.chamadas, 2)
+        self.assertGreater(segundo['versao'], primeiro['versao'])
+        self.assertEqual(segundo['estatisticas']['total_itens'], 50)
+
+        # Tabela fora do dashboard não invalida
+        change_bus.publish('fornecedores')
+        self.assertIs(data_provider.get_dashboard_snapshot(), segundo)
+
+    def test_configuracao_invalidates(self):
+        """Novo estoque mínimo gera outro snapshot com os alertas recalculados"""
+        data_provider.set_configuracao('estoque_minimo', 0)
+        primeiro = data_provider.get_dashboard_snapshot()
+        self.assertEqual(primeiro['estatisticas']['itens_estoque_baixo'], 0)
+
+        data_provider.set_configuracao('estoque_minimo', 5)
+        segundo = data_provider.get_dashboard_snapshot()
+        self.assertIsNot(segundo, primeiro)
+        self.assertEqual(segundo['estatisticas']['itens_estoque_baixo'], 1)
+
+if __name__ == "__main__":
+    unittest.main()
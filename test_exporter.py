@@ -0,0 +1,224 @@
+"""
+Testes da exportação em fluxo (CSV/XLSX) de brindes, estoque e movimentações
+"""
+
+import unittest
+import csv
+import os
+import sys
+import tempfile
+import shutil
+import tracemalloc
+from datetime import date
+
+# Adicionar src ao path para importar módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.database.schema import DatabaseSchema
+from src.database.models import MovimentacaoModel
+from src.database.data_manager import DatabaseDataManager
+from src.data.mock_data import MockDataManager
+from src.data.exporter import ExportJob, ExportCancelled, xlsx_available
+
+def _ler_csv(path):
+    with open(path, newline='', encoding='utf-8-sig') as arquivo:
+        return list(csv.reader(arquivo, delimiter=';'))
+
+class _ProvedorBanco:
+    """Movimentações de um banco temporário no formato do DatabaseDataManager"""
+
+    def __init__(self, schema):
+        self.model = MovimentacaoModel()
+        self.model.db = schema
+
+    def count_movimentacoes(self, filters):
+        return self.model.count(filters)
+
+    def iter_movimentacoes(self, filters):
+        return map(DatabaseDataManager._format_movimentacao, self.model.iter_rows(filters))
+
+class TestExportMock(unittest.TestCase):
+    """Visões e filtros sobre os dados do mock"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.mock = MockDataManager.__new__(MockDataManager)
+        self.mock.data = {
+            'brindes': [
+                {'id': 1, 'codigo': 'B1', 'descricao': 'Caneta Azul', 'categoria': 'Escrita',
+                 'filial': 'Matriz', 'quantidade': 10, 'valor_unitario': 2.5, 'unidade_medida': 'UN'},
+                {'id': 2, 'codigo': 'B2', 'descricao': 'Caneta Preta', 'categoria': 'Escrita',
+                 'filial': 'Filial 2', 'quantidade': 4, 'valor_unitario': 2.5, 'unidade_medida': 'UN'},
+                {'id': 3, 'codigo': 'B3', 'descricao': 'Boné', 'categoria': 'Vestuário',
+                 'filial': 'Matriz', 'quantidade': 3, 'valor_unitario': 20.0, 'unidade_medida': 'UN'}
+            ],
+            'movimentacoes': [
+                {'id': i, 'brinde_id': 1, 'brinde_descricao': 'Caneta Azul', 'tipo': tipo,
+                 'quantidade': i, 'usuario': 'admin', 'filial': 'Matriz', 'filial_origem': 'Matriz',
+                 'data_hora': f"2025-01-{i:02d} 10:00:00"}
+                for i, tipo in enumerate(['entrada', 'saida', 'entrada', 'saida', 'saida'], start=1)
+            ]
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _exportar(self, view, filtros=None, nome='saida.csv'):
+        path = os.path.join(self.temp_dir, nome)
+        job = ExportJob(view, path, filtros)
+        job.provider = self.mock
+        linhas = job.run()
+        return job, linhas, path
+
+    def test_brindes_csv(self):
+        """Cabeçalho, separador ';' e vírgula decimal"""
+        _, linhas, path = self._exportar('brindes')
+        rows = _ler_csv(path)
+        self.assertEqual(linhas, 3)
+        self.assertEqual(rows[0][:2], ["Código", "Descrição"])
+        self.assertEqual(rows[1], ['B1', 'Caneta Azul', 'Escrita', 'Matriz', '10', 'UN', '2,50', '25,00'])
+        self.assertFalse(os.path.exists(path + '.parcial'))
+
+    def test_brindes_filters(self):
+        """Filial, categoria e busca (prefixo, sem acentos) como na tela"""
+        _, linhas, path = self._exportar('brindes', {'filial': 'Matriz', 'categoria': 'Todas', 'busca': 'bone'})
+        self.assertEqual(linhas, 1)
+        self.assertEqual(_ler_csv(path)[1][0], 'B3')
+
+        _, linhas, _ = self._exportar('brindes', {'categoria': 'Escrita', 'busca': 'can'})
+        self.assertEqual(linhas, 2)
+
+    def test_brindes_date_range(self):
+        """Período de cadastro como no filtro de datas da tela (inclusive; sem data fica de fora)"""
+        for brinde, cadastro in zip(self.mock.data['brindes'], ['2025-01-05 09:00:00', '2025-02-10 18:30:00', None]):
+            brinde['data_cadastro'] = cadastro
+
+        _, linhas, path = self._exportar('brindes', {'data_inicio': date(2025, 1, 5), 'data_fim': date(2025, 1, 31)})
+        self.assertEqual(linhas, 1)
+        self.assertEqual(_ler_csv(path)[1][0], 'B1')
+
+        _, linhas, _ = self._exportar('brindes', {'data_inicio': date(2025, 2, 1), 'data_fim': None})
+        self.assertEqual(linhas, 1)
+        _, linhas, _ = self._exportar('brindes', {'data_inicio': None, 'data_fim': None})
+        self.assertEqual(linhas, 3)
+
+    def test_estoque(self):
+        """Estoque consolidado por descrição e filial"""
+        _, linhas, path = self._exportar('estoque', {'filial': 'Matriz'})
+        rows = _ler_csv(path)
+        self.assertEqual(linhas, 2)
+        self.assertEqual([r[0] for r in rows[1:]], ['Boné', 'Caneta Azul'])
+
+    def test_movimentacoes_filters_and_progress(self):
+        """Movimentações filtradas, mais recentes primeiro, com total conhecido"""
+        job, linhas, path = self._exportar('movimentacoes', {'tipo': 'saida'})
+        rows = _ler_csv(path)
+        self.assertEqual(linhas, 3)
+        self.assertEqual([r[4] for r in rows[1:]], ['5', '4', '2'])
+        self.assertEqual(job.total, 3)
+        self.assertEqual(job.progress, 1.0)
+
+    def test_invalid_view_and_format(self):
+        """Visão ou formato desconhecidos são rejeitados na criação"""
+        with self.assertRaises(ValueError):
+            ExportJob('fornecedores', 'x.csv')
+        with self.assertRaises(ValueError):
+            ExportJob('brindes', 'x.pdf')
+
+    @unittest.skipIf(xlsx_available(), "openpyxl instalado")
+    def test_xlsx_requires_openpyxl(self):
+        """Sem openpyxl, XLSX é recusado com mensagem clara"""
+        with self.assertRaises(RuntimeError):
+            ExportJob('brindes', 'x.xlsx')
+
+    @unittest.skipUnless(xlsx_available(), "openpyxl não instalado")
+    def test_xlsx(self):
+        """Planilha write-only com os valores numéricos preservados"""
+        from openpyxl import load_workbook
+        _, linhas, path = self._exportar('brindes', nome='saida.xlsx')
+        sheet = load_workbook(path, read_only=True).active
+        rows = list(sheet.iter_rows(values_only=True))
+        self.assertEqual(linhas, 3)
+        self.assertEqual(rows[1][6], 2.5)
+
+class TestExportBanco(unittest.TestCase):
+    """Movimentações lidas do cursor em lotes, com cancelamento"""
+
+    MOVIMENTACOES = 20000
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.mkdtemp()
+        cls.schema = DatabaseSchema(os.path.join(cls.temp_dir, 'teste.db'))
+        brinde_id = cls.schema.execute_insert("""
+            INSERT INTO brindes (codigo, descricao, categoria_id, quantidade, valor_unitario,
+                                 unidade_medida_id, filial_id)
+            VALUES ('Q1', 'Caneta', 1, 0, 1.0, 1, 1)
+        """)
+        with cls.schema.transaction() as conn:
+            conn.executemany("""
+                INSERT INTO movimentacoes (brinde_id, tipo, quantidade, filial_origem_id,
+                                           usuario_id, observacoes, data_hora)
+                VALUES (?, ?, 1, 1, 1, ?, ?)
+            """, ((brinde_id, 'entrada' if i % 2 else 'saida', f"Lote {i}",
+                   f"2025-{1 + i % 12:02d}-{1 + i % 28:02d} {i % 24:02d}:00:00")
+                  for i in range(cls.MOVIMENTACOES)))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.schema.close()
+        shutil.rmtree(cls.temp_dir, ignore_errors=True)
+
+    def _job(self, filtros=None, nome='movimentacoes.csv'):
+        job = ExportJob('movimentacoes', os.path.join(self.temp_dir, nome), filtros)
+        job.provider = _ProvedorBanco(self.schema)
+        return job
+
+    def test_all_rows_in_order(self):
+        """Todas as linhas, na ordem (data_hora, id) decrescente da tela"""
+        job = self._job()
+        self.assertEqual(job.run(), self.MOVIMENTACOES)
+        rows = _ler_csv(job.path)
+        self.assertEqual(len(rows), self.MOVIMENTACOES + 1)
+        datas = [r[0] for r in rows[1:]]
+        self.assertEqual(datas, sorted(datas, reverse=True))
+
+    def test_filters_in_sql(self):
+        """Filtros aplicados na consulta do cursor"""
+        job = self._job({'tipo': 'saida'})
+        self.assertEqual(job.run(), self.MOVIMENTACOES // 2)
+        self.assertEqual(job.total, self.MOVIMENTACOES // 2)
+
+    def test_constant_memory(self):
+        """Pico de memória muito abaixo do que a lista de linhas ocuparia"""
+        job = self._job()
+        tracemalloc.start()
+        try:
+            job.run()
+            _, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        # Só a lista de dicts das 20 mil linhas passaria de 15 MB
+        self.assertLess(pico, 3 * 1024 * 1024)
+
+    def test_cancel_midway_removes_partial_file(self):
+        """Cancelamento durante a escrita interrompe e apaga o arquivo parcial"""
+        job = self._job(nome='cancelada.csv')
+        provedor = job.provider
+        iter_original = provedor.iter_movimentacoes
+
+        def iter_cancelando(filters):
+            for i, row in enumerate(iter_original(filters)):
+                if i == 1234:
+                    job.cancel()
+                yield row
+
+        provedor.iter_movimentacoes = iter_cancelando
+        with self.assertRaises(ExportCancelled):
+            job.run()
+        self.assertLess(job.written, 2000)
+        self.assertFalse(os.path.exists(job.path))
+        self.assertFalse(os.path.exists(job.path + '.parcial'))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+"""
+Testes do armazenamento do modo mock (snapshot + diário de operações)
+"""
+
+import unittest
+import json
+import os
+import sys
+import tempfile
+import shutil
+
+# Adicionar src ao path para importar módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.data.journal import JournalStore, apply_ops, op_put, op_delete, op_set
+from src.data.mock_data import MockDataManager
+
+def _inicial():
+    return {'brindes': [{'id': 1, 'descricao': 'Caneta'}, {'id': 2, 'descricao': 'Boné'}],
+            'configuracoes': {}}
+
+class TestJournalStore(unittest.TestCase):
+    """Diário, reaplicação, compactação e recuperação de queda"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.snapshot = os.path.join(self.temp_dir, 'dados.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _store(self, **kwargs):
+        store = JournalStore(self.snapshot, **kwargs)
+        self.addCleanup(store.close)
+        return store
+
+    def test_apply_ops_keeps_order(self):
+        """put substitui na mesma posição ou inclui no fim; del remove; set troca a chave"""
+        data = _inicial()
+        apply_ops(data, [op_put('brindes', {'id': 1, 'descricao': 'Caneta Azul'}),
+                         op_put('brindes', {'id': 3, 'descricao': 'Caderno'}),
+                         op_delete('brindes', 2),
+                         op_set('configuracoes', {'estoque_minimo': 5}),
+                         op_put('movimentacoes', {'id': 1})])
+        self.assertEqual([b['descricao'] for b in data['brindes']], ['Caneta Azul', 'Caderno'])
+        self.assertEqual(data['configuracoes'], {'estoque_minimo': 5})
+        self.assertEqual(data['movimentacoes'], [{'id': 1}])
+
+    def test_replay_on_load(self):
+        """Snapshot + diário reconstroem os dados; repetir o diário não muda nada"""
+        store = self._store()
+        data = store.load(_inicial)
+        store.compact(data)
+        ops = [op_put('brindes', {'id': 3, 'descricao': 'Caderno'}), op_delete('brindes', 1)]
+        store.append(ops)
+        store.close()
+
+        esperado = _inicial()
+        apply_ops(esperado, ops)
+        self.assertEqual(self._store().load(dict), esperado)
+
+        # Queda entre a troca do snapshot e o esvaziamento do diário
+        store = self._store()
+        store.compact(esperado)
+        store.append(ops)
+        store.close()
+        self.assertEqual(self._store().load(dict), esperado)
+
+    def test_truncated_last_line_is_discarded(self):
+        """Linha incompleta no fim do diário é ignorada e cortada do arquivo"""
+        store = self._store()
+        store.compact(store.load(_inicial))
+        store.append([op_put('brindes', {'id': 3, 'descricao': 'Caderno'})])
+        store.close()
+        with open(store.journal_path, 'a', encoding='utf-8') as f:
+            f.write('{"op":"put","t":"brindes","v":{"id":4,"desc')
+
+        novo = self._store()
+        data = novo.load(dict)
+        self.assertEqual([b['id'] for b in data['brindes']], [1, 2, 3])
+        with open(store.journal_path, encoding='utf-8') as f:
+            self.assertEqual(len(f.readlines()), 1)
+
+        # Gravações seguintes continuam íntegras
+        novo.append([op_delete('brindes', 3)])
+        novo.close()
+        self.assertEqual([b['id'] for b in self._store().load(dict)['brindes']], [1, 2])
+
+    def test_compaction_threshold(self):
+        """Compacta após max(mínimo, registros do snapshot) operações"""
+        store = self._store(compact_min_ops=3)
+        data = store.load(_inicial)
+        store.compact(data)
+        self.assertEqual(store.snapshot_size, 2)
+
+        store.append([op_put('brindes', {'id': 3})] * 2)
+        self.assertFalse(store.should_compact())
+        store.append([op_put('brindes', {'id': 4})])
+        self.assertTrue(store.should_compact())
+
+        store.compact(data)
+        self.assertEqual(store.pending_ops, 0)
+        self.assertEqual(os.path.getsize(store.journal_path), 0)
+        self.assertFalse(os.path.exists(self.snapshot + '.tmp'))
+
+    def test_file_formats(self):
+        """Snapshot indentado (versionado no git); diário com uma operação compacta por linha"""
+        store = self._store()
+        data = store.load(_inicial)
+        store.compact(data)
+        store.append([op_put('brindes', {'id': 3, 'descricao': 'Caderno'})])
+        with open(self.snapshot, encoding='utf-8') as f:
+            self.assertEqual(f.read(), json.dumps(data, ensure_ascii=False, indent=2))
+        with open(store.journal_path, encoding='utf-8') as f:
+            self.assertEqual(f.read(), '{"op":"put","t":"brindes","v":{"id":3,"descricao":"Caderno"}}\n')
+
+class TestMockJournal(unittest.TestCase):
+    """MockDataManager gravando no diário e recarregando pelo snapshot + diário"""
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.temp_dir = tempfile.mkdtemp()
+        os.chdir(self.temp_dir)
+        self.mock = MockDataManager()
+
+    def tearDown(self):
+        self.mock.store.close()
+        os.chdir(self.cwd)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _recarregado(self):
+        mock = MockDataManager()
+        mock.store.close()
+        return mock.data
+
+    def test_first_write_creates_snapshot(self):
+        """Sem snapshot, a primeira gravação cria o arquivo completo"""
+        self.assertFalse(os.path.exists('mock_data.json'))
+        self.mock.create_brinde({'descricao': 'Squeeze', 'categoria': 'Outros', 'quantidade': 5,
+                                 'valor_unitario': 8, 'unidade_medida': 'UN', 'filial': 'Matriz'})
+        self.assertTrue(os.path.exists('mock_data.json'))
+        self.assertEqual(self._recarregado(), self.mock.data)
+
+    def test_operations_are_appended(self):
+        """Alterações só acrescentam ao diário; a recarga chega aos mesmos dados"""
+        self.mock.save_data()
+        tamanho_snapshot = os.path.getsize('mock_data.json')
+
+        brinde = self.mock.create_brinde({'descricao': 'Squeeze', 'categoria': 'Outros', 'quantidade': 5,
+                                          'valor_unitario': 8, 'unidade_medida': 'UN', 'filial': 'Matriz'})
+        self.mock.update_brinde(brinde['id'], {'quantidade': 9})
+        self.mock.create_movimentacao({'brinde_id': brinde['id'], 'tipo': 'saida', 'quantidade': 2,
+                                       'usuario': 'admin'})
+        self.mock.create_movimentacoes_bulk([{'brinde_id': brinde['id'], 'tipo': 'entrada', 'quantidade': 1}] * 3)
+        self.mock.transfer_brinde(brinde['id'], 'Filial São Paulo', 4, 'admin')
+        self.mock.delete_brinde(1)
+        self.mock.create_fornecedor({'nome': 'Novo Fornecedor'})
+        self.mock.data.setdefault('configuracoes', {})['estoque_minimo'] = 7
+        self.mock.save_key('configuracoes')
+
+        self.assertEqual(os.path.getsize('mock_data.json'), tamanho_snapshot)
+        with open(self.mock.store.journal_path, encoding='utf-8') as f:
+            self.assertTrue(all(json.loads(linha)['op'] in ('put', 'del', 'set') for linha in f))
+        self.assertEqual(self._recarregado(), self.mock.data)
+
+    def test_compaction_during_writes(self):
+        """Com limite baixo o snapshot é refeito e o diário volta a crescer do zero"""
+        self.mock.save_data()
+        self.mock.store.compact_min_ops = 5
+        self.mock.store.snapshot_size = 0
+        brinde_id = self.mock.data['brindes'][0]['id']
+        for _ in range(12):
+            self.mock.create_movimentacao({'brinde_id': brinde_id, 'tipo': 'entrada', 'quantidade': 1})
+        # 12 movimentações = 24 operações; ao menos uma compactação no caminho
+        self.assertLess(self.mock.store.pending_ops, 24)
+        self.assertEqual(self._recarregado(), self.mock.data)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+"""
+Testes das migrações versionadas (PRAGMA user_version) e dos backfills em lotes
+"""
+
+import unittest
+import os
+import sys
+import sqlite3
+import tempfile
+import shutil
+
+# Adicionar src ao path para importar módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.database.schema import DatabaseSchema
+from src.database.migrations import Migration, MigrationRunner, Backfill, BackfillWorker
+
+class TestSchemaMigrations(unittest.TestCase):
+    """Migrações do DatabaseSchema"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'teste.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _user_version(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute("PRAGMA user_version").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_new_database_at_latest_version(self):
+        """Banco novo é criado já na versão mais recente"""
+        schema = DatabaseSchema(self.db_path)
+        try:
+            self.assertEqual(self._user_version(), schema.migrator.latest_version)
+            self.assertTrue(schema.execute_query("SELECT COUNT(*) FROM fornecedores")[0][0] > 0)
+        finally:
+            schema.close()
+
+    def test_current_database_runs_no_ddl(self):
+        """Com o banco atualizado só o user_version é lido"""
+        schema = DatabaseSchema(self.db_path)
+        schema.close()
+
+        comandos = []
+        conn = sqlite3.connect(self.db_path)
+        conn.set_trace_callback(comandos.append)
+        try:
+            self.assertEqual(schema.migrator.migrate(conn), [])
+        finally:
+            conn.close()
+        self.assertEqual(comandos, ["PRAGMA user_version"])
+
+    def test_legacy_database_keeps_data(self):
+        """Banco sem versão (e sem fornecedores) é migrado sem ser recriado"""
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript("""
+            CREATE TABLE configuracoes (id INTEGER PRIMARY KEY AUTOINCREMENT, chave TEXT UNIQUE NOT NULL,
+                valor TEXT NOT NULL, descricao TEXT, data_criacao TIMESTAMP, data_atualizacao TIMESTAMP);
+            CREATE TABLE filiais (id INTEGER PRIMARY KEY AUTOINCREMENT, numero TEXT UNIQUE NOT NULL,
+                nome TEXT NOT NULL, cidade TEXT, endereco TEXT, telefone TEXT, email TEXT,
+                ativo BOOLEAN DEFAULT 1, data_criacao TIMESTAMP, data_atualizacao TIMESTAMP);
+            INSERT INTO filiais (numero, nome) VALUES ('950', 'Filial Antiga');
+        """)
+        conn.close()
+
+        schema = DatabaseSchema(self.db_path)
+        try:
+            self.assertEqual(self._user_version(), schema.migrator.latest_version)
+            self.assertTrue(schema.execute_query("SELECT 1 FROM filiais WHERE numero = '950'"))
+            self.assertTrue(schema.execute_query("SELECT COUNT(*) FROM fornecedores")[0][0] > 0)
+            self.assertFalse(os.path.exists(f"{self.db_path}.backup"))
+        finally:
+            schema.close()
+
+class TestMigrationRunner(unittest.TestCase):
+    """Executor de migrações e backfills com passos de teste"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'teste.db')
+        self.conn = sqlite3.connect(self.db_path)
+
+    def tearDown(self):
+        self.conn.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_only_pending_steps_applied(self):
+        """Cada passo roda uma única vez, em ordem"""
+        aplicados = []
+        passos = [Migration(v, f"passo {v}", lambda conn, v=v: aplicados.append(v)) for v in (1, 2)]
+        self.assertEqual(MigrationRunner(passos).migrate(self.conn), [1, 2])
+
+        passos.append(Migration(3, "passo 3", lambda conn: aplicados.append(3)))
+        self.assertEqual(MigrationRunner(passos).migrate(self.conn), [3])
+        self.assertEqual(aplicados, [1, 2, 3])
+        self.assertEqual(MigrationRunner.current_version(self.conn), 3)
+
+    def test_failed_step_rolls_back_everything(self):
+        """Falha em um passo desfaz todos os passos pendentes"""
+        def falhar(conn):
+            raise RuntimeError("falha")
+
+        runner = MigrationRunner([
+            Migration(1, "tabela", lambda conn: conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY)")),
+            Migration(2, "falha", falhar)
+        ])
+        with self.assertRaises(RuntimeError):
+            runner.migrate(self.conn)
+        self.assertEqual(MigrationRunner.current_version(self.conn), 0)
+        tabelas = self.conn.execute("SELECT name FROM sqlite_master WHERE name = 't'").fetchall()
+        self.assertEqual(tabelas, [])
+
+    def test_versions_must_be_consecutive(self):
+        """Lacuna na numeração é erro de programação"""
+        with self.assertRaises(ValueError):
+            MigrationRunner([Migration(1, "a", print), Migration(3, "b", print)])
+
+    def test_batched_backfill_resumes(self):
+        """Backfill em lotes: progresso salvo entre execuções e limite no ID da migração"""
+        schema = DatabaseSchema(os.path.join(self.temp_dir, 'app.db'))
+        try:
+            with schema.transaction() as conn:
+                conn.execute("CREATE TABLE itens (id INTEGER PRIMARY KEY, valor INTEGER, dobro INTEGER)")
+                conn.executemany("INSERT INTO itens (valor) VALUES (?)", [(i,) for i in range(2500)])
+
+            backfill = Backfill("itens_dobro", "itens",
+                                "UPDATE itens SET dobro = valor * 2 WHERE id > ? AND id <= ?",
+                                batch_size=1000)
+            proxima = schema.migrator.latest_version + 1
+            runner = MigrationRunner(schema.schema_migrations() + [
+                Migration(proxima, "dobro", lambda conn: None, [backfill])
+            ])
+            conn = schema.get_connection()
+            try:
+                self.assertEqual(runner.migrate(conn), [proxima])
+            finally:
+                conn.close()
+
+            worker = BackfillWorker(schema, runner, pause=0)
+            self.assertEqual(worker.pending(), ["itens_dobro"])
+            self.assertEqual(worker.run_pending(max_batches=1), 1)
+            restantes = schema.execute_query("SELECT COUNT(*) FROM itens WHERE dobro IS NULL")[0][0]
+            self.assertEqual(restantes, 1500)
+
+            # Execução em segundo plano continua de onde parou
+            worker.start()
+            worker.wait(10)
+            self.assertEqual(worker.pending(), [])
+            self.assertEqual(worker.stats['batches'], 3)
+            self.assertEqual(worker.stats['completed'], 1)
+            erros = schema.execute_query("SELECT COUNT(*) FROM itens WHERE dobro IS NOT valor * 2")[0][0]
+            self.assertEqual(erros, 0)
+        finally:
+            schema.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+"""
+Testes dos índices em memória do MockDataManager (mesmos resultados da busca sequencial)
+"""
+
+import unittest
+import os
+import sys
+import random
+import tempfile
+import shutil
+
+# Adicionar src ao path para importar módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.data.mock_data import MockDataManager
+from src.data.journal import JournalStore
+
+FILIAIS = ['Matriz', 'Filial 1', 'Filial 2']
+DESCRICOES = ['Caneta', 'caneta ', 'Boné', 'Caderno', ' CADERNO', 'Squeeze']
+
+class Referencia:
+    """Implementação anterior (busca sequencial e ordenação a cada chamada)"""
+
+    def __init__(self, data):
+        self.data = data
+
+    def get_brinde_by_id(self, brinde_id):
+        return next((b for b in self.data.get('brindes', []) if b.get('id') == brinde_id), None)
+
+    def get_brindes(self, filial_filter=None):
+        brindes = self.data.get('brindes', [])
+        if filial_filter and filial_filter != "Todas":
+            brindes = [b for b in brindes if b.get('filial') == filial_filter]
+        return brindes
+
+    def find_brinde_by_descricao(self, filial, descricao):
+        chave = (descricao or '').strip().lower()
+        return next((b for b in self.data.get('brindes', [])
+                     if b.get('filial') == filial and (b.get('descricao') or '').strip().lower() == chave), None)
+
+    def get_movimentacoes(self, brinde_id=None, tipo=None, limit=None):
+        movimentacoes = list(self.data.get('movimentacoes', []))
+        if brinde_id:
+            movimentacoes = [m for m in movimentacoes if m.get('brinde_id') == brinde_id]
+        if tipo:
+            movimentacoes = [m for m in movimentacoes if m.get('tipo') == tipo]
+        movimentacoes.sort(key=lambda x: x.get('data_hora', ''), reverse=True)
+        if limit:
+            movimentacoes = movimentacoes[:limit]
+        return movimentacoes
+
+    def get_next_codigo(self):
+        codigos = [int(b['codigo']) for b in self.data.get('brindes', []) if str(b.get('codigo', '')).isdigit()]
+        return f"{max(codigos, default=0) + 1:03d}"
+
+class TestMockIndex(unittest.TestCase):
+    """Resultados com índices iguais aos da implementação sequencial"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.mock = MockDataManager.__new__(MockDataManager)
+        self.mock.store = JournalStore(os.path.join(self.temp_dir, 'dados.json'))
+        self.mock.data = {'brindes': [], 'movimentacoes': [], 'configuracoes': {},
+                          'filiais': [{'id': i, 'nome': nome} for i, nome in enumerate(FILIAIS, 1)]}
+        self.ref = Referencia(self.mock.data)
+
+    def tearDown(self):
+        self.mock.store.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _novo_brinde(self, rnd, **dados):
+        brinde = {'descricao': rnd.choice(DESCRICOES), 'categoria': 'Outros', 'quantidade': rnd.randint(0, 50),
+                  'valor_unitario': 2.5, 'unidade_medida': 'UN', 'filial': rnd.choice(FILIAIS)}
+        brinde.update(dados)
+        return self.mock.create_brinde(brinde)
+
+    def _comparar(self):
+        ids = [b['id'] for b in self.mock.data['brindes']]
+        for brinde_id in ids + [0, max(ids, default=0) + 1]:
+            self.assertIs(self.mock.get_brinde_by_id(brinde_id), self.ref.get_brinde_by_id(brinde_id))
+        for filial in FILIAIS + ['Todas', None, 'Inexistente']:
+            self.assertEqual([id(b) for b in self.mock.get_brindes(filial)],
+                             [id(b) for b in self.ref.get_brindes(filial)])
+            for descricao in DESCRICOES:
+                self.assertIs(self.mock.find_brinde_by_descricao(filial, descricao),
+                              self.ref.find_brinde_by_descricao(filial, descricao))
+        for filtros in ({}, {'limit': 5}, {'tipo': 'saida'}, {'tipo': 'entrada', 'limit': 3},
+                        {'brinde_id': ids[0] if ids else 1}, {'brinde_id': ids[-1] if ids else 1, 'limit': 2}):
+            self.assertEqual([id(m) for m in self.mock.get_movimentacoes(**filtros)],
+                             [id(m) for m in self.ref.get_movimentacoes(**filtros)], filtros)
+
+    def test_random_operations_match_linear_scan(self):
+        """Sequência aleatória de criações, alterações, exclusões, movimentações e transferências"""
+        rnd = random.Random(25)
+        for _ in range(20):
+            self._novo_brinde(rnd)
+        for passo in range(400):
+            ids = [b['id'] for b in self.mock.data['brindes']]
+            operacao = rnd.randrange(7)
+            if operacao == 0:
+                self._novo_brinde(rnd)
+            elif operacao == 1 and ids:
+                alteracao = rnd.choice([{'quantidade': rnd.randint(0, 80)}, {'descricao': rnd.choice(DESCRICOES)},
+                                        {'filial': rnd.choice(FILIAIS)}, {'codigo': f"{rnd.randint(1, 999):03d}"}])
+                self.mock.update_brinde(rnd.choice(ids), alteracao)
+            elif operacao == 2 and ids:
+                self.mock.delete_brinde(rnd.choice(ids))
+            elif operacao == 3 and ids:
+                self.mock.create_movimentacao({'brinde_id': rnd.choice(ids), 'tipo': 'entrada',
+                                               'quantidade': rnd.randint(1, 5)})
+            elif operacao == 4 and ids:
+                # Lote: mesma data_hora para todas (empates na ordenação)
+                self.mock.create_movimentacoes_bulk(
+                    [{'brinde_id': rnd.choice(ids), 'tipo': rnd.choice(['entrada', 'saida']), 'quantidade': 1}
+                     for _ in range(rnd.randint(1, 4))], atomic=False)
+            elif operacao == 5 and ids:
+                origem = self.mock.get_brinde_by_id(rnd.choice(ids))
+                if origem['quantidade'] > 0:
+                    destino = rnd.choice([f for f in FILIAIS if f != origem['filial']])
+                    self.mock.transfer_brinde(origem['id'], destino, 1, 'admin')
+            elif operacao == 6:
+                # Contador monotônico: nunca atrás do máximo atual (exclusões não o fazem voltar)
+                self.assertGreaterEqual(int(self.mock.get_next_codigo()), int(self.ref.get_next_codigo()))
+                self.assertGreater(self.mock.get_next_id('brindes'), max(ids, default=0))
+            if passo % 10 == 0:
+                self._comparar()
+        self._comparar()
+
+    def test_ids_are_monotonic(self):
+        """Ids de brindes e movimentações não são reaproveitados após exclusões"""
+        rnd = random.Random(1)
+        primeiro = self._novo_brinde(rnd)
+        ultimo = self._novo_brinde(rnd, codigo=None)
+        self.mock.create_movimentacao({'brinde_id': primeiro['id'], 'tipo': 'entrada', 'quantidade': 1})
+        self.assertEqual(ultimo['codigo'], '002')
+
+        self.mock.delete_brinde(ultimo['id'])
+        self.assertEqual(self.mock.get_next_id('brindes'), ultimo['id'] + 1)
+        self.assertEqual(self.mock.get_next_codigo(), '003')
+        self.assertEqual(self._novo_brinde(rnd)['id'], ultimo['id'] + 1)
+        self.assertEqual(self.mock.get_next_id('movimentacoes'), 2)
+
+    def test_transfer_unknown_filial(self):
+        """Filial de destino inexistente: erro antes de qualquer alteração"""
+        origem = self._novo_brinde(random.Random(3), filial='Matriz', quantidade=10)
+        antes = [dict(b) for b in self.mock.data['brindes']]
+        gravacoes = self.mock.store.pending_ops
+        with self.assertRaisesRegex(ValueError, "Filial 'Filial 9' não encontrada"):
+            self.mock.transfer_brinde(origem['id'], 'Filial 9', 1, 'admin')
+        self.assertEqual(self.mock.data['brindes'], antes)
+        self.assertEqual(self.mock.data['movimentacoes'], [])
+        self.assertEqual(self.mock.store.pending_ops, gravacoes)
+
+    def test_external_changes_rebuild(self):
+        """Lista trocada ou alterada por fora dos métodos: índices refeitos na consulta"""
+        self.mock.data['movimentacoes'].extend([
+            {'id': 1, 'brinde_id': 1, 'data_hora': '2025-01-02T10:00:00'},
+            {'id': 2, 'brinde_id': 1, 'data_hora': '2025-01-03T10:00:00'},
+            {'id': 3, 'brinde_id': 2, 'data_hora': '2025-01-02T10:00:00'}
+        ])
+        self.assertEqual([m['id'] for m in self.mock.get_movimentacoes()], [2, 1, 3])
+        self.mock.data['movimentacoes'].append({'id': 9, 'data_hora': '2025-01-01T00:00:00'})
+        self.assertEqual(self.mock.get_next_id('movimentacoes'), 10)
+        self.assertEqual([m['id'] for m in self.mock.get_movimentacoes(limit=10)], [2, 1, 3, 9])
+
+        self.mock.data = {'brindes': [{'id': 4, 'codigo': '010', 'descricao': 'Caneta', 'filial': 'Matriz'}],
+                          'movimentacoes': []}
+        self.assertEqual(self.mock.get_next_id('brindes'), 5)
+        self.assertEqual(self.mock.get_next_id('movimentacoes'), 1)
+        self.assertEqual(self.mock.get_next_codigo(), '011')
+        self.assertEqual(self.mock.find_brinde_by_descricao('Matriz', ' caneta')['id'], 4)
+        self.assertEqual(self.mock.get_movimentacoes(), [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,297 @@
+"""
+Testes do motor de movimentações (transação única e concorrência)
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+import threading
+
+# Adicionar src ao path para importar módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.database.schema import DatabaseSchema
+from src.database.movement_engine import MovementEngine
+from src.database.models import BrindeModel
+
+class MovementEngineTestCase(unittest.TestCase):
+    """Base: banco temporário com um brinde"""
+
+    ESTOQUE_INICIAL = 100
+
+    def setUp(self):
+        """Cria um banco temporário e um motor apontando para ele"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.schema = DatabaseSchema(os.path.join(self.temp_dir, 'teste.db'))
+        self.engine = MovementEngine()
+        self.engine.db = self.schema
+        self.brinde_id = self._create_brinde(self.ESTOQUE_INICIAL)
+
+    def tearDown(self):
+        """Remove o banco temporário"""
+        self.schema.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _create_brinde(self, quantidade: int) -> int:
+        return self.schema.execute_insert("""
+            INSERT INTO brindes (codigo, descricao, categoria_id, quantidade, valor_unitario,
+                                 unidade_medida_id, filial_id)
+            VALUES (?, 'Caneta Teste', 1, ?, 2.5, 1, 1)
+        """, (f"T{quantidade}", quantidade))
+
+    def _movimento(self, tipo: str, quantidade: int) -> dict:
+        return {
+            'brinde_id': self.brinde_id,
+            'tipo': tipo,
+            'quantidade': quantidade,
+            'filial_origem_id': 1,
+            'usuario_id': 1
+        }
+
+    def _estoque(self) -> int:
+        rows = self.schema.execute_query("SELECT quantidade FROM brindes WHERE id = ?", (self.brinde_id,))
+        return rows[0][0]
+
+    def _count(self, tabela: str, where: str = "1=1") -> int:
+        return self.schema.execute_query(f"SELECT COUNT(*) FROM {tabela} WHERE {where}")[0][0]
+
+class TestMovementEngine(MovementEngineTestCase):
+    """Testes funcionais"""
+
+    def test_entrada_and_saida(self):
+        """Entradas somam e saídas subtraem do estoque"""
+        self.engine.register(self._movimento('entrada', 10))
+        self.engine.register(self._movimento('saida', 30))
+        self.assertEqual(self._estoque(), self.ESTOQUE_INICIAL - 20)
+        self.assertEqual(self._count('movimentacoes'), 2)
+
+    def test_audit_written_in_same_transaction(self):
+        """A auditoria da movimentação deve ser gravada junto"""
+        mov = self.engine.register(self._movimento('saida', 1))
+        self.assertEqual(
+            self._count('logs_auditoria', f"tabela = 'movimentacoes' AND registro_id = {mov['id']}"), 1
+        )
+
+    def test_insufficient_stock_rolls_back(self):
+        """Saída maior que o saldo não altera nada"""
+        with self.assertRaises(ValueError):
+            self.engine.register(self._movimento('saida', self.ESTOQUE_INICIAL + 1))
+
+        self.assertEqual(self._estoque(), self.ESTOQUE_INICIAL)
+        self.assertEqual(self._count('movimentacoes'), 0)
+        self.assertEqual(self._count('logs_auditoria', "tabela = 'movimentacoes'"), 0)
+        self.assertFalse(self.schema.get_pooled_connection().in_transaction)
+
+    def test_unknown_brinde(self):
+        """Brinde inexistente deve gerar erro"""
+        data = self._movimento('entrada', 1)
+        data['brinde_id'] = 99999
+        with self.assertRaises(ValueError):
+            self.engine.register(data)
+
+    def test_failed_insert_rolls_back_stock(self):
+        """Falha no INSERT da movimentação desfaz o ajuste de estoque"""
+        data = self._movimento('saida', 5)
+        data['usuario_id'] = 99999  # Viola a foreign key de usuarios
+        with self.assertRaises(Exception):
+            self.engine.register(data)
+        self.assertEqual(self._estoque(), self.ESTOQUE_INICIAL)
+
+class TestMovementEngineBulk(MovementEngineTestCase):
+    """Testes do registro em lote"""
+
+    def test_bulk_all_valid(self):
+        """Lote válido grava tudo com IDs reais e uma auditoria por linha"""
+        lote = [self._movimento('entrada', 5), self._movimento('saida', 20), self._movimento('saida', 1)]
+        resultados = self.engine.register_bulk(lote)
+
+        self.assertTrue(all(r['sucesso'] for r in resultados))
+        self.assertEqual(self._estoque(), self.ESTOQUE_INICIAL - 16)
+        ids = [r['id'] for r in resultados]
+        rows = self.schema.execute_query("SELECT id, quantidade FROM movimentacoes ORDER BY id")
+        self.assertEqual([row[0] for row in rows], ids)
+        self.assertEqual([row[1] for row in rows], [5, 20, 1])
+        self.assertEqual(self._count('logs_auditoria', "tabela = 'movimentacoes'"), 3)
+
+    def test_bulk_cumulative_stock(self):
+        """O saldo é verificado de forma acumulada, na ordem das linhas"""
+        lote = [self._movimento('saida', 60), self._movimento('saida', 60)]
+        resultados = self.engine.register_bulk(lote)
+
+        self.assertFalse(any(r['sucesso'] for r in resultados))
+        self.assertEqual(resultados[1]['erro'], "Estoque insuficiente")
+        self.assertIn("cancelado", resultados[0]['erro'])
+        self.assertEqual(self._estoque(), self.ESTOQUE_INICIAL)
+        self.assertEqual(self._count('movimentacoes'), 0)
+
+    def test_bulk_non_atomic_partial(self):
+        """Sem atomicidade apenas as linhas válidas são gravadas"""
+        invalida = self._movimento('saida', 1)
+        invalida['brinde_id'] = 99999
+        lote = [self._movimento('saida', 10), invalida, self._movimento('saida', 0)]
+        resultados = self.engine.register_bulk(lote, atomic=False)
+
+        self.assertEqual([r['sucesso'] for r in resultados], [True, False, False])
+        self.assertIn("não encontrado", resultados[1]['erro'])
+        self.assertEqual(self._estoque(), self.ESTOQUE_INICIAL - 10)
+        self.assertEqual(self._count('movimentacoes'), 1)
+
+class TestMovementEngineTransfer(MovementEngineTestCase):
+    """Testes da transferência entre filiais"""
+
+    FILIAL_DESTINO = 2
+
+    def _brinde_destino(self):
+        rows = self.schema.execute_query(
+            "SELECT id, quantidade FROM brindes WHERE filial_id = ? AND descricao = 'Caneta Teste'",
+            (self.FILIAL_DESTINO,)
+        )
+        return rows[0] if rows else None
+
+    def test_transfer_creates_destination(self):
+        """Sem brinde no destino, ele é criado já com a quantidade transferida"""
+        resultado = self.engine.transfer(self.brinde_id, self.FILIAL_DESTINO, 30, 1, "Reposição")
+
+        self.assertTrue(resultado['brinde_destino_criado'])
+        self.assertEqual(self._estoque(), self.ESTOQUE_INICIAL - 30)
+        destino = self._brinde_destino()
+        self.assertEqual(destino['id'], resultado['brinde_destino_id'])
+        self.assertEqual(destino['quantidade'], 30)
+        tipos = self.schema.execute_query("SELECT tipo FROM movimentacoes ORDER BY id")
+        self.assertEqual([row[0] for row in tipos], ['transferencia_saida', 'transferencia_entrada'])
+
+    def test_transfer_reuses_destination(self):
+        """Transferências seguintes somam no mesmo brinde do destino"""
+        primeira = self.engine.transfer(self.brinde_id, self.FILIAL_DESTINO, 10, 1)
+        segunda = self.engine.transfer(self.brinde_id, self.FILIAL_DESTINO, 5, 1)
+
+        self.assertFalse(segunda['brinde_destino_criado'])
+        self.assertEqual(primeira['brinde_destino_id'], segunda['brinde_destino_id'])
+        self.assertEqual(self._brinde_destino()['quantidade'], 15)
+        self.assertEqual(self._count('brindes'), 2)
+
+    def test_transfer_matches_normalized_description(self):
+        """Descrição com outra caixa/espaços no destino é reaproveitada"""
+        destino_id = self.schema.execute_insert("""
+            INSERT INTO brindes (codigo, descricao, categoria_id, quantidade, valor_unitario,
+                                 unidade_medida_id, filial_id)
+            VALUES ('D1', '  CANETA teste ', 1, 4, 2.5, 1, ?)
+        """, (self.FILIAL_DESTINO,))
+
+        resultado = self.engine.transfer(self.brinde_id, self.FILIAL_DESTINO, 6, 1)
+
+        self.assertFalse(resultado['brinde_destino_criado'])
+        self.assertEqual(resultado['brinde_destino_id'], destino_id)
+        quantidade = self.schema.execute_query("SELECT quantidade FROM brindes WHERE id = ?", (destino_id,))
+        self.assertEqual(quantidade[0][0], 10)
+
+    def test_transfer_insufficient_stock_rolls_back(self):
+        """Saldo insuficiente não cria brinde nem movimentações"""
+        with self.assertRaises(ValueError):
+            self.engine.transfer(self.brinde_id, self.FILIAL_DESTINO, self.ESTOQUE_INICIAL + 1, 1)
+
+        self.assertEqual(self._estoque(), self.ESTOQUE_INICIAL)
+        self.assertIsNone(self._brinde_destino())
+        self.assertEqual(self._count('movimentacoes'), 0)
+
+    def test_transfer_failure_after_stock_change_rolls_back(self):
+        """Erro no meio da transferência desfaz a baixa na origem"""
+        with self.assertRaises(Exception):
+            self.engine.transfer(self.brinde_id, self.FILIAL_DESTINO, 10, 99999)  # Usuário inexistente
+
+        self.assertEqual(self._estoque(), self.ESTOQUE_INICIAL)
+        self.assertIsNone(self._brinde_destino())
+
+    def test_transfer_same_filial_rejected(self):
+        """Origem e destino iguais são rejeitados"""
+        with self.assertRaises(ValueError):
+            self.engine.transfer(self.brinde_id, 1, 1, 1)
+
+class TestMovementEngineConcurrency(MovementEngineTestCase):
+    """Teste de estresse com várias threads"""
+
+    THREADS = 8
+    POR_THREAD = 25
+
+    def _run_threads(self, target):
+        threads = [threading.Thread(target=target) for _ in range(self.THREADS)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    def test_no_lost_updates(self):
+        """Entradas e saídas concorrentes não perdem atualizações"""
+        erros = []
+
+        def worker():
+            try:
+                for _ in range(self.POR_THREAD):
+                    self.engine.register(self._movimento('entrada', 3))
+                    self.engine.register(self._movimento('saida', 2))
+            except Exception as e:
+                erros.append(e)
+            finally:
+                self.schema.pool.release()
+
+        self._run_threads(worker)
+
+        self.assertEqual(erros, [])
+        total = self.THREADS * self.POR_THREAD
+        self.assertEqual(self._estoque(), self.ESTOQUE_INICIAL + total)
+        self.assertEqual(self._count('movimentacoes'), total * 2)
+
+    def test_never_oversells(self):
+        """Saídas concorrentes nunca deixam o estoque negativo"""
+        sucessos = []
+        lock = threading.Lock()
+
+        def worker():
+            try:
+                for _ in range(self.POR_THREAD):
+                    try:
+                        self.engine.register(self._movimento('saida', 1))
+                        with lock:
+                            sucessos.append(1)
+                    except ValueError:
+                        pass
+            finally:
+                self.schema.pool.release()
+
+        self._run_threads(worker)
+
+        self.assertEqual(len(sucessos), self.ESTOQUE_INICIAL)
+        self.assertEqual(self._estoque(), 0)
+        self.assertEqual(self._count('movimentacoes'), self.ESTOQUE_INICIAL)
+
+    def test_upsert_codes_are_unique(self):
+        """Criações concorrentes (upsert_for_filial) não repetem o código"""
+        model = BrindeModel()
+        model.db = self.schema
+        erros = []
+        contador = iter(range(self.THREADS * self.POR_THREAD))
+        lock = threading.Lock()
+
+        def worker():
+            try:
+                for _ in range(self.POR_THREAD):
+                    with lock:
+                        n = next(contador)
+                    model.upsert_for_filial({'descricao': f"Brinde {n}", 'categoria_id': 1, 'quantidade': 1,
+                                             'valor_unitario': 1.0, 'unidade_medida_id': 1, 'filial_id': 1})
+            except Exception as e:
+                erros.append(e)
+            finally:
+                self.schema.pool.release()
+
+        self._run_threads(worker)
+
+        self.assertEqual(erros, [])
+        self.assertEqual(self._count('brindes'), self.THREADS * self.POR_THREAD + 1)
+        self.assertEqual(self.schema.execute_query("SELECT COUNT(DISTINCT codigo) FROM brindes")[0][0],
+                         self.THREADS * self.POR_THREAD + 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+"""
+Testes da consulta paginada de movimentações (paginação por cursor e filtros no SQL)
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+
+# Adicionar src ao path para importar módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.database.schema import DatabaseSchema
+from src.database.models import MovimentacaoModel
+from src.data.mock_data import MockDataManager
+
+class TestMovimentacaoQuery(unittest.TestCase):
+    """Consulta paginada no banco"""
+
+    def setUp(self):
+        """Cria um banco temporário com movimentações em duas filiais"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.schema = DatabaseSchema(os.path.join(self.temp_dir, 'teste.db'))
+        self.model = MovimentacaoModel()
+        self.model.db = self.schema
+        self.filial2 = self.schema.execute_insert(
+            "INSERT INTO filiais (numero, nome, cidade) VALUES ('902', 'Filial 2', 'Campinas')"
+        )
+        self.brinde_id = self.schema.execute_insert("""
+            INSERT INTO brindes (codigo, descricao, categoria_id, quantidade, valor_unitario,
+                                 unidade_medida_id, filial_id)
+            VALUES ('Q1', 'Caneta', 1, 0, 1.0, 1, 1)
+        """)
+        # 23 movimentações; várias com o mesmo data_hora (desempate pelo id)
+        with self.schema.transaction() as conn:
+            for i in range(23):
+                conn.execute("""
+                    INSERT INTO movimentacoes (brinde_id, tipo, quantidade, filial_origem_id,
+                                               usuario_id, data_hora)
+                    VALUES (?, ?, 1, ?, 1, ?)
+                """, (self.brinde_id, 'entrada' if i % 2 else 'saida',
+                      1 if i % 3 else self.filial2, f"2025-01-{1 + i // 4:02d} 10:00:00"))
+
+    def tearDown(self):
+        """Remove o banco temporário"""
+        self.schema.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _all_pages(self, filters=None, page_size=5):
+        ids = []
+        cursor = None
+        while True:
+            page = self.model.query(filters, cursor, page_size)
+            ids.extend(m['id'] for m in page['items'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                return ids, page['total']
+
+    def _expected(self, where="1=1", params=()):
+        rows = self.schema.execute_query(
+            f"SELECT id FROM movimentacoes WHERE {where} ORDER BY data_hora DESC, id DESC", params
+        )
+        return [row[0] for row in rows]
+
+    def test_pages_cover_all_rows_once_in_order(self):
+        """Percorrer as páginas retorna cada linha uma vez, na ordem (data_hora, id) desc"""
+        ids, total = self._all_pages()
+        self.assertEqual(ids, self._expected())
+        self.assertEqual(total, 23)
+
+    def test_exact_multiple_of_page_size(self):
+        """Última página cheia não gera página vazia"""
+        ids, _ = self._all_pages(page_size=23)
+        self.assertEqual(len(ids), 23)
+        self.assertIsNone(self.model.query(None, None, 23)['next_cursor'])
+
+    def test_filters_in_sql(self):
+        """Filial, tipo e período são aplicados antes da paginação"""
+        filters = {'filial_id': self.filial2, 'tipo': 'saida'}
+        ids, total = self._all_pages(filters, page_size=2)
+        self.assertEqual(ids, self._expected("filial_origem_id = ? AND tipo = 'saida'", (self.filial2,)))
+        self.assertEqual(total, len(ids))
+
+        filters = {'tipo': ['entrada', 'saida'], 'data_inicio': '2025-01-02', 'data_fim': '2025-01-04'}
+        ids, total = self._all_pages(filters)
+        self.assertEqual(ids, self._expected("data_hora >= '2025-01-02' AND data_hora < '2025-01-04'"))
+        self.assertEqual(total, 8)
+
+        self.assertEqual(self.model.query({'usuario_id': 999})['total'], 0)
+        self.assertEqual(self.model.query({'brinde_id': self.brinde_id})['total'], 23)
+
+    def test_filial_count_uses_covering_index(self):
+        """Total por filial é contado só no índice (sem ler a tabela)"""
+        plano = " ".join(
+            row[3] for row in self.schema.execute_query(
+                "EXPLAIN QUERY PLAN SELECT COUNT(*) FROM movimentacoes m WHERE m.filial_origem_id = ?",
+                (1,)
+            )
+        )
+        self.assertIn("COVERING INDEX idx_movimentacoes_filial_data", plano)
+
+class TestMovimentacaoQueryMock(unittest.TestCase):
+    """Mesma consulta no MockDataManager"""
+
+    def setUp(self):
+        self.mock = MockDataManager()
+        self.mock.data = {'movimentacoes': [
+            {'id': i, 'tipo': 'entrada' if i % 2 else 'saida', 'usuario': 'admin',
+             'filial': 'Matriz' if i % 3 else 'Filial 2', 'brinde_id': 1,
+             'data_hora': f"2025-01-{1 + i // 4:02d}T10:00:00"}
+            for i in range(1, 24)
+        ]}
+
+    def test_pages_and_filters(self):
+        """Páginas consecutivas sem repetição e filtros aplicados"""
+        ids = []
+        cursor = None
+        while True:
+            page = self.mock.query_movimentacoes({'filial': 'Matriz'}, cursor, 4)
+            ids.extend(m['id'] for m in page['items'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+        esperado = sorted((m for m in self.mock.data['movimentacoes'] if m['filial'] == 'Matriz'),
+                          key=lambda m: (m['data_hora'], m['id']), reverse=True)
+        self.assertEqual(ids, [m['id'] for m in esperado])
+        self.assertEqual(page['total'], len(esperado))
+
+        page = self.mock.query_movimentacoes({'tipo': ('saida',), 'usuario': 'outro'})
+        self.assertEqual(page['total'], 0)
+
+if __name__ == "__main__":
+    unittest.main()
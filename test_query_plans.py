@@ -0,0 +1,163 @@
+"""
+Testes de regressão dos planos de consulta (EXPLAIN QUERY PLAN) dos modelos
+"""
+
+import unittest
+import os
+import re
+import sys
+import tempfile
+import shutil
+
+# Adicionar src ao path para importar módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.database.schema import DatabaseSchema, OBSOLETE_INDEXES
+from src.database.models import (
+    FilialModel, CategoriaModel, UnidadeMedidaModel, UsuarioModel,
+    BrindeModel, MovimentacaoModel, FornecedorModel
+)
+
+# Varredura da tabela sem índice ("SCAN b") e ordenação fora do índice
+FULL_SCAN = re.compile(r"^SCAN \w+$")
+TEMP_SORT = "USE TEMP B-TREE"
+
+class TestQueryPlans(unittest.TestCase):
+    """Cada consulta dos modelos deve usar índice, sem varredura completa nem ordenação temporária"""
+
+    BRINDES = 20000
+    MOVIMENTACOES = 60000
+
+    @classmethod
+    def setUpClass(cls):
+        """Cria um banco temporário grande compartilhado pelos testes"""
+        cls.temp_dir = tempfile.mkdtemp()
+        cls.schema = DatabaseSchema(os.path.join(cls.temp_dir, 'teste.db'))
+        cls.executadas = []
+        filiais = [row[0] for row in cls.schema.execute_query("SELECT id FROM filiais ORDER BY id")]
+
+        with cls.schema.transaction() as conn:
+            conn.executemany("""
+                INSERT INTO brindes (codigo, descricao, categoria_id, quantidade, valor_unitario,
+                                     unidade_medida_id, filial_id, ativo)
+                VALUES (?, ?, ?, ?, 1.5, 1, ?, ?)
+            """, [(f"{i:06d}", f"Brinde {i}", 1 + i % 6, i % 40, filiais[i % len(filiais)], int(i % 10 != 0))
+                  for i in range(1, cls.BRINDES + 1)])
+            conn.executemany("""
+                INSERT INTO movimentacoes (brinde_id, tipo, quantidade, filial_origem_id,
+                                           usuario_id, data_hora)
+                VALUES (?, ?, 1, ?, 1, datetime('2025-01-01', ? || ' minutes'))
+            """, [(1 + i % cls.BRINDES,
+                   ('entrada', 'saida', 'transferencia_saida', 'transferencia_entrada')[i % 4],
+                   filiais[i % len(filiais)], i)
+                  for i in range(cls.MOVIMENTACOES)])
+
+        # Registrar o SQL emitido pelos modelos
+        original = cls.schema.execute_query
+
+        def execute_query(query, params=None):
+            cls.executadas.append((query, params))
+            return original(query, params)
+
+        cls.schema.execute_query = execute_query
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove o banco temporário"""
+        cls.schema.close()
+        shutil.rmtree(cls.temp_dir, ignore_errors=True)
+
+    def setUp(self):
+        self.executadas.clear()
+
+    def _model(self, cls):
+        model = cls()
+        model.db = self.schema
+        return model
+
+    def _plan(self, query, params):
+        conn = self.schema.get_pooled_connection()
+        return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + query, params or ())]
+
+    def assertPlansUseIndexes(self, *chamadas):
+        """Executa as chamadas e verifica o plano de cada consulta emitida"""
+        for chamada in chamadas:
+            chamada()
+        self.assertTrue(self.executadas)
+        for query, params in self.executadas:
+            plano = self._plan(query, params)
+            with self.subTest(query=" ".join(query.split()), plano=plano):
+                self.assertFalse([p for p in plano if FULL_SCAN.match(p)], "varredura completa")
+                self.assertFalse([p for p in plano if TEMP_SORT in p], "ordenação temporária")
+
+    def test_cadastros(self):
+        """Filiais, categorias, unidades, usuários e fornecedores"""
+        filiais = self._model(FilialModel)
+        categorias = self._model(CategoriaModel)
+        unidades = self._model(UnidadeMedidaModel)
+        usuarios = self._model(UsuarioModel)
+        fornecedores = self._model(FornecedorModel)
+        self.assertPlansUseIndexes(
+            filiais.get_all, lambda: filiais.get_all(False),
+            lambda: filiais.get_by_id(1), lambda: filiais.get_by_numero('001'),
+            categorias.get_all, lambda: categorias.get_all(False),
+            lambda: categorias.get_by_id(1), lambda: categorias.can_delete(1),
+            unidades.get_all, lambda: unidades.get_all(False), lambda: unidades.get_by_id(1),
+            usuarios.get_all, lambda: usuarios.get_all(False),
+            lambda: usuarios.get_by_username('admin'),
+            fornecedores.get_all, lambda: fornecedores.get_all(False),
+            lambda: fornecedores.get_by_id(1), lambda: fornecedores.get_by_codigo('FOR001'),
+            lambda: fornecedores.search('Brindes')
+        )
+
+    def test_brindes(self):
+        """Listagem por filial/código, estatísticas e buscas pontuais"""
+        brindes = self._model(BrindeModel)
+        self.assertPlansUseIndexes(
+            brindes.get_all, lambda: brindes.get_all(filial_id=2),
+            lambda: brindes.get_all(ativo_apenas=False),
+            lambda: brindes.get_estatisticas(10), lambda: brindes.get_estatisticas(10, 2),
+            lambda: brindes.get_by_id(5), lambda: brindes.get_by_codigo('000005'),
+            lambda: brindes.exists(5), lambda: brindes.find_by_descricao(2, 'Brinde 5'),
+            brindes.get_next_codigo,
+            lambda: brindes.search('Brinde 12', categoria_id=1, filial_id=2)
+        )
+
+    def test_movimentacoes(self):
+        """Histórico por brinde, recentes e consulta paginada com filtros"""
+        movimentacoes = self._model(MovimentacaoModel)
+        cursor = ('2025-01-20 00:00:00', 30000)
+        self.assertPlansUseIndexes(
+            lambda: movimentacoes.get_by_brinde(7, limit=20),
+            movimentacoes.get_recent, lambda: movimentacoes.get_recent(50, 'saida'),
+            movimentacoes.query,
+            lambda: movimentacoes.query(None, cursor),
+            lambda: movimentacoes.query({'filial_id': 2}, cursor),
+            lambda: movimentacoes.query({'tipo': 'entrada'}, cursor),
+            lambda: movimentacoes.query({'tipo': ['transferencia_saida', 'transferencia_entrada']}),
+            lambda: movimentacoes.query({'usuario_id': 1, 'data_inicio': '2025-01-10'}),
+            lambda: movimentacoes.query({'brinde_id': 7}),
+            lambda: movimentacoes.query({'data_inicio': '2025-01-10', 'data_fim': '2025-01-20'})
+        )
+
+    def test_listing_plans_read_in_index_order(self):
+        """As listagens principais usam os índices compostos/parciais esperados"""
+        brindes = self._model(BrindeModel)
+        movimentacoes = self._model(MovimentacaoModel)
+        brindes.get_all(filial_id=2)
+        brindes.get_estatisticas(10, 2)
+        movimentacoes.get_recent(50, 'saida')
+        planos = [" ".join(self._plan(q, p)) for q, p in self.executadas]
+        self.assertIn("idx_brindes_ativos_filial", planos[0])
+        self.assertIn("COVERING INDEX idx_brindes_ativos_estoque", planos[1])
+        self.assertIn("idx_movimentacoes_tipo_data", planos[2])
+
+    def test_obsolete_indexes_dropped(self):
+        """Índices redundantes não existem no banco atualizado"""
+        nomes = {row[0] for row in self.schema.get_pooled_connection().execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'"
+        )}
+        self.assertFalse(nomes & set(OBSOLETE_INDEXES))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+Testes das migrações do schema do banco de dados
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+import sqlite3
+
+# Adicionar src ao path para importar módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.database.schema import DatabaseSchema
+
+class TestDescricaoNormMigration(unittest.TestCase):
+    """Testes da descrição normalizada dos brindes"""
+
+    def setUp(self):
+        """Cria um banco temporário"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'teste.db')
+        self.schema = None
+
+    def tearDown(self):
+        """Remove o banco temporário"""
+        if self.schema:
+            self.schema.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _create_legacy_database(self):
+        """Banco no formato anterior (sem descricao_norm) com descrições repetidas"""
+        schema = DatabaseSchema(self.db_path)
+        schema.close()
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DROP INDEX idx_brindes_filial_descricao")
+        conn.execute("DROP TRIGGER trg_brindes_descricao_norm_insert")
+        conn.execute("DROP TRIGGER trg_brindes_descricao_norm_update")
+        conn.execute("ALTER TABLE brindes DROP COLUMN descricao_norm")
+        # Versão anterior ao passo da descrição normalizada
+        conn.execute("PRAGMA user_version = 1")
+        conn.executemany("""
+            INSERT INTO brindes (codigo, descricao, categoria_id, quantidade, valor_unitario,
+                                 unidade_medida_id, filial_id)
+            VALUES (?, ?, 1, 10, 1.0, 1, ?)
+        """, [('001', 'Caneta Azul', 1), ('002', ' caneta azul ', 1), ('003', 'Caneta Azul', 2)])
+        conn.commit()
+        conn.close()
+
+    def _norms(self):
+        rows = self.schema.execute_query("SELECT codigo, descricao_norm FROM brindes ORDER BY codigo")
+        return {row[0]: row[1] for row in rows}
+
+    def test_backfill_existing_rows(self):
+        """A migração preenche a coluna e resolve duplicados sem perder linhas"""
+        self._create_legacy_database()
+        self.schema = DatabaseSchema(self.db_path)
+
+        norms = self._norms()
+        self.assertEqual(norms['001'], 'caneta azul')
+        self.assertTrue(norms['002'].startswith('caneta azul#'))
+        self.assertEqual(norms['003'], 'caneta azul')
+
+    def test_unique_index_used_for_lookup(self):
+        """A busca por filial e descrição usa o índice único"""
+        self.schema = DatabaseSchema(self.db_path)
+        plano = self.schema.execute_query("""
+            EXPLAIN QUERY PLAN SELECT * FROM brindes
+            WHERE filial_id = 1 AND descricao_norm = 'x' AND ativo = 1
+        """)
+        self.assertIn('idx_brindes_filial_descricao', ' '.join(row[3] for row in plano))
+
+    def test_triggers_keep_column_updated(self):
+        """Inserções e alterações de descrição atualizam a coluna normalizada"""
+        self.schema = DatabaseSchema(self.db_path)
+        brinde_id = self.schema.execute_insert("""
+            INSERT INTO brindes (codigo, descricao, categoria_id, unidade_medida_id, filial_id)
+            VALUES ('010', '  Bloco A4 ', 1, 1, 1)
+        """)
+        self.assertEqual(self._norms()['010'], 'bloco a4')
+
+        self.schema.execute_update("UPDATE brindes SET descricao = 'Bloco A5' WHERE id = ?", (brinde_id,))
+        self.assertEqual(self._norms()['010'], 'bloco a5')
+
+    def test_duplicate_active_description_rejected(self):
+        """Dois brindes ativos não podem ter a mesma descrição na filial"""
+        self.schema = DatabaseSchema(self.db_path)
+        insert = """
+            INSERT INTO brindes (codigo, descricao, categoria_id, unidade_medida_id, filial_id)
+            VALUES (?, ?, 1, 1, 1)
+        """
+        brinde_id = self.schema.execute_insert(insert, ('020', 'Chaveiro'))
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.schema.execute_insert(insert, ('021', 'CHAVEIRO'))
+
+        # Brindes inativos não participam do índice
+        self.schema.execute_update("UPDATE brindes SET ativo = 0 WHERE id = ?", (brinde_id,))
+        self.schema.execute_insert(insert, ('022', 'Chaveiro'))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,193 @@
+"""
+Testes da busca textual (FTS5) de brindes e fornecedores
+"""
+
+import unittest
+from unittest import mock
+import os
+import sys
+import sqlite3
+import tempfile
+import shutil
+
+# Adicionar src ao path para importar módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.database.schema import DatabaseSchema
+from src.database.models import BrindeModel, FornecedorModel
+from src.database import search_index
+from src.database.search_index import fts_query
+from src.data.mock_data import MockDataManager
+
+class TestSearchIndex(unittest.TestCase):
+    """Índice FTS5 mantido pelos triggers"""
+
+    def setUp(self):
+        """Cria um banco temporário com alguns brindes"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.schema = DatabaseSchema(os.path.join(self.temp_dir, 'teste.db'))
+        self.brindes = BrindeModel()
+        self.brindes.db = self.schema
+        self.fornecedores = FornecedorModel()
+        self.fornecedores.db = self.schema
+
+        categoria = lambda nome: self.schema.execute_query("SELECT id FROM categorias WHERE nome = ?", (nome,))[0][0]
+        self.categoria = categoria('Chaveiros')
+        outros = categoria('Outros')
+        self.ids = {}
+        for codigo, descricao, observacoes, categoria in [
+            ('S1', 'Caneta Azul', None, outros),
+            ('S2', 'Camiseta Polo', 'Estampa azul marinho', outros),
+            ('S3', 'Chaveiro Metálico', None, self.categoria),
+            ('S4', 'Bloco de Anotações', 'Capa em couro', outros)
+        ]:
+            self.ids[codigo] = self.schema.execute_insert("""
+                INSERT INTO brindes (codigo, descricao, categoria_id, unidade_medida_id, filial_id, observacoes)
+                VALUES (?, ?, ?, 1, 1, ?)
+            """, (codigo, descricao, categoria, observacoes))
+
+    def tearDown(self):
+        """Remove o banco temporário"""
+        self.schema.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _codigos(self, termo, **kwargs):
+        return [b['codigo'] for b in self.brindes.search(termo, **kwargs)]
+
+    def test_fts_query(self):
+        """Palavras viram prefixos; aspas e pontuação não quebram a consulta"""
+        self.assertEqual(fts_query('can azul'), '"can"* "azul"*')
+        self.assertEqual(fts_query('a"b'), '"a"* "b"*')
+        self.assertIsNone(fts_query('  -- '))
+
+    def test_prefix_and_accent_insensitive(self):
+        """Prefixo, sem acentos e sem diferenciar maiúsculas"""
+        self.assertEqual(self._codigos('CANÉT'), ['S1'])
+        self.assertEqual(self._codigos('metalico'), ['S3'])
+        self.assertEqual(self._codigos('anotacoes'), ['S4'])
+
+    def test_ranking_by_column(self):
+        """Termo na descrição vale mais que nas observações"""
+        self.assertEqual(self._codigos('azul'), ['S1', 'S2'])
+
+    def test_broad_term_without_bm25(self):
+        """Acima de RANK_LIMIT: descrição primeiro, completando com as demais colunas"""
+        with mock.patch.object(search_index, 'RANK_LIMIT', 1):
+            self.assertEqual(self._codigos('azul'), ['S1', 'S2'])
+            self.assertEqual(self._codigos('azul', limit=1), ['S1'])
+            self.assertEqual(len(self._codigos('c')), 4)
+
+    def test_category_name_indexed(self):
+        """Nome da categoria é pesquisável e acompanha a renomeação"""
+        self.assertEqual(self._codigos('chaveiros'), ['S3'])
+        self.schema.execute_update("UPDATE categorias SET nome = 'Acessórios' WHERE id = ?", (self.categoria,))
+        self.assertEqual(self._codigos('acessorio'), ['S3'])
+        self.assertEqual(self._codigos('chaveiros'), [])
+        self.assertEqual(self._codigos('chaveiro'), ['S3'])  # ainda pela descrição
+
+    def test_triggers_follow_changes(self):
+        """Alteração de descrição e exclusão lógica atualizam o índice"""
+        self.schema.execute_update("UPDATE brindes SET descricao = 'Caneta Vermelha' WHERE id = ?",
+                                   (self.ids['S1'],))
+        self.assertEqual(self._codigos('vermelha'), ['S1'])
+        self.assertEqual(self._codigos('azul'), ['S2'])
+
+        self.brindes.delete(self.ids['S2'])
+        self.assertEqual(self._codigos('azul'), [])
+
+        self.schema.execute_update("UPDATE brindes SET ativo = 1 WHERE id = ?", (self.ids['S2'],))
+        self.assertEqual(self._codigos('azul'), ['S2'])
+
+    def test_filters_and_limit(self):
+        """Filtros de categoria/filial e limite de resultados"""
+        self.assertEqual(self._codigos('c', categoria_id=self.categoria), ['S3'])
+        self.assertEqual(self._codigos('c', filial_id=999), [])
+        self.assertEqual(len(self._codigos('c', limit=2)), 2)
+        self.assertEqual(len(self._codigos('', limit=3)), 3)
+
+    def test_fornecedores(self):
+        """Nome, email e CNPJ com ou sem pontuação"""
+        def codigos(termo):
+            return [f['codigo'] for f in self.fornecedores.search(termo)]
+
+        self.assertEqual(codigos('papel'), ['FOR002'])
+        self.assertEqual(codigos('techbrindes'), ['FOR003'])
+        self.assertEqual(codigos('11.222.333'), ['FOR003'])
+        self.assertEqual(codigos('98765432'), ['FOR002'])
+        self.assertEqual(codigos('joao'), ['FOR001'])
+
+class TestSearchIndexMigration(unittest.TestCase):
+    """Preenchimento do índice em bancos existentes"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'teste.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_existing_rows_backfilled(self):
+        """Banco anterior ao índice: as linhas existentes são indexadas em lotes"""
+        DatabaseSchema(self.db_path).close()
+        conn = sqlite3.connect(self.db_path)
+        triggers = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE '%fts%'"
+        ).fetchall()
+        for (trigger,) in triggers:
+            conn.execute(f"DROP TRIGGER {trigger}")
+        conn.executescript("""
+            DROP TABLE brindes_fts;
+            DROP TABLE fornecedores_fts;
+            DELETE FROM schema_backfills;
+            PRAGMA user_version = 3;
+        """)
+        conn.executemany("""
+            INSERT INTO brindes (codigo, descricao, categoria_id, unidade_medida_id, filial_id)
+            VALUES (?, ?, 1, 1, 1)
+        """, [(f"M{i}", f"Mochila {i}") for i in range(3000)])
+        conn.commit()
+        conn.close()
+
+        schema = DatabaseSchema(self.db_path)
+        try:
+            schema.backfill_worker.wait(30)
+            self.assertEqual(schema.backfill_worker.pending(), [])
+            brindes = BrindeModel()
+            brindes.db = schema
+            self.assertEqual(len(brindes.search('mochila', limit=5000)), 3000)
+            self.assertEqual([b['codigo'] for b in brindes.search('mochila 2999')], ['M2999'])
+
+            fornecedores = FornecedorModel()
+            fornecedores.db = schema
+            self.assertEqual(len(fornecedores.search('for')), 3)
+        finally:
+            schema.close()
+
+class TestSearchMock(unittest.TestCase):
+    """Mesma semântica de busca no MockDataManager"""
+
+    def setUp(self):
+        self.mock = MockDataManager()
+        self.mock.data = {
+            'brindes': [
+                {'codigo': '001', 'descricao': 'Caneta Azul', 'categoria': 'Canetas', 'filial': 'Matriz'},
+                {'codigo': '002', 'descricao': 'Camiseta', 'observacoes': 'azul', 'categoria': 'Camisetas',
+                 'filial': 'Matriz'},
+                {'codigo': '003', 'descricao': 'Chaveiro Metálico', 'categoria': 'Chaveiros', 'filial': 'Matriz'}
+            ],
+            'fornecedores': [
+                {'id': 1, 'codigo': 'FOR001', 'nome': 'Brindes & Cia', 'cnpj': '12.345.678/0001-90'}
+            ]
+        }
+
+    def test_search(self):
+        """Prefixo sem acentos, descrição primeiro, limite e CNPJ só com dígitos"""
+        codigos = lambda termo, **kw: [b['codigo'] for b in self.mock.search_brindes(termo, **kw)]
+        self.assertEqual(codigos('metalico'), ['003'])
+        self.assertEqual(codigos('azu'), ['001', '002'])
+        self.assertEqual(codigos('c', limit=1), ['001'])
+        self.assertEqual(codigos('c', categoria='Chaveiros'), ['003'])
+        self.assertEqual(len(self.mock.search_fornecedores('12345678')), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,180 @@
+"""
+Testes do resumo do estoque (estoque_resumo) mantido por triggers
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+
+# Adicionar src ao path para importar módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.database.schema import DatabaseSchema
+from src.database.models import BrindeModel
+from src.database.stock_summary import rebuild_stock_summary, verify_stock_summary
+from src.data.mock_data import MockDataManager
+
+class TestEstoqueResumo(unittest.TestCase):
+    """Triggers comparados ao recálculo a partir dos brindes"""
+
+    def setUp(self):
+        """Cria um banco temporário com brindes em duas filiais e duas categorias"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.schema = DatabaseSchema(os.path.join(self.temp_dir, 'teste.db'))
+        self.model = BrindeModel()
+        self.model.db = self.schema
+        self.conn = self.schema.get_pooled_connection()
+        self.filial2 = self.schema.execute_insert(
+            "INSERT INTO filiais (numero, nome, cidade) VALUES ('902', 'Filial 2', 'Campinas')"
+        )
+        self.categoria2 = self.schema.execute_query(
+            "SELECT id FROM categorias WHERE id <> 1 ORDER BY id LIMIT 1"
+        )[0][0]
+        self.ids = [
+            self._inserir(f"E{i}", descricao, categoria, quantidade, valor, filial)
+            for i, (descricao, categoria, quantidade, valor, filial) in enumerate([
+                ("Caneta Azul", 1, 10, 2.5, 1),
+                ("Caneta Azul", 1, 4, 2.5, self.filial2),
+                ("Caderno", 1, 7, 12.0, 1),
+                ("Squeeze", self.categoria2, 0, 9.9, 1)
+            ])
+        ]
+
+    def tearDown(self):
+        """Remove o banco temporário"""
+        self.schema.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _inserir(self, codigo, descricao, categoria, quantidade, valor, filial):
+        return self.schema.execute_insert("""
+            INSERT INTO brindes (codigo, descricao, categoria_id, quantidade, valor_unitario,
+                                 unidade_medida_id, filial_id)
+            VALUES (?, ?, ?, ?, ?, 1, ?)
+        """, (codigo, descricao, categoria, quantidade, valor, filial))
+
+    def _linha(self, grupo, chave, filial_id):
+        rows = self.schema.execute_query("""
+            SELECT itens, quantidade, valor_total FROM estoque_resumo
+            WHERE grupo = ? AND chave = ? AND filial_id = ?
+        """, (grupo, str(chave), filial_id))
+        return tuple(rows[0]) if rows else None
+
+    def test_insert_fills_both_groups(self):
+        """Cada brinde ativo entra no grupo da descrição e no da categoria"""
+        self.assertEqual(self._linha('descricao', 'caneta azul', 1), (1, 10, 25.0))
+        self.assertEqual(self._linha('descricao', 'caneta azul', self.filial2), (1, 4, 10.0))
+        self.assertEqual(self._linha('categoria', 1, 1), (2, 17, 109.0))
+        self.assertEqual(self._linha('categoria', self.categoria2, 1), (1, 0, 0.0))
+        self.assertEqual(verify_stock_summary(self.conn), [])
+
+    def test_quantity_update_applies_delta(self):
+        """Entrada e saída de estoque atualizam só quantidade e valor"""
+        self.schema.execute_update("UPDATE brindes SET quantidade = quantidade + 6 WHERE id = ?",
+                                   (self.ids[0],))
+        self.schema.execute_update("UPDATE brindes SET quantidade = quantidade - 2 WHERE id = ?",
+                                   (self.ids[2],))
+        self.assertEqual(self._linha('descricao', 'caneta azul', 1), (1, 16, 40.0))
+        self.assertEqual(self._linha('categoria', 1, 1), (2, 21, 100.0))
+        self.assertEqual(verify_stock_summary(self.conn), [])
+
+    def test_moving_between_groups(self):
+        """Troca de descrição, categoria ou filial sai do grupo antigo e entra no novo"""
+        self.schema.execute_update("UPDATE brindes SET categoria_id = ? WHERE id = ?",
+                                   (self.categoria2, self.ids[2]))
+        self.schema.execute_update("UPDATE brindes SET descricao = '  SQUEEZE ' WHERE id = ?",
+                                   (self.ids[1],))
+        self.schema.execute_update("UPDATE brindes SET filial_id = ? WHERE id = ?",
+                                   (self.filial2, self.ids[0]))
+        self.assertIsNone(self._linha('descricao', 'caneta azul', 1))
+        self.assertEqual(self._linha('descricao', 'caneta azul', self.filial2), (1, 10, 25.0))
+        self.assertEqual(self._linha('descricao', 'squeeze', self.filial2), (1, 4, 10.0))
+        self.assertEqual(self._linha('categoria', self.categoria2, 1), (2, 7, 84.0))
+        self.assertEqual(verify_stock_summary(self.conn), [])
+
+    def test_deactivate_and_delete(self):
+        """Brindes inativados ou excluídos saem do resumo; grupos vazios são removidos"""
+        self.schema.execute_update("UPDATE brindes SET ativo = 0 WHERE id = ?", (self.ids[3],))
+        self.assertIsNone(self._linha('descricao', 'squeeze', 1))
+        self.assertIsNone(self._linha('categoria', self.categoria2, 1))
+
+        self.schema.execute_update("DELETE FROM brindes WHERE id = ?", (self.ids[2],))
+        self.assertEqual(self._linha('categoria', 1, 1), (1, 10, 25.0))
+
+        # Reativar volta a contar; excluir um inativo não muda nada
+        self.schema.execute_update("UPDATE brindes SET ativo = 1 WHERE id = ?", (self.ids[3],))
+        self.assertEqual(self._linha('descricao', 'squeeze', 1), (1, 0, 0.0))
+        self.schema.execute_update("UPDATE brindes SET ativo = 0 WHERE id = ?", (self.ids[1],))
+        self.schema.execute_update("DELETE FROM brindes WHERE id = ?", (self.ids[1],))
+        self.assertIsNone(self._linha('descricao', 'caneta azul', self.filial2))
+        self.assertEqual(verify_stock_summary(self.conn), [])
+
+    def test_verify_and_rebuild(self):
+        """verify aponta divergências; rebuild as corrige"""
+        self.schema.execute_update("""
+            UPDATE estoque_resumo SET quantidade = 999
+            WHERE grupo = 'descricao' AND chave = 'caderno'
+        """)
+        self.schema.execute_update("DELETE FROM estoque_resumo WHERE grupo = 'categoria'")
+        divergencias = verify_stock_summary(self.conn)
+        self.assertEqual(len(divergencias), 4)
+        caderno = next(d for d in divergencias if d['chave'] == 'caderno')
+        self.assertEqual(caderno['esperado'][1], 7)
+        self.assertEqual(caderno['atual'][1], 999)
+
+        self.assertEqual(rebuild_stock_summary(self.conn), 7)
+        self.assertEqual(verify_stock_summary(self.conn), [])
+
+    def test_model_rows(self):
+        """Linhas por descrição trazem os dados de exibição; por categoria, o nome"""
+        rows = self.model.get_estoque_resumo('descricao', 1)
+        self.assertEqual([r['descricao'] for r in rows], ["Caderno", "Caneta Azul", "Squeeze"])
+        caneta = rows[1]
+        self.assertEqual(caneta['quantidade'], 10)
+        self.assertEqual(caneta['codigo'], "E0")
+        self.assertIsNotNone(caneta['categoria'])
+        self.assertIsNotNone(caneta['unidade_medida'])
+
+        todas = self.model.get_estoque_resumo('descricao')
+        self.assertEqual(len(todas), 4)
+
+        categorias = self.model.get_estoque_resumo('categoria', 1)
+        self.assertEqual(sum(r['quantidade'] for r in categorias), 17)
+        self.assertTrue(all(r['categoria'] for r in categorias))
+        with self.assertRaises(ValueError):
+            self.model.get_estoque_resumo('fornecedor')
+
+class TestEstoqueResumoMock(unittest.TestCase):
+    """Resumo do mock no mesmo formato do banco"""
+
+    def setUp(self):
+        self.mock = MockDataManager.__new__(MockDataManager)
+        self.mock.data = {'brindes': [
+            {'id': 1, 'codigo': 'B1', 'descricao': 'Caneta', 'categoria': 'Escrita', 'filial': 'Matriz',
+             'quantidade': 10, 'valor_unitario': 2.0, 'unidade_medida': 'UN'},
+            {'id': 2, 'codigo': 'B2', 'descricao': ' caneta ', 'categoria': 'Escrita', 'filial': 'Matriz',
+             'quantidade': 5, 'valor_unitario': 3.0, 'unidade_medida': 'UN'},
+            {'id': 3, 'codigo': 'B3', 'descricao': 'Caneta', 'categoria': 'Escrita', 'filial': 'Filial 2',
+             'quantidade': 1, 'valor_unitario': 2.0, 'unidade_medida': 'UN'},
+            {'id': 4, 'codigo': 'B4', 'descricao': 'Boné', 'categoria': 'Vestuário', 'filial': 'Matriz',
+             'quantidade': 3, 'valor_unitario': 20.0, 'unidade_medida': 'UN'}
+        ]}
+
+    def test_descricao(self):
+        """Agrupa por descrição normalizada e filial, somando o valor de cada brinde"""
+        rows = self.mock.get_estoque_resumo('descricao')
+        self.assertEqual([(r['descricao'], r['filial']) for r in rows],
+                         [('Boné', 'Matriz'), ('Caneta', 'Filial 2'), ('Caneta', 'Matriz')])
+        caneta = rows[2]
+        self.assertEqual((caneta['itens'], caneta['quantidade'], caneta['valor_total']), (2, 15, 35.0))
+        self.assertEqual(caneta['codigo'], 'B1')
+
+    def test_categoria_with_filter(self):
+        """Por categoria, respeitando o filtro de filial"""
+        rows = self.mock.get_estoque_resumo('categoria', 'Matriz')
+        self.assertEqual([(r['categoria'], r['quantidade']) for r in rows],
+                         [('Escrita', 15), ('Vestuário', 3)])
+
+if __name__ == "__main__":
+    unittest.main()
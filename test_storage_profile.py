@@ -0,0 +1,105 @@
+"""
+Testes do perfil de armazenamento (WAL, PRAGMAs e checkpoint)
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+import sqlite3
+
+# Adicionar src ao path para importar módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.database.schema import DatabaseSchema
+from src.database.storage_profile import StorageProfile, DEFAULT_PROFILE
+
+class TestStorageProfile(unittest.TestCase):
+    """Testes do perfil de armazenamento"""
+
+    def setUp(self):
+        """Cria um banco temporário"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'teste.db')
+        self.schema = DatabaseSchema(self.db_path)
+
+    def tearDown(self):
+        """Remove o banco temporário"""
+        self.schema.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _pragma(self, nome: str):
+        return self.schema.execute_query(f"PRAGMA {nome}")[0][0]
+
+    def test_profile_seeded_in_configuracoes(self):
+        """O perfil padrão deve ser gravado na tabela configuracoes"""
+        rows = self.schema.execute_query(
+            "SELECT chave, valor FROM configuracoes WHERE chave LIKE 'storage_%'"
+        )
+        valores = {row[0]: row[1] for row in rows}
+        self.assertEqual(valores['storage_journal_mode'], 'WAL')
+        self.assertEqual(len(valores), len(DEFAULT_PROFILE))
+
+    def test_pragmas_applied_on_pooled_connection(self):
+        """As conexões do pool devem usar o perfil configurado"""
+        self.assertEqual(self._pragma("journal_mode").upper(), 'WAL')
+        self.assertEqual(self._pragma("synchronous"), 1)  # NORMAL
+        self.assertEqual(self._pragma("cache_size"), DEFAULT_PROFILE['cache_size'])
+        self.assertEqual(self._pragma("temp_store"), 2)  # MEMORY
+        self.assertEqual(self._pragma("foreign_keys"), 1)
+
+    def test_reload_applies_new_values(self):
+        """Alterar o perfil no banco e recarregar deve recriar as conexões"""
+        self.schema.execute_update(
+            "UPDATE configuracoes SET valor = 'FULL' WHERE chave = 'storage_synchronous'"
+        )
+        self.schema.reload_storage_profile()
+        self.assertEqual(self._pragma("synchronous"), 2)  # FULL
+
+    def test_invalid_values_rejected(self):
+        """Valores inválidos não podem chegar ao PRAGMA"""
+        with self.assertRaises(ValueError):
+            StorageProfile({'synchronous': 'NORMAL; DROP TABLE brindes'})
+        with self.assertRaises(ValueError):
+            StorageProfile({'cache_size': 'muito'})
+
+    def test_invalid_stored_value_falls_back_to_default(self):
+        """Valor inválido gravado no banco deve ser ignorado na carga"""
+        self.schema.execute_update(
+            "UPDATE configuracoes SET valor = 'RAPIDO' WHERE chave = 'storage_synchronous'"
+        )
+        perfil = self.schema.load_storage_profile()
+        self.assertEqual(perfil['synchronous'], DEFAULT_PROFILE['synchronous'])
+
+    def test_readers_not_blocked_by_open_write(self):
+        """Com WAL, leituras não esperam uma transação de escrita aberta"""
+        writer = sqlite3.connect(self.db_path)
+        try:
+            writer.execute("BEGIN IMMEDIATE")
+            writer.execute("UPDATE filiais SET nome = nome || '' WHERE id = 1")
+
+            rows = self.schema.execute_query("SELECT COUNT(*) FROM filiais")
+            self.assertGreater(rows[0][0], 0)
+        finally:
+            writer.rollback()
+            writer.close()
+
+    def test_checkpoint_scheduler_truncates_wal(self):
+        """O checkpoint em segundo plano deve esvaziar o WAL acima do limite"""
+        scheduler = self.schema.checkpoint_scheduler
+        scheduler.threshold_pages = 1
+
+        for i in range(50):
+            self.schema.execute_insert(
+                "INSERT INTO categorias (nome, descricao) VALUES (?, ?)", (f"Cat WAL {i}", 'x' * 500)
+            )
+
+        conn = self.schema.get_pooled_connection()
+        self.assertGreater(scheduler.wal_pages(conn), 0)
+        self.assertTrue(scheduler.check())
+        self.assertEqual(scheduler.wal_pages(conn), 0)
+        self.assertFalse(scheduler.check())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Testes do modelo das tabelas virtualizadas (colunas, ordenação e janela visível)
+"""
+
+import unittest
+import os
+import sys
+
+# Adicionar src ao path para importar módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.utils.table_model import Column, TableModel
+
+class TestColumn(unittest.TestCase):
+    """Valor, texto e chave de ordenação das colunas"""
+
+    def test_text(self):
+        """Chave ou função, formatação e abreviação"""
+        item = {'descricao': 'Caneta esferográfica azul', 'valor': 2.5, 'vazio': None}
+        self.assertEqual(Column('descricao', "Descrição").text(item), 'Caneta esferográfica azul')
+        self.assertEqual(Column('descricao', "Descrição", max_chars=6).text(item), 'Caneta...')
+        self.assertEqual(Column('descricao', "Descrição", max_chars=6).full_text(item),
+                         'Caneta esferográfica azul')
+        self.assertEqual(Column('valor', "Valor", formatter=lambda v: f"R$ {v:.2f}").text(item), 'R$ 2.50')
+        self.assertEqual(Column(lambda i: i['valor'] * 2, "Dobro").text(item), '5.0')
+        self.assertEqual(Column('vazio', "Vazio").text(item), '')
+
+class TestTableModel(unittest.TestCase):
+    """Ordenação e navegação da janela de linhas"""
+
+    def setUp(self):
+        self.items = [{'id': i, 'nome': f"Item {i:02d}", 'quantidade': (i * 7) % 10} for i in range(23)]
+        self.model = TableModel([
+            Column('nome', "Nome"),
+            Column('quantidade', "Quantidade"),
+            Column('id', "ID", sortable=False)
+        ], page_size=10)
+        self.model.set_items(self.items)
+
+    def _ids(self):
+        return [item['id'] for item in self.model.visible()]
+
+    def test_pages(self):
+        """Páginas de tamanho fixo; a última só com o restante"""
+        self.assertEqual(self.model.pages, 3)
+        self.assertEqual(self._ids(), list(range(10)))
+        self.assertTrue(self.model.go_to_page(3))
+        self.assertEqual(self._ids(), [20, 21, 22])
+        self.assertEqual(self.model.page, 3)
+        self.assertFalse(self.model.go_to_page(99))  # limitada à última
+        self.model.go_to_page(0)
+        self.assertEqual(self.model.page, 1)
+
+    def test_scroll(self):
+        """Rolagem linha a linha, limitada ao início da última página"""
+        self.assertTrue(self.model.scroll(3))
+        self.assertEqual(self._ids()[0], 3)
+        self.assertEqual(self.model.page, 1)
+        self.model.scroll(100)
+        self.assertEqual(self.model.offset, 20)
+        self.assertFalse(self.model.scroll(1))
+        self.model.scroll(-100)
+        self.assertEqual(self.model.offset, 0)
+
+    def test_set_items(self):
+        """Novos itens voltam ao início, ou mantêm a posição se possível"""
+        self.model.go_to_page(2)
+        self.model.set_items(self.items, keep_position=True)
+        self.assertEqual(self.model.page, 2)
+        self.model.set_items(self.items[:12], keep_position=True)
+        self.assertEqual(self.model.offset, 10)
+        self.model.set_items(self.items[:5], keep_position=True)
+        self.assertEqual(self.model.offset, 0)
+        self.model.set_items([])
+        self.assertEqual((self.model.pages, self.model.visible()), (1, []))
+
+    def test_sort(self):
+        """Mesma coluna alterna o sentido; None volta à ordem original"""
+        self.model.sort_by(1)
+        quantidades = [item['quantidade'] for item in self.model.rows]
+        self.assertEqual(quantidades, sorted(quantidades))
+        self.model.sort_by(1)
+        self.assertTrue(self.model.sort_descending)
+        self.assertEqual([item['quantidade'] for item in self.model.rows], sorted(quantidades, reverse=True))
+        self.model.sort_by(0)
+        self.assertFalse(self.model.sort_descending)
+        self.model.sort_by(None)
+        self.assertEqual(self.model.rows, self.items)
+
+    def test_sort_keeps_on_new_items_and_resets_window(self):
+        """A ordenação vale para os próximos itens; ordenar volta à primeira página"""
+        self.model.go_to_page(2)
+        self.model.sort_by(0, descending=True)
+        self.assertEqual(self.model.offset, 0)
+        self.model.set_items(self.items[:3])
+        self.assertEqual([item['id'] for item in self.model.rows], [2, 1, 0])
+
+    def test_sort_not_sortable_column(self):
+        """Coluna não ordenável é ignorada"""
+        self.model.sort_by(2)
+        self.assertIsNone(self.model.sort_column)
+
+    def test_sort_empty_values_last_and_mixed_types(self):
+        """Vazios no fim e sem diferenciar maiúsculas; tipos misturados ordenam pelo texto"""
+        model = TableModel([Column('v', "V")])
+        model.set_items([{'v': 'b'}, {'v': None}, {'v': 'A'}, {'v': ''}])
+        model.sort_by(0)
+        self.assertEqual([item['v'] for item in model.rows], ['A', 'b', None, ''])
+        model.set_items([{'v': 10}, {'v': 'x'}, {'v': 2}])
+        self.assertEqual([item['v'] for item in model.rows], [10, 2, 'x'])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+"""
+Testes do índice de busca em memória das telas de listagem
+"""
+
+import unittest
+import os
+import sys
+import time
+import random
+
+# Adicionar src ao path para importar módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.utils.text_search import TextSearchIndex, search_words
+
+def _varredura(items, query, fields):
+    """Referência: cada palavra da busca é prefixo de alguma palavra do item"""
+    palavras = search_words(query)
+    resultado = []
+    for item in items:
+        texto = [p for valor in fields(item) for p in search_words(valor)]
+        if all(any(p.startswith(q) for p in texto) for q in palavras):
+            resultado.append(item)
+    return resultado
+
+class TestTextSearchIndex(unittest.TestCase):
+    """Índice de prefixos sem acentos"""
+
+    def setUp(self):
+        self.items = [
+            {'id': 1, 'codigo': '001', 'descricao': 'Caneta Azul', 'categoria': 'Canetas'},
+            {'id': 2, 'codigo': '002', 'descricao': 'Camiseta Polo', 'categoria': 'Camisetas'},
+            {'id': 3, 'codigo': '003', 'descricao': 'Chaveiro Metálico', 'categoria': 'Chaveiros'},
+            {'id': 4, 'codigo': '104', 'descricao': 'Boné Azul-Marinho', 'categoria': None}
+        ]
+        self.index = TextSearchIndex(self.items)
+
+    def _ids(self, query):
+        return [item['id'] for item in self.index.search(query)]
+
+    def test_search_words(self):
+        """Minúsculas, sem acentos, pontuação separa palavras"""
+        self.assertEqual(search_words('Boné AÇÃO azul-marinho'), ['bone', 'acao', 'azul', 'marinho'])
+        self.assertEqual(search_words('Cafe\u0301'), ['cafe'])  # acento combinado (NFD)
+        self.assertEqual(search_words(None), [])
+        self.assertEqual(search_words(12.5), ['12', '5'])
+
+    def test_prefix_accent_insensitive(self):
+        """Prefixo de palavra, sem acentos e sem diferenciar maiúsculas"""
+        self.assertEqual(self._ids('METÁL'), [3])
+        self.assertEqual(self._ids('bone'), [4])
+        self.assertEqual(self._ids('azul'), [1, 4])
+        self.assertEqual(self._ids('marinho azul'), [4])
+        self.assertEqual(self._ids('zul'), [])
+        self.assertEqual(self._ids('10'), [4])
+
+    def test_empty_query_returns_all_in_order(self):
+        """Busca vazia devolve todos os itens, na ordem original"""
+        self.assertEqual(self._ids(''), [1, 2, 3, 4])
+        self.assertEqual(self._ids('  - '), [1, 2, 3, 4])
+
+    def test_custom_fields(self):
+        """Só os campos informados são pesquisáveis"""
+        index = TextSearchIndex(self.items, lambda item: (item['descricao'],))
+        self.assertEqual([i['id'] for i in index.search('canetas')], [])
+        self.assertEqual([i['id'] for i in index.search('caneta')], [1])
+
+    def test_incremental_matches_fresh_index(self):
+        """Digitação, apagamento e troca de termo dão o mesmo resultado de um índice novo"""
+        random.seed(7)
+        palavras = ['Caneta', 'Caneca', 'Camiseta', 'Azul', 'Ação', 'Metálico', 'Boné', 'Polo']
+        items = [{'id': i, 'descricao': ' '.join(random.sample(palavras, 3)), 'codigo': f"{i:04d}"}
+                 for i in range(500)]
+        fields = lambda item: (item['descricao'], item['codigo'])
+        index = TextSearchIndex(items, fields)
+
+        digitado = "cane aca 01"
+        sequencia = [digitado[:i] for i in range(len(digitado) + 1)]
+        sequencia += list(reversed(sequencia)) + ['metal', 'me', 'bone po', 'polo', '']
+        for query in sequencia:
+            with self.subTest(query=query):
+                self.assertEqual(index.search(query), _varredura(items, query, fields))
+
+    def test_rebuild(self):
+        """Nova carga de dados substitui o índice"""
+        self.assertEqual(self._ids('azul'), [1, 4])
+        self.index.build(self.items[:2])
+        self.assertEqual(self._ids('azul'), [1])
+        self.assertEqual(len(self.index), 2)
+
+    def test_keystroke_under_5ms_at_50k(self):
+        """Cada tecla custa menos de 5 ms com 50 mil itens"""
+        itens = ['Caneta', 'Camiseta', 'Chaveiro', 'Bloco', 'Caneca', 'Mochila', 'Squeeze', 'Boné']
+        cores = ['Azul', 'Vermelha', 'Preta', 'Branca', 'Verde', 'Amarela', 'Metálica']
+        items = [{
+            'id': i, 'codigo': f"{i:06d}",
+            'descricao': f"{itens[i % len(itens)]} {cores[i // len(itens) % len(cores)]} {i}",
+            'categoria': 'Outros', 'quantidade': i % 50, 'filial': 'Matriz'
+        } for i in range(50000)]
+        index = TextSearchIndex(items)
+
+        teclas = ["caneta azul 4"[:i] for i in range(1, 14)] + ['', 'b', 'bo', 'bon', 'bone', '', '4', '49', '499']
+        # Melhor de 3 digitações por tecla, para não medir ruído da máquina
+        tempos = [float('inf')] * len(teclas)
+        for _ in range(3):
+            index.search('')
+            for i, query in enumerate(teclas):
+                inicio = time.perf_counter()
+                index.search(query)
+                tempos[i] = min(tempos[i], time.perf_counter() - inicio)
+
+        pior = max(tempos)
+        self.assertLess(pior, 0.005, f"tecla mais lenta: {teclas[tempos.index(pior)]!r} {pior * 1000:.2f} ms")
+        self.assertEqual(len(index.search('caneta azul 49')), len(_varredura(items, 'caneta azul 49', dict.values)))
+
+if __name__ == "__main__":
+    unittest.main()